@@ -103,6 +103,8 @@ class Asteroid(object):
         self.__initasteroid()
         # compute a bunch of parameters for the polyhedron model
         self.asteroid_grav = self.polyhedron_shape_input()
+        self.polyhedron_model = polyhedron.PolyhedronGravity.from_asteroid_grav(
+            self.asteroid_grav, self.G, self.sigma)
     
     def __initasteroid(self):
         """Initialize the asteroid properties
@@ -281,88 +283,28 @@ class Asteroid(object):
             U_grad_mat - gravitational gradient matrix
             Ulaplace - laplacian
         """
-        F = self.F
-        V = self.V
-
-        Fa = self.asteroid_grav['Fa']
-        Fb = self.asteroid_grav['Fb']
-        Fc = self.asteroid_grav['Fc']
-
-        e1 = self.asteroid_grav['e1']
-        e2 = self.asteroid_grav['e2']
-        e3 = self.asteroid_grav['e3']
-
-        e1_face_map = self.asteroid_grav['e1_face_map']
-        e2_face_map = self.asteroid_grav['e2_face_map']
-        e3_face_map = self.asteroid_grav['e3_face_map']
-
-
-        e1_vertex_map = self.asteroid_grav['e1_vertex_map']
-        e2_vertex_map = self.asteroid_grav['e2_vertex_map']
-        e3_vertex_map = self.asteroid_grav['e3_vertex_map']
-        
-        e_vertex_map = self.asteroid_grav['e_vertex_map']
-        unique_index = self.asteroid_grav['unique_index']
-
-        e1_ind1b = self.asteroid_grav['e1_ind1b']
-        e1_ind2b = self.asteroid_grav['e1_ind2b']
-        e1_ind3b = self.asteroid_grav['e1_ind3b']
-
-        e2_ind1b = self.asteroid_grav['e2_ind1b']
-        e2_ind2b = self.asteroid_grav['e2_ind2b']
-        e2_ind3b = self.asteroid_grav['e2_ind3b']
-
-        e3_ind1b = self.asteroid_grav['e3_ind1b']
-        e3_ind2b = self.asteroid_grav['e3_ind2b']
-        e3_ind3b = self.asteroid_grav['e3_ind3b']
+        U, U_grad, U_grad_mat, Ulaplace = self.polyhedron_model.potential(state)
 
-        normal_face = self.asteroid_grav['normal_face']
+        return (U[0], U_grad[0, :], U_grad_mat[0, :, :], Ulaplace[0])
 
-        e1_normal = self.asteroid_grav['e1_normal']
-        e2_normal = self.asteroid_grav['e2_normal']
-        e3_normal = self.asteroid_grav['e3_normal']
+    def polyhedron_potential_batch(self, states, block_size=64):
+        """Polyhedron Potential Model at many field points
 
-        E1_edge = self.asteroid_grav['E1_edge']
-        E2_edge = self.asteroid_grav['E2_edge']
-        E3_edge = self.asteroid_grav['E3_edge']
+        Same interface as the C++ asteroid (lib.asteroid)
 
-        F_face = self.asteroid_grav['F_face']
+        Inputs:
+            states - nx3 array of positions in the asteroid body fixed frame in km
+            block_size - unused, kept for compatibility with the C++ asteroid
 
-        num_f = self.asteroid_grav['num_f']
-        num_e = self.asteroid_grav['num_e']
-        num_v = self.asteroid_grav['num_v']
-
-        G = self.G
-        sigma = self.sigma
-        
-        # distance from state to each vertex
-        r_v = V - np.tile(state, (num_v, 1))
-
-        # function to compute laplacia factor (wf)
-        w_face = polyhedron.laplacian_factor(r_v, Fa, Fb, Fc)
-
-        # check if point is inside or outside the body
-        # zero when outside body and -G*sigma*4 pi on the inside
-        inside_check = np.sum(w_face)
-        if np.isclose(inside_check, 0):  # outside the body
-            L1_edge, L2_edge, L3_edge = polyhedron.edge_factor(r_v, e1, e2, e3, e1_vertex_map, e2_vertex_map, e3_vertex_map)
-            
-            # compute the contribution of the each face
-            U_face, U_grad_face, U_grad_mat_face  = polyhedron.face_contribution(r_v, Fa, F_face, w_face)
-            U_edge, U_grad_edge, U_grad_mat_edge = polyhedron.edge_contribution(state, e_vertex_map, unique_index, V, E1_edge, E2_edge, E3_edge, L1_edge, L2_edge, L3_edge)
-            # combine edge and face summations
-            U = 1 / 2 * G * sigma * U_edge - 1 / 2 * G * sigma * U_face
-            U_grad = -G * sigma * U_grad_edge + G * sigma * U_grad_face
-            U_grad_mat = G * sigma * U_grad_mat_edge - G * sigma * U_grad_mat_face
-            Ulaplace = -G * sigma * np.sum(w_face)
-        else:
-            U = 0
-            U_grad = np.zeros(3)
-            U_grad_mat = np.zeros((3, 3))
-            Ulaplace = 0
-        #     print("INSIDE ASTEROID!")
+        Outputs:
+            U - (n,) gravitational potential
+            U_grad - (n, 3) gravitational attraction
+            U_grad_mat - (n, 9) gravitational gradient matrix (row major)
+            Ulaplace - (n,) laplacian
+        """
+        U, U_grad, U_grad_mat, Ulaplace = self.polyhedron_model.potential(states)
 
-        return (U, U_grad, U_grad_mat, Ulaplace)
+        return (U, U_grad, U_grad_mat.reshape((-1, 9)), Ulaplace)
     
     def rotate_vertices(self, t):
         """New method to rotate the asteroid vertices
@@ -411,6 +353,8 @@ class Asteroid(object):
         self.name = name
         self.__initasteroid()
         self.asteroid_grav = self.polyhedron_shape_input()
+        self.polyhedron_model = polyhedron.PolyhedronGravity.from_asteroid_grav(
+            self.asteroid_grav, self.G, self.sigma)
 
         return self
 
@@ -925,3 +925,88 @@ def approaching_translation(time, ast, final_pos=[0.550, 0, 0],
     # output
     return inertial_pos, inertial_vel, inertial_accel 
 
+
+class DecisionHold(object):
+    """Zero order hold of the desired state of a C++ Controller
+
+    The equations of motion call explore_asteroid (or refinement) at every
+    right hand side evaluation, which minimizes the uncertainty over the whole
+    reconstructed mesh each time. This wrapper computes the desired state once
+    and returns the same decision until expire is called, e.g. by a periodic
+    event of dynamics.scheduler.Scheduler that also restarts the integrator.
+    The next evaluation after that plans again at the current time and state.
+
+    Pass it to the equations of motion in place of the controller.
+
+    With a horizon the exploration decisions use the receding horizon planner
+    explore_asteroid_horizon instead of the greedy explore_asteroid. It is
+    too expensive to call at every evaluation so it is only used with a hold.
+
+    Parameters
+    ----------
+    complete_controller : lib.controller.Controller
+        Controller that makes the decisions
+    horizon : int
+        Number of views planned ahead, None for the greedy decision
+    num_candidates : int
+        Number of candidate view sequences of the planner
+    max_angle : float
+        Max angle of the measurements used by ReconstructMesh.update
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, complete_controller, horizon=None, num_candidates=8, max_angle=0.1):
+        self.controller = complete_controller
+        self.horizon = horizon
+        self.num_candidates = num_candidates
+        self.max_angle = max_angle
+        self.decision = None
+        # number of decisions that were made
+        self.replans = 0
+
+    def expire(self, *args):
+        """Plan again at the next evaluation, args are ignored so it can be an event"""
+        self.decision = None
+
+    def explore_asteroid(self, *args):
+        if self.horizon is None:
+            self._plan('explore_asteroid', args)
+        else:
+            self._plan('explore_asteroid_horizon',
+                       args + (self.horizon, self.num_candidates, self.max_angle))
+
+    def refinement(self, *args):
+        self._plan('refinement', args)
+
+    def _plan(self, method, args):
+        if self.decision is None:
+            getattr(self.controller, method)(*args)
+            self.decision = (self.controller.get_Rd(), self.controller.get_Rd_dot(),
+                             self.controller.get_ang_vel_d(), self.controller.get_ang_vel_d_dot(),
+                             self.controller.get_posd(), self.controller.get_veld(),
+                             self.controller.get_acceld())
+            self.replans += 1
+
+    def get_Rd(self):
+        return self.decision[0]
+
+    def get_Rd_dot(self):
+        return self.decision[1]
+
+    def get_ang_vel_d(self):
+        return self.decision[2]
+
+    def get_ang_vel_d_dot(self):
+        return self.decision[3]
+
+    def get_posd(self):
+        return self.decision[4]
+
+    def get_veld(self):
+        return self.decision[5]
+
+    def get_acceld(self):
+        return self.decision[6]
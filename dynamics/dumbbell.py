@@ -4,6 +4,8 @@ import numpy as np
 import scipy.linalg
 
 import kinematics.attitude as attitude
+from dynamics import gravity
+from eom_comparison import transform
 import pdb
 
 class Dumbbell(object):
@@ -186,6 +188,88 @@ class Dumbbell(object):
 
         return statedot
 
+    def gravity_batch(self, t, pos, R, ast):
+        """Gravity on the dumbbell at many inertial states at once
+
+        The positions of both masses of every state are evaluated by a
+        single batched potential call
+
+        Parameters
+        ----------
+        t : float or (n,) array
+            Time of each state
+        pos : (n, 3) array
+            Position of the center of mass in the inertial frame
+        R : (n, 3, 3) array
+            Rotation from the dumbbell frame to the inertial frame
+        ast : asteroid object (Python or C++)
+
+        Returns
+        -------
+        PE : (n,) array
+            Potential energy in kg km^2/sec^2
+        force : (n, 3) array
+            Gravity force in the inertial frame
+        moment : (n, 3) array
+            Gravity moment in the dumbbell frame
+        """
+        num = pos.shape[0]
+        # asteroid body frame to inertial frame
+        Ra = transform.rot_ast2int(np.broadcast_to(t, (num,)), gravity.rotation_rate(ast))
+
+        # position of each mass in the asteroid frame
+        z1 = np.einsum('nji,nj->ni', Ra, pos + np.einsum('nij,j->ni', R, self.zeta1))
+        z2 = np.einsum('nji,nj->ni', Ra, pos + np.einsum('nij,j->ni', R, self.zeta2))
+
+        U, U_grad, _, _ = gravity.batch_potential(ast, np.concatenate((z1, z2), axis=0))
+
+        # acceleration of each mass in the inertial frame
+        a1 = np.einsum('nij,nj->ni', Ra, U_grad[:num, :])
+        a2 = np.einsum('nij,nj->ni', Ra, U_grad[num:, :])
+
+        PE = -self.m1 * U[:num] - self.m2 * U[num:]
+        force = self.m1 * a1 + self.m2 * a2
+        moment = (self.m1 * np.cross(self.zeta1, np.einsum('nji,nj->ni', R, a1))
+                  + self.m2 * np.cross(self.zeta2, np.einsum('nji,nj->ni', R, a2)))
+        return PE, force, moment
+
+    def eoms_inertial_batch(self, t, states, ast):
+        """Inertial dumbbell equations of motion for many states at once
+
+        Same dynamics as eoms_inertial but the gravity of every state is
+        evaluated at once by gravity_batch
+
+        Parameters
+        ----------
+        t : float or (n,) array
+            Time of each state
+        states : (n, 18) array
+            Inertial states, same layout as eoms_inertial
+        ast : asteroid object (Python or C++)
+
+        Returns
+        -------
+        statedot : (n, 18) array
+            Derivative of each state
+        """
+        states = np.atleast_2d(states)
+        num = states.shape[0]
+        pos = states[:, 0:3]
+        vel = states[:, 3:6]
+        R = states[:, 6:15].reshape((num, 3, 3)) # sc body frame to inertial frame
+        ang_vel = states[:, 15:18]
+
+        _, force, moment = self.gravity_batch(t, pos, R, ast)
+
+        statedot = np.zeros_like(states)
+        statedot[:, 0:3] = vel
+        statedot[:, 3:6] = force / (self.m1 + self.m2)
+        statedot[:, 6:15] = (R @ transform.hat_map(ang_vel)).reshape((num, 9))
+        statedot[:, 15:18] = np.linalg.solve(
+            self.J, (-np.cross(ang_vel, ang_vel.dot(self.J.T)) + moment).T).T
+
+        return statedot
+
     def eoms_relative(self, state, t, ast):
         """Relative EOMS defined in the rotating asteroid frame
 
@@ -598,64 +682,103 @@ class Dumbbell(object):
             T - nx1 kinetic energy array which should be the same length as state input
 
         """
-        # some constants
-        m = self.m1 + self.m2 # total mass of dumbbell in kg
-        Jd = self.Jd
+        KE, PE, _, _ = self.inertial_invariants(time, state, ast)
+        return KE, PE
 
-        KE = np.zeros(time.shape[0])
-        PE = np.zeros(time.shape[0])
+    def relative_energy(self, time, state, ast):
+        """Compute the KE and PE of the relative equations of motion
 
-        for ii in range(time.shape[0]):
-            pos = state[ii,0:3] # location of the center of mass in the inertial frame
-            vel = state[ii,3:6] # vel of com in inertial frame
-            R = np.reshape(state[ii,6:15],(3,3)) # sc body frame to inertial frame
-            ang_vel = state[ii,15:18] # angular velocity of sc wrt inertial frame defined in body frame
+        """
+        KE, PE, _, _ = self.relative_invariants(time, state, ast)
+        return KE, PE
 
-            Ra = attitude.rot3(ast.omega*time[ii], 'c') # asteroid body frame to inertial frame
+    def inertial_invariants(self, time, state, ast):
+        r"""Energy, Jacobi integral and angular momentum of inertial states
 
-            # position of each mass in the inertial frame
-            z1 = Ra.T.dot(pos + R.dot(self.zeta1))
-            z2 = Ra.T.dot(pos + R.dot(self.zeta2))
+        Every sample of the trajectory is evaluated at once and the potential
+        at both masses of all samples is a single batched gravity call.
 
-            (U1, _, _, _) = ast.polyhedron_potential(z1)
-            (U2, _, _, _) = ast.polyhedron_potential(z2)
+        The asteroid rotates about its third axis at a constant rate, so the
+        energy is not conserved but the Jacobi integral
 
-            PE[ii] = -self.m1*U1 - self.m2*U2
-            KE[ii] = 1.0/2 * m * vel.dot(vel) + 1.0/2 * np.trace(attitude.hat_map(ang_vel).dot(Jd).dot(attitude.hat_map(ang_vel).T))
+        .. math:: E_J = T + V - \Omega e_3 \cdot H
 
-        return KE, PE
+        is an invariant of the equations of motion.
 
-    def relative_energy(self, time, state, ast):
-        """Compute the KE and PE of the relative equations of motion
+        Parameters
+        ----------
+        time : (n,) array
+            Time of each state
+        state : (n, 18) array
+            Inertial states, same layout as eoms_inertial
+        ast : asteroid object (Python or C++)
+
+        Returns
+        -------
+        KE : (n,) array
+            Kinetic energy in kg km^2/sec^2
+        PE : (n,) array
+            Potential energy in kg km^2/sec^2
+        jacobi : (n,) array
+            Jacobi integral KE + PE - omega * ang_mom[:, 2]
+        ang_mom : (n, 3) array
+            Angular momentum about the asteroid center of mass in the inertial frame
 
+        Author
+        ------
+        Shankar Kulumani		GWU		skulumani@gwu.edu
         """
+        state = np.atleast_2d(state)
+        num = state.shape[0]
+        m = self.m1 + self.m2 # total mass of dumbbell in kg
+        pos = state[:, 0:3] # location of the center of mass in the inertial frame
+        vel = state[:, 3:6] # vel of com in inertial frame
+        R = state[:, 6:15].reshape((num, 3, 3)) # sc body frame to inertial frame
+        ang_vel = state[:, 15:18] # angular velocity of sc wrt inertial frame defined in body frame
 
-        m = self.m1 + self.m2
-        J1 = self.J
-        Jd = self.Jd
+        PE, _, _ = self.gravity_batch(time, pos, R, ast)
 
-        KE = np.zeros(time.shape[0])
-        PE = np.zeros(time.shape[0])
+        spin_mom = ang_vel.dot(self.J.T) # angular momentum of the dumbbell in its frame
+        KE = 1.0/2 * m * np.sum(vel * vel, axis=1) + 1.0/2 * np.sum(ang_vel * spin_mom, axis=1)
+        ang_mom = m * np.cross(pos, vel) + np.einsum('nij,nj->ni', R, spin_mom)
+        jacobi = KE + PE - gravity.rotation_rate(ast) * ang_mom[:, 2]
 
-        for ii in range(time.shape[0]):
-            pos = state[ii, 0:3]  # location of the COM wrt asteroid in the asteroid frame
-            vel = state[ii, 3:6]  # vel of COM wrt asteroid in asteroid frame
-            R = np.reshape(state[ii, 6:15], (3, 3))  # sc body frame to asteroid frame
-            ang_vel = state[ii, 15:18]  # angular velocity of sc wrt inertial frame defined in asteroid frame
+        return KE, PE, jacobi, ang_mom
 
-            # position of each mass in the inertial frame
-            z1 = pos + R.dot(self.zeta1)
-            z2 = pos + R.dot(self.zeta2)
+    def relative_invariants(self, time, state, ast):
+        """Energy, Jacobi integral and angular momentum of relative states
 
-            (U1, _, _, _) = ast.polyhedron_potential(z1)
-            (U2, _, _, _) = ast.polyhedron_potential(z2)
+        Same as inertial_invariants for the states of eoms_relative, which
+        are defined in the asteroid fixed frame.
 
-            Jdr = R.dot(Jd).dot(R.T)
+        Parameters
+        ----------
+        time : (n,) array
+            Time of each state
+        state : (n, 18) array
+            Relative states, same layout as eoms_relative
+        ast : asteroid object (Python or C++)
 
-            PE[ii] = -self.m1 * U1 - self.m2 * U2
-            KE[ii] = 1/2 * m * vel.dot(vel) + 1/2 * np.trace(attitude.hat_map(ang_vel).dot(Jdr).dot(attitude.hat_map(ang_vel).T))
+        Returns
+        -------
+        KE, PE, jacobi : (n,) arrays
+            Kinetic and potential energy and the Jacobi integral
+        ang_mom : (n, 3) array
+            Angular momentum about the asteroid center of mass in the inertial frame
 
-        return KE, PE
+        Author
+        ------
+        Shankar Kulumani		GWU		skulumani@gwu.edu
+        """
+        state = np.atleast_2d(state)
+        time = np.broadcast_to(time, (state.shape[0],))
+
+        # same state in the inertial frame with the angular velocity in the dumbbell frame
+        inertial_state, _, _ = transform.ast2inertial(time, state, ast, self)
+        R = inertial_state[:, 6:15].reshape((-1, 3, 3))
+        inertial_state[:, 15:18] = np.einsum('nji,nj->ni', R, inertial_state[:, 15:18])
+
+        return self.inertial_invariants(time, inertial_state, ast)
 
     def attitude_controller(self, time, state, ext_moment):
         r"""Geometric attitude controller on SO(3)
@@ -0,0 +1,690 @@
+"""Ensemble propagation of many dumbbell trajectories over a process pool
+
+Stability maps sweep thousands of initial conditions (and dumbbell
+parameters) about the same asteroid. Rather than launching a script per
+initial condition, propagate_ensemble distributes the members over a pool
+of worker processes and streams each trajectory into a single chunked HDF5
+file as soon as it finishes.
+
+The polyhedron model of the asteroid is copied into shared memory (memory
+mapped files before Python 3.8) once. Every worker attaches to it when it
+starts, so the shape model is neither recomputed nor pickled for each member.
+
+With a batch_size the members with the same dumbbell are advanced together
+by lockstep_dopri5, so each stage of the integrator evaluates the gravity
+at both masses of every member with a single batched potential call.
+Members stop early on a terminal condition, such as RadiusBounds for an
+impact or InvariantMonitor for drift of the Jacobi integral.
+
+File layout, all inside of group:
+
+    time (m,) - output times shared by all members
+    initial_state (n, 18)
+    m1, m2, l, rtol, atol (n,) - parameters of each member
+    state (n, m, 18) - integrator output, chunked by member
+    status (n,) - PENDING, SUCCESS, FAILED or TERMINATED
+    elapsed (n,) - wall time of each member (or its lockstep batch) in seconds
+    message (n,) - integrator message or the error of each member
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import copy
+import logging
+import multiprocessing
+import numbers
+import os
+import shutil
+import tempfile
+import time as timer
+import types
+
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python < 3.8 shares memory mapped files instead
+    shared_memory = None
+
+import h5py
+import numpy as np
+from scipy import integrate
+
+from dynamics import dumbbell
+from dynamics.gravity import AsteroidGravity, mesh_properties
+from kinematics import attitude
+from point_cloud import polyhedron
+
+logger = logging.getLogger(__name__)
+
+PENDING, SUCCESS, FAILED, TERMINATED = 0, 1, -1, 2
+
+# equations of motion of dynamics.dumbbell.Dumbbell for odeint
+EOMS = {'inertial': 'eoms_inertial',
+        'relative': 'eoms_relative',
+        'hamilton': 'eoms_hamilton_relative'}
+
+MODEL_FIELDS = ('V', 'face_vertex', 'face_dyad', 'edge_vertex', 'edge_dyad')
+
+class SharedAsteroid(AsteroidGravity):
+    """Polyhedron gravity of an asteroid stored in shared memory
+
+    Created from an asteroid (Python or C++) in the parent process and then
+    pickled to the workers, which only receive the names of the shared
+    memory blocks. The arrays of the polyhedron model are attached, without
+    a copy, when a worker unpickles it. Before Python 3.8 the blocks are
+    memory mapped files in a temporary directory instead.
+
+    Attributes other than the potential (omega, mu, ...) are passed through
+    to the scalar attributes of the original asteroid.
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, ast):
+        model = getattr(ast, 'polyhedron_model', None)
+        if model is None:
+            model = polyhedron.PolyhedronGravity.from_mesh(*mesh_properties(ast))
+
+        if hasattr(ast, 'get_omega'):
+            attributes = {'name': ast.get_name(), 'omega': ast.get_omega()}
+        else:
+            attributes = {key: value for key, value in vars(ast).items()
+                          if isinstance(value, (numbers.Number, str))}
+        attributes.update(G=model.G, sigma=model.sigma)
+        AsteroidGravity.__init__(self, types.SimpleNamespace(**attributes))
+
+        self.owner = True
+        self.mapped = shared_memory is None
+        self.directory = tempfile.mkdtemp(prefix='ensemble') if self.mapped else None
+        self.blocks = {}
+        self.layout = {}
+        for name in MODEL_FIELDS:
+            array = getattr(model, name)
+            if self.mapped:
+                block_name = os.path.join(self.directory, name)
+                block = np.memmap(block_name, dtype=array.dtype, mode='w+',
+                                  shape=array.shape)
+                block[...] = array
+                block.flush()
+            else:
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                block_name = block.name
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks[name] = block
+            self.layout[name] = (block_name, array.shape, array.dtype.str)
+        self.model = model
+
+    def __getstate__(self):
+        return {'ast': self.ast, 'layout': self.layout, 'mapped': self.mapped}
+
+    def __setstate__(self, state):
+        AsteroidGravity.__init__(self, state['ast'])
+        self.owner = False
+        self.mapped = state['mapped']
+        self.directory = None
+        self.layout = state['layout']
+        if self.mapped:
+            self.blocks = {name: np.memmap(block_name, dtype=dtype, mode='r', shape=shape)
+                           for name, (block_name, shape, dtype) in self.layout.items()}
+            arrays = self.blocks
+        else:
+            self.blocks = {name: shared_memory.SharedMemory(name=block_name)
+                           for name, (block_name, _, _) in self.layout.items()}
+            arrays = {name: np.ndarray(shape, dtype=dtype, buffer=self.blocks[name].buf)
+                      for name, (_, shape, dtype) in self.layout.items()}
+        self.model = polyhedron.PolyhedronGravity(G=self.ast.G, sigma=self.ast.sigma, **arrays)
+
+    def polyhedron_potential_batch(self, states, block_size=64):
+        U, U_grad, U_grad_mat, Ulaplace = self.model.potential(states)
+        return U, U_grad, U_grad_mat.reshape((-1, 9)), Ulaplace
+
+    def polyhedron_potential(self, state):
+        """Single point potential with the Python asteroid return values"""
+        U, U_grad, U_grad_mat, Ulaplace = self.model.potential(state)
+        return U[0], U_grad[0, :], U_grad_mat[0, :, :], Ulaplace[0]
+
+    def rot_ast2int(self, t):
+        return attitude.rot3(self.ast.omega * t, 'c')
+
+    def close(self):
+        """Release the shared memory, which is removed by its owner"""
+        self.model = None
+        if not self.mapped:
+            for block in self.blocks.values():
+                block.close()
+                if self.owner:
+                    block.unlink()
+        self.blocks = {}
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+class RadiusBounds(object):
+    """Terminal condition for an impact or escape
+
+    Members stop once the distance of the center of mass from the asteroid
+    is below min_radius or above max_radius. A picklable callable so it can
+    be sent to the workers.
+    """
+
+    def __init__(self, min_radius=0.0, max_radius=np.inf):
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+
+    def __call__(self, t, states):
+        radius = np.linalg.norm(np.atleast_2d(states)[:, 0:3], axis=1)
+        return (radius < self.min_radius) | (radius > self.max_radius)
+
+class InvariantMonitor(object):
+    """Terminal condition for drift of the Jacobi integral
+
+    The Jacobi integral of Dumbbell.inertial_invariants is conserved by the
+    exact dynamics, so its drift from the initial value is a direct measure
+    of the integration error. Members stop, and are reported as TERMINATED,
+    once the relative drift exceeds threshold. A run with a bad tolerance is
+    caught early instead of being discarded after it finishes.
+
+    The monitor is stateful: start records the Jacobi integral of each
+    member and the calls after each step pass the indices of the members.
+    To keep it cheap the invariants are only evaluated once every seconds
+    of simulation time for each member, which is every step for every=0.
+    check_trajectory applies the same checks to a whole trajectory of one
+    member, for integrators like odeint that can not stop.
+
+    Parameters
+    ----------
+    dum : Dumbbell
+        Dumbbell shared by all of the monitored members
+    ast : asteroid object
+        Asteroid of the equations of motion. propagate_ensemble substitutes
+        its shared asteroid if None
+    threshold : float
+        Largest allowed relative drift of the Jacobi integral
+    frame : str
+        'inertial' or 'relative' layout of the states
+    every : float
+        Simulation time in seconds between checks of each member
+
+    Attributes
+    ----------
+    reference : (n,) array
+        Jacobi integral of each member at the start
+    drift : (n,) array
+        Relative drift of each member at its last check
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, dum, ast=None, threshold=1e-6, frame='inertial', every=0.0):
+        if frame not in ('inertial', 'relative'):
+            raise ValueError("frame must be 'inertial' or 'relative' not {}".format(frame))
+        self.dum = dum
+        self.ast = ast
+        self.threshold = threshold
+        self.frame = frame
+        self.every = every
+        self.reference = self.drift = self.checked = None
+
+    def jacobi(self, t, states):
+        """Jacobi integral of each state"""
+        invariants = getattr(self.dum, self.frame + '_invariants')
+        return invariants(np.broadcast_to(t, (np.atleast_2d(states).shape[0],)),
+                          states, self.ast)[2]
+
+    def start(self, t, states):
+        """Record the reference of each member from its initial state"""
+        self.reference = self.jacobi(t, states)
+        self.drift = np.zeros_like(self.reference)
+        self.checked = np.array(np.broadcast_to(t, self.reference.shape), dtype=np.float64)
+
+    def __call__(self, t, states, members):
+        t = np.broadcast_to(t, (np.atleast_2d(states).shape[0],))
+        members = np.asarray(members)
+        check = t - self.checked[members] >= self.every
+        stop = np.zeros(t.shape[0], dtype=bool)
+        if np.any(check):
+            rows = members[check]
+            jacobi = self.jacobi(t[check], np.atleast_2d(states)[check])
+            self.drift[rows] = np.absolute(jacobi / self.reference[rows] - 1)
+            self.checked[rows] = t[check]
+            stop[check] = self.drift[rows] > self.threshold
+        return stop
+
+    def check_trajectory(self, time, states):
+        """Terminal condition at each output of a single member
+
+        The first state is the reference and the later outputs are checked
+        once every seconds, the same as the calls after each step.
+
+        Parameters
+        ----------
+        time : (m,) array
+            Output times
+        states : (m, 18) array
+            State of the member at each output
+
+        Returns
+        -------
+        stop : (m,) boolean array
+            True at the checked outputs where the drift exceeds threshold
+        """
+        self.start(time[0], states[:1, :])
+        rows = []
+        for ii in range(1, time.shape[0]):
+            if time[ii] - self.checked[0] >= self.every:
+                rows.append(ii)
+                self.checked[0] = time[ii]
+
+        stop = np.zeros(time.shape[0], dtype=bool)
+        if rows:
+            drift = np.absolute(self.jacobi(time[rows], states[rows]) / self.reference[0] - 1)
+            self.drift[0] = drift[-1]
+            stop[rows] = drift > self.threshold
+        return stop
+
+# Dormand-Prince 5(4) tableau, same as propagator.cpp
+DOPRI_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+DOPRI_A = [np.array([]),
+           np.array([1 / 5]),
+           np.array([3 / 40, 9 / 40]),
+           np.array([44 / 45, -56 / 15, 32 / 9]),
+           np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+           np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]),
+           np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])]
+DOPRI_E = np.array([71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+DOPRI_D = np.array([-12715105075 / 11282082432, 0, 87487479700 / 32700410799,
+                    -10690763975 / 1880347072, 701980252875 / 199316789632,
+                    -1453857185 / 822651844, 69997945 / 29380423])
+
+def _rms(vec, scale):
+    return np.sqrt(np.mean((vec / scale)**2, axis=1))
+
+def lockstep_dopri5(fun, initial_states, time, rtol=1e-9, atol=1e-9, terminal=None,
+                    max_step=np.inf):
+    """Adaptive Dormand-Prince 5(4) integration of many states in lockstep
+
+    Every member has its own time, step size and error control but all of
+    the active members are evaluated together, so each stage is a single
+    call of fun. Members stop when they reach the final time, when terminal
+    is true or if the integration fails and are then masked out of the
+    remaining stages.
+
+    Parameters
+    ----------
+    fun : callable
+        Batched right hand side fun(t, states) with t (k,) and states (k, d)
+    initial_states : (n, d) array
+        State of each member at time[0]
+    time : (m,) array
+        Increasing output times, from the dense output of each step
+    rtol, atol : float or (n,) array
+        Tolerances of each member
+    terminal : callable
+        Optional terminal(t, states) returning a (k,) boolean array, e.g.
+        RadiusBounds for impact or escape. Checked after every step. A
+        stateful terminal, like InvariantMonitor, defines start(t, states)
+        which is called with the initial states and is then called as
+        terminal(t, states, members) with the indices of the members
+    max_step : float
+        Largest step size
+
+    Returns
+    -------
+    states : (n, m, d) array
+        State of each member at the output times, nan after it stopped
+    status : (n,) array
+        SUCCESS, TERMINATED or FAILED
+    t_final : (n,) array
+        Time each member stopped
+    messages : list
+        Description of how each member stopped
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+    y = np.atleast_2d(np.array(initial_states, dtype=np.float64))
+    time = np.asarray(time, dtype=np.float64)
+    num, dim = y.shape
+    rtol = np.broadcast_to(np.asarray(rtol, dtype=np.float64), (num,))[:, np.newaxis]
+    atol = np.broadcast_to(np.asarray(atol, dtype=np.float64), (num,))[:, np.newaxis]
+    t0, tf = time[0], time[-1]
+
+    states = np.full((num, time.shape[0], dim), np.nan)
+    states[:, 0, :] = y
+    count = np.ones(num, dtype=int) # index of the next output of each member
+    status = np.full(num, PENDING, dtype=np.int8)
+    messages = ['Integration successful.'] * num
+    t = np.full(num, t0)
+
+    # initial step size from Hairer, Norsett and Wanner
+    k1 = fun(t, y)
+    scale = atol + rtol * np.absolute(y)
+    d0, d1 = _rms(y, scale), _rms(k1, scale)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+    h0 = np.minimum(h0, tf - t0)
+    d2 = _rms(fun(t + h0, y + h0[:, np.newaxis] * k1) - k1, scale) / h0
+    dmax = np.maximum(d1, d2)
+    h1 = np.where(dmax <= 1e-15, np.maximum(1e-6, h0 * 1e-3),
+                  (0.01 / np.maximum(dmax, 1e-300))**(1 / 5))
+    h = np.minimum(np.minimum(100 * h0, h1), max_step)
+
+    stateful = hasattr(terminal, 'start')
+    if stateful:
+        terminal.start(t, y)
+
+    active = np.ones(num, dtype=bool) if tf > t0 else np.zeros(num, dtype=bool)
+    status[~active] = SUCCESS
+    while np.any(active):
+        idx = np.flatnonzero(active)
+        ta, ya = t[idx], y[idx, :]
+        last = ta + 1.01 * h[idx] >= tf
+        ha = np.where(last, tf - ta, h[idx])[:, np.newaxis]
+
+        # all of the active members in a single evaluation per stage
+        k = [k1[idx, :]]
+        for stage in range(1, 7):
+            ys = ya + ha * np.einsum('s,snd->nd', DOPRI_A[stage], np.array(k))
+            if stage == 6:
+                y_new = ys
+            k.append(fun(ta + DOPRI_C[stage] * ha[:, 0], ys))
+        k = np.array(k)
+
+        error = ha * np.einsum('s,snd->nd', DOPRI_E, k)
+        scale = atol[idx] + rtol[idx] * np.maximum(np.absolute(ya), np.absolute(y_new))
+        err = _rms(error, scale)
+        finite = np.all(np.isfinite(y_new), axis=1) & np.isfinite(err)
+        accept = finite & (err <= 1)
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * np.where(err > 0, err, 1e-10)**(-1 / 5), 0.2, 10)
+        h[idx] = np.minimum(ha[:, 0] * np.where(accept, factor, np.minimum(factor, 1)), max_step)
+
+        # outputs inside of each accepted step from the dense output
+        t_new = np.where(last, tf, ta + ha[:, 0])
+        ydiff = y_new - ya
+        bspl = ha * k[0] - ydiff
+        rcont4 = ydiff - ha * k[6] - bspl
+        rcont5 = ha * np.einsum('s,snd->nd', DOPRI_D, k)
+        while True:
+            out = accept & (count[idx] < time.shape[0])
+            out[out] = time[count[idx[out]]] <= t_new[out]
+            if not np.any(out):
+                break
+            rows, t_out = idx[out], time[count[idx[out]]]
+            theta = ((t_out - ta[out]) / ha[out, 0])[:, np.newaxis]
+            theta1 = 1 - theta
+            states[rows, count[rows], :] = np.where(
+                (t_out == t_new[out])[:, np.newaxis], y_new[out],
+                ya[out] + theta * (ydiff[out] + theta1 * (bspl[out] + theta
+                                                          * (rcont4[out] + theta1 * rcont5[out]))))
+            count[rows] += 1
+
+        rows = idx[accept]
+        t[rows], y[rows, :], k1[rows, :] = t_new[accept], y_new[accept], k[6][accept]
+
+        # members that are done
+        failed = ~finite | (h[idx] < 16 * np.finfo(float).eps * np.absolute(ta))
+        for ii in idx[failed]:
+            messages[ii] = 'Integration failed at t = {}'.format(t[ii])
+        status[idx[failed]] = FAILED
+        if terminal is not None and np.any(accept):
+            stop = np.zeros(idx.shape[0], dtype=bool)
+            members = (idx[accept],) if stateful else ()
+            stop[accept] = terminal(t_new[accept], y_new[accept], *members)
+            stop &= ~failed
+            for ii in idx[stop]:
+                messages[ii] = 'Terminated at t = {}'.format(t[ii])
+            status[idx[stop]] = TERMINATED
+        finished = accept & last & (status[idx] == PENDING)
+        status[idx[finished]] = SUCCESS
+        active[idx] = status[idx] == PENDING
+
+    return states, status, t, messages
+
+# asteroid, output times and equations of motion of each worker
+_worker = {}
+
+def _init_worker(ast, time, eoms, terminal=None, lockstep=False):
+    if getattr(terminal, 'ast', False) is None:
+        terminal = copy.copy(terminal)
+        terminal.ast = ast
+    _worker.update(ast=ast, time=time, eoms=eoms, terminal=terminal, lockstep=lockstep,
+                   dumbbell={})
+
+def _get_dumbbell(m1, m2, l):
+    # members usually share the dumbbell parameters
+    key = (m1, m2, l)
+    if key not in _worker['dumbbell']:
+        _worker['dumbbell'][key] = dumbbell.Dumbbell(m1=m1, m2=m2, l=l)
+    return _worker['dumbbell'][key]
+
+def _propagate_member(member):
+    """Integrate one member in a worker, never raises"""
+    index, initial_state, m1, m2, l, rtol, atol = member
+    start = timer.time()
+    try:
+        eoms = getattr(_get_dumbbell(m1, m2, l), EOMS[_worker['eoms']])
+        state, info = integrate.odeint(eoms, initial_state, _worker['time'],
+                                       args=(_worker['ast'],), rtol=rtol, atol=atol,
+                                       full_output=True)
+        message = info['message']
+        if message == 'Integration successful.' and np.all(np.isfinite(state)):
+            status = SUCCESS
+        else:
+            status = FAILED
+
+        # odeint can not stop so the terminal condition is applied to the output
+        terminal = _worker['terminal']
+        if status == SUCCESS and terminal is not None:
+            if hasattr(terminal, 'check_trajectory'):
+                stop = terminal.check_trajectory(_worker['time'], state)
+            else:
+                stop = terminal(_worker['time'], state)
+            stop = np.flatnonzero(stop)
+            if stop.size > 0:
+                state[stop[0] + 1:, :] = np.nan
+                status = TERMINATED
+                message = 'Terminated at t = {}'.format(_worker['time'][stop[0]])
+    except Exception as err:
+        state = None
+        status, message = FAILED, '{}: {}'.format(type(err).__name__, err)
+
+    return index, status, message, timer.time() - start, state
+
+def _propagate_batch(members):
+    """Integrate members with the same dumbbell in lockstep in a worker, never raises"""
+    start = timer.time()
+    try:
+        dum = _get_dumbbell(*members[0][2:5])
+        fun = lambda t, states: dum.eoms_inertial_batch(t, states, _worker['ast'])
+        states, status, _, messages = lockstep_dopri5(
+            fun, [member[1] for member in members], _worker['time'],
+            rtol=[member[5] for member in members], atol=[member[6] for member in members],
+            terminal=_worker['terminal'])
+    except Exception as err:
+        message = '{}: {}'.format(type(err).__name__, err)
+        return [(member[0], FAILED, message, timer.time() - start, None) for member in members]
+
+    elapsed = timer.time() - start
+    return [(member[0], status[ii], messages[ii], elapsed, states[ii])
+            for ii, member in enumerate(members)]
+
+def _propagate_task(members):
+    if _worker['lockstep']:
+        return _propagate_batch(members)
+    return [_propagate_member(member) for member in members]
+
+def _member_parameter(value, num_members, name):
+    value = np.broadcast_to(np.asarray(value, dtype=np.float64), (num_members,))
+    if not np.all(np.isfinite(value)):
+        raise ValueError("{} must be finite".format(name))
+    return value
+
+def _create_group(hf, group, time, initial_states, parameters, compression, compression_opts):
+    num_members, num_steps = initial_states.shape[0], time.shape[0]
+    grp = hf.create_group(group)
+    grp.attrs['layout'] = 'ensemble'
+    grp.create_dataset('time', data=time)
+    grp.create_dataset('initial_state', data=initial_states)
+    for name, value in parameters.items():
+        grp.create_dataset(name, data=value)
+
+    grp.create_dataset('state', shape=(num_members, num_steps, 18), dtype=np.float64,
+                       chunks=(1, min(num_steps, 4096), 18), fillvalue=np.nan,
+                       compression=compression, compression_opts=compression_opts)
+    grp.create_dataset('status', shape=(num_members,), dtype=np.int8, fillvalue=PENDING)
+    grp.create_dataset('elapsed', shape=(num_members,), dtype=np.float64, fillvalue=np.nan)
+    grp.create_dataset('message', shape=(num_members,), dtype=h5py.special_dtype(vlen=str))
+    return grp
+
+def propagate_ensemble(filename, ast, initial_states, time, m1=100.0, m2=100.0, l=0.003,
+                       rtol=1e-9, atol=1e-9, eoms='inertial', processes=None, batch_size=None,
+                       terminal=None, group='ensemble', resume=False, compression='gzip',
+                       compression_opts=4):
+    """Propagate many initial states and save them into one HDF5 file
+
+    Each member is integrated with scipy.integrate.odeint over the same
+    time vector, like dynamics.eoms.inertial_eoms_driver. The raw integrator
+    output is saved so the existing conversions of eom_comparison.transform
+    apply to each member. With a batch_size, up to batch_size members with
+    the same dumbbell are integrated together by lockstep_dopri5 instead.
+
+    Parameters
+    ----------
+    filename : str
+        HDF5 file, created or appended to
+    ast : asteroid object (Python or C++)
+    initial_states : (n, 18) array
+        Initial state of each member
+    time : (m,) array
+        Output times of every member
+    m1, m2, l : float or (n,) array
+        Dumbbell parameters of each member
+    rtol, atol : float or (n,) array
+        Tolerances of each member
+    eoms : str
+        'inertial', 'relative' or 'hamilton' equations of motion of the dumbbell
+    processes : int
+        Size of the process pool, all cores by default. 1 runs in this process
+    batch_size : int
+        Number of members in each lockstep batch, only for the inertial
+        equations of motion. None integrates each member with odeint
+    terminal : callable
+        Optional picklable terminal(t, states), e.g. RadiusBounds, which
+        stops a member after the first time it is true. An InvariantMonitor
+        without an asteroid monitors the drift of each member
+    group : str
+        Group of the file that holds the ensemble
+    resume : bool
+        Continue an existing group and only propagate the members that
+        failed or were not finished
+    compression, compression_opts :
+        HDF5 filter of the state dataset
+
+    Returns
+    -------
+    status : (n,) array
+        SUCCESS, TERMINATED or FAILED for each member
+
+    Examples
+    --------
+    initial_states = np.tile(initial_state, (1000, 1))
+    initial_states[:, 0] = np.linspace(1.2, 2.0, 1000)
+    status = propagate_ensemble('stability.hdf5', ast, initial_states,
+                                np.arange(0, 1e5, 10), l=0.003)
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+    if eoms not in EOMS:
+        raise ValueError("Unknown equations of motion: {}".format(eoms))
+    if batch_size is not None and eoms != 'inertial':
+        raise ValueError("Lockstep batches only use the inertial equations of motion")
+
+    initial_states = np.atleast_2d(np.asarray(initial_states, dtype=np.float64))
+    time = np.asarray(time, dtype=np.float64)
+    if initial_states.shape[1] != 18:
+        raise ValueError("Initial states must be (n, 18)")
+    num_members = initial_states.shape[0]
+    parameters = {name: _member_parameter(value, num_members, name)
+                  for name, value in (('m1', m1), ('m2', m2), ('l', l),
+                                      ('rtol', rtol), ('atol', atol))}
+
+    with h5py.File(filename, 'a') as hf:
+        if group in hf and resume:
+            grp = hf[group]
+            if (grp['state'].shape != (num_members, time.shape[0], 18)
+                    or not np.array_equal(grp['initial_state'][()], initial_states)
+                    or not np.array_equal(grp['time'][()], time)
+                    or not all(np.array_equal(grp[name][()], value)
+                               for name, value in parameters.items())):
+                raise ValueError("Ensemble in {} does not match the members".format(group))
+        else:
+            if group in hf:
+                del hf[group]
+            grp = _create_group(hf, group, time, initial_states, parameters,
+                                compression, compression_opts)
+
+        status = grp['status'][()]
+        members = [(ii, initial_states[ii, :], parameters['m1'][ii], parameters['m2'][ii],
+                    parameters['l'][ii], parameters['rtol'][ii], parameters['atol'][ii])
+                   for ii in range(num_members) if status[ii] not in (SUCCESS, TERMINATED)]
+        logger.info('Propagating {} of {} members'.format(len(members), num_members))
+
+        if batch_size is None:
+            tasks = [[member] for member in members]
+        else:
+            # a batch shares the dumbbell
+            groups = {}
+            for member in members:
+                groups.setdefault(tuple(member[2:5]), []).append(member)
+            tasks = [batch[ii:ii + batch_size] for batch in groups.values()
+                     for ii in range(0, len(batch), batch_size)]
+
+        def save(result):
+            index, member_status, message, elapsed, state = result
+            if state is not None:
+                grp['state'][index, :, :] = state
+            grp['status'][index] = member_status
+            grp['elapsed'][index] = elapsed
+            grp['message'][index] = message
+            status[index] = member_status
+            if member_status == FAILED:
+                logger.warning('Member {} failed: {}'.format(index, message))
+
+        shared = SharedAsteroid(ast)
+        try:
+            initargs = (shared, time, eoms, terminal, batch_size is not None)
+            if processes == 1:
+                _init_worker(*initargs)
+                for task in tasks:
+                    for result in _propagate_task(task):
+                        save(result)
+                    hf.flush()
+            else:
+                pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                            initargs=initargs)
+                try:
+                    # results are written in the order they finish
+                    for results in pool.imap_unordered(_propagate_task, tasks):
+                        for result in results:
+                            save(result)
+                        hf.flush()
+                    pool.close()
+                except:
+                    pool.terminate()
+                    raise
+                finally:
+                    pool.join()
+        finally:
+            _worker.clear()
+            shared.close()
+
+    return status
@@ -545,7 +545,7 @@ def eoms_controlled_inertial_pybind(t, state, ast, dum, complete_controller, est
         dumbbell frame
     ast : asteroid object (from C++ bindings)
     dum : dumbbell object (from Python)
-    complete_controller : controller object (from C++)
+    complete_controller : controller object (from C++) or controller.DecisionHold
     """ 
     # unpack the state
     pos = state[0:3] # location of the center of mass in the inertial frame
@@ -567,14 +567,10 @@ def eoms_controlled_inertial_pybind(t, state, ast, dum, complete_controller, est
 
     z = Ra.T.dot(pos) # position of COM in asteroid frame
 
-    # gradient and potential at this state
-    ast.polyhedron_potential(z1)
-    U1 = ast.get_potential()
-    U1_grad = ast.get_acceleration()
-
-    ast.polyhedron_potential(z2)
-    U2 = ast.get_potential()
-    U2_grad = ast.get_acceleration()
+    # gradient and potential at both masses in a single pass over the mesh
+    U, U_grad, _, _ = ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1, U2 = U
+    U1_grad, U2_grad = U_grad
 
     F1 = dum.m1 * Ra.dot(U1_grad)
     F2 = dum.m2 * Ra.dot(U2_grad)
@@ -635,7 +631,7 @@ def eoms_controlled_inertial_control_cost_pybind(t, state, true_ast, dum,
         dumbbell frame
     ast : asteroid object (from C++ bindings)
     dum : dumbbell object (from Python)
-    complete_controller : controller object (from C++)
+    complete_controller : controller object (from C++) or controller.DecisionHold
     """ 
     # unpack the state
     pos = state[0:3] # location of the center of mass in the inertial frame
@@ -657,14 +653,10 @@ def eoms_controlled_inertial_control_cost_pybind(t, state, true_ast, dum,
 
     z = Ra.T.dot(pos) # position of COM in asteroid frame
 
-    # gradient and potential at this state
-    true_ast.polyhedron_potential(z1)
-    U1 = true_ast.get_potential()
-    U1_grad = true_ast.get_acceleration()
-
-    true_ast.polyhedron_potential(z2)
-    U2 = true_ast.get_potential()
-    U2_grad = true_ast.get_acceleration()
+    # gradient and potential at both masses in a single pass over the mesh
+    U, U_grad, _, _ = true_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1, U2 = U
+    U1_grad, U2_grad = U_grad
 
     F1 = dum.m1 * Ra.dot(U1_grad)
     F2 = dum.m2 * Ra.dot(U2_grad)
@@ -673,13 +665,9 @@ def eoms_controlled_inertial_control_cost_pybind(t, state, true_ast, dum,
     M2 = dum.m2 * attitude.hat_map(rho2).dot(R.T.dot(Ra).dot(U2_grad))
     
     # compute the external force and moment using the asteroid estimate
-    est_ast.polyhedron_potential(z1)
-    U1_est = est_ast.get_potential()
-    U1_grad_est = est_ast.get_acceleration()
-
-    est_ast.polyhedron_potential(z2)
-    U2_est = est_ast.get_potential()
-    U2_grad_est = est_ast.get_acceleration()
+    U_est, U_grad_est, _, _ = est_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1_est, U2_est = U_est
+    U1_grad_est, U2_grad_est = U_grad_est
 
     F1_est = dum.m1 * Ra.dot(U1_grad_est)
     F2_est = dum.m2 * Ra.dot(U2_grad_est)
@@ -759,14 +747,10 @@ def eoms_controlled_land_pybind(t, state, true_ast, dum, est_ast,
 
     z = Ra.T.dot(pos) # position of COM in asteroid frame
 
-    # compute the potential at this state
-    true_ast.polyhedron_potential(z1)
-    U1 = true_ast.get_potential()
-    U1_grad = true_ast.get_acceleration()
-
-    true_ast.polyhedron_potential(z2)
-    U2 = true_ast.get_potential()
-    U2_grad = true_ast.get_acceleration()
+    # compute the potential at both masses in a single pass over the mesh
+    U, U_grad, _, _ = true_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1, U2 = U
+    U1_grad, U2_grad = U_grad
 
     F1 = dum.m1*Ra.dot(U1_grad)
     F2 = dum.m2*Ra.dot(U2_grad)
@@ -775,13 +759,9 @@ def eoms_controlled_land_pybind(t, state, true_ast, dum, est_ast,
     M2 = dum.m2 * attitude.hat_map(rho2).dot(R.T.dot(Ra).dot(U2_grad))
 
     # compute the external force and moment using the asteroid estimate
-    est_ast.polyhedron_potential(z1)
-    U1_est = est_ast.get_potential()
-    U1_grad_est = est_ast.get_acceleration()
-
-    est_ast.polyhedron_potential(z2)
-    U2_est = est_ast.get_potential()
-    U2_grad_est = est_ast.get_acceleration()
+    U_est, U_grad_est, _, _ = est_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1_est, U2_est = U_est
+    U1_grad_est, U2_grad_est = U_grad_est
 
     F1_est = dum.m1 * Ra.dot(U1_grad_est)
     F2_est = dum.m2 * Ra.dot(U2_grad_est)
@@ -831,7 +811,7 @@ def eoms_controlled_inertial_refinement_pybind(t, state, true_ast, dum,
         dumbbell frame
     ast : asteroid object (from C++ bindings)
     dum : dumbbell object (from Python)
-    complete_controller : controller object (from C++)
+    complete_controller : controller object (from C++) or controller.DecisionHold
     """
     # unpack the state
     pos = state[0:3] # location of the center of mass in the inertial frame
@@ -853,14 +833,10 @@ def eoms_controlled_inertial_refinement_pybind(t, state, true_ast, dum,
 
     z = Ra.T.dot(pos) # position of COM in asteroid frame
 
-    # gradient and potential at this state
-    true_ast.polyhedron_potential(z1)
-    U1 = true_ast.get_potential()
-    U1_grad = true_ast.get_acceleration()
-
-    true_ast.polyhedron_potential(z2)
-    U2 = true_ast.get_potential()
-    U2_grad = true_ast.get_acceleration()
+    # gradient and potential at both masses in a single pass over the mesh
+    U, U_grad, _, _ = true_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1, U2 = U
+    U1_grad, U2_grad = U_grad
 
     F1 = dum.m1 * Ra.dot(U1_grad)
     F2 = dum.m2 * Ra.dot(U2_grad)
@@ -869,13 +845,9 @@ def eoms_controlled_inertial_refinement_pybind(t, state, true_ast, dum,
     M2 = dum.m2 * attitude.hat_map(rho2).dot(R.T.dot(Ra).dot(U2_grad))
     
     # compute the external force and moment using the asteroid estimate
-    est_ast.polyhedron_potential(z1)
-    U1_est = est_ast.get_potential()
-    U1_grad_est = est_ast.get_acceleration()
-
-    est_ast.polyhedron_potential(z2)
-    U2_est = est_ast.get_potential()
-    U2_grad_est = est_ast.get_acceleration()
+    U_est, U_grad_est, _, _ = est_ast.polyhedron_potential_batch(np.vstack((z1, z2)))
+    U1_est, U2_est = U_est
+    U1_grad_est, U2_grad_est = U_grad_est
 
     F1_est = dum.m1 * Ra.dot(U1_grad_est)
     F2_est = dum.m2 * Ra.dot(U2_grad_est)
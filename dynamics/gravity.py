@@ -0,0 +1,1195 @@
+"""Alternative gravity models built from the polyhedron shape model
+
+The exact polyhedron potential costs O(edges + faces) for every evaluation.
+Far from the body a truncated exterior spherical harmonic expansion is much
+cheaper and, outside of the Brillouin sphere, accurate to a known bound.
+
+FarFieldAsteroid, ClusterAsteroid and GridAsteroid wrap an asteroid (Python
+or C++) and return the same (U, U_grad, U_grad_mat, Ulaplace) values as the
+polyhedron potential so they can be used in its place.
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import abc
+import hashlib
+import logging
+import os
+from multiprocessing import Pool
+
+import h5py
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def mesh_properties(ast):
+    """Get the vertices, faces, G and sigma from an asteroid
+
+    Works with both the Python asteroid (dynamics.asteroid) and the C++
+    asteroid (lib.asteroid)
+
+    Parameters
+    ----------
+    ast : asteroid object
+
+    Returns
+    -------
+    V : (v, 3) array of vertices
+    F : (f, 3) array of faces
+    G : float gravitational constant in km^3/kg/sec^2
+    sigma : float density in kg/km^3
+    """
+    if hasattr(ast, 'get_verts'):
+        return (np.asarray(ast.get_verts(), dtype=np.float64),
+                np.asarray(ast.get_faces(), dtype=np.int64),
+                ast.get_grav_constant(), ast.get_sigma())
+    else:
+        return (np.asarray(ast.V, dtype=np.float64),
+                np.asarray(ast.F, dtype=np.int64),
+                ast.G, ast.sigma)
+
+def tetrahedron_quadrature(V, F, order):
+    """Quadrature rule over the volume of a closed polyhedron
+
+    The polyhedron is split into one tetrahedron per face with the fourth
+    vertex at the origin. Each tetrahedron uses a collapsed (Duffy) Gauss-Legendre
+    product rule with order points in each direction, which integrates
+    polynomials up to degree 2 * order - 3 exactly. Signed volumes are used
+    so the origin does not need to be inside a star shaped body.
+
+    Parameters
+    ----------
+    V : (v, 3) array of vertices
+    F : (f, 3) array of faces with outward normals
+    order : int number of Gauss points in each direction
+
+    Returns
+    -------
+    pts : (f * order**3, 3) array of quadrature points
+    weights : (f * order**3,) array of quadrature weights (sum to the volume)
+    """
+    x, w = np.polynomial.legendre.leggauss(order)
+    x = (x + 1) / 2
+    w = w / 2
+
+    s, t, q = [a.ravel() for a in np.meshgrid(x, x, x, indexing='ij')]
+    ws, wt, wq = [a.ravel() for a in np.meshgrid(w, w, w, indexing='ij')]
+
+    # barycentric coordinates in the unit tetrahedron
+    u1 = s
+    u2 = (1 - s) * t
+    u3 = (1 - s) * (1 - t) * q
+    jac = (1 - s)**2 * (1 - t) * ws * wt * wq
+
+    a, b, c = V[F[:, 0], :], V[F[:, 1], :], V[F[:, 2], :]
+    det = np.einsum('ij,ij->i', a, np.cross(b, c))
+
+    pts = (u1[np.newaxis, :, np.newaxis] * a[:, np.newaxis, :]
+           + u2[np.newaxis, :, np.newaxis] * b[:, np.newaxis, :]
+           + u3[np.newaxis, :, np.newaxis] * c[:, np.newaxis, :])
+    weights = det[:, np.newaxis] * jac[np.newaxis, :]
+
+    return pts.reshape((-1, 3)), weights.ravel()
+
+def triangle_quadrature(V, F, order):
+    """Quadrature rule over the faces of a mesh
+
+    Collapsed (Duffy) Gauss-Legendre product rule with order points in each
+    direction, which integrates polynomials up to degree 2 * order - 2 exactly.
+
+    Parameters
+    ----------
+    V : (v, 3) array of vertices
+    F : (f, 3) array of faces
+    order : int number of Gauss points in each direction
+
+    Returns
+    -------
+    pts : (f, order**2, 3) array of quadrature points
+    weights : (f, order**2) array of quadrature weights (sum to the face areas)
+    """
+    x, w = np.polynomial.legendre.leggauss(order)
+    x = (x + 1) / 2
+    w = w / 2
+
+    s, t = [a.ravel() for a in np.meshgrid(x, x, indexing='ij')]
+    ws, wt = [a.ravel() for a in np.meshgrid(w, w, indexing='ij')]
+
+    u1 = s
+    u2 = (1 - s) * t
+    jac = (1 - s) * ws * wt
+
+    a, b, c = V[F[:, 0], :], V[F[:, 1], :], V[F[:, 2], :]
+    double_area = np.linalg.norm(np.cross(b - a, c - a), axis=1)
+
+    pts = (a[:, np.newaxis, :]
+           + u1[np.newaxis, :, np.newaxis] * (b - a)[:, np.newaxis, :]
+           + u2[np.newaxis, :, np.newaxis] * (c - a)[:, np.newaxis, :])
+    weights = double_area[:, np.newaxis] * jac[np.newaxis, :]
+
+    return pts, weights
+
+def interior_harmonics(pts, degree, radius):
+    """Regular solid harmonics (r/R)^n P_nm(sin phi) [cos, sin](m lambda)
+
+    Unnormalized and without the Condon-Shortley phase
+
+    Parameters
+    ----------
+    pts : (n, 3) array of points
+    degree : int maximum degree
+    radius : float reference radius R
+
+    Returns
+    -------
+    Vr, Wr : (degree + 1, degree + 1, n) arrays of the cos/sin terms
+    """
+    x, y, z = pts[:, 0] / radius, pts[:, 1] / radius, pts[:, 2] / radius
+    r2 = x**2 + y**2 + z**2
+
+    Vr = np.zeros((degree + 1, degree + 1, pts.shape[0]))
+    Wr = np.zeros_like(Vr)
+    Vr[0, 0] = 1
+
+    for m in range(degree + 1):
+        if m > 0:
+            Vr[m, m] = (2 * m - 1) * (x * Vr[m-1, m-1] - y * Wr[m-1, m-1])
+            Wr[m, m] = (2 * m - 1) * (x * Wr[m-1, m-1] + y * Vr[m-1, m-1])
+        for n in range(m + 1, degree + 1):
+            Vr[n, m] = (2 * n - 1) * z * Vr[n-1, m]
+            Wr[n, m] = (2 * n - 1) * z * Wr[n-1, m]
+            if n > m + 1:
+                Vr[n, m] -= (n + m - 1) * r2 * Vr[n-2, m]
+                Wr[n, m] -= (n + m - 1) * r2 * Wr[n-2, m]
+            Vr[n, m] /= (n - m)
+            Wr[n, m] /= (n - m)
+
+    return Vr, Wr
+
+def exterior_harmonics(states, degree, radius):
+    """Cunningham's exterior harmonics (R/r)^(n+1) P_nm(sin phi) [cos, sin](m lambda)
+
+    Montenbruck and Gill, Satellite Orbits, Section 3.2.4
+
+    Parameters
+    ----------
+    states : (n, 3) array of field points
+    degree : int maximum degree
+    radius : float reference radius R
+
+    Returns
+    -------
+    V, W : (degree + 1, degree + 1, n) arrays of the cos/sin terms
+    """
+    x, y, z = states[:, 0], states[:, 1], states[:, 2]
+    r2 = x**2 + y**2 + z**2
+    rho = radius**2 / r2
+    x0, y0, z0 = radius * x / r2, radius * y / r2, radius * z / r2
+
+    V = np.zeros((degree + 1, degree + 1, states.shape[0]))
+    W = np.zeros_like(V)
+    V[0, 0] = radius / np.sqrt(r2)
+
+    for m in range(degree + 1):
+        if m > 0:
+            V[m, m] = (2 * m - 1) * (x0 * V[m-1, m-1] - y0 * W[m-1, m-1])
+            W[m, m] = (2 * m - 1) * (x0 * W[m-1, m-1] + y0 * V[m-1, m-1])
+        for n in range(m + 1, degree + 1):
+            V[n, m] = (2 * n - 1) * z0 * V[n-1, m]
+            W[n, m] = (2 * n - 1) * z0 * W[n-1, m]
+            if n > m + 1:
+                V[n, m] -= (n + m - 1) * rho * V[n-2, m]
+                W[n, m] -= (n + m - 1) * rho * W[n-2, m]
+            V[n, m] /= (n - m)
+            W[n, m] /= (n - m)
+
+    return V, W
+
+def harmonic_derivative(C, S, axis):
+    """Coefficients of the derivative of a spherical harmonic expansion
+
+    If U = (GM/R) sum(C V + S W) then dU/dx_axis = (GM/R^2) sum(C' V + S' W)
+    where V, W are the exterior harmonics. The derivative increases the
+    degree by one.
+
+    Parameters
+    ----------
+    C, S : (..., n + 1, n + 1) coefficient arrays
+    axis : int 0, 1, 2 for x, y, z
+
+    Returns
+    -------
+    Cd, Sd : (..., n + 2, n + 2) coefficient arrays of the derivative
+    """
+    degree = C.shape[-1] - 1
+    Cd = np.zeros(C.shape[:-2] + (degree + 2, degree + 2))
+    Sd = np.zeros_like(Cd)
+
+    for n in range(degree + 1):
+        for m in range(n + 1):
+            c, s = C[..., n, m], S[..., n, m]
+            if axis == 2:
+                Cd[..., n+1, m] -= (n - m + 1) * c
+                Sd[..., n+1, m] -= (n - m + 1) * s
+            elif m == 0:
+                if axis == 0:
+                    Cd[..., n+1, 1] -= c
+                else:
+                    Sd[..., n+1, 1] -= c
+            else:
+                f = (n - m + 2) * (n - m + 1)
+                if axis == 0:
+                    Cd[..., n+1, m+1] -= c / 2
+                    Sd[..., n+1, m+1] -= s / 2
+                    Cd[..., n+1, m-1] += f * c / 2
+                    Sd[..., n+1, m-1] += f * s / 2
+                else:
+                    Cd[..., n+1, m+1] += s / 2
+                    Sd[..., n+1, m+1] -= c / 2
+                    Cd[..., n+1, m-1] += f * s / 2
+                    Sd[..., n+1, m-1] -= f * c / 2
+
+    return Cd, Sd
+
+def harmonic_factors(degree):
+    """Normalization (2 - delta_m0) (n - m)! / (n + m)! of the addition theorem
+
+    1 / |x - y| = (1 / R) sum factor_nm (Vr_nm(y) V_nm(x) + Wr_nm(y) W_nm(x))
+    """
+    factor = np.zeros((degree + 1, degree + 1))
+    for n in range(degree + 1):
+        for m in range(n + 1):
+            factor[n, m] = (2 - (m == 0)) / np.prod(np.arange(n - m + 1, n + m + 1, dtype=np.float64))
+    return factor
+
+class SphericalHarmonics(object):
+    """Exterior spherical harmonic gravity model of a constant density polyhedron
+
+    The coefficients are computed by integrating the regular solid harmonics
+    over the volume of the polyhedron. The integrands are polynomials so the
+    quadrature is exact, and the only approximation is the truncation of the
+    series at degree. The expansion is only valid outside of the Brillouin
+    sphere (the smallest sphere centered at the origin containing the body).
+
+    Attributes:
+        C, S - (degree+1, degree+1) unnormalized coefficients
+        mu - G * sigma * volume in km^3/sec^2
+        radius - reference radius (Brillouin radius) in km
+        degree - maximum degree of the expansion
+    """
+
+    def __init__(self, C, S, mu, radius):
+        self.C = np.asarray(C, dtype=np.float64)
+        self.S = np.asarray(S, dtype=np.float64)
+        self.mu = mu
+        self.radius = radius
+        self.degree = self.C.shape[0] - 1
+
+        # coefficients of the first and second derivatives
+        self._grad = [harmonic_derivative(self.C, self.S, ii) for ii in range(3)]
+        self._hess = {}
+        for ii in range(3):
+            for jj in range(ii, 3):
+                self._hess[(ii, jj)] = harmonic_derivative(*self._grad[ii], axis=jj)
+
+    @classmethod
+    def from_polyhedron(cls, V, F, G, sigma, degree=16):
+        """Compute the expansion of the constant density polyhedron V, F
+        """
+        radius = np.max(np.linalg.norm(V, axis=1))
+        order = degree // 2 + 2
+
+        Cn = np.zeros((degree + 1, degree + 1))
+        Sn = np.zeros_like(Cn)
+        volume = 0
+
+        # keep the number of points in each chunk bounded
+        faces_per_chunk = max(1, 20000 // order**3)
+        for ii in range(0, F.shape[0], faces_per_chunk):
+            pts, weights = tetrahedron_quadrature(V, F[ii:ii+faces_per_chunk, :], order)
+            Vr, Wr = interior_harmonics(pts, degree, radius)
+            Cn += Vr.dot(weights)
+            Sn += Wr.dot(weights)
+            volume += np.sum(weights)
+
+        factor = harmonic_factors(degree)
+        return cls(factor * Cn / volume, factor * Sn / volume, G * sigma * volume, radius)
+
+    @classmethod
+    def from_asteroid(cls, ast, degree=16, filename=None):
+        """Compute the expansion for an asteroid, using an HDF5 cache
+
+        If filename exists and was computed from the same mesh, density and
+        degree it is loaded, otherwise the expansion is computed and saved.
+        """
+        V, F, G, sigma = mesh_properties(ast)
+        checksum = mesh_checksum(V, F, G, sigma, degree)
+
+        if filename is not None and os.path.isfile(filename):
+            with h5py.File(filename, 'r') as hf:
+                cached = hf.attrs.get('checksum', '')
+            if isinstance(cached, bytes):
+                cached = cached.decode()
+            if cached == checksum:
+                logger.info('Loading spherical harmonics from {}'.format(filename))
+                return cls.load(filename)
+            logger.info('Cached spherical harmonics in {} do not match the mesh'.format(filename))
+
+        logger.info('Computing degree {} spherical harmonics for {} faces'.format(degree, F.shape[0]))
+        sh = cls.from_polyhedron(V, F, G, sigma, degree)
+        if filename is not None:
+            sh.save(filename, checksum)
+
+        return sh
+
+    def save(self, filename, checksum=''):
+        """Save the coefficients to an HDF5 file
+        """
+        with h5py.File(filename, 'w') as hf:
+            hf.create_dataset('C', data=self.C)
+            hf.create_dataset('S', data=self.S)
+            hf.attrs['mu'] = self.mu
+            hf.attrs['radius'] = self.radius
+            hf.attrs['checksum'] = checksum
+
+    @classmethod
+    def load(cls, filename):
+        """Load the coefficients from an HDF5 file
+        """
+        with h5py.File(filename, 'r') as hf:
+            return cls(hf['C'][()], hf['S'][()], hf.attrs['mu'], hf.attrs['radius'])
+
+    def error_bound(self, r):
+        """Truncation error bound of the expansion at radius r
+
+        Each degree n of the exterior expansion is bounded by
+        mu R^n / r^(n+1) (since |P_n| <= 1) and its gradient by
+        (2n + 1) mu R^n / r^(n+2). Summing the geometric tails for n > degree
+        gives the bound, which is only finite outside of the Brillouin sphere.
+
+        Parameters
+        ----------
+        r : float or array of radii in km
+
+        Returns
+        -------
+        U_err : bound on the potential error
+        U_grad_err : bound on the norm of the acceleration error
+        """
+        r = np.asarray(r, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rho = self.radius / r
+            k = self.degree + 1
+            U_err = self.mu / r * rho**k / (1 - rho)
+            U_grad_err = self.mu / r**2 * rho**k * ((2 * k + 1) / (1 - rho)
+                                                    + 2 * rho / (1 - rho)**2)
+        U_err = np.where(rho < 1, U_err, np.inf)
+        U_grad_err = np.where(rho < 1, U_grad_err, np.inf)
+        return U_err, U_grad_err
+
+    def potential(self, states):
+        """Evaluate the expansion at many field points
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+
+        Returns
+        -------
+        U : (n,) potential
+        U_grad : (n, 3) acceleration
+        U_grad_mat : (n, 9) gradient matrix (row major)
+        Ulaplace : (n,) laplacian (zero outside of the body)
+        """
+        states = np.atleast_2d(states)
+        V, W = exterior_harmonics(states, self.degree + 2, self.radius)
+
+        def evaluate(C, S):
+            deg = C.shape[0]
+            return (np.einsum('ij,ijk->k', C, V[:deg, :deg])
+                    + np.einsum('ij,ijk->k', S, W[:deg, :deg]))
+
+        U = self.mu / self.radius * evaluate(self.C, self.S)
+        U_grad = self.mu / self.radius**2 * np.stack([evaluate(*cs) for cs in self._grad], axis=1)
+
+        U_grad_mat = np.zeros((states.shape[0], 3, 3))
+        for (ii, jj), cs in self._hess.items():
+            U_grad_mat[:, ii, jj] = self.mu / self.radius**3 * evaluate(*cs)
+            U_grad_mat[:, jj, ii] = U_grad_mat[:, ii, jj]
+
+        return U, U_grad, U_grad_mat.reshape((-1, 9)), np.zeros(states.shape[0])
+
+def batch_potential(ast, states):
+    """Exact polyhedron potential of an asteroid at many field points
+
+    Uses the batched C++ kernel if available and otherwise loops over the
+    single point potential of the asteroid.
+
+    Parameters
+    ----------
+    ast : asteroid object (Python or C++)
+    states : (n, 3) array of positions in the asteroid fixed frame in km
+
+    Returns
+    -------
+    U : (n,) potential
+    U_grad : (n, 3) acceleration
+    U_grad_mat : (n, 9) gradient matrix (row major)
+    Ulaplace : (n,) laplacian
+    """
+    states = np.atleast_2d(states)
+    if hasattr(ast, 'polyhedron_potential_batch'):
+        return ast.polyhedron_potential_batch(states)
+
+    if hasattr(ast, 'compute_potential'):
+        func = ast.compute_potential
+    else:
+        func = ast.polyhedron_potential
+
+    results = [func(state) for state in states]
+    return (np.array([res[0] for res in results]),
+            np.array([res[1] for res in results]).reshape((-1, 3)),
+            np.array([res[2] for res in results]).reshape((-1, 9)),
+            np.array([res[3] for res in results]))
+
+def rotation_rate(ast):
+    """Rotation rate in rad/sec of an asteroid about its third axis
+
+    Works with both the Python asteroid (dynamics.asteroid) and the C++
+    asteroid (lib.asteroid)
+    """
+    if hasattr(ast, 'get_omega'):
+        return ast.get_omega()
+    else:
+        return ast.omega
+
+class AsteroidGravity(abc.ABC):
+    """Common interface for gravity models that stand in for an asteroid
+
+    Subclasses implement polyhedron_potential_batch and this provides the
+    single point interfaces of both asteroid classes. All other attributes
+    are passed through to the wrapped asteroid.
+    """
+
+    def __init__(self, ast):
+        self.ast = ast
+
+        self._U = 0
+        self._U_grad = np.zeros(3)
+        self._U_grad_mat = np.zeros((3, 3))
+        self._Ulaplace = 0
+
+    def __getattr__(self, name):
+        if name == 'ast':
+            raise AttributeError(name)
+        return getattr(self.ast, name)
+
+    def _exact(self, states):
+        return batch_potential(self.ast, states)
+
+    @abc.abstractmethod
+    def polyhedron_potential_batch(self, states, block_size=64):
+        """Potential at (n, 3) states. Returns (U, U_grad, U_grad_mat, Ulaplace)
+        """
+
+    def compute_potential(self, state):
+        """Potential at a single state. Returns (U, U_grad, U_grad_mat, Ulaplace)
+        """
+        U, U_grad, U_grad_mat, Ulaplace = self.polyhedron_potential_batch(state)
+        return U[0], U_grad[0, :], U_grad_mat[0, :].reshape((3, 3)), Ulaplace[0]
+
+    def polyhedron_potential(self, state):
+        """Same interface as both asteroid classes
+
+        The result is stored for the get_* methods (C++ interface) and
+        also returned (Python interface)
+        """
+        (self._U, self._U_grad,
+         self._U_grad_mat, self._Ulaplace) = self.compute_potential(state)
+        return (self._U, self._U_grad, self._U_grad_mat, self._Ulaplace)
+
+    def get_potential(self):
+        return self._U
+
+    def get_acceleration(self):
+        return self._U_grad
+
+    def get_gradient_mat(self):
+        return self._U_grad_mat
+
+    def get_laplace(self):
+        return self._Ulaplace
+
+class FarFieldAsteroid(AsteroidGravity):
+    """Asteroid gravity that switches to a spherical harmonic expansion far away
+
+    Wraps an asteroid (Python or C++) and provides the same potential
+    interface. Field points beyond switch_radius use the expansion and
+    all others use the exact polyhedron potential of the wrapped asteroid.
+    The switch radius is the smallest radius, and at least min_ratio times
+    the Brillouin radius, where the truncation bound on the acceleration is
+    below rel_tol times the point mass acceleration mu / r^2.
+
+    All other attributes are passed through to the wrapped asteroid.
+
+    Attributes:
+        ast - wrapped asteroid
+        harmonics - SphericalHarmonics expansion
+        switch_radius - radius in km beyond which the expansion is used
+        rel_tol - relative acceleration error bound used to pick switch_radius
+    """
+
+    def __init__(self, ast, degree=16, rel_tol=1e-9, min_ratio=1.2, filename=None):
+        AsteroidGravity.__init__(self, ast)
+        self.harmonics = SphericalHarmonics.from_asteroid(ast, degree, filename)
+        self.rel_tol = rel_tol
+        self.switch_radius = self._switch_radius(min_ratio)
+
+        _, grad_err = self.harmonics.error_bound(self.switch_radius)
+        logger.info('Spherical harmonics beyond {:.3f} km (Brillouin radius {:.3f} km) '
+                    'with acceleration error bound {:.3e}'.format(
+                        self.switch_radius, self.harmonics.radius, grad_err))
+
+    def _switch_radius(self, min_ratio):
+        """Bisection for the radius where the relative error bound equals rel_tol
+        """
+        def rel_err(r):
+            return self.harmonics.error_bound(r)[1] * r**2 / self.harmonics.mu
+
+        low = min_ratio * self.harmonics.radius
+        if rel_err(low) <= self.rel_tol:
+            return low
+
+        high = 2 * low
+        while rel_err(high) > self.rel_tol:
+            high = 2 * high
+
+        for _ in range(60):
+            mid = (low + high) / 2
+            if rel_err(mid) > self.rel_tol:
+                low = mid
+            else:
+                high = mid
+
+        return high
+
+    def error_bound(self, states):
+        """Error bound used for each field point (zero if computed exactly)
+
+        Returns
+        -------
+        U_err : (n,) bound on the potential error
+        U_grad_err : (n,) bound on the norm of the acceleration error
+        """
+        r = np.linalg.norm(np.atleast_2d(states), axis=1)
+        U_err, U_grad_err = self.harmonics.error_bound(r)
+        exact = r < self.switch_radius
+        return np.where(exact, 0, U_err), np.where(exact, 0, U_grad_err)
+
+    def polyhedron_potential_batch(self, states, block_size=64):
+        """Potential at many field points using the exact model or the expansion
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+
+        Returns
+        -------
+        U, U_grad, U_grad_mat (n, 9), Ulaplace
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        far = np.linalg.norm(states, axis=1) >= self.switch_radius
+
+        U = np.zeros(states.shape[0])
+        U_grad = np.zeros((states.shape[0], 3))
+        U_grad_mat = np.zeros((states.shape[0], 9))
+        Ulaplace = np.zeros(states.shape[0])
+
+        for mask, func in ((far, self.harmonics.potential), (~far, self._exact)):
+            if np.any(mask):
+                (U[mask], U_grad[mask, :],
+                 U_grad_mat[mask, :], Ulaplace[mask]) = func(states[mask, :])
+
+        return U, U_grad, U_grad_mat, Ulaplace
+
+def face_integrals(states, V, F, normals, edge_normals, edge_lengths):
+    """Integral of 1/|x - y| over each face and its gradient
+
+    Closed form for a uniform density triangle: the sum of the edge terms of
+    the polyhedron potential for that face minus its solid angle term.
+
+    Parameters
+    ----------
+    states : (p, 3) array of field points
+    V, F : vertices and (f, 3) faces
+    normals : (f, 3) outward unit face normals
+    edge_normals : (f, 3, 3) outward in plane unit normal of edge (i, i+1)
+    edge_lengths : (f, 3) length of edge (i, i+1)
+
+    Returns
+    -------
+    phi : (p, f) integral of 1 / |x - y| over the face
+    phi_grad : (p, f, 3) gradient with respect to the field point x
+    """
+    r = V[F, :][np.newaxis, :, :, :] - states[:, np.newaxis, np.newaxis, :]
+    r_norm = np.linalg.norm(r, axis=3)
+
+    r_next = np.roll(r_norm, -1, axis=2)
+    L = np.log((r_norm + r_next + edge_lengths) / (r_norm + r_next - edge_lengths))
+
+    num = np.einsum('pfi,pfi->pf', r[:, :, 0, :], np.cross(r[:, :, 1, :], r[:, :, 2, :]))
+    den = (np.prod(r_norm, axis=2)
+           + r_norm[:, :, 0] * np.einsum('pfi,pfi->pf', r[:, :, 1, :], r[:, :, 2, :])
+           + r_norm[:, :, 1] * np.einsum('pfi,pfi->pf', r[:, :, 2, :], r[:, :, 0, :])
+           + r_norm[:, :, 2] * np.einsum('pfi,pfi->pf', r[:, :, 0, :], r[:, :, 1, :]))
+    omega = 2 * np.arctan2(num, den)
+
+    phi = (np.einsum('fei,pfei,pfe->pf', edge_normals, r, L)
+           - np.einsum('fi,pfi->pf', normals, r[:, :, 0, :]) * omega)
+    phi_grad = (-np.einsum('fei,pfe->pfi', edge_normals, L)
+                + normals[np.newaxis, :, :] * omega[:, :, np.newaxis])
+
+    return phi, phi_grad
+
+class ClusterAsteroid(AsteroidGravity):
+    """Hierarchical (Barnes-Hut) evaluation of the polyhedron potential
+
+    The divergence theorem turns the polyhedron potential into surface
+    integrals of 1/|x - y| with a constant density on each face,
+
+        U = G sigma / 2 sum_f (n_f . (v_f - x)) phi_f(x)
+        U_grad = -G sigma sum_f n_f phi_f(x)
+
+    where phi_f is the integral of 1/|x - y| over face f. This is a Laplace
+    problem with four scalar densities (n_f and n_f . v_f) so the faces are
+    sorted into an octree and each cell stores the spherical harmonic
+    expansion of the densities about its center up to degree order. A cell is approximated by its
+    expansion if its radius is less than theta times the distance to the field
+    point, otherwise its children (or the faces of a leaf) are visited. Faces
+    near the field point are always integrated exactly, so this is valid on
+    and near the surface. theta = 0 gives the exact polyhedron potential.
+
+    Attributes:
+        ast - wrapped asteroid
+        theta - opening angle which controls the accuracy
+        order - degree of the expansion of each cell
+        leaf_size - maximum number of faces in a leaf cell
+    """
+
+    def __init__(self, ast, theta=0.5, order=6, leaf_size=32):
+        AsteroidGravity.__init__(self, ast)
+        self.theta = theta
+        self.order = order
+        self.leaf_size = leaf_size
+
+        V, F, self.G, self.sigma = mesh_properties(ast)
+        self.V, self.F = V, F
+
+        a, b, c = V[F[:, 0], :], V[F[:, 1], :], V[F[:, 2], :]
+        cross = np.cross(b - a, c - a)
+        self.areas = np.linalg.norm(cross, axis=1) / 2
+        self.normals = cross / (2 * self.areas[:, np.newaxis])
+
+        edges = V[np.roll(F, -1, axis=1), :] - V[F, :]
+        self.edge_lengths = np.linalg.norm(edges, axis=2)
+        self.edge_normals = (np.cross(edges, self.normals[:, np.newaxis, :])
+                             / self.edge_lengths[:, :, np.newaxis])
+
+        # densities [n_x, n_y, n_z, n . v]
+        self.densities = np.hstack((self.normals,
+                                    np.einsum('ij,ij->i', self.normals, a)[:, np.newaxis]))
+
+        self._build_tree()
+        logger.info('Octree with {} cells over {} faces'.format(len(self.cell_faces), F.shape[0]))
+
+    def _build_tree(self):
+        """Split the faces by the octant of their centroid
+        """
+        centroids = np.mean(self.V[self.F, :], axis=1)
+
+        self.cell_faces = []
+        self.cell_children = []
+        stack = [(np.arange(self.F.shape[0]), -1)]
+        while stack:
+            faces, parent = stack.pop()
+            cell = len(self.cell_faces)
+            self.cell_faces.append(faces)
+            self.cell_children.append([])
+            if parent >= 0:
+                self.cell_children[parent].append(cell)
+
+            if faces.size <= self.leaf_size:
+                continue
+
+            center = (np.max(centroids[faces, :], axis=0) + np.min(centroids[faces, :], axis=0)) / 2
+            octant = np.dot(centroids[faces, :] > center, [1, 2, 4])
+            if np.all(octant == octant[0]):
+                continue
+
+            for oct in np.unique(octant)[::-1]:
+                stack.append((faces[octant == oct], cell))
+
+        num_cells = len(self.cell_faces)
+        self.cell_center = np.zeros((num_cells, 3))
+        self.cell_radius = np.zeros(num_cells)
+        self.cell_C = np.zeros((num_cells, 4, self.order + 1, self.order + 1))
+        self.cell_S = np.zeros_like(self.cell_C)
+
+        for cell, faces in enumerate(self.cell_faces):
+            verts = self.V[self.F[faces, :], :].reshape((-1, 3))
+            center = (np.max(verts, axis=0) + np.min(verts, axis=0)) / 2
+
+            self.cell_center[cell, :] = center
+            self.cell_radius[cell] = np.max(np.linalg.norm(verts - center, axis=1))
+            self.cell_C[cell], self.cell_S[cell] = self._moments(faces, center,
+                                                                 self.cell_radius[cell])
+
+        self.cell_grad = [harmonic_derivative(self.cell_C, self.cell_S, axis)
+                          for axis in range(3)]
+
+    def _moments(self, faces, center, radius):
+        """Expansion coefficients of the densities on faces about center
+        """
+        order = self.order
+        C = np.zeros((4, order + 1, order + 1))
+        S = np.zeros_like(C)
+
+        num_quad = (order + 3) // 2
+        faces_per_chunk = max(1, 20000 // num_quad**2)
+        for ii in range(0, faces.size, faces_per_chunk):
+            chunk = faces[ii:ii+faces_per_chunk]
+            pts, weights = triangle_quadrature(self.V, self.F[chunk, :], num_quad)
+            Vr, Wr = interior_harmonics(pts.reshape((-1, 3)) - center, order, radius)
+            wd = (weights[:, :, np.newaxis]
+                  * self.densities[chunk, np.newaxis, :]).reshape((-1, 4))
+            C += np.einsum('ijk,kc->cij', Vr, wd)
+            S += np.einsum('ijk,kc->cij', Wr, wd)
+
+        factor = harmonic_factors(order)
+        return factor * C, factor * S
+
+    def _multipole(self, cell, states):
+        """Expansion of a cell about its center for each density
+        """
+        radius = self.cell_radius[cell]
+        V, W = exterior_harmonics(states - self.cell_center[cell, :], self.order + 1, radius)
+
+        def evaluate(C, S):
+            deg = C.shape[-1]
+            return (np.einsum('cij,ijk->kc', C, V[:deg, :deg])
+                    + np.einsum('cij,ijk->kc', S, W[:deg, :deg]))
+
+        phi = evaluate(self.cell_C[cell], self.cell_S[cell]) / radius
+        phi_grad = np.stack([evaluate(Cd[cell], Sd[cell]) for Cd, Sd in self.cell_grad],
+                            axis=2) / radius**2
+        return phi, phi_grad
+
+    def _exact_faces(self, faces, states):
+        """Exact contribution of faces for each density
+        """
+        phi, phi_grad = face_integrals(states, self.V, self.F[faces, :],
+                                       self.normals[faces, :],
+                                       self.edge_normals[faces, :, :],
+                                       self.edge_lengths[faces, :])
+        density = self.densities[faces, :]
+        return np.dot(phi, density), np.einsum('pfj,fc->pcj', phi_grad, density)
+
+    def _densities(self, states, theta):
+        """Integrals of the four densities and their gradients at each state
+        """
+        phi = np.zeros((states.shape[0], 4))
+        phi_grad = np.zeros((states.shape[0], 4, 3))
+
+        stack = [(0, np.arange(states.shape[0]))]
+        while stack:
+            cell, index = stack.pop()
+            dist = np.linalg.norm(states[index, :] - self.cell_center[cell, :], axis=1)
+            far = self.cell_radius[cell] < theta * dist
+
+            if np.any(far):
+                p, pg = self._multipole(cell, states[index[far], :])
+                phi[index[far], :] += p
+                phi_grad[index[far], :, :] += pg
+
+            near = index[~far]
+            if near.size == 0:
+                continue
+
+            if self.cell_children[cell]:
+                stack.extend((child, near) for child in self.cell_children[cell])
+            else:
+                p, pg = self._exact_faces(self.cell_faces[cell], states[near, :])
+                phi[near, :] += p
+                phi_grad[near, :, :] += pg
+
+        return phi, phi_grad
+
+    def polyhedron_potential_batch(self, states, block_size=64, theta=None):
+        """Potential at many field points using the octree
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+        theta : opening angle (defaults to self.theta)
+
+        Returns
+        -------
+        U, U_grad, U_grad_mat (n, 9), Ulaplace
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        if theta is None:
+            theta = self.theta
+
+        phi, phi_grad = self._densities(states, theta)
+        Gsigma = self.G * self.sigma
+
+        U = Gsigma / 2 * (phi[:, 3] - np.einsum('pi,pi->p', states, phi[:, :3]))
+        U_grad = -Gsigma * phi[:, :3]
+        U_grad_mat = -Gsigma * phi_grad[:, :3, :]
+        Ulaplace = np.trace(U_grad_mat, axis1=1, axis2=2)
+
+        return U, U_grad, U_grad_mat.reshape((-1, 9)), Ulaplace
+
+    def validate(self, states, exact=None):
+        """Compare the octree against the exact polyhedron potential
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+        exact : tuple (U, U_grad, U_grad_mat, Ulaplace) of the exact values.
+            Computed from the wrapped asteroid if not given
+
+        Returns
+        -------
+        error : dict of the maximum relative error of U, U_grad and U_grad_mat
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        if exact is None:
+            exact = self._exact(states)
+
+        U, U_grad, U_grad_mat, _ = self.polyhedron_potential_batch(states)
+        U_true, U_grad_true, U_grad_mat_true, _ = exact
+
+        def rel_err(approx, true):
+            approx = np.reshape(approx, (states.shape[0], -1))
+            true = np.reshape(true, (states.shape[0], -1))
+            return np.max(np.linalg.norm(approx - true, axis=1) / np.linalg.norm(true, axis=1))
+
+        error = {'U': rel_err(U, U_true),
+                 'U_grad': rel_err(U_grad, U_grad_true),
+                 'U_grad_mat': rel_err(U_grad_mat, U_grad_mat_true)}
+
+        logger.info('Octree theta={} relative error U {U:.3e} U_grad {U_grad:.3e} '
+                    'U_grad_mat {U_grad_mat:.3e}'.format(self.theta, **error))
+        return error
+
+def _model_potential(args):
+    """Evaluate a picklable potential model (used by the process pool)"""
+    model, states = args
+    U, U_grad, U_grad_mat, Ulaplace = model.potential(states)
+    return U, U_grad, np.reshape(U_grad_mat, (-1, 9)), Ulaplace
+
+def parallel_potential(ast, states, processes=None, chunk_size=4096):
+    """Exact potential at many field points using all cores
+
+    The C++ asteroid is already parallel (OpenMP) in polyhedron_potential_batch.
+    The Python asteroid model (polyhedron.PolyhedronGravity) is evaluated
+    in chunks by a process pool.
+    """
+    model = getattr(ast, 'polyhedron_model', None)
+    if model is None or processes == 1 or states.shape[0] <= chunk_size:
+        return batch_potential(ast, states)
+
+    chunks = [(model, states[ii:ii+chunk_size, :])
+              for ii in range(0, states.shape[0], chunk_size)]
+    pool = Pool(processes)
+    try:
+        results = pool.map(_model_potential, chunks)
+    finally:
+        pool.close()
+        pool.join()
+
+    return tuple(np.concatenate([res[ii] for res in results]) for ii in range(4))
+
+def hermite_basis(t):
+    """Cubic Hermite basis functions and their first two derivatives
+
+    Parameters
+    ----------
+    t : (n,) array of local coordinates in [0, 1]
+
+    Returns
+    -------
+    B : (n, 2, 2, 3) array indexed by [point, node, kind, derivative order]
+        where node 0/1 is the left/right end and kind 0/1 multiplies the
+        value/derivative at that node
+    """
+    t2 = t**2
+    t3 = t**3
+    one = np.ones_like(t)
+    zero = np.zeros_like(t)
+
+    B = np.empty(t.shape + (2, 2, 3))
+    B[..., 0, 0, :] = np.stack((2 * t3 - 3 * t2 + 1, 6 * t2 - 6 * t, 12 * t - 6 * one), axis=-1)
+    B[..., 0, 1, :] = np.stack((t3 - 2 * t2 + t, 3 * t2 - 4 * t + one, 6 * t - 4 * one), axis=-1)
+    B[..., 1, 0, :] = np.stack((-2 * t3 + 3 * t2, -6 * t2 + 6 * t, -12 * t + 6 * one), axis=-1)
+    B[..., 1, 1, :] = np.stack((t3 - t2, 3 * t2 - 2 * t + zero, 6 * t - 2 * one), axis=-1)
+    return B
+
+def _node_difference(f, valid, spacing, axis):
+    """Derivative of node values along axis using only valid nodes
+
+    Central differences where both neighbors are valid, one sided where only
+    one is and zero for isolated nodes.
+    """
+    fp = np.roll(f, -1, axis=axis)
+    fm = np.roll(f, 1, axis=axis)
+    vp = np.roll(valid, -1, axis=axis)
+    vm = np.roll(valid, 1, axis=axis)
+
+    # no wrap around at the ends of the grid
+    last = [slice(None)] * f.ndim
+    last[axis] = -1
+    vp[tuple(last)] = False
+    first = [slice(None)] * f.ndim
+    first[axis] = 0
+    vm[tuple(first)] = False
+
+    df = np.zeros_like(f)
+    central = vp & vm
+    df[central] = (fp - fm)[central] / (2 * spacing)
+    forward = vp & ~vm
+    df[forward] = (fp - f)[forward] / spacing
+    backward = vm & ~vp
+    df[backward] = (f - fm)[backward] / spacing
+    return df
+
+class GravityGrid(object):
+    """Tricubic Hermite interpolation of the potential on a Cartesian grid
+
+    Each node stores the potential, its gradient and the mixed second (from
+    the gradient matrix) and third (finite difference) derivatives. The
+    interpolant is the tensor product of cubic Hermite polynomials so it is
+    continuously differentiable, and the acceleration and gradient matrix are
+    the exact derivatives of the interpolated potential. This keeps the
+    interpolated field conservative.
+
+    Only cells with all eight nodes outside of the body are used.
+
+    Attributes:
+        lower - (3,) lower corner of the grid in km
+        spacing - node spacing in km
+        shape - (3,) number of nodes along each axis
+        nodes - (nx, ny, nz, 8) scaled node data
+            [U, Ux, Uy, Uz, Uxy, Uxz, Uyz, Uxyz] * spacing^order
+        cell_valid - (nx-1, ny-1, nz-1) cells that can be interpolated
+    """
+
+    # node data index of the derivative with orders (x, y, z)
+    DERIVATIVE_INDEX = np.array([[[0, 3], [2, 6]], [[1, 5], [4, 7]]])
+
+    def __init__(self, lower, spacing, nodes, valid):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.spacing = spacing
+        self.nodes = np.asarray(nodes, dtype=np.float64)
+        self.valid = np.asarray(valid, dtype=bool)
+        self.shape = np.array(self.valid.shape)
+
+        v = self.valid
+        self.cell_valid = (v[:-1, :-1, :-1] & v[1:, :-1, :-1] & v[:-1, 1:, :-1] & v[:-1, :-1, 1:]
+                           & v[1:, 1:, :-1] & v[1:, :-1, 1:] & v[:-1, 1:, 1:] & v[1:, 1:, 1:])
+
+    @classmethod
+    def build(cls, ast, extent, num_nodes=64, processes=None):
+        """Sample the exact potential of ast on a grid
+
+        Parameters
+        ----------
+        ast : asteroid object (Python or C++)
+        extent : float half width of the cube centered at the origin in km
+        num_nodes : int number of nodes along each axis
+        processes : int number of processes (default all cores)
+        """
+        axis = np.linspace(-extent, extent, num_nodes)
+        spacing = axis[1] - axis[0]
+        X, Y, Z = np.meshgrid(axis, axis, axis, indexing='ij')
+        states = np.stack((X.ravel(), Y.ravel(), Z.ravel()), axis=1)
+
+        logger.info('Building {} node gravity grid with spacing {:.3f} km'.format(
+            states.shape[0], spacing))
+        U, U_grad, U_grad_mat, _ = parallel_potential(ast, states, processes)
+
+        shape = (num_nodes,) * 3
+        # the potential is zero inside of the body
+        valid = (U > 0).reshape(shape)
+        U_grad_mat = U_grad_mat.reshape(shape + (3, 3))
+
+        nodes = np.zeros(shape + (8,))
+        nodes[..., 0] = U.reshape(shape)
+        nodes[..., 1:4] = U_grad.reshape(shape + (3,)) * spacing
+        nodes[..., 4] = U_grad_mat[..., 0, 1] * spacing**2
+        nodes[..., 5] = U_grad_mat[..., 0, 2] * spacing**2
+        nodes[..., 6] = U_grad_mat[..., 1, 2] * spacing**2
+        nodes[..., 7] = (_node_difference(U_grad_mat[..., 0, 1], valid, spacing, 2)
+                         + _node_difference(U_grad_mat[..., 0, 2], valid, spacing, 1)
+                         + _node_difference(U_grad_mat[..., 1, 2], valid, spacing, 0)) / 3 * spacing**3
+
+        return cls(-extent * np.ones(3), spacing, nodes, valid)
+
+    @classmethod
+    def from_asteroid(cls, ast, extent, num_nodes=64, filename=None, processes=None):
+        """Build the grid for an asteroid, using an HDF5 cache
+
+        If filename exists and was built from the same mesh, density, extent
+        and number of nodes it is loaded, otherwise the grid is built and saved.
+        """
+        V, F, G, sigma = mesh_properties(ast)
+        checksum = mesh_checksum(V, F, G, sigma, float(extent), int(num_nodes))
+
+        if filename is not None and os.path.isfile(filename):
+            with h5py.File(filename, 'r') as hf:
+                cached = hf.attrs.get('checksum', '')
+            if isinstance(cached, bytes):
+                cached = cached.decode()
+            if cached == checksum:
+                logger.info('Loading gravity grid from {}'.format(filename))
+                return cls.load(filename)
+            logger.info('Cached gravity grid in {} does not match the mesh'.format(filename))
+
+        grid = cls.build(ast, extent, num_nodes, processes)
+        if filename is not None:
+            grid.save(filename, checksum)
+
+        return grid
+
+    def save(self, filename, checksum=''):
+        """Save the grid to an HDF5 file
+        """
+        with h5py.File(filename, 'w') as hf:
+            hf.create_dataset('nodes', data=self.nodes, compression='gzip')
+            hf.create_dataset('valid', data=self.valid, compression='gzip')
+            hf.attrs['lower'] = self.lower
+            hf.attrs['spacing'] = self.spacing
+            hf.attrs['checksum'] = checksum
+
+    @classmethod
+    def load(cls, filename):
+        """Load the grid from an HDF5 file
+        """
+        with h5py.File(filename, 'r') as hf:
+            return cls(hf.attrs['lower'], hf.attrs['spacing'], hf['nodes'][()], hf['valid'][()])
+
+    def _locate(self, states):
+        coords = (states - self.lower) / self.spacing
+        cell = np.floor(coords).astype(int)
+        inside = np.all((coords >= 0) & (coords <= self.shape - 1), axis=1)
+        cell = np.clip(cell, 0, self.shape - 2)
+        return cell, coords - cell, inside
+
+    def contains(self, states):
+        """True for the states that can be interpolated
+        """
+        states = np.atleast_2d(states)
+        cell, _, inside = self._locate(states)
+        return inside & self.cell_valid[cell[:, 0], cell[:, 1], cell[:, 2]]
+
+    def potential(self, states):
+        """Interpolate the potential and its derivatives
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the grid (asteroid fixed) frame in km.
+            All states must satisfy contains
+
+        Returns
+        -------
+        U : (n,) potential
+        U_grad : (n, 3) acceleration
+        U_grad_mat : (n, 9) gradient matrix (row major)
+        Ulaplace : (n,) laplacian of the interpolant
+        """
+        states = np.atleast_2d(states)
+        cell, t, _ = self._locate(states)
+
+        # corner data indexed by [point, x node, y node, z node, x kind, y kind, z kind]
+        corners = np.empty((states.shape[0], 2, 2, 2, 8))
+        for a in range(2):
+            for b in range(2):
+                for c in range(2):
+                    corners[:, a, b, c, :] = self.nodes[cell[:, 0] + a, cell[:, 1] + b, cell[:, 2] + c, :]
+        corners = corners[..., self.DERIVATIVE_INDEX]
+
+        Bx, By, Bz = [hermite_basis(t[:, ii]) for ii in range(3)]
+
+        def evaluate(order):
+            return np.einsum('pabcijk,pai,pbj,pck->p', corners,
+                             Bx[..., order[0]], By[..., order[1]], Bz[..., order[2]])
+
+        h = self.spacing
+        U = evaluate((0, 0, 0))
+        U_grad = np.stack([evaluate(np.eye(3, dtype=int)[ii]) for ii in range(3)], axis=1) / h
+
+        U_grad_mat = np.zeros((states.shape[0], 3, 3))
+        for ii in range(3):
+            for jj in range(ii, 3):
+                order = np.eye(3, dtype=int)[ii] + np.eye(3, dtype=int)[jj]
+                U_grad_mat[:, ii, jj] = evaluate(order) / h**2
+                U_grad_mat[:, jj, ii] = U_grad_mat[:, ii, jj]
+
+        Ulaplace = np.trace(U_grad_mat, axis1=1, axis2=2)
+        return U, U_grad, U_grad_mat.reshape((-1, 9)), Ulaplace
+
+class GridAsteroid(AsteroidGravity):
+    """Asteroid gravity interpolated from a precomputed grid
+
+    Wraps an asteroid (Python or C++) and provides the same potential
+    interface. States inside of the grid use the tricubic interpolant and all
+    others (outside of the grid or in cells touching the body) use the exact
+    polyhedron potential of the wrapped asteroid.
+
+    Attributes:
+        ast - wrapped asteroid
+        grid - GravityGrid
+    """
+
+    def __init__(self, ast, extent, num_nodes=64, filename=None, processes=None):
+        AsteroidGravity.__init__(self, ast)
+        self.grid = GravityGrid.from_asteroid(ast, extent, num_nodes, filename, processes)
+
+    def polyhedron_potential_batch(self, states, block_size=64):
+        """Potential at many field points using the grid or the exact model
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+
+        Returns
+        -------
+        U, U_grad, U_grad_mat (n, 9), Ulaplace
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        interp = self.grid.contains(states)
+
+        U = np.zeros(states.shape[0])
+        U_grad = np.zeros((states.shape[0], 3))
+        U_grad_mat = np.zeros((states.shape[0], 9))
+        Ulaplace = np.zeros(states.shape[0])
+
+        for mask, func in ((interp, self.grid.potential), (~interp, self._exact)):
+            if np.any(mask):
+                (U[mask], U_grad[mask, :],
+                 U_grad_mat[mask, :], Ulaplace[mask]) = func(states[mask, :])
+
+        return U, U_grad, U_grad_mat, Ulaplace
+
+def mesh_checksum(V, F, *args):
+    """SHA1 of the mesh and any extra parameters for validating caches
+    """
+    sha = hashlib.sha1()
+    sha.update(np.ascontiguousarray(V, dtype=np.float64).tobytes())
+    sha.update(np.ascontiguousarray(F, dtype=np.int64).tobytes())
+    sha.update(repr(args).encode())
+    return sha.hexdigest()
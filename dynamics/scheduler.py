@@ -0,0 +1,150 @@
+"""Event driven integration with sensing and output at independent rates
+
+The integrator takes its own adaptive steps and periodic events, like a lidar
+scan or saving the state, are fired at their own rates instead of forcing an
+integration step every second.
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from scipy import integrate
+
+class Scheduler(object):
+    """Integrate with adaptive steps and fire periodic events
+
+    Events that change the dynamics, e.g. a lidar scan that updates the
+    estimated mesh used by the controller, end an integration segment and the
+    integrator is restarted after them. Events that only observe the state,
+    e.g. saving output, use the dense output of the step that covers them and
+    do not interrupt the integrator. A coast arc with only output events is a
+    single integration.
+
+    Events fire at t0 + k * period for k >= 1, up to and including tf. Events
+    at the same time fire in the order they were added, so an output event
+    added after a scan sees the updated mesh.
+
+    Parameters
+    ----------
+    fun : callable
+        Right hand side fun(t, y, *args)
+    t0, tf : float
+        Initial and final time
+    args : tuple
+        Extra arguments of fun
+    method : str
+        Name of a scipy.integrate.OdeSolver, e.g. 'LSODA' or 'RK45'
+    options :
+        Passed to the solver, e.g. rtol and atol
+
+    Examples
+    --------
+    scheduler = Scheduler(eoms_func, 0, 15000, args=(ast, dum), rtol=1e-9, atol=1e-9)
+    scheduler.every(1, scan)
+    scheduler.every(10, save, restart=False)
+    t, state = scheduler.run(initial_state)
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, fun, t0, tf, args=(), method='LSODA', **options):
+        self.fun = fun
+        self.t0 = t0
+        self.tf = tf
+        self.args = args
+        self.solver = getattr(integrate, method)
+        self.options = options
+
+        self.events = []
+        # number of integrator restarts during the last run
+        self.segments = 0
+
+    def every(self, period, callback, restart=True):
+        """Call callback(t, y) every period
+
+        Parameters
+        ----------
+        period : float
+            Time between events
+        callback : callable
+            Called with the time and state
+        restart : bool
+            True if callback changes the dynamics, so the integrator has to
+            stop at the event and restart after it
+        """
+        if period <= 0:
+            raise ValueError("Event period must be positive")
+        self.events.append((period, callback, restart))
+
+    def run(self, y, t=None):
+        """Integrate until tf and fire all of the events after t
+
+        Parameters
+        ----------
+        y : array
+            State at t
+        t : float
+            Start time, t0 by default. Events keep their phase relative to t0,
+            so a simulation can be resumed from the time of an event
+
+        Returns
+        -------
+        t, y : float, array
+            Final time and state
+        """
+        t = self.t0 if t is None else t
+        y = np.array(y, dtype=np.float64)
+        fun = lambda time, state: self.fun(time, state, *self.args)
+
+        # index k of the next time of each event
+        count = [int(np.floor((t - self.t0) / period + 1e-9)) + 1 for period, _, _ in self.events]
+        event_time = lambda ii: self.t0 + count[ii] * self.events[ii][0]
+
+        self.segments = 0
+        while t < self.tf:
+            # integrate up to the next event that changes the dynamics
+            t_stop = min([event_time(ii) for ii, event in enumerate(self.events) if event[2]]
+                         + [self.tf])
+            solver = self.solver(fun, t, y, t_stop, **self.options)
+            self.segments += 1
+
+            while solver.status == 'running':
+                message = solver.step()
+                if solver.status == 'failed':
+                    raise RuntimeError("Integration failed at t = {}: {}".format(solver.t, message))
+
+                # observations inside of this step from the interpolant
+                due = self._due(count, solver.t, t_stop)
+                if due:
+                    interpolant = solver.dense_output()
+                    for ii in due:
+                        self.events[ii][1](event_time(ii), interpolant(event_time(ii)))
+                        count[ii] += 1
+
+            t, y = t_stop, solver.y.copy()
+            # every event at the end of the segment, in the order they were added
+            for ii in range(len(self.events)):
+                if event_time(ii) <= t_stop:
+                    self.events[ii][1](t, y)
+                    count[ii] += 1
+
+        return t, y
+
+    def _due(self, count, t, t_stop):
+        """Observation events before t_stop and up to t, in time order"""
+        due = []
+        pending = list(count)
+        while True:
+            times = [(self.t0 + pending[ii] * period, ii)
+                     for ii, (period, _, restart) in enumerate(self.events) if not restart]
+            times = [(time, ii) for time, ii in times if time <= t and time < t_stop]
+            if not times:
+                return due
+            _, ii = min(times)
+            due.append(ii)
+            pending[ii] += 1
@@ -0,0 +1,662 @@
+"""Chunked, append only storage of simulation trajectories in HDF5
+
+Rather than one small dataset per time step, every quantity is stored in a
+single resizable dataset indexed by the step, e.g. state[N, 18] and
+Ra[N, 3, 3]. Rows are buffered in memory and written in blocks.
+
+The reconstructed mesh is stored as periodic keyframes of all the vertices
+and weights, with sparse deltas (changed vertex indices, new radius and
+weight) for the steps in between. Any step is rebuilt from its keyframe on
+demand. The faces are only stored again when the topology of the mesh
+changes.
+
+A checkpoint group holds whatever is needed to restart the simulation along
+with the number of steps written when it was saved. TrajectoryWriter.resume
+truncates the trajectory to that point and continues appending.
+
+TrajectoryReader also reads the original layout, with a group holding one
+dataset per step for each quantity, so older simulation files still work.
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import multiprocessing
+import queue
+import signal
+from collections import defaultdict
+
+import h5py
+import numpy as np
+
+MESH_FIELDS = ('reconstructed_vertex', 'reconstructed_face', 'reconstructed_weight')
+
+# mesh datasets with a row per step
+STEP_MESH_FIELDS = ('topology', 'keyframe', 'delta_offset', 'delta_count')
+# datasets of concatenated variable length arrays
+CONCATENATED_FIELDS = MESH_FIELDS + ('delta_index', 'delta_radius', 'delta_weight')
+# mesh datasets with a row per keyframe or topology
+MESH_INDEX_FIELDS = ('keyframe_offset', 'keyframe_count', 'keyframe_row', 'face_offset', 'face_count')
+
+class TrajectoryWriter(object):
+    """Buffered writer of a trajectory into a HDF5 group
+
+    Parameters
+    ----------
+    group : h5py.Group
+        Group (or file) to hold the datasets
+    num_steps : int
+        Expected number of steps, used to preallocate the datasets. They are
+        resized if more steps are appended and trimmed on close
+    block_size : int
+        Number of steps buffered before writing. Also the chunk size of the
+        datasets along the step axis
+    keyframe_interval : int
+        Maximum number of steps between full copies of the mesh
+    tol : float
+        Relative tolerance for a vertex change to be stored as a radial delta
+    compression, compression_opts :
+        HDF5 filter for all of the datasets
+
+    Notes
+    -----
+    The mesh is saved as keyframes, with all of the vertices and weights, and
+    sparse deltas for the other steps. A delta holds the index, new radius and
+    new weight of the vertices that changed since the previous step, which is
+    all that ReconstructMesh changes. A keyframe is written every
+    keyframe_interval steps, when the topology changes or if a vertex moves
+    other than radially.
+
+    Examples
+    --------
+    with h5py.File(filename, 'a') as hf:
+        writer = TrajectoryWriter(hf, num_steps=15000)
+        for ii in range(num_steps):
+            writer.append(ii, mesh=(v, f, w), state=state, Ra=Ra)
+        writer.close()
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, group, num_steps=None, block_size=128, keyframe_interval=500,
+                 tol=1e-12, compression='gzip', compression_opts=4):
+        self.group = group
+        self.block_size = block_size
+        self.num_steps = max(num_steps or block_size, 1)
+        self.keyframe_interval = keyframe_interval
+        self.tol = tol
+        self.compression = compression
+        self.compression_opts = compression_opts
+
+        self.length = 0
+        self.fields = None
+
+        # rows of each dataset that are written or buffered
+        self.rows = defaultdict(int)
+        self.written = defaultdict(int)
+
+        # mesh as the reader will reconstruct it and the last one appended
+        self.faces = None
+        self.vertices = None
+        self.weights = None
+        self.previous = None
+        self.num_topologies = 0
+        self.num_keyframes = 0
+        self.keyframe_age = 0
+
+        self.steps = []
+        self.buffer = defaultdict(list)
+
+        self.group.attrs['layout'] = 'chunked'
+        self.group.attrs['length'] = 0
+
+    @classmethod
+    def resume(cls, group, length, **kwargs):
+        """Continue a trajectory after its first length steps
+
+        Anything written after those steps is discarded, e.g. the steps since
+        the last checkpoint of a simulation that was killed.
+
+        Parameters
+        ----------
+        group : h5py.Group
+            Group holding a trajectory written by TrajectoryWriter
+        length : int
+            Number of steps to keep
+        kwargs :
+            Passed to TrajectoryWriter
+
+        Returns
+        -------
+        writer : TrajectoryWriter
+            Writer that appends after step length
+        """
+        reader = TrajectoryReader(group)
+        if not reader.chunked or length > len(reader):
+            raise ValueError("Can not resume after step {} of a trajectory with {} steps".format(
+                length, len(reader)))
+        fields = tuple(group.attrs.get('fields', ()))
+        mesh = length > 0 and 'topology' in group
+
+        writer = cls(group, **kwargs)
+        writer.length = length
+        writer.group.attrs['length'] = length
+        for name in fields:
+            writer.rows[name] = length
+
+        if mesh:
+            mesh_index = reader._mesh_index()
+            row = length - 1
+            topology, keyframe = mesh_index['topology'][row], mesh_index['keyframe'][row]
+            writer.num_topologies = topology + 1
+            writer.num_keyframes = keyframe + 1
+            writer.keyframe_age = row - mesh_index['keyframe_row'][keyframe]
+            writer.rows.update({name: length for name in STEP_MESH_FIELDS})
+            writer.rows.update({name: writer.num_keyframes for name in MESH_INDEX_FIELDS[:3]})
+            writer.rows.update({name: writer.num_topologies for name in MESH_INDEX_FIELDS[3:]})
+            writer.rows['reconstructed_face'] = (mesh_index['face_offset'][topology]
+                                                 + mesh_index['face_count'][topology])
+            for name in ('reconstructed_vertex', 'reconstructed_weight'):
+                writer.rows[name] = (mesh_index['keyframe_offset'][keyframe]
+                                     + mesh_index['keyframe_count'][keyframe])
+            for name in ('delta_index', 'delta_radius', 'delta_weight'):
+                writer.rows[name] = mesh_index['delta_offset'][row] + mesh_index['delta_count'][row]
+
+            writer.vertices, writer.faces, writer.weights = reader.mesh(row)
+            writer.previous = (writer.vertices.copy(), writer.weights.copy())
+
+        if length > 0:
+            writer.fields = fields + ((MESH_FIELDS,) if mesh else ())
+        # anything past the kept rows is overwritten or trimmed on close
+        for name in fields + STEP_MESH_FIELDS + CONCATENATED_FIELDS + MESH_INDEX_FIELDS:
+            if name in group:
+                writer.rows.setdefault(name, 0)
+        writer.written = defaultdict(int, writer.rows)
+        return writer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.length + len(self.steps)
+
+    def append(self, step, mesh=None, **fields):
+        """Add a step to the trajectory
+
+        Parameters
+        ----------
+        step : float
+            Label of this step (step number or time)
+        mesh : tuple (vertices, faces, weights)
+            Reconstructed mesh at this step, or None
+        fields : arrays
+            Fixed size arrays to save at this step, e.g. state=state. Every
+            step must have the same fields with the same shapes
+        """
+        names = tuple(sorted(fields.keys())) + ((MESH_FIELDS,) if mesh is not None else ())
+        if self.fields is None:
+            self.fields = names
+        elif names != self.fields:
+            raise ValueError("Step {} has fields {} but expected {}".format(step, names, self.fields))
+
+        self.steps.append(step)
+        for name, value in fields.items():
+            self._buffer(name, np.array(value))
+
+        if mesh is not None:
+            self._append_mesh(*mesh)
+
+        if len(self.steps) >= self.block_size:
+            self.flush()
+
+    def _buffer(self, name, value):
+        self.buffer[name].append(value)
+        self.rows[name] += value.shape[0] if name in CONCATENATED_FIELDS else 1
+
+    def _append_mesh(self, vertices, faces, weights):
+        vertices = np.array(vertices, dtype=np.float64)
+        weights = np.array(weights, dtype=np.float64).reshape(-1)
+        faces = np.asarray(faces)
+
+        if vertices.shape[0] != weights.shape[0]:
+            raise ValueError("Need a weight for each vertex")
+
+        # only store the faces again if the topology changed
+        keyframe = self.faces is None or not np.array_equal(faces, self.faces)
+        if keyframe:
+            self.faces = faces.copy()
+            self._buffer('face_offset', np.array(self.rows['reconstructed_face']))
+            self._buffer('face_count', np.array(faces.shape[0]))
+            self._buffer('reconstructed_face', self.faces)
+            self.num_topologies += 1
+
+        keyframe = (keyframe or self.keyframe_age >= self.keyframe_interval
+                    or vertices.shape != self.vertices.shape)
+        if not keyframe:
+            index = np.nonzero(np.any(vertices != self.previous[0], axis=1)
+                               | (weights != self.previous[1]))[0]
+            radius = np.linalg.norm(vertices[index], axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                radial = radial_update(self.vertices[index], radius)
+            # fall back to a keyframe if a vertex did not move radially
+            keyframe = not np.all(np.absolute(radial - vertices[index])
+                                  <= self.tol * radius[:, np.newaxis])
+        self.previous = (vertices, weights)
+
+        self._buffer('topology', np.array(self.num_topologies - 1))
+        if keyframe:
+            self.vertices, self.weights = vertices.copy(), weights.copy()
+            self._buffer('keyframe_offset', np.array(self.rows['reconstructed_vertex']))
+            self._buffer('keyframe_count', np.array(vertices.shape[0]))
+            self._buffer('keyframe_row', np.array(len(self) - 1))
+            self._buffer('reconstructed_vertex', vertices)
+            self._buffer('reconstructed_weight', weights)
+            self.num_keyframes += 1
+            self.keyframe_age = 0
+            index, radius = np.zeros(0, dtype=np.int64), np.zeros(0)
+        else:
+            self.vertices[index] = radial
+            self.weights[index] = weights[index]
+            self.keyframe_age += 1
+        
+        self._buffer('keyframe', np.array(self.num_keyframes - 1))
+        self._buffer('delta_offset', np.array(self.rows['delta_index']))
+        self._buffer('delta_count', np.array(index.shape[0]))
+        self._buffer('delta_index', index.astype(np.int64))
+        self._buffer('delta_radius', radius)
+        self._buffer('delta_weight', self.weights[index])
+
+    def flush(self):
+        """Write all of the buffered steps to the file"""
+        if not self.steps:
+            return
+
+        self._write('step', np.array(self.steps, dtype=np.float64), self.length,
+                    preallocate=True)
+        for name, values in self.buffer.items():
+            if name in CONCATENATED_FIELDS:
+                # chunked independent of the step axis
+                self._write(name, np.concatenate(values), self.written[name], chunk_rows=16384)
+            else:
+                self._write(name, np.stack(values), self.written[name],
+                            preallocate=name in self.fields or name in STEP_MESH_FIELDS)
+            self.written[name] = self.rows[name]
+
+        self.length += len(self.steps)
+        self.group.attrs['length'] = self.length
+        self.group.attrs['keyframe_interval'] = self.keyframe_interval
+        self.group.attrs['fields'] = [name for name in self.fields if name != MESH_FIELDS]
+
+        self.steps = []
+        self.buffer = defaultdict(list)
+
+    def checkpoint(self, **values):
+        """Flush and save the values needed to restart from this step
+
+        The previous checkpoint is only removed once the new one is complete,
+        so there is always one to resume from. See read_checkpoint.
+
+        Parameters
+        ----------
+        values : arrays
+            Saved as datasets of the checkpoint group, e.g. state=state
+        """
+        self.flush()
+        if 'checkpoint_new' in self.group:
+            del self.group['checkpoint_new']
+        checkpoint = self.group.create_group('checkpoint_new')
+        for name, value in values.items():
+            checkpoint.create_dataset(name, data=value)
+        checkpoint.attrs['length'] = self.length
+        self.group.file.flush()
+
+        if 'checkpoint' in self.group:
+            del self.group['checkpoint']
+        self.group.move('checkpoint_new', 'checkpoint')
+        self.group.file.flush()
+
+    def close(self):
+        """Flush the buffer and trim the datasets to the written length"""
+        self.flush()
+        # nothing to trim if the run stopped before the first step
+        if 'step' not in self.group:
+            return
+        self.group['step'].resize(self.length, axis=0)
+        for name, rows in self.written.items():
+            if name in self.group:
+                self.group[name].resize(rows, axis=0)
+
+    def _write(self, name, data, start, chunk_rows=None, preallocate=False):
+        """Write data into the dataset starting at row start and grow if needed
+
+        Datasets indexed by the step are preallocated to num_steps. The
+        chunks are block_size rows unless chunk_rows is given.
+        """
+        stop = start + data.shape[0]
+        if name not in self.group:
+            rows = max(self.num_steps, stop) if preallocate else stop
+            self.group.create_dataset(name, shape=(rows,) + data.shape[1:],
+                                      maxshape=(None,) + data.shape[1:],
+                                      chunks=(chunk_rows or self.block_size,) + data.shape[1:],
+                                      dtype=data.dtype, compression=self.compression,
+                                      compression_opts=self.compression_opts)
+        dataset = self.group[name]
+        if dataset.shape[1:] != data.shape[1:]:
+            raise ValueError("{} has shape {} but the dataset holds {}".format(
+                name, data.shape[1:], dataset.shape[1:]))
+
+        if dataset.shape[0] < stop:
+            dataset.resize(max(stop, 2 * dataset.shape[0]), axis=0)
+        dataset[start:stop] = data
+
+class AsyncTrajectoryWriter(object):
+    """TrajectoryWriter running in a separate process
+
+    The simulation loop puts each step on a bounded queue and a writer
+    process does the delta encoding, compression and HDF5 writes. append
+    blocks while the queue is full, so a slow disk slows down the simulation
+    rather than using unbounded memory. The file is identical to one written
+    by TrajectoryWriter with the same arguments.
+
+    The file must not be open in this process while the writer is running.
+
+    Parameters
+    ----------
+    filename : str
+        HDF5 file to append to
+    group_name : str
+        Group to hold the trajectory, created if needed. '/' for the file
+    maxsize : int
+        Number of steps that can wait in the queue
+    resume : int
+        Continue after this many steps, see TrajectoryWriter.resume
+    writer_kwargs :
+        Passed to TrajectoryWriter, e.g. num_steps or compression
+
+    Examples
+    --------
+    with AsyncTrajectoryWriter(filename, '/', num_steps=15000) as writer:
+        for ii in range(num_steps):
+            writer.append(ii, mesh=(v, f, w), state=state, Ra=Ra)
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, filename, group_name='/', maxsize=64, resume=None, **writer_kwargs):
+        # spawn so the writer does not inherit open HDF5 or OpenMP state
+        context = multiprocessing.get_context('spawn')
+        self.queue = context.Queue(maxsize=maxsize)
+        self.process = context.Process(target=_write_trajectory,
+                                       args=(filename, group_name, self.queue, resume,
+                                             writer_kwargs))
+        self.process.start()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # always flush what was already simulated, even on an exception or Ctrl-C
+        self.close()
+
+    def append(self, step, mesh=None, **fields):
+        """Queue a step, see TrajectoryWriter.append
+
+        The arrays are copied since the queue pickles them in the background
+        """
+        if mesh is not None:
+            mesh = tuple(np.array(value) for value in mesh)
+        fields = {name: np.array(value) for name, value in fields.items()}
+        self._put(('append', (step,), dict(fields, mesh=mesh)))
+
+    def checkpoint(self, **values):
+        """Queue a checkpoint, see TrajectoryWriter.checkpoint
+
+        It is saved after all of the steps appended before it
+        """
+        values = {name: np.array(value) for name, value in values.items()}
+        self._put(('checkpoint', (), values))
+
+    def close(self):
+        """Wait for the writer to write all of the queued steps"""
+        if self.closed:
+            return
+        self.closed = True
+        self._put(None)
+        self.process.join()
+        if self.process.exitcode != 0:
+            raise RuntimeError("Trajectory writer exited with code {}".format(self.process.exitcode))
+
+    def _put(self, item):
+        while True:
+            try:
+                self.queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not self.process.is_alive():
+                    self.closed = True
+                    raise RuntimeError("Trajectory writer exited with code {}".format(
+                        self.process.exitcode))
+
+def _write_trajectory(filename, group_name, step_queue, resume, writer_kwargs):
+    """Writer process for AsyncTrajectoryWriter"""
+    # the simulation process handles Ctrl-C or a batch scheduler's SIGTERM
+    # and then closes the queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    with h5py.File(filename, 'a') as hf:
+        group = hf.require_group(group_name)
+        if resume is None:
+            writer = TrajectoryWriter(group, **writer_kwargs)
+        else:
+            writer = TrajectoryWriter.resume(group, resume, **writer_kwargs)
+        try:
+            for method, args, kwargs in iter(step_queue.get, None):
+                getattr(writer, method)(*args, **kwargs)
+        finally:
+            writer.close()
+
+def radial_update(vertices, radius):
+    """Move vertices along their direction from the origin to a new radius
+
+    Used by both the writer and reader so a delta is reconstructed exactly
+    """
+    return radius[:, np.newaxis] * vertices / np.linalg.norm(vertices, axis=1)[:, np.newaxis]
+
+class TrajectoryReader(object):
+    """Read a trajectory saved by TrajectoryWriter or the per step layout
+
+    Parameters
+    ----------
+    group : h5py.Group
+        Group (or file) holding the trajectory
+
+    Examples
+    --------
+    with h5py.File(filename, 'r') as hf:
+        reader = TrajectoryReader(hf['refinement'])
+        state = reader.read('state', reader.rows(100, 200))
+        v, f, w = reader.mesh(-1)
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.chunked = group.attrs.get('layout', '') == 'chunked'
+
+        if self.chunked:
+            self.length = int(group.attrs['length'])
+            self.steps = group['step'][:self.length]
+        else:
+            self.keys = sorted(group['state'].keys(), key=float)
+            self.length = len(self.keys)
+            self.steps = np.array([float(key) for key in self.keys])
+
+        self._index = None
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, name):
+        return name in self.group
+
+    def rows(self, start_step=None, stop_step=None):
+        """Slice of rows with start_step <= step < stop_step"""
+        start = 0 if start_step is None else np.searchsorted(self.steps, start_step, side='left')
+        stop = self.length if stop_step is None else np.searchsorted(self.steps, stop_step, side='left')
+        return slice(int(start), int(stop))
+
+    def index(self, step):
+        """Row of a step label"""
+        row = np.searchsorted(self.steps, step)
+        if row >= self.length or self.steps[row] != step:
+            raise KeyError("Step {} is not in the trajectory".format(step))
+        return int(row)
+
+    def read(self, name, index=slice(None)):
+        """Read a quantity for a row or slice of rows
+
+        Parameters
+        ----------
+        name : str
+            Name of the quantity, e.g. 'state' or 'Ra'
+        index : int or slice
+            Row (negative counts from the end) or slice of rows
+
+        Returns
+        -------
+        values : array
+            Single value for an int index, else stacked along the first axis
+        """
+        if isinstance(index, slice):
+            rows = range(self.length)[index]
+            if self.chunked:
+                if rows.step == 1:
+                    return self.group[name][rows.start:rows.stop]
+                return self.group[name][rows.start:rows.stop][::rows.step]
+            return np.array([self.group[name][self.keys[row]][()] for row in rows])
+
+        row = range(self.length)[index]
+        if self.chunked:
+            return self.group[name][row]
+        return self.group[name][self.keys[row]][()]
+
+    def mesh(self, index):
+        """Reconstructed (vertices, faces, weights) at a row
+
+        The closest keyframe before the row is read and the deltas of the
+        following steps are applied in order.
+        """
+        row = range(self.length)[index]
+        if not self.chunked:
+            key = self.keys[row]
+            return (self.group['reconstructed_vertex'][key][()],
+                    self.group['reconstructed_face'][key][()],
+                    np.squeeze(self.group['reconstructed_weight'][key][()]))
+
+        mesh_index = self._mesh_index()
+        keyframe = mesh_index['keyframe'][row]
+        v_start = mesh_index['keyframe_offset'][keyframe]
+        v_stop = v_start + mesh_index['keyframe_count'][keyframe]
+        vertices = self.group['reconstructed_vertex'][v_start:v_stop]
+        weights = self.group['reconstructed_weight'][v_start:v_stop]
+
+        first = mesh_index['keyframe_row'][keyframe] + 1
+        if row >= first:
+            d_start = mesh_index['delta_offset'][first]
+            d_stop = mesh_index['delta_offset'][row] + mesh_index['delta_count'][row]
+            delta_index = self.group['delta_index'][d_start:d_stop]
+            delta_radius = self.group['delta_radius'][d_start:d_stop]
+            delta_weight = self.group['delta_weight'][d_start:d_stop]
+            for step_row in range(first, row + 1):
+                start = mesh_index['delta_offset'][step_row] - d_start
+                stop = start + mesh_index['delta_count'][step_row]
+                apply_delta(vertices, weights, delta_index[start:stop],
+                            delta_radius[start:stop], delta_weight[start:stop])
+
+        return vertices, self._faces(mesh_index['topology'][row]), weights
+
+    def meshes(self, index=slice(None)):
+        """Generator of (vertices, faces, weights) over a slice of rows
+
+        Consecutive rows only apply the delta of each step
+        """
+        rows = range(self.length)[index]
+        if not self.chunked or rows.step != 1:
+            for row in rows:
+                yield self.mesh(row)
+            return
+
+        mesh_index = self._mesh_index()
+        vertices = weights = None
+        for block_start in range(rows.start, rows.stop, 4096):
+            block_stop = min(block_start + 4096, rows.stop)
+            d_start = mesh_index['delta_offset'][block_start]
+            d_stop = mesh_index['delta_offset'][block_stop - 1] + mesh_index['delta_count'][block_stop - 1]
+            delta_index = self.group['delta_index'][d_start:d_stop]
+            delta_radius = self.group['delta_radius'][d_start:d_stop]
+            delta_weight = self.group['delta_weight'][d_start:d_stop]
+
+            for row in range(block_start, block_stop):
+                keyframe = mesh_index['keyframe'][row]
+                if vertices is None or mesh_index['keyframe_row'][keyframe] == row:
+                    vertices, faces, weights = self.mesh(row)
+                else:
+                    start = mesh_index['delta_offset'][row] - d_start
+                    stop = start + mesh_index['delta_count'][row]
+                    vertices, weights = vertices.copy(), weights.copy()
+                    apply_delta(vertices, weights, delta_index[start:stop],
+                                delta_radius[start:stop], delta_weight[start:stop])
+                yield vertices, faces, weights
+
+    def _mesh_index(self):
+        """Per step and per keyframe index arrays, read once"""
+        if self._index is None:
+            self._index = {name: self.group[name][()] for name in
+                           STEP_MESH_FIELDS + MESH_INDEX_FIELDS}
+        return self._index
+
+    def _faces(self, topology):
+        f_start = self._index['face_offset'][topology]
+        f_stop = f_start + self._index['face_count'][topology]
+        return self.group['reconstructed_face'][f_start:f_stop]
+
+def read_checkpoint(group):
+    """Last complete checkpoint saved by TrajectoryWriter.checkpoint
+
+    Parameters
+    ----------
+    group : h5py.Group
+        Group holding the trajectory
+
+    Returns
+    -------
+    length : int
+        Number of steps written when the checkpoint was saved
+    values : dict
+        Saved arrays by name
+    """
+    # a complete checkpoint_new is newer if it was not moved yet
+    for name in ('checkpoint_new', 'checkpoint'):
+        if name in group and 'length' in group[name].attrs:
+            checkpoint = group[name]
+            return (int(checkpoint.attrs['length']),
+                    {key: checkpoint[key][()] for key in checkpoint})
+    raise KeyError("No checkpoint in {}".format(group.name))
+
+def apply_delta(vertices, weights, index, radius, weight):
+    """Apply the delta of a step to the vertices and weights in place"""
+    vertices[index] = radial_update(vertices[index], radius)
+    weights[index] = weight
@@ -0,0 +1,219 @@
+"""Lie group variational integrator for the dumbbell about an asteroid
+
+The odeint drivers integrate the nine entries of R directly, so R only
+stays on SO(3) with tight tolerances. The integrator here is derived from a
+discrete version of Hamilton's principle on SE(3) [1]_. The attitude is
+updated by multiplying with a rotation matrix, so R stays orthogonal to
+machine precision. As a symplectic method the energy error stays bounded
+for large fixed steps instead of drifting.
+
+Each step costs a single batched potential evaluation at both masses of
+every state, since the gravity at the end of a step is reused at the start
+of the next one.
+
+The update is done in the inertial frame, where the potential of the
+uniformly rotating asteroid is evaluated at the rotated positions. States
+of the relative and Hamiltonian relative equations of motion are converted
+to the inertial frame and back with eom_comparison.transform.
+
+References
+----------
+.. [1] LEE, Taeyoung, LEOK, Melvin y MCCLAMROCH, N Harris. "Lie Group
+Variational Integrators for the Full Body Problem". Computer Methods in
+Applied Mechanics and Engineering. 2007, vol 196, no. 29, p. 2907--2924.
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+
+import numpy as np
+
+from eom_comparison import transform
+
+logger = logging.getLogger(__name__)
+
+def cayley(f):
+    """Rotation matrices (I + hat(f)) (I - hat(f))^-1 of (n, 3) vectors"""
+    f_hat = transform.hat_map(f)
+
+    # closed form of the product, which commutes
+    f_hat_sq = f_hat @ f_hat
+    return (np.eye(3) + (2 * f_hat + 2 * f_hat_sq) / (1 + np.sum(f * f, axis=1))[:, np.newaxis, np.newaxis])
+
+def solve_rotation(g, J, tol=1e-15, max_iter=20):
+    r"""Relative attitude of one step of the integrator
+
+    Solves the implicit equation of the attitude update
+
+    .. math:: \hat{g} = F J_d - J_d F^T
+
+    for F in SO(3), where J = tr(J_d) I - J_d. With the Cayley
+    parameterization F = cayley(f) it is equivalent to
+
+    .. math:: g + g \times f + (g \cdot f) f - 2 J f = 0
+
+    which is solved by Newton's method for all of the rows at once.
+
+    Parameters
+    ----------
+    g : (n, 3) array
+        Angular momentum of each state over the step, h Pi + h^2 / 2 M
+    J : (3, 3) array
+        Moment of inertia of the dumbbell
+    tol : float
+        Convergence tolerance on the change of f relative to g
+    max_iter : int
+        Largest number of Newton iterations
+
+    Returns
+    -------
+    F : (n, 3, 3) array
+        Relative attitude of each state over the step. nan for the states
+        where it did not converge, since there is no solution once the
+        rotation over a step is too large
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+    num = g.shape[0]
+    f = np.linalg.solve(2 * J, g.T).T
+    scale = np.maximum(np.linalg.norm(f, axis=1), np.finfo(float).tiny)
+
+    g_hat = transform.hat_map(g)
+
+    active = np.ones(num, dtype=bool)
+    for _ in range(max_iter):
+        ga, fa = g[active], f[active]
+        gf = np.sum(ga * fa, axis=1)
+        phi = ga + np.cross(ga, fa) + gf[:, np.newaxis] * fa - fa.dot(2 * J.T)
+        grad = (g_hat[active] + gf[:, np.newaxis, np.newaxis] * np.eye(3)
+                + np.einsum('ni,nj->nij', fa, ga) - 2 * J)
+        delta = np.linalg.solve(grad, phi[:, :, np.newaxis])[:, :, 0]
+        f[active] = fa - delta
+
+        rows = np.flatnonzero(active)
+        active[rows[np.linalg.norm(delta, axis=1) <= tol * scale[active]]] = False
+        if not np.any(active):
+            break
+
+    F = cayley(f)
+    F[active] = np.nan
+    return F
+
+def _to_inertial(time, states, ast, dum, eoms):
+    """States of eoms as the states of eoms_inertial"""
+    if eoms == 'hamilton':
+        states = transform.inverse_legendre(states, dum)
+    if eoms in ('relative', 'hamilton'):
+        states, _, _ = transform.ast2inertial(time, states, ast, dum)
+        R = states[:, 6:15].reshape((-1, 3, 3))
+        states[:, 15:18] = np.einsum('nji,nj->ni', R, states[:, 15:18])
+    return states
+
+def _from_inertial(time, states, ast, dum, eoms):
+    """States of eoms_inertial as the states of eoms"""
+    if eoms in ('relative', 'hamilton'):
+        states = transform.eoms_inertial_to_asteroid(time, states, ast, dum)
+    if eoms == 'hamilton':
+        R = states[:, 6:15].reshape((-1, 3, 3))
+        states[:, 3:6] = (dum.m1 + dum.m2) * states[:, 3:6]
+        states[:, 15:18] = np.einsum('nij,nj->ni', R,
+                                     np.einsum('nji,nj->ni', R, states[:, 15:18]).dot(dum.J.T))
+    return states
+
+def lgvi(dum, ast, initial_state, time, step=None, eoms='inertial', tol=1e-15, max_iter=20):
+    """Integrate the dumbbell with fixed steps of the Lie group variational integrator
+
+    Every output interval is divided into the fewest equal steps that are
+    no longer than step. Many initial states are integrated together and
+    share the potential evaluation of each step.
+
+    Parameters
+    ----------
+    dum : Dumbbell
+        Dumbbell model
+    ast : asteroid object (Python or C++)
+        Gravity of the asteroid, see Dumbbell.gravity_batch
+    initial_state : (18,) or (n, 18) array
+        State at time[0], same layout as the equations of motion
+    time : (m,) array
+        Increasing output times
+    step : float
+        Largest step size in seconds, the spacing of time by default
+    eoms : str
+        Layout of the states, 'inertial' for eoms_inertial, 'relative' for
+        eoms_relative or 'hamilton' for eoms_hamilton_relative
+    tol, max_iter :
+        Convergence of the implicit attitude update, see solve_rotation
+
+    Returns
+    -------
+    state : (m, 18) or (n, m, 18) array
+        State at each output time, like odeint. nan after a step where the
+        attitude update of the state failed, see solve_rotation
+
+    Author
+    ------
+    Shankar Kulumani		GWU		skulumani@gwu.edu
+    """
+    if eoms not in ('inertial', 'relative', 'hamilton'):
+        raise ValueError("eoms must be 'inertial', 'relative' or 'hamilton' not {}".format(eoms))
+
+    time = np.asarray(time, dtype=np.float64)
+    single = np.ndim(initial_state) == 1
+    initial_state = np.atleast_2d(np.array(initial_state, dtype=np.float64))
+    num = initial_state.shape[0]
+
+    states = np.full((num, time.shape[0], 18), np.nan)
+    states[:, 0, :] = initial_state
+
+    # momentum form of the inertial states
+    inertial = _to_inertial(np.full(num, time[0]), initial_state, ast, dum, eoms)
+    m = dum.m1 + dum.m2
+    pos = inertial[:, 0:3]
+    lin_mom = m * inertial[:, 3:6]
+    R = inertial[:, 6:15].reshape((num, 3, 3))
+    ang_mom = inertial[:, 15:18].dot(dum.J.T) # body frame
+    _, force, moment = dum.gravity_batch(time[0], pos, R, ast)
+
+    # members stop once their attitude update fails
+    active = np.ones(num, dtype=bool)
+    for ii in range(1, time.shape[0]):
+        interval = time[ii] - time[ii - 1]
+        substeps = max(int(np.ceil(interval / step - 1e-9)), 1) if step else 1
+        h = interval / substeps
+        for jj in range(1, substeps + 1):
+            idx = np.flatnonzero(active)
+            F = solve_rotation(h * ang_mom[idx] + h**2 / 2 * moment[idx], dum.J, tol, max_iter)
+            failed = ~np.all(np.isfinite(F), axis=(1, 2))
+            if np.any(failed):
+                logger.warning('Attitude update of members %s failed at t = %s, reduce the step',
+                               idx[failed], time[ii - 1] + h * (jj - 1))
+                active[idx[failed]] = False
+                idx, F = idx[~failed], F[~failed]
+            if idx.size == 0:
+                break
+
+            pos[idx] += h / m * lin_mom[idx] + h**2 / (2 * m) * force[idx]
+            R[idx] = R[idx] @ F
+            ang_mom_half = np.einsum('nji,nj->ni', F, ang_mom[idx] + h / 2 * moment[idx])
+            lin_mom_half = lin_mom[idx] + h / 2 * force[idx]
+
+            t = time[ii - 1] + h * jj if jj < substeps else time[ii]
+            _, force[idx], moment[idx] = dum.gravity_batch(t, pos[idx], R[idx], ast)
+            lin_mom[idx] = lin_mom_half + h / 2 * force[idx]
+            ang_mom[idx] = ang_mom_half + h / 2 * moment[idx]
+
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        inertial = np.hstack((pos[idx], lin_mom[idx] / m, R[idx].reshape((-1, 9)),
+                              np.linalg.solve(dum.J, ang_mom[idx].T).T))
+        states[idx, ii, :] = _from_inertial(np.full(idx.size, time[ii]), inertial, ast, dum, eoms)
+
+    return states[0] if single else states
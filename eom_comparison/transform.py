@@ -9,11 +9,15 @@ It will be able to convert between:
     Dumbbell frame - frame located at the center of mass of the dumbbell and aligned with the 
     principle moments of inertia
 
+All of the rotation matrices are built at once and applied to the (n, 18)
+states with einsum. transform_chunks and transform_dataset convert long
+trajectories stored in HDF5 a chunk at a time so the memory stays bounded.
+
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 import numpy as np
 
-import kinematics.attitude as attitude
+from dynamics import gravity
 
 def inertial2ast(time, state, ast, dum):
     """Convert inertial state to the asteroid fixed frame
@@ -47,32 +51,14 @@ def inertial2ast(time, state, ast, dum):
                 frame and defined in the asteroid rotating frame
 
     """
+    Rast2int = rot_ast2int(time, gravity.rotation_rate(ast))
+    pos, vel, R_sc2int, inertial_w = _unpack(state)
 
-    # figure out transformation from inertial frame to relative frame
-    Rast2int = np.zeros((3,3,time.shape[0]))
-    Rint2ast = np.zeros((3,3,time.shape[0]))
-
-    ast_state = np.zeros(state.shape)
-
-    for ii,t in np.ndenumerate(time):
-        Rast2int[:,:,ii] = attitude.rot3(ast.omega*t, 'c')[:,:,np.newaxis] # asteroid body frame to inertial frame
-        Rint2ast[:,:,ii] = attitude.rot3(ast.omega*t, 'c').T[:,:,np.newaxis]
-
-        Ra = np.squeeze(Rast2int[:,:,ii])
-        # convert inertial states to relative states
-        inertial_pos = np.squeeze(state[ii,0:3])
-        inertial_vel = np.squeeze(state[ii,3:6])
-        R_sc2int = np.squeeze(state[ii,6:15].reshape(3,3))
-        inertial_w = np.squeeze(state[ii,15:18])
-
-        ast_pos = Ra.T.dot(inertial_pos)
-        ast_vel = Ra.T.dot(inertial_vel)
-        ast_R_sc2ast = Ra.T.dot(R_sc2int).reshape(9)
-        ast_w = ast_R_sc2ast.reshape((3,3)).dot(inertial_w)
-
-        ast_state[ii,:] = np.hstack((ast_pos, ast_vel, ast_R_sc2ast, ast_w))
+    ast_R_sc2ast = _transpose(Rast2int) @ R_sc2int
+    ast_state = _pack(_rotate(Rast2int, pos, transpose=True), _rotate(Rast2int, vel, transpose=True),
+                      ast_R_sc2ast, _rotate(ast_R_sc2ast, inertial_w))
 
-    return ast_state,Rast2int, Rint2ast
+    return ast_state, _stack(Rast2int), _stack(_transpose(Rast2int))
 
 def ast2inertial(time, state, ast, dum):
     """Convert from the asteroid frame to the inertial frame
@@ -107,33 +93,14 @@ def ast2inertial(time, state, ast, dum):
 
 
     """
-
     # transformation between asteroid fixed frame and inertial frame
-    # figure out transformation from inertial frame to relative frame
-    Rast2int = np.zeros((3, 3, time.shape[0]))
-    Rint2ast = np.zeros((3, 3, time.shape[0]))
-
-    inertial_state = np.zeros(state.shape)
-
-    for ii, t in np.ndenumerate(time):
-        Rast2int[:, :, ii] = attitude.rot3(ast.omega*t, 'c')[:, :, np.newaxis] # asteroid body frame to inertial frame
-        Rint2ast[:, :, ii] = attitude.rot3(ast.omega*t, 'c').T[:, :, np.newaxis]
-
-        Ra = np.squeeze(Rast2int[:, :, ii])
-        # convert the relative state to the inertial frame
-        ast_pos = np.squeeze(state[ii, 0:3])
-        ast_vel = np.squeeze(state[ii, 3:6])
-        R_sc2ast = np.squeeze(state[ii, 6:15].reshape(3, 3))
-        ast_w = np.squeeze(state[ii, 15:18])
-
-        inertial_pos = Ra.dot(ast_pos)
-        inertial_vel = Ra.dot(ast_vel)
-        inertial_R_sc2int = Ra.dot(R_sc2ast).reshape(9)
-        inertial_w = Ra.dot(ast_w)
+    Rast2int = rot_ast2int(time, gravity.rotation_rate(ast))
+    ast_pos, ast_vel, R_sc2ast, ast_w = _unpack(state)
 
-        inertial_state[ii, :] = np.hstack((inertial_pos, inertial_vel, inertial_R_sc2int, inertial_w))
+    inertial_state = _pack(_rotate(Rast2int, ast_pos), _rotate(Rast2int, ast_vel),
+                           Rast2int @ R_sc2ast, _rotate(Rast2int, ast_w))
 
-    return inertial_state, Rast2int, Rint2ast
+    return inertial_state, _stack(Rast2int), _stack(_transpose(Rast2int))
 
 def body2inertial(time, state, ast, dum):
     """Convert SC state to inertial state
@@ -168,21 +135,9 @@ def body2inertial(time, state, ast, dum):
 
 
     """
-    inertial_state = np.zeros(state.shape)
+    inertial_pos, inertial_vel, R_sc2int, body_w = _unpack(state)
 
-    for ii, t in np.ndenumerate(time):
-
-        # convert the relative state to the inertial frame
-        inertial_pos = np.squeeze(state[ii, 0:3])
-        inertial_vel = np.squeeze(state[ii, 3:6])
-        R_sc2int = np.squeeze(state[ii, 6:15])
-        body_w = np.squeeze(state[ii, 15:18])
-
-        inertial_w = R_sc2int.reshape((3, 3)).dot(body_w)
-
-        inertial_state[ii, :] = np.hstack((inertial_pos, inertial_vel,R_sc2int, inertial_w))
-
-    return inertial_state 
+    return _pack(inertial_pos, inertial_vel, R_sc2int, _rotate(R_sc2int, body_w))
 
 def body2ast(time, state, ast, dum):
     """Convert state from the body frame to the asteroid fixed frame
@@ -215,32 +170,8 @@ def body2ast(time, state, ast, dum):
             ast_w - ast_state[:, 15:18] is the angular velocity of the sc with respect to the inertial 
                 frame and defined in the asteroid frame
     """
-    # transformation between asteroid fixed frame and inertial frame
-    # figure out transformation from inertial frame to relative frame
-    Rast2int = np.zeros((3, 3, time.shape[0]))
-    Rint2ast = np.zeros((3, 3, time.shape[0]))
-
-    ast_state = np.zeros(state.shape)
-
-    for ii, t in np.ndenumerate(time):
-        Rast2int[:, :, ii] = attitude.rot3(ast.omega*t, 'c')[:, :, np.newaxis] # asteroid body frame to inertial frame
-        Rint2ast[:, :, ii] = attitude.rot3(ast.omega*t, 'c').T[:, :, np.newaxis]
-
-        Ra = np.squeeze(Rast2int[:, :, ii])
-        # convert the relative state to the inertial frame
-        body_pos = np.squeeze(state[ii, 0:3])
-        body_vel = np.squeeze(state[ii, 3:6])
-        R_sc2int = np.squeeze(state[ii, 6:15].reshape(3, 3))
-        body_w = np.squeeze(state[ii, 15:18])
-
-        ast_pos = Ra.T.dot(body_pos)
-        ast_vel = Ra.T.dot(body_vel)
-        ast_R_sc2ast = Ra.T.dot(R_sc2int).reshape(9)
-        ast_w = ast_R_sc2ast.reshape((3, 3)).dot(body_w)
-
-        ast_state[ii, :] = np.hstack((ast_pos, ast_vel, ast_R_sc2ast, ast_w))
-
-    return ast_states
+    ast_state, _, _ = inertial2ast(time, state, ast, dum)
+    return ast_state
 
 def eoms_inertial_to_inertial(time, state, ast, dum):
     """Transform the simulation result of the eoms_inertial into the inertial frame
@@ -273,36 +204,11 @@ def eoms_inertial_to_inertial(time, state, ast, dum):
             inertial_w - inertial_state[:, 15:18] is the angular velocity of the sc with respect to the inertial 
                 frame and defined in the inertial frame
     """
-    inertial_state = np.zeros(state.shape)
-
-    # logic to check if the input is only a single element array
-    if state.ndim == 1:
-        inertial_pos = state[0:3]
-        inertial_vel = state[3:6]
-        R_sc2int = state[6:15]
-        body_w = state[15:18]
-
-        inertial_w = R_sc2int.reshape((3, 3)).dot(body_w)
-
-        inertial_state = np.hstack((inertial_pos, inertial_vel,R_sc2int, inertial_w))
-    elif state.ndim == 2:
-
-        for ii, tup in enumerate(zip(time, state)):
-            t, state_ii = tup
-            # convert the relative state to the inertial frame
-            inertial_pos = np.squeeze(state_ii[0:3])
-            inertial_vel = np.squeeze(state_ii[3:6])
-            R_sc2int = np.squeeze(state_ii[6:15])
-            body_w = np.squeeze(state_ii[15:18])
-
-            inertial_w = R_sc2int.reshape((3, 3)).dot(body_w)
+    # a single state is converted as a batch of one
+    if np.ndim(state) == 1:
+        return body2inertial(time, state[np.newaxis, :], ast, dum)[0, :]
 
-            inertial_state[ii, :] = np.hstack((inertial_pos, inertial_vel,R_sc2int, inertial_w))
-    else:
-        print("Some kind of crazy error")
-        return 2
-
-    return inertial_state 
+    return body2inertial(time, state, ast, dum)
 
 def eoms_hamilton_relative_to_inertial(time, state, ast, dum):
     """Convert the relative eoms to the inertial frame
@@ -338,75 +244,10 @@ def eoms_hamilton_relative_to_inertial(time, state, ast, dum):
         inertial_w - inertial_state[:, 15:18] is the angular velocity of the sc with respect to the inertial 
             frame and defined in the inertial frame
     """
-    if state.ndim == 1:
-        # first do the inverse legendre transform
-        rel_lin_mom = state[3:6]
-        rel_ang_mom = state[15:18]
-
-        rh_vel = rel_lin_mom / (dum.m1 + dum.m2)
-        rh_ang_vel = np.zeros_like(rel_ang_mom)
-
-        Rast2int = attitude.rot3(ast.omega*time, 'c') # asteroid body frame to inertial frame
-        Ra = Rast2int 
-
-        R = state[6:15].reshape((3,3))    
-
-        Jr = R.dot(dum.J).dot(R.T)
-        rh_ang_vel = np.linalg.inv(Jr).dot(rel_ang_mom)
-
-        rh_state_conv = np.hstack((state[0:3], rh_vel, R.reshape(9), rh_ang_vel))
-        # convert the relative state to the inertial frame
-        ast_pos = np.squeeze(rh_state_conv[0:3])
-        ast_vel = np.squeeze(rh_state_conv[3:6])
-        R_sc2ast = np.squeeze(rh_state_conv[6:15].reshape(3, 3))
-        ast_w = np.squeeze(rh_state_conv[15:18])
-
-        inertial_pos = Ra.dot(ast_pos)
-        inertial_vel = Ra.dot(ast_vel)
-        inertial_R_sc2int = Ra.dot(R_sc2ast).reshape(9)
-        inertial_w = Ra.dot(ast_w)
-
-        inertial_state = np.hstack((inertial_pos, inertial_vel, inertial_R_sc2int, inertial_w))
-
-    elif state.ndim == 2:
-        # first do the inverse legendre transform
-        rel_lin_mom = state[:, 3:6]
-        rel_ang_mom = state[:, 15:18]
-
-        rh_vel = rel_lin_mom / (dum.m1 + dum.m2)
-        rh_ang_vel = np.zeros_like(rel_ang_mom)
-
-        # convert from the relative asteroid frame into the inertial frame
-        Rast2int = np.zeros((3, 3, time.shape[0]))
-        Rint2ast = np.zeros((3, 3, time.shape[0]))
-        
-        rh_state_conv = np.zeros(state.shape)
-        inertial_state = np.zeros(state.shape)
-
-        for ii, t in np.ndenumerate(time):
-            Rast2int[:, :, ii] = attitude.rot3(ast.omega*t, 'c')[:, :, np.newaxis] # asteroid body frame to inertial frame
-            Rint2ast[:, :, ii] = attitude.rot3(ast.omega*t, 'c').T[:, :, np.newaxis]
-            Ra = np.squeeze(Rast2int[:, :, ii])
-
-            R = state[ii, 6:15].reshape((3,3))    
-
-            Jr = R.dot(dum.J).dot(R.T)
-            rh_ang_vel[ii, :] = np.linalg.inv(Jr).dot(np.squeeze(rel_ang_mom[ii, :]))
-
-            rh_state_conv[ii, :] = np.hstack((state[ii, 0:3], rh_vel[ii, :], R.reshape((1,9)), rh_ang_vel[ii, :]))
-            # convert the relative state to the inertial frame
-            ast_pos = np.squeeze(rh_state_conv[ii, 0:3])
-            ast_vel = np.squeeze(rh_state_conv[ii, 3:6])
-            R_sc2ast = np.squeeze(rh_state_conv[ii, 6:15].reshape(3, 3))
-            ast_w = np.squeeze(rh_state_conv[ii, 15:18])
-
-            inertial_pos = Ra.dot(ast_pos)
-            inertial_vel = Ra.dot(ast_vel)
-            inertial_R_sc2int = Ra.dot(R_sc2ast).reshape(9)
-            inertial_w = Ra.dot(ast_w)
-
-            inertial_state[ii, :] = np.hstack((inertial_pos, inertial_vel, inertial_R_sc2int, inertial_w))
+    if np.ndim(state) == 1:
+        return eoms_hamilton_relative_to_inertial(time, state[np.newaxis, :], ast, dum)[0, :]
 
+    inertial_state, _, _ = ast2inertial(time, inverse_legendre(state, dum), ast, dum)
     return inertial_state
 
 def eoms_inertial_to_asteroid(time, state, ast, dum):
@@ -440,47 +281,10 @@ def eoms_inertial_to_asteroid(time, state, ast, dum):
         ast_w - ast_state[:, 15:18] is the angular velocity of the sc with respect to the inertial 
             frame and defined in the asteroid frame
     """
-    
-    ast_state = np.zeros(state.shape)
-
-    if state.ndim == 1:
-        inertial_pos = state[0:3]
-        inertial_vel = state[3:6]
-        R_sc2int = state[6:15]
-        body_w = state[15:18]
-
-        Rast2int = attitude.rot3(ast.omega*time, 'c') # asteroid body frame to inertial frame
-        Ra = Rast2int 
-
-        ast_pos = Ra.T.dot(inertial_pos)
-        ast_vel = Ra.T.dot(inertial_vel)
-        R_sc2ast = Ra.T.dot(R_sc2int.reshape((3,3))).reshape(9)
-        ast_w = R_sc2ast.reshape((3,3)).dot(body_w)
-
-        ast_state = np.hstack((ast_pos, ast_vel, R_sc2ast, ast_w))
-    elif state.ndim == 2:
-
-        # transformation between asteroid fixed frame and inertial frame
-        # figure out transformation from inertial frame to relative frame
-        Rast2int = np.zeros((3, 3, time.shape[0]))
-
-        for ii, t in np.ndenumerate(time):
-            Rast2int[:, :, ii] = attitude.rot3(ast.omega*t, 'c')[:, :, np.newaxis] # asteroid body frame to inertial frame
-
-            Ra = np.squeeze(Rast2int[:, :, ii])
-            # convert the relative state to the inertial frame
-            inertial_pos = np.squeeze(state[ii, 0:3])
-            inertial_vel = np.squeeze(state[ii, 3:6])
-            R_sc2int = np.squeeze(state[ii, 6:15].reshape(3, 3))
-            body_w = np.squeeze(state[ii, 15:18])
-
-            ast_pos = Ra.T.dot(inertial_pos)
-            ast_vel = Ra.T.dot(inertial_vel)
-            ast_R_sc2ast = Ra.T.dot(R_sc2int).reshape(9)
-            ast_w = ast_R_sc2ast.reshape((3, 3)).dot(body_w)
-
-            ast_state[ii, :] = np.hstack((ast_pos, ast_vel, ast_R_sc2ast, ast_w))
+    if np.ndim(state) == 1:
+        return eoms_inertial_to_asteroid(time, state[np.newaxis, :], ast, dum)[0, :]
 
+    ast_state, _, _ = inertial2ast(time, state, ast, dum)
     return ast_state
 
 def eoms_hamilton_relative_to_asteroid(time, state, ast, dum):
@@ -517,43 +321,161 @@ def eoms_hamilton_relative_to_asteroid(time, state, ast, dum):
         ast_w - ast_state[:, 15:18] is the angular velocity of the sc with respect to the inertial 
             frame and defined in the asteroid frame
     """
+    if np.ndim(state) == 1:
+        return inverse_legendre(state[np.newaxis, :], dum)[0, :]
 
-    if state.ndim == 1:
-        # first do the inverse legendre transform
-        rel_lin_mom = state[3:6]
-        rel_ang_mom = state[15:18]
-        R = state[6:15].reshape((3,3))
+    return inverse_legendre(state, dum)
 
-        rh_vel = rel_lin_mom / (dum.m1 + dum.m2)
+def rot_ast2int(time, omega):
+    """Asteroid to inertial frame rotation at every time
 
-        Rast2int = attitude.rot3(ast.omega * time, 'c')
-        Ra = Rast2int
-        Jr = R.dot(dum.J).dot(R.T)
+    Same as attitude.rot3(omega * t, 'c') for each time, built all at once
 
-        rh_ang_vel = np.linalg.inv(Jr).dot(rel_ang_mom)
+    Parameters
+    ----------
+    time : (n,) array or float
+        Time of each sample
+    omega : float
+        Rotation rate of the asteroid
 
-        ast_state = np.hstack((state[0:3], rh_vel, R.reshape(9), rh_ang_vel))
-    elif state.ndim == 2:
-        rel_lin_mom = state[:, 3:6]
-        rel_ang_mom = state[:, 15:18]
+    Returns
+    -------
+    Rast2int : (n, 3, 3) array
+        Rotation matrix of each time
+    """
+    theta = omega * np.reshape(time, -1)
+    Rast2int = np.zeros((theta.shape[0], 3, 3))
+    Rast2int[:, 0, 0] = np.cos(theta)
+    Rast2int[:, 0, 1] = -np.sin(theta)
+    Rast2int[:, 1, 0] = np.sin(theta)
+    Rast2int[:, 1, 1] = np.cos(theta)
+    Rast2int[:, 2, 2] = 1
+    return Rast2int
 
-        rh_vel = rel_lin_mom / (dum.m1 + dum.m2)
-        rh_ang_vel = np.zeros_like(rel_ang_mom)
+def hat_map(vec):
+    """Skew symmetric matrices of (n, 3) vectors, hat_map(a) b = a x b
 
-        Rast2int = np.zeros((3, 3, time.shape[0]))
+    Same as attitude.hat_map for each row, built all at once
 
-        ast_state = np.zeros(state.shape)
+    Parameters
+    ----------
+    vec : (n, 3) array
 
-        for ii, t in np.ndenumerate(time):
-            Rast2int[:, :, ii] = attitude.rot3(ast.omega * t, 'c')[:, :, np.newaxis]
-            Ra = np.squeeze(Rast2int[:, :, ii])
+    Returns
+    -------
+    vec_hat : (n, 3, 3) array
+    """
+    vec = np.atleast_2d(vec)
+    vec_hat = np.zeros((vec.shape[0], 3, 3))
+    vec_hat[:, 0, 1], vec_hat[:, 0, 2] = -vec[:, 2], vec[:, 1]
+    vec_hat[:, 1, 0], vec_hat[:, 1, 2] = vec[:, 2], -vec[:, 0]
+    vec_hat[:, 2, 0], vec_hat[:, 2, 1] = -vec[:, 1], vec[:, 0]
+    return vec_hat
 
-            R = state[ii, 6:15].reshape((3, 3))
+def inverse_legendre(state, dum):
+    """Velocities of the states of eoms_hamilton_relative
 
-            Jr = R.dot(dum.J).dot(R.T)
-            rh_ang_vel[ii, :] = np.linalg.inv(Jr).dot(np.squeeze(rel_ang_mom[ii, :]))
+    Parameters
+    ----------
+    state : (n, 18) array
+        pos, lin_mom, R (sc to asteroid frame) and ang_mom in the asteroid frame
+    dum : Instance of Dumbbell class
 
-            ast_state[ii, :] = np.hstack((state[ii, 0:3], rh_vel[ii, :], R.reshape((1,9)), rh_ang_vel[ii,:]))
+    Returns
+    -------
+    ast_state : (n, 18) array
+        pos, vel, R and ang_vel, all in the asteroid frame
+    """
+    pos, lin_mom, R, ang_mom = _unpack(state)
 
-    return ast_state
+    Jr = R @ dum.J @ _transpose(R)
+    ang_vel = np.linalg.solve(Jr, ang_mom[:, :, np.newaxis])[:, :, 0]
 
+    return _pack(pos, lin_mom / (dum.m1 + dum.m2), R, ang_vel)
+
+def transform_chunks(func, time, state, ast, dum, chunk_size=2**16):
+    """Convert a long trajectory in chunks of bounded size
+
+    Only chunk_size rows of time and state are read at once, so they can be
+    HDF5 datasets (e.g. the state of a dynamics.trajectory file) larger than
+    memory.
+
+    Parameters
+    ----------
+    func : callable
+        One of the conversions of this module, e.g. eoms_inertial_to_asteroid
+    time : (n,) array or h5py.Dataset
+    state : (n, 18) array or h5py.Dataset
+    ast : Instance of Asteroid class
+    dum : Instance of Dumbbell class
+    chunk_size : int
+        Number of rows converted at once
+
+    Yields
+    ------
+    index : slice
+        Rows of this chunk
+    converted : (chunk_size, 18) array
+        State of the rows in the new frame
+    """
+    for ii in range(0, state.shape[0], chunk_size):
+        index = slice(ii, min(ii + chunk_size, state.shape[0]))
+        converted = func(np.asarray(time[index]), np.asarray(state[index]), ast, dum)
+        # the conversions that also return the rotation matrices
+        if isinstance(converted, tuple):
+            converted = converted[0]
+        yield index, converted
+
+def transform_dataset(func, time, state, ast, dum, group, name, chunk_size=2**16,
+                      compression='gzip', compression_opts=4):
+    """Convert a trajectory into a new chunked HDF5 dataset
+
+    Examples
+    --------
+    with h5py.File(filename, 'a') as hf:
+        transform_dataset(transform.eoms_inertial_to_asteroid, hf['time'], hf['state'],
+                          ast, dum, hf, 'asteroid_state')
+
+    Parameters
+    ----------
+    func, time, state, ast, dum, chunk_size :
+        Same as transform_chunks
+    group : h5py.Group
+        Group of the new dataset
+    name : str
+        Name of the new dataset, which is replaced if it exists
+    compression, compression_opts :
+        HDF5 filter of the new dataset
+
+    Returns
+    -------
+    dataset : h5py.Dataset
+        Converted state
+    """
+    if name in group:
+        del group[name]
+    dataset = group.create_dataset(name, shape=(state.shape[0], 18), dtype=np.float64,
+                                   chunks=(min(max(state.shape[0], 1), chunk_size), 18),
+                                   compression=compression, compression_opts=compression_opts)
+    for index, converted in transform_chunks(func, time, state, ast, dum, chunk_size):
+        dataset[index, :] = converted
+    return dataset
+
+def _unpack(state):
+    state = np.atleast_2d(state)
+    return state[:, 0:3], state[:, 3:6], state[:, 6:15].reshape((-1, 3, 3)), state[:, 15:18]
+
+def _pack(pos, vel, R, ang_vel):
+    return np.hstack((pos, vel, R.reshape((-1, 9)), ang_vel))
+
+def _transpose(R):
+    return np.swapaxes(R, 1, 2)
+
+def _rotate(R, vec, transpose=False):
+    if transpose:
+        return np.einsum('nji,nj->ni', R, vec)
+    return np.einsum('nij,nj->ni', R, vec)
+
+def _stack(R):
+    """(n, 3, 3) rotations in the (3, 3, n) layout of the original functions"""
+    return np.moveaxis(R, 0, 2)
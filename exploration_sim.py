@@ -16,6 +16,8 @@ import logging
 import os
 import tempfile
 import argparse
+import signal
+import sys
 from collections import defaultdict
 import itertools
 import subprocess
@@ -32,20 +34,26 @@ from lib import controller as controller_cpp
 from lib import stats
 from lib import geodesic
 
-from dynamics import dumbbell, eoms, controller
+from dynamics import dumbbell, eoms, controller, trajectory, scheduler
 from point_cloud import wavefront
 from kinematics import attitude
-import utilities
 from visualization import graphics, animation, publication
 
 compression = 'gzip'
 compression_opts = 9
 max_steps = 15000
-
-def initialize_asteroid(output_filename, ast_name="castalia"):
+lidar_period = 1 # seconds between lidar scans and mesh updates
+output_period = 1 # seconds between saved states
+checkpoint_period = 100 # seconds between restart points
+replan_period = 1 # seconds a guidance decision is held, None to plan at every evaluation
+planning_horizon = None # views planned ahead during exploration, None for the greedy choice
+planning_candidates = 8 # candidate view sequences evaluated in parallel by the planner
+
+def initialize_asteroid(output_filename, ast_name="castalia", save_parameters=True):
     """Initialize all the things for the simulation
 
     Output_file : the actual HDF5 file to save the data/parameters to
+    save_parameters : False when resuming, since the file already has them
 
     """
     logger = logging.getLogger(__name__)
@@ -163,39 +171,40 @@ def initialize_asteroid(output_filename, ast_name="castalia"):
     caster = cgal.RayCaster(v, f)
     
     # save a bunch of parameters to the HDF5 file
-    with h5py.File(output_filename, 'w-') as hf:
-        sim_group = hf.create_group("simulation_parameters")
-        sim_group['AbsTol'] = AbsTol
-        sim_group['RelTol'] = RelTol
-        dumbbell_group = sim_group.create_group("dumbbell")
-        dumbbell_group["m1"] = 500
-        dumbbell_group["m2"] = 500
-        dumbbell_group['l'] = 0.003
+    if save_parameters:
+        with h5py.File(output_filename, 'w-') as hf:
+            sim_group = hf.create_group("simulation_parameters")
+            sim_group['AbsTol'] = AbsTol
+            sim_group['RelTol'] = RelTol
+            dumbbell_group = sim_group.create_group("dumbbell")
+            dumbbell_group["m1"] = 500
+            dumbbell_group["m2"] = 500
+            dumbbell_group['l'] = 0.003
         
-        true_ast_group = sim_group.create_group("true_asteroid")
-        true_ast_group.create_dataset("vertices", data=v, compression=compression,
-                                    compression_opts=compression_opts)
-        true_ast_group.create_dataset("faces", data=f, compression=compression,
-                                    compression_opts=compression_opts)
-        true_ast_group['name'] = file_name
+            true_ast_group = sim_group.create_group("true_asteroid")
+            true_ast_group.create_dataset("vertices", data=v, compression=compression,
+                                        compression_opts=compression_opts)
+            true_ast_group.create_dataset("faces", data=f, compression=compression,
+                                        compression_opts=compression_opts)
+            true_ast_group['name'] = file_name
         
-        est_ast_group = sim_group.create_group("estimate_asteroid")
-        est_ast_group['surf_area'] = surf_area
-        est_ast_group['max_angle'] = max_angle
-        est_ast_group['min_angle'] = min_angle
-        est_ast_group['max_distance'] = max_distance
-        est_ast_group['max_radius'] = max_radius
-        est_ast_group.create_dataset('initial_vertices', data=est_ast_rmesh.get_verts(), compression=compression,
-                                    compression_opts=compression_opts)
-        est_ast_group.create_dataset("initial_faces", data=est_ast_rmesh.get_faces(), compression=compression,
-                                    compression_opts=compression_opts)
-        est_ast_group.create_dataset("initial_weight", data=est_ast_rmesh.get_weights(), compression=compression,
-                                    compression_opts=compression_opts)
+            est_ast_group = sim_group.create_group("estimate_asteroid")
+            est_ast_group['surf_area'] = surf_area
+            est_ast_group['max_angle'] = max_angle
+            est_ast_group['min_angle'] = min_angle
+            est_ast_group['max_distance'] = max_distance
+            est_ast_group['max_radius'] = max_radius
+            est_ast_group.create_dataset('initial_vertices', data=est_ast_rmesh.get_verts(), compression=compression,
+                                        compression_opts=compression_opts)
+            est_ast_group.create_dataset("initial_faces", data=est_ast_rmesh.get_faces(), compression=compression,
+                                        compression_opts=compression_opts)
+            est_ast_group.create_dataset("initial_weight", data=est_ast_rmesh.get_weights(), compression=compression,
+                                        compression_opts=compression_opts)
 
-        lidar_group = sim_group.create_group("lidar")
-        lidar_group.create_dataset("view_axis", data=lidar.get_view_axis())
-        lidar_group.create_dataset("up_axis", data=lidar.get_up_axis())
-        lidar_group.create_dataset("fov", data=lidar.get_fov())
+            lidar_group = sim_group.create_group("lidar")
+            lidar_group.create_dataset("view_axis", data=lidar.get_view_axis())
+            lidar_group.create_dataset("up_axis", data=lidar.get_up_axis())
+            lidar_group.create_dataset("fov", data=lidar.get_fov())
     
     return (true_ast_meshdata, true_ast, complete_controller, est_ast_meshdata, 
             est_ast_rmesh, est_ast, lidar, caster, max_angle, 
@@ -218,14 +227,10 @@ def initialize_refinement(output_filename, ast_name="castalia"):
 
     # open the file and recreate the objects
     with h5py.File(output_filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        explore_tf = hf['time'][()][-1]
-        # explore_tf = int(state_keys[-1])
-        explore_state = hf['state/' + str(explore_tf)][()]
-        explore_Ra = hf['Ra/' + str(explore_tf)][()]
-        explore_v = hf['reconstructed_vertex/' + str(explore_tf)][()]
-        explore_f = hf['reconstructed_face/' + str(explore_tf)][()]
-        explore_w = hf['reconstructed_weight/' + str(explore_tf)][()]
+        explore = trajectory.TrajectoryReader(hf)
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
+        explore_v, explore_f, explore_w = explore.mesh(-1)
         
         explore_name = hf['simulation_parameters/true_asteroid/name'][()][:-4]
         explore_m1 = hf['simulation_parameters/dumbbell/m1'][()]
@@ -371,6 +376,100 @@ def initialize_castalia(output_filename):
             est_ast_rmesh, est_ast, lidar, caster, max_angle, 
             dum, AbsTol, RelTol)
 
+def lidar_scan(t, state, lidar, caster, true_ast):
+    """Cast the lidar rays at the true asteroid
+
+    Returns a dictionary of the targets, the asteroid rotation Ra and the
+    intersections in the inertial and asteroid frames, with NaN for a ray
+    that missed
+    """
+    logger = logging.getLogger(__name__)
+
+    targets = lidar.define_targets(state[0:3],
+                                   state[6:15].reshape((3, 3)),
+                                   np.linalg.norm(state[0:3]))
+
+    # rotate the rays into the asteroid frame inside the caster
+    Ra = true_ast.rot_ast2int(t)
+    caster.set_rotation(Ra)
+
+    # do the raycasting
+    intersections = caster.castarray(state[0:3], targets)
+
+    # convert the intersections to the asteroid frame
+    ast_ints = []
+    for pt in intersections:
+        if np.linalg.norm(pt) < 1e-9:
+            logger.info("No intersection for this point")
+            pt_ast = np.array([np.nan, np.nan, np.nan])
+        else:
+            pt_ast = Ra.T.dot(pt)
+
+        ast_ints.append(pt_ast)
+
+    return {'targets': targets, 'Ra': Ra, 'inertial_intersections': intersections,
+            'asteroid_intersections': np.array(ast_ints)}
+
+def empty_scan(t, state, lidar, true_ast):
+    """Scan with no intersections, saved until the first lidar scan"""
+    targets = lidar.define_targets(state[0:3],
+                                   state[6:15].reshape((3, 3)),
+                                   np.linalg.norm(state[0:3]))
+    return {'targets': targets, 'Ra': true_ast.rot_ast2int(t),
+            'inertial_intersections': np.zeros_like(targets),
+            'asteroid_intersections': np.full_like(targets, np.nan)}
+
+def save_checkpoint(writer, ii, t, state, est_ast_rmesh=None, complete_controller=None,
+                    **values):
+    """Save a restart point of the simulation
+
+    lsoda keeps its step size and history in Fortran common blocks that can
+    not be saved, so checkpoints are events that restart the integrator (see
+    dynamics.scheduler), and the estimated mesh is rebuilt from the saved
+    arrays, every time. Resuming from the last checkpoint is then the same as
+    never having stopped.
+
+    writer : TrajectoryWriter or AsyncTrajectoryWriter holding the trajectory
+    ii : step number of the next output
+    t, state : time and state of the checkpoint
+    est_ast_rmesh : ReconstructMesh to save, if it changes during the simulation
+    complete_controller : Controller to save the vertices in view for refinement
+    values : anything else to restore, e.g. the last lidar scan
+    """
+    rng = np.random.get_state()
+    values.update({'step': ii, 't': t, 'state': state,
+                   'rng_keys': rng[1], 'rng_state': np.array(rng[2:], dtype=np.float64)})
+    if est_ast_rmesh is not None:
+        values['vertices'] = est_ast_rmesh.get_verts()
+        values['faces'] = est_ast_rmesh.get_faces()
+        values['weights'] = est_ast_rmesh.get_weights()
+        est_ast_rmesh.set_mesh(values['vertices'], values['faces'], values['weights'])
+    if complete_controller is not None:
+        values['vertices_in_view'] = complete_controller.get_vertices_in_view()
+
+    writer.checkpoint(**values)
+
+def load_checkpoint(filename, group_name, est_ast_rmesh=None, complete_controller=None):
+    """Restore the simulation objects from the last checkpoint in a group
+
+    Returns the number of steps in the trajectory when the checkpoint was
+    saved and a dictionary of the saved values. See save_checkpoint
+    """
+    logger = logging.getLogger(__name__)
+
+    with h5py.File(filename, 'r') as hf:
+        length, values = trajectory.read_checkpoint(hf[group_name])
+
+    pos, has_gauss, cached_gaussian = values['rng_state']
+    np.random.set_state(('MT19937', values['rng_keys'], int(pos), int(has_gauss), cached_gaussian))
+    if est_ast_rmesh is not None:
+        est_ast_rmesh.set_mesh(values['vertices'], values['faces'], values['weights'])
+    if complete_controller is not None:
+        complete_controller.set_vertices_in_view(values['vertices_in_view'])
+
+    logger.info("Resuming {} from step {} time {}".format(group_name, values['step'], values['t']))
+    return length, values
+
 def simulate(output_filename="/tmp/exploration_sim.hdf5"):
     """Actually run the simulation around the asteroid
     """
@@ -399,14 +498,8 @@ def simulate(output_filename="/tmp/exploration_sim.hdf5"):
         hf.create_dataset("initial_state", data=initial_state, compression=compression,
                           compression_opts=compression_opts)
 
-        v_group = hf.create_group("reconstructed_vertex")
-        f_group = hf.create_group("reconstructed_face")
-        w_group = hf.create_group("reconstructed_weight")
-        state_group = hf.create_group("state")
-        targets_group = hf.create_group("targets")
-        Ra_group = hf.create_group("Ra")
-        inertial_intersections_group = hf.create_group("inertial_intersections")
-        asteroid_intersections_group = hf.create_group("asteroid_intersections")
+        writer = trajectory.TrajectoryWriter(hf, num_steps=num_steps, compression=compression,
+                                             compression_opts=compression_opts)
 
         
         # initialize the ODE function
@@ -430,12 +523,9 @@ def simulate(output_filename="/tmp/exploration_sim.hdf5"):
                 targets = lidar.define_targets(state[0:3],
                                                state[6:15].reshape((3, 3)),
                                                np.linalg.norm(state[0:3]))
-                # update the asteroid inside the caster
-                nv = true_ast.rotate_vertices(t)
+                # rotate the rays into the asteroid frame inside the caster
                 Ra = true_ast.rot_ast2int(t)
-                
-                # this also updates true_ast (both point to same data) 
-                caster.update_mesh(nv, true_ast.get_faces())
+                caster.set_rotation(Ra)
 
                 # do the raycasting
                 intersections = caster.castarray(state[0:3], targets)
@@ -458,41 +548,33 @@ def simulate(output_filename="/tmp/exploration_sim.hdf5"):
 
                 # save data to HDF5
 
-            v_group.create_dataset(str(ii), data=est_ast_rmesh.get_verts(), compression=compression,
-                                   compression_opts=compression_opts)
-            f_group.create_dataset(str(ii), data=est_ast_rmesh.get_faces(), compression=compression,
-                                   compression_opts=compression_opts)
-            w_group.create_dataset(str(ii), data=est_ast_rmesh.get_weights(), compression=compression,
-                                   compression_opts=compression_opts)
-
-            state_group.create_dataset(str(ii), data=state, compression=compression,
-                                       compression_opts=compression_opts)
-            targets_group.create_dataset(str(ii), data=targets, compression=compression,
-                                         compression_opts=compression_opts)
-            Ra_group.create_dataset(str(ii), data=Ra, compression=compression,
-                                    compression_opts=compression_opts)
-            inertial_intersections_group.create_dataset(str(ii), data=intersections, compression=compression,
-                                                        compression_opts=compression_opts)
-            asteroid_intersections_group.create_dataset(str(ii), data=ast_ints, compression=compression,
-                                                        compression_opts=compression_opts)
+            writer.append(ii, mesh=(est_ast_rmesh.get_verts(), est_ast_rmesh.get_faces(),
+                                    est_ast_rmesh.get_weights()),
+                          state=state, targets=targets, Ra=Ra,
+                          inertial_intersections=intersections,
+                          asteroid_intersections=ast_ints)
             
             ii += 1
 
+        writer.close()
+
 def simulate_control(output_filename="/tmp/exploration_sim.hdf5", 
-                     asteroid_name="castalia"):
+                     asteroid_name="castalia", resume=False):
     """Run the simulation with the control cost added in
+
+    resume : continue from the last checkpoint in output_filename
     """
     logger = logging.getLogger(__name__)
     
     num_steps = int(max_steps)
     time = np.arange(0, num_steps)
     t0, tf = time[0], time[-1]
-    dt = time[1] - time[0]
 
     # initialize the simulation objects
     (true_ast_meshdata, true_ast, complete_controller,
         est_ast_meshdata, est_ast_rmesh, est_ast, lidar, caster, max_angle, dum,
-        AbsTol, RelTol) = initialize_asteroid(output_filename, asteroid_name)
+        AbsTol, RelTol) = initialize_asteroid(output_filename, asteroid_name,
+                                              save_parameters=not resume)
 
     # change the initial condition based on the asteroid name
     if true_ast.get_name() == "itokawa": 
@@ -521,92 +603,63 @@ def simulate_control(output_filename="/tmp/exploration_sim.hdf5",
     initial_w = np.array([0, 0, 0])
     initial_state = np.hstack((initial_pos, initial_vel, initial_R, initial_w))
 
-    with h5py.File(output_filename, 'a') as hf:
-        hf.create_dataset('time', data=time, compression=compression,
-                          compression_opts=compression_opts)
-        hf.create_dataset("initial_state", data=initial_state, compression=compression,
-                          compression_opts=compression_opts)
-
-        v_group = hf.create_group("reconstructed_vertex")
-        f_group = hf.create_group("reconstructed_face")
-        w_group = hf.create_group("reconstructed_weight")
-        state_group = hf.create_group("state")
-        targets_group = hf.create_group("targets")
-        Ra_group = hf.create_group("Ra")
-        inertial_intersections_group = hf.create_group("inertial_intersections")
-        asteroid_intersections_group = hf.create_group("asteroid_intersections")
-
-        # initialize the ODE function
-        system = integrate.ode(eoms.eoms_controlled_inertial_control_cost_pybind)
-        system.set_integrator("lsoda", atol=AbsTol, rtol=RelTol, nsteps=10000)
-        # system.set_integrator("vode", nsteps=5000, method='bdf')
-        system.set_initial_value(initial_state, t0)
-        system.set_f_params(true_ast, dum, complete_controller, est_ast_rmesh, est_ast)
-        
-        point_cloud = defaultdict(list)
-
-        ii = 1
-        while system.successful() and system.t < tf:
-            t = system.t + dt
+    # hold the guidance decision between replanning events
+    guidance = complete_controller
+    if replan_period is not None:
+        guidance = controller.DecisionHold(complete_controller, horizon=planning_horizon,
+                                           num_candidates=planning_candidates,
+                                           max_angle=max_angle)
+
+    # integrate with adaptive steps, scanning and saving at their own rates
+    events = scheduler.Scheduler(eoms.eoms_controlled_inertial_control_cost_pybind, t0, tf,
+                                 args=(true_ast, dum, guidance, est_ast_rmesh, est_ast),
+                                 atol=AbsTol, rtol=RelTol)
+
+    if resume:
+        length, values = load_checkpoint(output_filename, '/', est_ast_rmesh)
+        ii, t, state = int(values['step']), values['t'], values['state']
+        scan = {name: values[name] for name in ('targets', 'Ra', 'inertial_intersections',
+                                                'asteroid_intersections')}
+    else:
+        with h5py.File(output_filename, 'a') as hf:
+            hf.create_dataset('time', data=time, compression=compression,
+                              compression_opts=compression_opts)
+            hf.create_dataset("initial_state", data=initial_state, compression=compression,
+                              compression_opts=compression_opts)
+        ii, length, t, state = 1, None, t0, initial_state
+        scan = empty_scan(t0, initial_state, lidar, true_ast)
+
+    # compress and write in a background process while the simulation runs
+    with trajectory.AsyncTrajectoryWriter(output_filename, '/', resume=length,
+                                          num_steps=num_steps, compression=compression,
+                                          compression_opts=compression_opts) as writer:
+        def measure(t, state):
             # TODO Make sure the asteroid (est and truth) are being rotated by ROT3(t)
-            state = system.integrate(system.t + dt)
+            scan.update(lidar_scan(t, state, lidar, caster, true_ast))
+            # this updates the estimated asteroid mesh used in both rmesh and est_ast
+            est_ast_rmesh.update(scan['asteroid_intersections'], max_angle)
 
+        def save(t, state):
+            nonlocal ii
             logger.info("Step: {} Time: {} Pos: {} Uncertainty: {}".format(ii, t,
                                                                            state[0:3],
                                                                            np.sum(est_ast_rmesh.get_weights())))
+            writer.append(ii, mesh=(est_ast_rmesh.get_verts(), est_ast_rmesh.get_faces(),
+                                    est_ast_rmesh.get_weights()),
+                          state=state, **scan)
+            ii += 1
 
-            if not (np.floor(t) % 1):
-                targets = lidar.define_targets(state[0:3],
-                                               state[6:15].reshape((3, 3)),
-                                               np.linalg.norm(state[0:3]))
-
-                # update the asteroid inside the caster
-                nv = true_ast.rotate_vertices(t)
-                Ra = true_ast.rot_ast2int(t)
-                
-                caster.update_mesh(nv, true_ast.get_faces())
-
-                # do the raycasting
-                intersections = caster.castarray(state[0:3], targets)
-
-                # reconstruct the mesh with new measurements
-                # convert the intersections to the asteroid frame
-                ast_ints = []
-                for pt in intersections:
-                    if np.linalg.norm(pt) < 1e-9:
-                        logger.info("No intersection for this point")
-                        pt_ast = np.array([np.nan, np.nan, np.nan])
-                    else:
-                        pt_ast = Ra.T.dot(pt)
-
-                    ast_ints.append(pt_ast)
-                
-                ast_ints = np.array(ast_ints)
-                
-                # this updates the estimated asteroid mesh used in both rmesh and est_ast
-                est_ast_rmesh.update(ast_ints, max_angle)
+        events.every(lidar_period, measure)
+        events.every(output_period, save, restart=False)
+        events.every(checkpoint_period, lambda t, state: save_checkpoint(
+            writer, ii, t, state, est_ast_rmesh, **scan))
+        if replan_period is not None:
+            # also at checkpoints, since a resumed simulation plans again there
+            events.every(replan_period, guidance.expire)
+            events.every(checkpoint_period, guidance.expire)
+        events.run(state, t)
 
-            v_group.create_dataset(str(ii), data=est_ast_rmesh.get_verts(), compression=compression,
-                                   compression_opts=compression_opts)
-            f_group.create_dataset(str(ii), data=est_ast_rmesh.get_faces(), compression=compression,
-                                   compression_opts=compression_opts)
-            w_group.create_dataset(str(ii), data=est_ast_rmesh.get_weights(), compression=compression,
-                                   compression_opts=compression_opts)
-
-            state_group.create_dataset(str(ii), data=state, compression=compression,
-                                       compression_opts=compression_opts)
-            targets_group.create_dataset(str(ii), data=targets, compression=compression,
-                                         compression_opts=compression_opts)
-            Ra_group.create_dataset(str(ii), data=Ra, compression=compression,
-                                    compression_opts=compression_opts)
-            inertial_intersections_group.create_dataset(str(ii), data=intersections, compression=compression,
-                                                        compression_opts=compression_opts)
-            asteroid_intersections_group.create_dataset(str(ii), data=ast_ints, compression=compression,
-                                                        compression_opts=compression_opts)
-            
-            ii += 1
-        
-        logger.info("Exploration complete")
+    logger.info("Exploration complete")
 
     
     logger.info("All done")
@@ -618,20 +671,11 @@ def save_animation(filename, move_cam=False, mesh_weight=False,
     with h5py.File(filename, 'r') as hf:
         # get the inertial state and asteroid mesh object
         time = hf['time'][()]
-        state_group = hf['state']
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        
-        intersections_group = hf['inertial_intersections']
+        explore = trajectory.TrajectoryReader(hf)
 
         # extract out the entire state and intersections
-        state = []
-        inertial_intersections = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-            inertial_intersections.append(intersections_group[key][()])
-        
-        state = np.array(state)
-        inertial_intersections = np.array(inertial_intersections)
+        state = explore.read('state')
+        inertial_intersections = explore.read('inertial_intersections')
         # get the true asteroid from the HDF5 file
         true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
@@ -706,21 +750,12 @@ def animate(filename, move_cam=False, mesh_weight=False, save_animation=False):
     with h5py.File(filename, 'r') as hf:
         # get the inertial state and asteroid mesh object
         # time = hf['time'][()]
-        state_group = hf['state']
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        time = [int(t) for t in state_keys];
-
-        intersections_group = hf['inertial_intersections']
+        explore = trajectory.TrajectoryReader(hf)
+        time = explore.steps.astype(int)
 
         # extract out the entire state and intersections
-        state = []
-        inertial_intersections = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-            inertial_intersections.append(intersections_group[key][()])
-        
-        state = np.array(state)
-        inertial_intersections = np.array(inertial_intersections)
+        state = explore.read('state')
+        inertial_intersections = explore.read('inertial_intersections')
         # get the true asteroid from the HDF5 file
         true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
@@ -779,21 +814,12 @@ def animate_refinement(filename, move_cam=False, mesh_weight=False, save_animati
     with h5py.File(filename, 'r') as hf:
         # get the inertial state and asteroid mesh object
         # time = hf['time'][()]
-        state_group = hf['refinement/state']
-        state_keys = np.array(utilities.sorted_nicely(list(hf['refinement/state'].keys())))
-        time = [int(t) for t in state_keys];
-
-        intersections_group = hf['refinement/inertial_intersections']
+        explore = trajectory.TrajectoryReader(hf['refinement'])
+        time = explore.steps.astype(int)
 
         # extract out the entire state and intersections
-        state = []
-        inertial_intersections = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-            inertial_intersections.append(intersections_group[key][()])
-        
-        state = np.array(state)
-        inertial_intersections = np.array(inertial_intersections)
+        state = explore.read('state')
+        inertial_intersections = explore.read('inertial_intersections')
         # get the true asteroid from the HDF5 file
         true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
@@ -850,14 +876,7 @@ def animate_landing(filename, move_cam=False, mesh_weight=False):
     """
     with h5py.File(filename, 'r') as hf:
         time = hf['landing/time'][()]
-        state_group = hf['landing/state']
-        state_keys = np.array(utilities.sorted_nicely(list(state_group.keys())))
-
-        state = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-
-        state=np.array(state)
+        state = trajectory.TrajectoryReader(hf['landing']).read('state')
 
         mfig = graphics.mayavi_figure(bg=(0, 0, 0),size=(800, 600))
 
@@ -900,14 +919,7 @@ def save_animate_landing(filename,output_path,move_cam=False, mesh_weight=False)
 
     with h5py.File(filename, 'r') as hf:
         time = hf['landing/time'][()]
-        state_group = hf['landing/state']
-        state_keys = np.array(utilities.sorted_nicely(list(state_group.keys())))
-
-        state = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-
-        state=np.array(state)
+        state = trajectory.TrajectoryReader(hf['landing']).read('state')
 
         mfig = graphics.mayavi_figure(bg=(0, 0, 0), size=(800, 600), offscreen=True)
 
@@ -967,21 +979,12 @@ def save_animate_refinement(filename, output_path, move_cam=False, mesh_weight=F
     with h5py.File(filename, 'r') as hf:
         # get the inertial state and asteroid mesh object
         # time = hf['time'][()]
-        state_group = hf['refinement/state']
-        state_keys = np.array(utilities.sorted_nicely(list(hf['refinement/state'].keys())))
-        time = [int(t) for t in state_keys];
-
-        intersections_group = hf['refinement/inertial_intersections']
+        explore = trajectory.TrajectoryReader(hf['refinement'])
+        time = explore.steps.astype(int)
 
         # extract out the entire state and intersections
-        state = []
-        inertial_intersections = []
-        for key in state_keys:
-            state.append(state_group[key][()])
-            inertial_intersections.append(intersections_group[key][()])
-        
-        state = np.array(state)
-        inertial_intersections = np.array(inertial_intersections)
+        state = explore.read('state')
+        inertial_intersections = explore.read('inertial_intersections')
         # get the true asteroid from the HDF5 file
         true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
@@ -1048,7 +1051,7 @@ def save_animate_refinement(filename, output_path, move_cam=False, mesh_weight=F
         if file_path.endswith('.jpg'):
             os.remove(file_path)
 
-def refine_landing_area(filename, asteroid_name, desired_landing_site):
+def refine_landing_area(filename, asteroid_name, desired_landing_site, resume=False):
     """Called after exploration is completed
     
     We'll refine the area near the landing site.
@@ -1057,132 +1060,115 @@ def refine_landing_area(filename, asteroid_name, desired_landing_site):
     using a mixed resolution mesh
 
     Then in a differetn function we'll go and land
+
+    resume : continue from the last checkpoint in the refinement group
     """
     logger = logging.getLogger(__name__)
     
     num_steps = int(3600)
     time = np.arange(0, num_steps)
     t0, tf = time[0], time[-1]
-    dt = time[1] - time[0]
     
     # intialize the simulation objects
     (true_ast_meshdata, true_ast, complete_controller,
         est_ast_meshdata, est_ast_rmesh, est_ast, lidar, caster, max_angle, dum,
         AbsTol, RelTol) = initialize_refinement(filename, asteroid_name)
     v_bumpy, f_bumpy = wavefront.read_obj('./data/shape_model/CASTALIA/castalia_bump.obj') 
+    caster.update_mesh(v_bumpy, f_bumpy)
     
     # define the initial condition as teh terminal state of the exploration sim
     with h5py.File(filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        explore_tf = hf['time'][()][-1]
-        explore_state = hf['state/' + str(explore_tf)][()]
-        explore_Ra = hf['Ra/' + str(explore_tf)][()]
+        explore = trajectory.TrajectoryReader(hf)
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
     
         explore_AbsTol = hf["simulation_parameters/AbsTol"][()]
         explore_RelTol = hf["simulation_parameters/RelTol"][()]
 
     initial_state = explore_state
 
+    guidance = complete_controller
+    if replan_period is not None:
+        guidance = controller.DecisionHold(complete_controller)
+
+    events = scheduler.Scheduler(eoms.eoms_controlled_inertial_refinement_pybind, t0, tf,
+                                 args=(true_ast, dum, guidance, est_ast_rmesh,
+                                       est_ast, desired_landing_site),
+                                 atol=explore_AbsTol, rtol=explore_RelTol)
+
+    if resume:
+        # the refined mesh and the vertices in view are in the checkpoint
+        length, values = load_checkpoint(filename, 'refinement', est_ast_rmesh,
+                                         complete_controller)
+        ii, t, state = int(values['step']), values['t'], values['state']
+        scan = {name: values[name] for name in ('targets', 'Ra', 'inertial_intersections',
+                                                'asteroid_intersections')}
+    else:
+        ii, length, t, state = 1, None, t0, initial_state
+        scan = empty_scan(t0, initial_state, lidar, true_ast)
+
     # open the file and recreate the objects
     with h5py.File(filename, 'r+') as hf:
-        # groups to save the refined data
-        if "refinement" in hf:
-            del hf['refinement']
+        if resume:
+            refinement_group = hf['refinement']
+            writer = trajectory.TrajectoryWriter.resume(refinement_group, length, num_steps=num_steps,
+                                                        compression=compression,
+                                                        compression_opts=compression_opts)
+        else:
+            # groups to save the refined data
+            if "refinement" in hf:
+                del hf['refinement']
 
-        refinement_group = hf.create_group("refinement")
+            refinement_group = hf.create_group("refinement")
 
-        refinement_group.create_dataset("time", data=time, compression=compression,
-                                        compression_opts=compression_opts)
-        refinement_group.create_dataset("initial_state", data=initial_state)
-        v_group = refinement_group.create_group("reconstructed_vertex")
-        f_group = refinement_group.create_group("reconstructed_face")
-        w_group = refinement_group.create_group("reconstructed_weight")
-        state_group = refinement_group.create_group("state")
-        targets_group = refinement_group.create_group("targets")
-        Ra_group = refinement_group.create_group("Ra")
-        inertial_intersections_group = refinement_group.create_group("inertial_intersections")
-        asteroid_intersections_group = refinement_group.create_group("asteroid_intersections")
+            refinement_group.create_dataset("time", data=time, compression=compression,
+                                            compression_opts=compression_opts)
+            refinement_group.create_dataset("initial_state", data=initial_state)
+            writer = trajectory.TrajectoryWriter(refinement_group, num_steps=num_steps, compression=compression,
+                                                 compression_opts=compression_opts)
 
-        logger.info("Estimated asteroid has {} vertices and {} faces".format(
-            est_ast_rmesh.get_verts().shape[0],
-            est_ast_rmesh.get_faces().shape[0]))
+            logger.info("Estimated asteroid has {} vertices and {} faces".format(
+                est_ast_rmesh.get_verts().shape[0],
+                est_ast_rmesh.get_faces().shape[0]))
             
-        logger.info("Now refining the faces close to the landing site")
-        # perform remeshing over the landing area and take a bunch of measurements 
-        est_ast_meshdata.remesh_faces_in_view(desired_landing_site, np.deg2rad(40),
-                                              0.02)
-        logger.info("Estimated asteroid has {} vertices and {} faces".format(
-            est_ast_rmesh.get_verts().shape[0],
-            est_ast_rmesh.get_faces().shape[0]))
-        logger.info("Now starting dynamic simulation and taking measurements again again")
-        complete_controller.set_vertices_in_view(est_ast_rmesh, desired_landing_site,
-                                                 np.deg2rad(40))
+            logger.info("Now refining the faces close to the landing site")
+            # perform remeshing over the landing area and take a bunch of measurements 
+            est_ast_meshdata.remesh_faces_in_view(desired_landing_site, np.deg2rad(40),
+                                                  0.02)
+            logger.info("Estimated asteroid has {} vertices and {} faces".format(
+                est_ast_rmesh.get_verts().shape[0],
+                est_ast_rmesh.get_faces().shape[0]))
+            complete_controller.set_vertices_in_view(est_ast_rmesh, desired_landing_site,
+                                                     np.deg2rad(40))
 
-        system = integrate.ode(eoms.eoms_controlled_inertial_refinement_pybind)
-        # system = integrate.ode(eoms.eoms_controlled_inertial_control_cost_pybind)
-        system.set_integrator("lsoda", atol=explore_AbsTol, rtol=explore_RelTol, nsteps=10000)
-        system.set_initial_value(initial_state, t0)
-        system.set_f_params(true_ast, dum, complete_controller, est_ast_rmesh, 
-                            est_ast, desired_landing_site)
-        # system.set_f_params(true_ast, dum, complete_controller, est_ast_rmesh, est_ast)
+        logger.info("Now starting dynamic simulation and taking measurements again again")
         # TODO make sure that at this point the new faces have a high weight
-        ii = 1
-        while system.successful() and system.t < tf:
-            t = system.t + dt
-            state = system.integrate(system.t + dt)
+        def measure(t, state):
+            scan.update(lidar_scan(t, state, lidar, caster, true_ast))
+            # this updates the estimated asteroid mesh used in both rmesh and est_ast
+            est_ast_rmesh.update(scan['asteroid_intersections'], max_angle)
+
+        def save(t, state):
+            nonlocal ii
             logger.info("Step: {} Time: {} Pos: {} Uncertainty: {}".format(ii, t,
                                                                            state[0:3],
                                                                            np.sum(est_ast_rmesh.get_weights())))
+            writer.append(ii, mesh=(est_ast_rmesh.get_verts(), est_ast_rmesh.get_faces(),
+                                    est_ast_rmesh.get_weights()),
+                          state=state, **scan)
+            ii += 1
 
-            targets = lidar.define_targets(state[0:3],
-                                            state[6:15].reshape((3, 3)),
-                                            np.linalg.norm(state[0:3]))
-
-            # update the asteroid inside the caster
-            nv = true_ast.rotate_vertices(t)
-            Ra = true_ast.rot_ast2int(t)
-            nv = Ra.dot(v_bumpy.T).T        
-            caster.update_mesh(nv, f_bumpy)
-
-            # do the raycasting
-            intersections = caster.castarray(state[0:3], targets)
-
-            # reconstruct the mesh with new measurements
-            # convert the intersections to the asteroid frame
-            ast_ints = []
-            for pt in intersections:
-                if np.linalg.norm(pt) < 1e-9:
-                    logger.info("No intersection for this point")
-                    pt_ast = np.array([np.nan, np.nan, np.nan])
-                else:
-                    pt_ast = Ra.T.dot(pt)
+        events.every(lidar_period, measure)
+        events.every(output_period, save, restart=False)
+        events.every(checkpoint_period, lambda t, state: save_checkpoint(
+            writer, ii, t, state, est_ast_rmesh, complete_controller, **scan))
+        if replan_period is not None:
+            # also at checkpoints, since a resumed simulation plans again there
+            events.every(replan_period, guidance.expire)
+            events.every(checkpoint_period, guidance.expire)
+        events.run(state, t)
 
-                ast_ints.append(pt_ast)
-            
-            ast_ints = np.array(ast_ints)
-            
-            # this updates the estimated asteroid mesh used in both rmesh and est_ast
-            est_ast_rmesh.update(ast_ints, max_angle)
-            
-            v_group.create_dataset(str(ii), data=est_ast_rmesh.get_verts(), compression=compression,
-                                   compression_opts=compression_opts)
-            f_group.create_dataset(str(ii), data=est_ast_rmesh.get_faces(), compression=compression,
-                                   compression_opts=compression_opts)
-            w_group.create_dataset(str(ii), data=est_ast_rmesh.get_weights(), compression=compression,
-                                   compression_opts=compression_opts)
-
-            state_group.create_dataset(str(ii), data=state, compression=compression,
-                                       compression_opts=compression_opts)
-            targets_group.create_dataset(str(ii), data=targets, compression=compression,
-                                         compression_opts=compression_opts)
-            Ra_group.create_dataset(str(ii), data=Ra, compression=compression,
-                                    compression_opts=compression_opts)
-            inertial_intersections_group.create_dataset(str(ii), data=intersections, compression=compression,
-                                                        compression_opts=compression_opts)
-            asteroid_intersections_group.create_dataset(str(ii), data=ast_ints, compression=compression,
-                                                        compression_opts=compression_opts)
-            
-            ii += 1
+        writer.close()
 
     logger.info("Refinement complete")
 
@@ -1196,7 +1182,6 @@ def kinematics_refine_landing_area(filename, asteroid_name, desired_landing_site
     num_steps = int(3600*3)
     time = np.arange(max_steps, max_steps + num_steps)
     t0, tf = time[0], time[-1]
-    dt = time[1] - time[0]
     
     # intialize the simulation objects
     (true_ast_meshdata, true_ast, complete_controller,
@@ -1204,12 +1189,12 @@ def kinematics_refine_landing_area(filename, asteroid_name, desired_landing_site
         AbsTol, RelTol) = initialize_refinement(filename, asteroid_name)
 
     v_bumpy, f_bumpy = wavefront.read_obj('./data/shape_model/CASTALIA/castalia_bump_2.obj') 
+    caster.update_mesh(v_bumpy, f_bumpy)
     # define the initial condition as teh terminal state of the exploration sim
     with h5py.File(filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        explore_tf = hf['time'][()][-1]
-        explore_state = hf['state/' + str(explore_tf)][()]
-        explore_Ra = hf['Ra/' + str(explore_tf)][()]
+        explore = trajectory.TrajectoryReader(hf)
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
     
         explore_AbsTol = hf["simulation_parameters/AbsTol"][()]
         explore_RelTol = hf["simulation_parameters/RelTol"][()]
@@ -1228,14 +1213,8 @@ def kinematics_refine_landing_area(filename, asteroid_name, desired_landing_site
         refinement_group.create_dataset("time", data=time, compression=compression,
                                         compression_opts=compression_opts)
         refinement_group.create_dataset("initial_state", data=initial_state)
-        v_group = refinement_group.create_group("reconstructed_vertex")
-        f_group = refinement_group.create_group("reconstructed_face")
-        w_group = refinement_group.create_group("reconstructed_weight")
-        state_group = refinement_group.create_group("state")
-        targets_group = refinement_group.create_group("targets")
-        Ra_group = refinement_group.create_group("Ra")
-        inertial_intersections_group = refinement_group.create_group("inertial_intersections")
-        asteroid_intersections_group = refinement_group.create_group("asteroid_intersections")
+        writer = trajectory.TrajectoryWriter(refinement_group, num_steps=num_steps, compression=compression,
+                                             compression_opts=compression_opts)
 
         logger.info("Estimated asteroid has {} vertices and {} faces".format(
             est_ast_rmesh.get_verts().shape[0],
@@ -1273,10 +1252,8 @@ def kinematics_refine_landing_area(filename, asteroid_name, desired_landing_site
             # target = lidar.define_target(state[0:3], state[6:15].reshape((3, 3)),
             #                              np.linalg.norm(state[0:3]))
 
-            # update the asteroid inside the caster
-            nv = Ra.dot(v_bumpy.T).T
-            
-            caster.update_mesh(nv,f_bumpy)
+            # rotate the rays into the asteroid frame inside the caster
+            caster.set_rotation(Ra)
 
             # do the raycasting
             intersections = caster.castarray(state[0:3], targets)
@@ -1297,37 +1274,26 @@ def kinematics_refine_landing_area(filename, asteroid_name, desired_landing_site
             # ast_int = Ra.T.dot(intersection)            
             # est_ast_rmesh.single_update(ast_int, max_angle) 
 
-            v_group.create_dataset(str(t), data=est_ast_rmesh.get_verts(), compression=compression,
-                                   compression_opts=compression_opts)
-            f_group.create_dataset(str(t), data=est_ast_rmesh.get_faces(), compression=compression,
-                                   compression_opts=compression_opts)
-            w_group.create_dataset(str(t), data=est_ast_rmesh.get_weights(), compression=compression,
-                                   compression_opts=compression_opts)
-
-            state_group.create_dataset(str(t), data=state, compression=compression,
-                                       compression_opts=compression_opts)
-            targets_group.create_dataset(str(t), data=targets, compression=compression,
-                                         compression_opts=compression_opts)
-            # targets_group.create_dataset(str(ii), data=target, compression=compression,
-            #                              compression_opts=compression_opts)
-            Ra_group.create_dataset(str(t), data=Ra, compression=compression,
-                                    compression_opts=compression_opts)
-            inertial_intersections_group.create_dataset(str(t), data=intersections, compression=compression,
-                                                        compression_opts=compression_opts)
-            asteroid_intersections_group.create_dataset(str(t), data=ast_ints, compression=compression,
-                                                        compression_opts=compression_opts)
+            writer.append(t, mesh=(est_ast_rmesh.get_verts(), est_ast_rmesh.get_faces(),
+                                   est_ast_rmesh.get_weights()),
+                          state=state, targets=targets, Ra=Ra,
+                          inertial_intersections=intersections,
+                          asteroid_intersections=ast_ints)
             # inertial_intersections_group.create_dataset(str(ii), data=intersection, compression=compression,
             #                                             compression_opts=compression_opts)
             # asteroid_intersections_group.create_dataset(str(ii), data=ast_int, compression=compression,
             #                                             compression_opts=compression_opts)
-            
+
+        writer.close()
 
     logger.info("Refinement complete")
 
 
-def landing(filename, desired_landing_site):
+def landing(filename, desired_landing_site, resume=False):
     """Open the HDF5 file and continue the simulation from the terminal state
     to landing on the surface over an additional few hours
+
+    resume : continue from the last checkpoint in the landing group
     """
     logger = logging.getLogger(__name__)
 
@@ -1336,13 +1302,11 @@ def landing(filename, desired_landing_site):
     # TODO Look at blender_sim
     # get all the terminal states from the exploration stage
     with h5py.File(filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['refinement/state'].keys())))
+        explore = trajectory.TrajectoryReader(hf['refinement'])
         explore_tf = hf['refinement/time'][()][-1]
-        explore_state = hf['refinement/state/' + str(explore_tf)][()]
-        explore_Ra = hf['refinement/Ra/' + str(explore_tf)][()]
-        explore_v = hf['refinement/reconstructed_vertex/' + str(explore_tf)][()]
-        explore_f = hf['refinement/reconstructed_face/' + str(explore_tf)][()]
-        explore_w = hf['refinement/reconstructed_weight/' + str(explore_tf)][()]
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
+        explore_v, explore_f, explore_w = explore.mesh(-1)
         
         explore_name = hf['simulation_parameters/true_asteroid/name'][()][:-4]
         explore_m1 = hf['simulation_parameters/dumbbell/m1'][()]
@@ -1357,7 +1321,6 @@ def landing(filename, desired_landing_site):
     num_steps = int(5000) # 2 hours to go from home pos to the surface
     time = np.arange(explore_tf, explore_tf  + num_steps)
     t0, tf = time[0], time[-1]
-    dt = time[1] - time[0]
     
     # initialize the asteroid and dumbbell objects
     true_ast_meshdata = mesh_data.MeshData(explore_true_vertices, explore_true_faces)
@@ -1369,45 +1332,57 @@ def landing(filename, desired_landing_site):
     dum = dumbbell.Dumbbell(m1=explore_m1, m2=explore_m2, l=explore_l)
 
     initial_state = explore_state
-    with h5py.File(filename, 'r+') as hf:
-        # delete the landing group if it exists
-        if "landing" in hf:
-            input("Press ENTER to delete the landing group!!!")
-            del hf['landing']
-        # save data to HDF5 file
-        hf.create_dataset('landing/time', data=time, compression=compression,
-                          compression_opts=compression_opts)
-        hf.create_dataset("landing/initial_state", data=initial_state, compression=compression,
-                          compression_opts=compression_opts)
-        hf.create_dataset("landing/vertices", data=explore_v, compression=compression,
-                          compression_opts=compression_opts)
-        hf.create_dataset("landing/faces", data=explore_f, compression=compression,
-                          compression_opts=compression_opts)
-        hf.create_dataset("landing/weight", data=explore_w, compression=compression,
-                          compression_opts=compression_opts)
 
-        state_group = hf.create_group("landing/state")
-        Ra_group = hf.create_group("landing/Ra")
+    # define the system EOMS and simulate. There is no sensing so the
+    # integrator only stops for checkpoints
+    events = scheduler.Scheduler(eoms.eoms_controlled_land_pybind, t0, tf,
+                                 args=(true_ast, dum, est_ast, desired_landing_site, t0, initial_state[0:3]),
+                                 atol=explore_AbsTol, rtol=explore_RelTol)
 
-        # define the system EOMS and simulate
-        system = integrate.ode(eoms.eoms_controlled_land_pybind)
-        system.set_integrator("lsoda", atol=explore_AbsTol, rtol=explore_RelTol,  nsteps=10000)
-        system.set_initial_value(initial_state, t0)
-        system.set_f_params(true_ast, dum, est_ast, desired_landing_site, t0, initial_state[0:3])
-        
-        ii = 1
-        while system.successful() and system.t < tf:
-            t = system.t + dt
-            state = system.integrate(system.t + dt)
+    if resume:
+        length, values = load_checkpoint(filename, 'landing')
+        ii, t, state = int(values['step']), values['t'], values['state']
+    else:
+        ii, length, t, state = 1, None, t0, initial_state
 
+    with h5py.File(filename, 'r+') as hf:
+        if resume:
+            writer = trajectory.TrajectoryWriter.resume(hf['landing'], length, num_steps=num_steps,
+                                                        compression=compression,
+                                                        compression_opts=compression_opts)
+        else:
+            # delete the landing group if it exists
+            if "landing" in hf:
+                input("Press ENTER to delete the landing group!!!")
+                del hf['landing']
+            # save data to HDF5 file
+            hf.create_dataset('landing/time', data=time, compression=compression,
+                              compression_opts=compression_opts)
+            hf.create_dataset("landing/initial_state", data=initial_state, compression=compression,
+                              compression_opts=compression_opts)
+            hf.create_dataset("landing/vertices", data=explore_v, compression=compression,
+                              compression_opts=compression_opts)
+            hf.create_dataset("landing/faces", data=explore_f, compression=compression,
+                              compression_opts=compression_opts)
+            hf.create_dataset("landing/weight", data=explore_w, compression=compression,
+                              compression_opts=compression_opts)
+
+            writer = trajectory.TrajectoryWriter(hf['landing'], num_steps=num_steps, compression=compression,
+                                                 compression_opts=compression_opts)
+
+        def save(t, state):
+            nonlocal ii
             logger.info("Step: {} Time: {} Pos: {}".format(ii, t, state[0:3]))
             
-            state_group.create_dataset(str(t), data=state, compression=compression,
-                                       compression_opts=compression_opts)
-            Ra_group.create_dataset(str(t), data=est_ast.rot_ast2int(t), compression=compression,
-                                    compression_opts=compression_opts)
+            writer.append(t, state=state, Ra=est_ast.rot_ast2int(t))
             ii+=1
 
+        events.every(output_period, save, restart=False)
+        events.every(checkpoint_period, lambda t, state: save_checkpoint(writer, ii, t, state))
+        events.run(state, t)
+
+        writer.close()
+
 def reconstruct_images(filename, output_path="/tmp/reconstruct_images", 
                        magnification=1, show=True):
     """Read teh HDF5 data and generate a bunch of images of the reconstructing 
@@ -1422,14 +1397,7 @@ def reconstruct_images(filename, output_path="/tmp/reconstruct_images",
     
     logger.info('Opening {}'.format(filename))
     with h5py.File(filename, 'r') as hf:
-        rv = hf['reconstructed_vertex']
-        rf = hf['reconstructed_face']
-        rw = hf['reconstructed_weight']
-
-        # get all the keys for the groups
-        v_keys = np.array(utilities.sorted_nicely(list(rv.keys())))
-        f_keys = np.array(utilities.sorted_nicely(list(rf.keys())))
-        w_keys = np.array(utilities.sorted_nicely(list(rw.keys())))
+        explore = trajectory.TrajectoryReader(hf)
         
         v_initial = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         f_initial = hf['simulation_parameters/estimate_asteroid/initial_faces'][()]
@@ -1451,12 +1419,12 @@ def reconstruct_images(filename, output_path="/tmp/reconstruct_images",
         graphics.mayavi_axes(mfig, [min_x, max_x, min_x, max_x, min_x, max_x], line_width=5, color=(1, 0, 0))
         graphics.mayavi_view(fig=mfig)
 
-        partial_index = np.array([1, v_keys.shape[0]*1/4, v_keys.shape[0]*1/2,
-                                  v_keys.shape[0]*3/4, v_keys.shape[0]*4/4-1],
+        partial_index = np.array([1, len(explore)*1/4, len(explore)*1/2,
+                                  len(explore)*3/4, len(explore)*4/4-1],
                                  dtype=np.int)
         for img_index, vk in enumerate(partial_index):
             filename = os.path.join(output_path, 'partial_' + str(vk) + '.jpg')
-            v = rv[str(vk)][()]
+            v, _, _ = explore.mesh(vk)
             # generate an image and save it 
             ms.set(x=v[:, 0], y=v[:, 1], z=v[:,2], triangles=f_initial)
             graphics.mlab.savefig(filename, magnification=magnification)
@@ -1471,13 +1439,12 @@ def reconstruct_images(filename, output_path="/tmp/reconstruct_images",
         graphics.mayavi_axes(mfig, [-1, 1, -1, 1, -1, 1], line_width=5, color=(1, 0, 0))
         graphics.mayavi_view(fig=mfig)
 
-        partial_index = np.array([1, v_keys.shape[0]*1/4, v_keys.shape[0]*1/2,
-                                  v_keys.shape[0]*3/4, v_keys.shape[0]*4/4-1],
+        partial_index = np.array([1, len(explore)*1/4, len(explore)*1/2,
+                                  len(explore)*3/4, len(explore)*4/4-1],
                                  dtype=np.int)
         for img_index, vk in enumerate(partial_index):
             filename = os.path.join(output_path, 'partial_weights_' + str(vk) + '.jpg')
-            v = rv[str(vk)][()]
-            w = np.squeeze(rw[str(vk)][()])
+            v, _, w = explore.mesh(vk)
             # generate an image and save it 
             ms.set(x=v[:, 0], y=v[:, 1], z=v[:,2], triangles=f_initial,
                      scalars=w)
@@ -1521,14 +1488,7 @@ def plot_uncertainty(filename, img_path, show=True):
     logger.info("Uncertainty plot as funciton of time")
 
     with h5py.File(filename, 'r') as hf:
-        rv = hf['reconstructed_vertex']
-        rf = hf['reconstructed_face']
-        rw = hf['reconstructed_weight']
-        
-        # get all the keys for the groups
-        v_keys = np.array(utilities.sorted_nicely(list(rv.keys())))
-        f_keys = np.array(utilities.sorted_nicely(list(rf.keys())))
-        w_keys = np.array(utilities.sorted_nicely(list(rw.keys())))
+        explore = trajectory.TrajectoryReader(hf)
         
         v_initial = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         f_initial = hf['simulation_parameters/estimate_asteroid/initial_faces'][()]
@@ -1537,10 +1497,10 @@ def plot_uncertainty(filename, img_path, show=True):
         t_array = []
         w_array = []
 
-        for ii, wk in enumerate(w_keys):
+        for ii, (_, _, w) in enumerate(explore.meshes()):
             logger.info("Step {}".format(ii))
             t_array.append(ii)
-            w_array.append(np.sum(rw[wk][()]))
+            w_array.append(np.sum(w))
 
         t_array = np.array(t_array)
         w_array = np.array(w_array)
@@ -1554,13 +1514,6 @@ def animate_uncertainty(filename):
     time
     """
     with h5py.File(filename, 'r') as hf:
-        rv = hf['reconstructed_vertex']
-        rw = hf['reconstructed_weight']
-        
-        # get all the keys for the groups
-        v_keys = np.array(utilities.sorted_nicely(list(rv.keys())))
-        w_keys = np.array(utilities.sorted_nicely(list(rw.keys())))
-        
         v_initial = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         w_initial = np.squeeze(hf['simulation_parameters/estimate_asteroid/initial_weight'][()])
 
@@ -1578,21 +1531,14 @@ def plot_state_trajectory(filename, img_path, show=False):
     """
 
     with h5py.File(filename, 'r') as hf:
-        state_group = hf['state']
-        Ra_group = hf['Ra']
-        rv = hf['reconstructed_vertex']
-        rf = hf['reconstructed_face']
-
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
+        explore = trajectory.TrajectoryReader(hf)
 
-        t_array = np.zeros(len(state_keys))
-        state_inertial_array = np.zeros((len(state_keys), 18))
-        state_asteroid_array = np.zeros((len(state_keys), 18))
+        t_array = np.zeros(len(explore))
+        state_inertial_array = explore.read('state')
+        state_asteroid_array = np.zeros((len(explore), 18))
         
-        for ii, sk in enumerate(state_keys):
+        for ii, Ra in enumerate(explore.read('Ra')):
             t_array[ii] = ii
-            state_inertial_array[ii, :] = state_group[sk][()]
-            Ra = Ra_group[sk][()]
             pos_ast = Ra.T.dot(state_inertial_array[ii, 0:3].T).T
             vel_ast = Ra.T.dot(state_inertial_array[ii, 3:6].T).T
             R_sc2ast = Ra.T.dot(state_inertial_array[ii, 6:15].reshape((3, 3)))
@@ -1602,8 +1548,7 @@ def plot_state_trajectory(filename, img_path, show=False):
     
 
         # draw three dimensional trajectory
-        v_final = rv[state_keys[-1]][()]
-        f_final = rf[state_keys[-1]][()]
+        v_final, f_final, _ = explore.mesh(-1)
 
         mfig = graphics.mayavi_figure(offscreen=(not show))
         mesh = graphics.mayavi_addMesh(mfig, v_final, f_final)
@@ -1628,17 +1573,14 @@ def plot_volume(filename, img_path, show=True):
     """Compute the volume of the asteroid at each time step
     """
     with h5py.File(filename, 'r') as hf:
-        rv_group = hf['reconstructed_vertex']
-        rf_group = hf['reconstructed_face']
+        explore = trajectory.TrajectoryReader(hf)
 
-        rv_keys = np.array(utilities.sorted_nicely(list(rv_group.keys())))
+        t_array = np.zeros(len(explore))
+        vol_array = np.zeros(len(explore))
 
-        t_array = np.zeros(len(rv_keys))
-        vol_array = np.zeros(len(rv_keys))
-
-        for ii, key in enumerate(rv_keys):
+        for ii, (v, f, _) in enumerate(explore.meshes()):
             t_array[ii] = ii
-            vol_array[ii] = stats.volume(rv_group[key][()], rf_group[key][()])
+            vol_array[ii] = stats.volume(v, f)
 
         true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
@@ -1659,15 +1601,11 @@ def refine_site_plots(input_filename, img_path, show=False):
     # generate a surface slope map for each face of an asteroid
     # load a asteroid
     with h5py.File(input_filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['state'].keys())))
-        explore_tf = hf['time'][()][-1]
+        explore = trajectory.TrajectoryReader(hf)
         explore_name = hf['simulation_parameters/true_asteroid/name'][()]
-        # explore_tf = int(state_keys[-1])
-        explore_state = hf['state/' + str(explore_tf)][()]
-        explore_Ra = hf['Ra/' + str(explore_tf)][()]
-        explore_v = hf['reconstructed_vertex/' + str(explore_tf)][()]
-        explore_f = hf['reconstructed_face/' + str(explore_tf)][()]
-        explore_w = hf['reconstructed_weight/' + str(explore_tf)][()]
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
+        explore_v, explore_f, explore_w = explore.mesh(-1)
         
         explore_name = hf['simulation_parameters/true_asteroid/name'][()][:-4]
         explore_m1 = hf['simulation_parameters/dumbbell/m1'][()]
@@ -1771,15 +1709,11 @@ def landing_site_plots(input_filename, img_path, show=False):
     # generate a surface slope map for each face of an asteroid
     # load a asteroid
     with h5py.File(input_filename, 'r') as hf:
-        state_keys = np.array(utilities.sorted_nicely(list(hf['refinement/state'].keys())))
-        explore_tf = hf['refinement/time'][()][-1]
+        explore = trajectory.TrajectoryReader(hf['refinement'])
         explore_name = hf['simulation_parameters/true_asteroid/name'][()]
-        # explore_tf = int(state_keys[-1])
-        explore_state = hf['refinement/state/' + str(explore_tf)][()]
-        explore_Ra = hf['refinement/Ra/' + str(explore_tf)][()]
-        explore_v = hf['refinement/reconstructed_vertex/' + str(explore_tf)][()]
-        explore_f = hf['refinement/reconstructed_face/' + str(explore_tf)][()]
-        explore_w = hf['refinement/reconstructed_weight/' + str(explore_tf)][()]
+        explore_state = explore.read('state', -1)
+        explore_Ra = explore.read('Ra', -1)
+        explore_v, explore_f, explore_w = explore.mesh(-1)
         
         explore_name = hf['simulation_parameters/true_asteroid/name'][()][:-4]
         explore_m1 = hf['simulation_parameters/dumbbell/m1'][()]
@@ -1791,22 +1725,18 @@ def landing_site_plots(input_filename, img_path, show=False):
         explore_true_vertices = hf['simulation_parameters/true_asteroid/vertices'][()]
         explore_true_faces = hf['simulation_parameters/true_asteroid/faces'][()]
 
-        landing_keys = np.array(utilities.sorted_nicely(list(hf['landing/state'].keys())))
-        landing_state_group = hf['landing/state']
-        landing_Ra_group = hf['landing/Ra']
+        landing = trajectory.TrajectoryReader(hf['landing'])
         landing_time = hf['landing/time'][()]
         landing_v = hf['landing/vertices'][()]
         landing_f = hf['landing/faces'][()]
     
         # draw the trajectory in the asteroid frame using mayavi
-        t_array = np.zeros(len(landing_keys))
-        state_inertial_array = np.zeros((len(landing_keys), 18))
-        state_asteroid_array = np.zeros((len(landing_keys), 18))
+        t_array = np.zeros(len(landing))
+        state_inertial_array = landing.read('state')
+        state_asteroid_array = np.zeros((len(landing), 18))
         
-        for ii, sk in enumerate(landing_keys):
+        for ii, Ra in enumerate(landing.read('Ra')):
             t_array[ii] = ii
-            state_inertial_array[ii, :] = landing_state_group[sk][()]
-            Ra = landing_Ra_group[sk][()]
             pos_ast = Ra.T.dot(state_inertial_array[ii, 0:3].T).T
             vel_ast = Ra.T.dot(state_inertial_array[ii, 3:6].T).T
             R_sc2ast = Ra.T.dot(state_inertial_array[ii, 6:15].reshape((3, 3)))
@@ -1938,6 +1868,8 @@ if __name__ == "__main__":
                         default=False)
     parser.add_argument("-m", "--magnification", help="Magnification for images",
                        action="store", type=int, const=4, nargs='?', default=4)
+    parser.add_argument("--resume", help="For use with -c, -lr or -l. Continue the simulation from the last checkpoint in simulation_data",
+                        action="store_true")
 
     group = parser.add_mutually_exclusive_group()
     # group.add_argument("-s", "--simulate", help="Run the exploration simulation",
@@ -1979,9 +1911,12 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
                         
+    # batch schedulers send SIGTERM at the wall clock limit, so exit cleanly
+    # and resume later from the last checkpoint
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
 
     if args.control_sim:
-        simulate_control(args.simulation_data, args.name)
+        simulate_control(args.simulation_data, args.name, resume=args.resume)
     elif args.reconstruct:
         reconstruct_images(args.simulation_data,output_path=args.reconstruct , magnification=args.magnification,
                            show=args.show)
@@ -2009,7 +1944,7 @@ if __name__ == "__main__":
     elif args.landing:
         # landing_site_plots(args.simulation_data)
         desired_landing_spot = np.array([0.48501797, -0.02027519, 0.37758639])
-        landing(args.simulation_data, desired_landing_spot)
+        landing(args.simulation_data, desired_landing_spot, resume=args.resume)
     elif args.landing_animation:
         animate_landing(args.simulation_data, move_cam=args.move_cam, mesh_weight=args.mesh_weight)
     elif args.landing_save_animation:
@@ -2019,7 +1954,8 @@ if __name__ == "__main__":
         # landing location in the asteroid fixed frame
         # desired_landing_spot = refine_site_plots(args.simulation_data)
         desired_landing_spot = np.array([0.47180473, -0.01972284, 0.36729988])
-        refine_landing_area(args.simulation_data, args.name, desired_landing_spot)
+        refine_landing_area(args.simulation_data, args.name, desired_landing_spot,
+                            resume=args.resume)
     elif args.landing_refine_animation:
         animate_refinement(args.simulation_data, move_cam=args.move_cam, mesh_weight=args.mesh_weight)
     elif args.landing_refine_save_animation:
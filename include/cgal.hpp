@@ -38,18 +38,40 @@ class RayCaster {
         
         void accelerate( void );
         
+        /**
+            Rebuild the tree after the vertices of the mesh moved
+
+            The primitives of the tree reference the faces of the mesh so 
+            only the hierarchy is rebuilt. Use this after the mesh is modified
+            in place (e.g. ReconstructMesh::update)
+        */
+        void refit( void );
+
+        /**
+            Set the rotation of the mesh
+
+            The tree is kept in the mesh (asteroid body) frame and all rays
+            are given in the inertial frame. The rays are rotated into the body
+            frame and the intersections rotated back. This replaces rebuilding
+            the tree with a rotated copy of the vertices.
+
+            @param Ra_in Rotation matrix from the body to inertial frame (rot_ast2int)
+        */
+        void set_rotation(const Eigen::Ref<const Eigen::Matrix3d>& Ra_in);
+        Eigen::Matrix3d get_rotation( void ) const { return Ra; }
+
         bool intersection(const Eigen::Ref<const Eigen::Vector3d>& psource,
-                          const Eigen::Ref<const Eigen::Vector3d>& ptarget);
+                          const Eigen::Ref<const Eigen::Vector3d>& ptarget) const;
 
         // cast ray function
         Eigen::Matrix<double, 1, 3> castray(const Eigen::Ref<const Eigen::Vector3d>& psource,
-                const Eigen::Ref<const Eigen::Vector3d>& ptarget);
+                const Eigen::Ref<const Eigen::Vector3d>& ptarget) const;
 
-        // cast many rays function
+        // cast many rays function (parallel over the rays)
         Eigen::Matrix<double, Eigen::Dynamic, 3> castarray(const Eigen::Ref<const Eigen::Vector3d> &psource,
-                                                           const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> > &targets);
+                                                           const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> > &targets) const;
     
-        // update the raycaster with a new mesh ptr
+        // update the raycaster with a new mesh ptr (refit if it is the same mesh)
         void update_mesh(std::shared_ptr<const MeshData> mesh_in);
         void update_mesh(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& V_in,
                          const Eigen::Ref<const Eigen::Matrix<int, Eigen::Dynamic, 3> >& F_in);
@@ -63,13 +85,15 @@ class RayCaster {
             @param pt Eigen::Vector3d point defining the test point
             @returns Double distance type
         */
-        double minimum_distance(const Eigen::Ref<const Eigen::Vector3d> &pt);
+        double minimum_distance(const Eigen::Ref<const Eigen::Vector3d> &pt) const;
 
         void minimum_primitive(const Eigen::Ref<const Eigen::Vector3d> &pt);
     private:
         // needs the mesh to operate on
         std::shared_ptr<const MeshData> mesh;
         AABB_Tree tree; // holds the AABB tree for CGAL distance computations
+        
+        Eigen::Matrix3d Ra = Eigen::Matrix3d::Identity(); // body to inertial frame
 };
 
 #endif
@@ -119,10 +119,77 @@ class TranslationController {
         Eigen::MatrixXd controller_vertices;
         Eigen::MatrixXi controller_faces;
         std::vector<std::vector<Vertex_index> > mesh_mapping;
+        Eigen::VectorXi vertex_controller; /**< Controller vertex of each mesh vertex, -1 if none */
+        
+        // control cost of each controller vertex and the inputs it was computed with
+        Eigen::VectorXd controller_cost;
+        Eigen::MatrixXd controller_cost_verts; /**< Mesh vertices when the cost was last updated */
+        double controller_cost_radius;
+        const Asteroid* controller_cost_ast;
+        double cost_vertex_tol; /**< Relative vertex motion that makes a region stale */
+        double cost_radius_tol; /**< Relative change of radius that makes every region stale */
 
         void generate_controller_mesh( void );
         void build_controller_mesh_mapping(std::shared_ptr<const MeshData> meshdata_ptr,
                                            const double& max_angle=0.53);
+        
+        /** @fn void update_controller_cost(const double& t, const double& radius,
+         *                                  std::shared_ptr<const ReconstructMesh> rmesh,
+         *                                  std::shared_ptr<Asteroid> ast_est)
+                
+            Update the cached control cost of the controller vertices. Only 
+            the controller vertices with a mapped mesh vertex that moved more 
+            than cost_vertex_tol are recomputed. Everything is recomputed for a 
+            new mesh or estimate, or if the radius changed by more than 
+            cost_radius_tol.
+
+            @param t Simulation time in seconds
+            @param radius Radius of the controller mesh
+            @param rmesh ReconstructMesh object with the estimated vertices
+            @param ast_est estimated asteroid object to compute the potential
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void update_controller_cost(const double& t, const double& radius,
+                                    std::shared_ptr<const ReconstructMesh> rmesh,
+                                    std::shared_ptr<Asteroid> ast_est);
+        
+        /** @fn Eigen::VectorXd mapped_controller_cost(const int& num_vertices) const
+                
+            Control cost of each mesh vertex from its controller vertex
+
+            @param num_vertices Number of vertices of the estimated mesh
+            @returns vertex_control_cost Cost of each vertex, zero if it is not mapped
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        Eigen::VectorXd mapped_controller_cost(const int& num_vertices) const;
+
+        /** @fn void set_desired_position(const Eigen::Ref<const Eigen::RowVector3d>& des_vector,
+         *                                const Eigen::Ref<const Eigen::Vector3d>& pos,
+         *                                std::shared_ptr<const ReconstructMesh> rmesh,
+         *                                std::shared_ptr<Asteroid> ast_est)
+                
+            Set the desired position above the chosen vertex at twice the 
+            largest axis. If the path intersects the mesh the first waypoint 
+            around it is used instead.
+
+            @param des_vector Vertex to view in the asteroid frame
+            @param pos Current position in the asteroid frame
+            @param rmesh ReconstructMesh object with the estimated mesh
+            @param ast_est estimated asteroid object
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void set_desired_position(const Eigen::Ref<const Eigen::RowVector3d>& des_vector,
+                                  const Eigen::Ref<const Eigen::Vector3d>& pos,
+                                  std::shared_ptr<const ReconstructMesh> rmesh,
+                                  std::shared_ptr<Asteroid> ast_est);
 
     public:
         TranslationController( void );
@@ -171,7 +238,9 @@ class TranslationController {
          *                                std::shared_ptr<Asteroid> ast_est)
                 
             Update the asteroid by computing the control cost for each vertex.
-            Need to input the inertial position of the spacecraft
+            Need to input the inertial position of the spacecraft. The control 
+            cost of the controller vertices is cached between calls and only
+            recomputed where the estimated mesh has changed.
 
             @param t Simulation time in seconds
             @param state Shared_ptr to current state
@@ -197,6 +266,52 @@ class TranslationController {
                                   std::shared_ptr<const ReconstructMesh> rmesh,
                                   std::shared_ptr<Asteroid> ast_est);
 
+        /** @fn void plan_horizon(const double& t,
+         *                        std::shared_ptr<const State> state,
+         *                        std::shared_ptr<const ReconstructMesh> rmesh,
+         *                        std::shared_ptr<Asteroid> ast_est,
+         *                        const int& horizon=3, const int& num_candidates=8,
+         *                        const double& max_angle=0.1)
+                
+            Receding horizon version of minimize_uncertainty. The candidates 
+            start at the num_candidates best vertices of the greedy cost and 
+            each one continues greedily for horizon views. Every view applies
+            a simulated measurement to a copy of the weights, with the same 
+            update as ReconstructMesh::update, so later views see the reduced
+            uncertainty. A view costs the decrease of the weights against the 
+            angle travelled and the control cost. The candidates are evaluated
+            in parallel and the desired position is the first view of the best
+            one.
+
+            @param t Simulation time in seconds
+            @param state Shared_ptr to current state
+                pos - interial frame positon wrt to asteroid
+            @param rmesh ReconstructMesh object holding the weights for all the 
+                estimated vertices
+            @param ast_est estimated asteroid object to compute the estimated
+                dynamics and rotation
+            @param horizon Number of views in each candidate
+            @param num_candidates Number of candidate view sequences
+            @param max_angle Max angle between a measurement and the vertices 
+                it updates, the same as for ReconstructMesh::update
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void plan_horizon(const double& t,
+                          std::shared_ptr<const State> state,
+                          std::shared_ptr<const ReconstructMesh> rmesh,
+                          std::shared_ptr<Asteroid> ast_est,
+                          const int& horizon=3, const int& num_candidates=8,
+                          const double& max_angle=0.1);
+        void plan_horizon(const double& t,
+                          const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >& state,
+                          std::shared_ptr<const ReconstructMesh> rmesh,
+                          std::shared_ptr<Asteroid> ast_est,
+                          const int& horizon=3, const int& num_candidates=8,
+                          const double& max_angle=0.1);
+
         Eigen::Matrix<double, 3, 1> get_posd( void ) const;
         Eigen::Matrix<double, 3, 1> get_veld( void ) const;
         Eigen::Matrix<double, 3, 1> get_acceld( void ) const;
@@ -204,6 +319,7 @@ class TranslationController {
         Eigen::MatrixXd get_controller_vertices( void ) const { return controller_vertices; }
         Eigen::MatrixXi get_controller_faces( void ) const { return controller_faces; }
         std::vector<std::vector<Vertex_index> > get_mesh_mapping( void ) const { return mesh_mapping; }
+        Eigen::VectorXd get_controller_cost( void ) const { return controller_cost; }
     protected:
         Eigen::Matrix<double, 3, 1> mposd; /**< Desired position in the asteroid fixed frame */
         Eigen::Matrix<double, 3, 1> mveld; /**< Desired velocity of com wrt to asteroid in asteroid frame */
@@ -280,6 +396,36 @@ class Controller: public TranslationController, public AttitudeController {
                 std::shared_ptr<const ReconstructMesh> rmesh,
                 std::shared_ptr<Asteroid> ast_est);
         
+        /** @fn void explore_asteroid_horizon(const double& t,
+         *                                    const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >& state,
+         *                                    std::shared_ptr<const ReconstructMesh> rmesh,
+         *                                    std::shared_ptr<Asteroid> ast_est,
+         *                                    const int& horizon=3, const int& num_candidates=8,
+         *                                    const double& max_angle=0.1)
+                
+            Explore an asteroid with the receding horizon planner 
+            TranslationController::plan_horizon and point at the asteroid
+
+            @param t Simulation time in seconds
+            @param state Current state, position in the inertial frame
+            @param rmesh ReconstructMesh object holding the weights for all the 
+                estimated vertices
+            @param ast_est estimated asteroid object
+            @param horizon Number of views in each candidate
+            @param num_candidates Number of candidate view sequences
+            @param max_angle Max angle of the simulated measurements
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void explore_asteroid_horizon(const double& t,
+                const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >& state,
+                std::shared_ptr<const ReconstructMesh> rmesh,
+                std::shared_ptr<Asteroid> ast_est,
+                const int& horizon=3, const int& num_candidates=8,
+                const double& max_angle=0.1);
+        
         void refinement(const double& t,
                 std::shared_ptr<const State> state,
                 std::shared_ptr<const ReconstructMesh> rmesh,
@@ -295,6 +441,21 @@ class Controller: public TranslationController, public AttitudeController {
         void set_vertices_in_view(std::shared_ptr<const ReconstructMesh> rmesh,
                 const Eigen::Ref<const Eigen::Vector3d>&  pos,
                 const double& max_angle);
+        
+        /** @fn void set_vertices_in_view(const Eigen::Ref<const Eigen::VectorXi>& index)
+                
+            Set the vertices in view directly from their indices, e.g. from
+            get_vertices_in_view when restarting from a checkpoint
+
+            @param index Vertex indices of the reconstructed mesh
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void set_vertices_in_view(const Eigen::Ref<const Eigen::VectorXi>& index);
+        Eigen::VectorXi get_vertices_in_view( void ) const;
+
         /** @fn Output a state object with the desired state
 
           Output a state object with the desired state
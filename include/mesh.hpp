@@ -186,7 +186,48 @@ class MeshData {
 
         double get_sum_face_factor( void ) const;
         
+        /** @fn const Eigen::Matrix<double, Eigen::Dynamic, 3>& get_vertex_table( void ) const
+                
+            Flat (structure of arrays) copies of the mesh data used by the 
+            polyhedron potential. Row i of each table corresponds to the 
+            Vertex/Face/Edge index i of the surface mesh.
+
+            The tables are built with the surface mesh and the affected rows
+            are updated whenever a vertex is moved (set_vertex), so they can be
+            read directly without walking the halfedge structure or looking up 
+            property maps. Dyads are stored row major, one 3x3 per row.
+
+            @returns Reference to the table
+
+            @author Shankar Kulumani
+            @version 18 October 2018
+        */
+        const Eigen::Matrix<double, Eigen::Dynamic, 3>& get_vertex_table( void ) const { return vertex_table; }
+        const Eigen::Matrix<int, Eigen::Dynamic, 3>& get_face_vertex_table( void ) const { return face_vertex_table; }
+        const Eigen::Matrix<double, Eigen::Dynamic, 9>& get_face_dyad_table( void ) const { return face_dyad_table; }
+        const Eigen::Matrix<int, Eigen::Dynamic, 2>& get_edge_vertex_table( void ) const { return edge_vertex_table; }
+        const Eigen::Matrix<double, Eigen::Dynamic, 9>& get_edge_dyad_table( void ) const { return edge_dyad_table; }
+        const Eigen::VectorXd& get_edge_length_table( void ) const { return edge_length_table; }
+
     private:
+        
+        Eigen::Matrix<double, Eigen::Dynamic, 3> vertex_table; /**< Vertex positions */
+        Eigen::Matrix<int, Eigen::Dynamic, 3> face_vertex_table; /**< Vertex indices of each face (halfedge order) */
+        Eigen::Matrix<double, Eigen::Dynamic, 9> face_dyad_table; /**< Face dyad of each face */
+        Eigen::Matrix<int, Eigen::Dynamic, 2> edge_vertex_table; /**< Vertex indices of each edge endpoint */
+        Eigen::Matrix<double, Eigen::Dynamic, 9> edge_dyad_table; /**< Edge dyad of each edge */
+        Eigen::VectorXd edge_length_table; /**< Length of each edge */
+        
+        /** @fn bool build_vertex_table( void )
+                
+            Copy all the vertex positions into the flat vertex table
+
+            @returns bool true if success
+
+            @author Shankar Kulumani
+            @version 18 October 2018
+        */
+        bool build_vertex_table( void );
 
         void build_surface_mesh(
                 const Eigen::Ref<const Eigen::MatrixXd>& V,
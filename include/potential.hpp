@@ -123,10 +123,27 @@ class Asteroid {
 
         void init_asteroid( void );
         
-        std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d> face_contribution(
-                const Eigen::Ref<const Eigen::Vector3d>& state) const;
-        std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d> edge_contribution(
-                const Eigen::Ref<const Eigen::Vector3d>& state) const;
+        
+        /** @fn void potential_block(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states,
+                Eigen::Ref<Eigen::VectorXd> U, Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 3> > U_grad,
+                Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 9> > U_grad_mat,
+                Eigen::Ref<Eigen::VectorXd> Ulaplace) const
+                
+            Compute the potential for a small block of field points with a 
+            single pass over the edges and faces of the mesh. The edge/face 
+            data is loaded once and then applied to every point in the block
+
+            @param states Block of field points in the asteroid fixed frame
+            @returns U, U_grad, U_grad_mat, Ulaplace Output blocks (same rows as states)
+
+            @author Shankar Kulumani
+            @version 18 October 2018
+        */
+        void potential_block(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states,
+                Eigen::Ref<Eigen::VectorXd> U,
+                Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 3> > U_grad,
+                Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 9> > U_grad_mat,
+                Eigen::Ref<Eigen::VectorXd> Ulaplace) const;
 
     public:
         Asteroid ( void ) {};
@@ -150,6 +167,50 @@ class Asteroid {
         */
         void polyhedron_potential(const Eigen::Ref<const Eigen::Vector3d>& state);
         
+        /** @fn std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d, double> compute_potential(
+                const Eigen::Ref<const Eigen::Vector3d>& state) const
+                
+            Compute the polyhedron potential at the given state and return the
+            result by value. This is const and re-entrant: the per-point edge
+            and face factors are kept in local buffers and nothing is written
+            to the mesh property maps or the member variables. A single
+            Asteroid can therefore be evaluated from many threads at once, 
+            as long as the mesh itself is not modified at the same time.
+
+            @param state Eigen Vector3d defining the state in the asteroid body fixed frame in km
+            @returns U potential, U_grad acceleration, U_grad_mat gradient matrix, Ulaplace laplacian
+
+            @author Shankar Kulumani
+            @version 18 October 2018
+        */
+        std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d, double> compute_potential(
+                const Eigen::Ref<const Eigen::Vector3d>& state) const;
+        
+        /** @fn polyhedron_potential_batch(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states, const std::size_t& block_size=64) const
+                
+            Compute the polyhedron potential at many field points at once.
+            The points are split into blocks and each block is evaluated with 
+            one pass over the mesh, so the two masses of the dumbbell or a 
+            large grid cost about the same as a single mesh traversal.
+
+            Nothing is stored in the member variables, so get_potential() etc.
+            are not modified by this call.
+
+            @param states Eigen (n x 3) array of field points in the asteroid fixed frame in km
+            @param block_size Number of points evaluated per pass over the mesh
+            @returns U (n) potential, U_grad (n x 3) acceleration, 
+                U_grad_mat (n x 9) row major gradient matrix, Ulaplace (n) laplacian
+
+            @author Shankar Kulumani
+            @version 18 October 2018
+        */
+        std::tuple<Eigen::VectorXd, 
+                   Eigen::Matrix<double, Eigen::Dynamic, 3>,
+                   Eigen::Matrix<double, Eigen::Dynamic, 9>,
+                   Eigen::VectorXd> polyhedron_potential_batch(
+                           const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states,
+                           const std::size_t& block_size=64) const;
+        
         /** @fn bool surface_slope( void )
                 
             Compute the surface slope for each face of the surface mesh
@@ -160,10 +221,10 @@ class Asteroid {
             @author Shankar Kulumani
             @version 10 June 2018
         */
-        Eigen::VectorXd surface_slope( void ) ;
-        double compute_face_slope(const Face_index& fd);
+        Eigen::VectorXd surface_slope( void ) const;
+        double compute_face_slope(const Face_index& fd) const;
         Eigen::Vector3d land_in_view(const Eigen::Ref<const Eigen::Vector3d>& cur_ast_pos,
-                const double& max_fov=0.52);
+                const double& max_fov=0.52) const;
 
         Eigen::Matrix<double, Eigen::Dynamic, 3> rotate_vertices(const double& time) const;
 
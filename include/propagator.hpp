@@ -0,0 +1,184 @@
+/**
+    Native propagation of the controlled dumbbell around an asteroid
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+#ifndef PROPAGATOR_H
+#define PROPAGATOR_H
+
+#include <Eigen/Dense>
+
+#include <functional>
+#include <memory>
+#include <tuple>
+
+class Asteroid;
+class ReconstructMesh;
+class Controller;
+
+typedef Eigen::Matrix<double, 1, 18> StateArray;
+
+/** @class Dumbbell
+
+    @brief Mass properties and control gains of the dumbbell spacecraft
+
+    Same definition as dynamics.dumbbell.Dumbbell in Python
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+class Dumbbell {
+    public:
+        Dumbbell(const double& m1_in=100.0, const double& m2_in=100.0,
+                 const double& l_in=0.003);
+        virtual ~Dumbbell( void ) {}
+
+        double m1, m2; /**< Mass of each sphere - kg */
+        double l; /**< Length of the link - km */
+        double r1, r2; /**< Radius of each sphere - km */
+
+        Eigen::Vector3d zeta1, zeta2; /**< Location of each mass from the COM in the body frame */
+        Eigen::Matrix<double, 3, 3> J; /**< Moment of inertia */
+
+        double kR, kW; /**< Attitude control gains */
+        double kx, kv; /**< Translation control gains */
+};
+
+/** @fn std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > dormand_prince(
+ *          const std::function<StateArray(const double&, const StateArray&)>& fun,
+ *          const Eigen::Ref<const StateArray>& initial_state,
+ *          const double& t0, const double& tf, const double& output_every,
+ *          const double& rtol=1e-9, const double& atol=1e-9,
+ *          const std::function<void(const double&, const StateArray&)>& callback=nullptr)
+
+    Integrate with the adaptive Dormand-Prince 5(4) method. The state is
+    output at t0, every output_every seconds after it and at tf. Without a
+    callback the outputs are interpolated with the 4th order dense output
+    and the steps are not shortened. With a callback the steps stop at every
+    output, the callback is called with the time and state, and the
+    integrator restarts so the callback may change the dynamics.
+
+    @param fun Right hand side fun(t, state)
+    @param initial_state State at t0
+    @param t0 Initial time
+    @param tf Final time
+    @param output_every Time between outputs
+    @param rtol Relative tolerance
+    @param atol Absolute tolerance
+    @param callback Called at every output after t0
+    @returns time, state Output times and the state at each of them
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > dormand_prince(
+        const std::function<StateArray(const double&, const StateArray&)>& fun,
+        const Eigen::Ref<const StateArray>& initial_state,
+        const double& t0, const double& tf, const double& output_every,
+        const double& rtol=1e-9, const double& atol=1e-9,
+        const std::function<void(const double&, const StateArray&)>& callback=nullptr);
+
+/** @class Propagator
+
+    @brief Controlled dumbbell dynamics and integration in C++
+
+    The equations of motion, gravity of the true and estimated asteroid and
+    the exploration controller are all evaluated in C++, the same as
+    dynamics.eoms.eoms_controlled_inertial_control_cost_pybind. A whole
+    trajectory is returned from a single call of propagate.
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+class Propagator {
+    public:
+        Propagator(std::shared_ptr<Asteroid> true_ast_in,
+                   std::shared_ptr<Asteroid> est_ast_in,
+                   std::shared_ptr<const ReconstructMesh> rmesh_in,
+                   std::shared_ptr<Controller> controller_in,
+                   const Dumbbell& dum_in);
+        virtual ~Propagator( void ) {}
+
+        // Named parameters idiom
+        inline Propagator& rtol(const double& rtol_in) {
+            mrtol = rtol_in;
+            return *this;
+        }
+
+        inline Propagator& atol(const double& atol_in) {
+            matol = atol_in;
+            return *this;
+        }
+
+        /** @fn Propagator& hold_decision(const bool& hold)
+
+            Plan once at the start of propagate and after every callback
+            instead of at every evaluation of the equations of motion, the
+            same as dynamics.controller.DecisionHold
+
+            @param hold True to hold the guidance decision
+            @returns Propagator Reference to this object
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        inline Propagator& hold_decision(const bool& hold) {
+            mhold_decision = hold;
+            return *this;
+        }
+
+        /** @fn StateArray eoms(const double& t, const StateArray& state)
+
+            Controlled dumbbell equations of motion in the inertial frame
+
+            @param t Simulation time
+            @param state pos, vel, R (row major, body to inertial) and ang_vel
+            @returns state_dot Derivative of the state
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        StateArray eoms(const double& t, const StateArray& state);
+
+        /** @fn std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > propagate(
+         *          const Eigen::Ref<const StateArray>& initial_state,
+         *          const double& t0, const double& tf, const double& callback_every=1.0,
+         *          const std::function<void(const double&, const StateArray&)>& callback=nullptr)
+
+            Integrate the controlled dynamics with dormand_prince
+
+            @param initial_state State at t0
+            @param t0 Initial time
+            @param tf Final time
+            @param callback_every Time between outputs (and callbacks)
+            @param callback Optional callback(t, state), e.g. to update the mesh
+            @returns time, state Output times and the state at each of them
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > propagate(
+                const Eigen::Ref<const StateArray>& initial_state,
+                const double& t0, const double& tf, const double& callback_every=1.0,
+                const std::function<void(const double&, const StateArray&)>& callback=nullptr);
+
+        int get_num_evaluations( void ) const { return num_evaluations; }
+
+    private:
+        void plan(const double& t, const StateArray& state);
+
+        std::shared_ptr<Asteroid> true_ast;
+        std::shared_ptr<Asteroid> est_ast;
+        std::shared_ptr<const ReconstructMesh> rmesh;
+        std::shared_ptr<Controller> controller;
+        Dumbbell dum;
+
+        double mrtol = 1e-9;
+        double matol = 1e-9;
+        bool mhold_decision = false;
+        bool planned = false; /**< True if the held decision is still valid */
+        int num_evaluations = 0; /**< Evaluations of the equations of motion */
+};
+
+#endif
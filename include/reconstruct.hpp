@@ -5,6 +5,136 @@
 
 #include <Eigen/Dense>
 #include <memory>
+#include <set>
+#include <unordered_map>
+#include <vector>
+
+/** @class SphereBins
+
+    @brief Uniform bins of unit vectors for angular neighbor queries
+
+    Unit vectors are binned in a cubic grid over [-1, 1]^3 with a cell size
+    at least as large as the chord between two unit vectors seperated by 
+    max_angle. All vectors within max_angle of a query are in the 27
+    neighboring cells.
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+class SphereBins {
+    public:
+        SphereBins(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& uvec,
+                   const double& max_angle);
+        
+        /** @fn void query(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+         *                 std::vector<std::size_t>& indices) const
+                
+            Find the candidate vectors close to uvec. Every vector within 
+            max_angle is returned, along with some further away.
+
+            @param uvec Unit vector to query
+            @param indices Output row indices of the candidate vectors
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void query(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+                   std::vector<std::size_t>& indices) const;
+
+    private:
+        Eigen::Vector3i index(const Eigen::Ref<const Eigen::Vector3d>& uvec) const;
+        long key(const Eigen::Ref<const Eigen::Vector3d>& uvec) const;
+
+        int num_cells; /**< Number of cells along each axis */
+        std::unordered_map<long, std::vector<std::size_t> > bins; /**< Row indices in each cell */
+};
+
+/** @class InformationMap
+
+    @brief Value of viewing each vertex, ordered for fast queries
+
+    The gain of each vertex, i.e. its weight, and its direction are kept in an 
+    ordered set. ReconstructMesh updates a vertex every time its weight 
+    changes, in O(log n), so the map is never rebuilt. The best viewing
+    directions from a position are found by visiting the vertices in order of 
+    decreasing gain and stopping once no vertex left can beat the k best.
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+class InformationMap {
+    public:
+        InformationMap( void ) {}
+        
+        /** @fn void set(const std::size_t& index,
+         *               const Eigen::Ref<const Eigen::Vector3d>& uvec,
+         *               const double& gain)
+                
+            Add or update a vertex
+
+            @param index Vertex index
+            @param uvec Unit vector of the vertex
+            @param gain Value of viewing the vertex, its weight
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void set(const std::size_t& index,
+                 const Eigen::Ref<const Eigen::Vector3d>& uvec,
+                 const double& gain);
+        
+        void clear( void );
+
+        /** @fn std::vector<std::size_t> top_k(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+         *                                     const std::size_t& k,
+         *                                     const double& gain_factor,
+         *                                     const double& angle_factor,
+         *                                     const Eigen::Ref<const Eigen::VectorXd>& extra_cost) const
+                
+            Find the k vertices of smallest cost
+
+                cost = - gain_factor * gain + angle_factor * sigma + extra_cost
+
+            where sigma is the central angle between uvec and the vertex. Ties 
+            are broken by the smaller index, the same as minCoeff on the cost 
+            of every vertex. Only the vertices with enough gain to beat the k 
+            best are visited.
+
+            @param uvec Unit vector of the current position
+            @param k Number of vertices
+            @param gain_factor Non-negative weighting of the gain
+            @param angle_factor Non-negative weighting of the central angle
+            @param extra_cost Non-negative cost of each vertex, or empty
+            @returns indices Vertex indices in order of increasing cost
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        std::vector<std::size_t> top_k(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+                                       const std::size_t& k,
+                                       const double& gain_factor,
+                                       const double& angle_factor,
+                                       const Eigen::Ref<const Eigen::VectorXd>& extra_cost=Eigen::VectorXd()) const;
+        
+        double max_gain( void ) const;
+        std::size_t size( void ) const { return ordered.size(); }
+
+    private:
+        struct GreaterGain {
+            bool operator()(const std::pair<double, std::size_t>& a,
+                            const std::pair<double, std::size_t>& b) const {
+                return a.first > b.first || (a.first == b.first && a.second < b.second);
+            }
+        };
+
+        std::set<std::pair<double, std::size_t>, GreaterGain> ordered; /**< (gain, index) by decreasing gain */
+        std::vector<double> gains; /**< Gain of each vertex */
+        std::vector<Eigen::Vector3d> uvecs; /**< Unit vector of each vertex */
+        std::vector<bool> present; /**< True if the vertex is in the map */
+};
+
 /** @class ReconstructMesh
 
     @brief Mesh reconstruction using radial vertex adjustment for an asteroid
@@ -53,8 +183,11 @@ class ReconstructMesh {
         /** @fn void update(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& pts,
          *                  const double& max_angle)
                 
-            Incorporate many points by treating each one in sequence using 
-            single_update
+            Incorporate many points with the same result as calling 
+            single_update for each one in sequence. The vertex unit vectors
+            are computed once, the vertices close to each measurement are
+            found with SphereBins, and the vertices are updated in parallel
+            since each vertex only depends on its own radius and weight.
 
             @param pots Array of measurements, nx3, in the asteroid frame
             @param max_angle Max angular seperation between the measurement and 
@@ -83,7 +216,39 @@ class ReconstructMesh {
 
         std::shared_ptr<MeshData> get_mesh( void ) const { return mesh; }
         
+        /** @fn const InformationMap& get_information_map( void ) const
+                
+            Gain of each vertex, kept up to date as the weights change. Only
+            changes made through this object are tracked.
+
+            @returns info_map Information map of the mesh
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        const InformationMap& get_information_map( void ) const { return info_map; }
+        
         void update_meshdata( void );
+        
+        /** @fn void set_mesh(const Eigen::Ref<const Eigen::MatrixXd>& v_in,
+         *                    const Eigen::Ref<const Eigen::MatrixXi>& f_in,
+         *                    const Eigen::Ref<const Eigen::VectorXd>& w_in)
+                
+            Replace the vertices, faces and weights of the mesh in place, e.g.
+            to restart a simulation from a checkpoint. Anything sharing the 
+            MeshData, like an Asteroid, sees the new mesh.
+
+            @param v_in Vertices nx3
+            @param f_in Faces mx3
+            @param w_in Weight of each vertex nx1
+            @returns None
+
+            @author Shankar Kulumani
+            @version 18 October 2026
+        */
+        void set_mesh(const Eigen::Ref<const Eigen::MatrixXd>& v_in,
+                      const Eigen::Ref<const Eigen::MatrixXi>& f_in,
+                      const Eigen::Ref<const Eigen::VectorXd>& w_in);
 
     private:
         
@@ -97,6 +262,7 @@ class ReconstructMesh {
         Eigen::VectorXd weights; /**< Weight for each vertex */
 
         std::shared_ptr<MeshData> mesh; /**< MeshData holding vertices */
+        InformationMap info_map; /**< Weights ordered for guidance queries */
 };
 
 /* template<typename T> */
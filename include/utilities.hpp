@@ -8,6 +8,10 @@
 
 bool assert_SO3(const Eigen::Ref<const Eigen::Matrix<double, 3, 3> > &R);
 
+// skew symmetric matrix such that hat_map(a) * b = a x b
+Eigen::Matrix<double, 3, 3> hat_map(const Eigen::Ref<const Eigen::Vector3d>& vec);
+Eigen::Vector3d vee_map(const Eigen::Ref<const Eigen::Matrix<double, 3, 3> >& mat);
+
 
 class Rand_double
 {
@@ -278,3 +278,160 @@ def map_edge_factor(r_v, e1, e2, e3, e1_vertex_map, e2_vertex_map, e3_vertex_map
    
     return L_edges[0], L_edges[1], L_edges[2]
 
+
+class PolyhedronGravity(object):
+    """Field point independent data of the polyhedron potential
+
+    Stores the flat face and unique edge tables (indices, dyads and edge
+    lengths) used by the potential so each evaluation is a few fused
+    contractions over preallocated arrays.
+
+    Attributes:
+        V - (v, 3) vertices
+        face_vertex - (f, 3) vertex indices of each face
+        face_dyad - (f, 3, 3) face dyads
+        edge_vertex - (e, 2) vertex indices of each unique edge
+        edge_dyad - (e, 3, 3) edge dyads
+        edge_length - (e,) length of each unique edge
+        G - gravitational constant
+        sigma - density
+    """
+    __slots__ = ('V', 'face_vertex', 'face_dyad', 'edge_vertex', 'edge_dyad',
+                 'edge_length', 'G', 'sigma')
+
+    def __init__(self, V, face_vertex, face_dyad, edge_vertex, edge_dyad, G, sigma):
+        self.V = np.ascontiguousarray(V, dtype=np.float64)
+        self.face_vertex = np.ascontiguousarray(face_vertex, dtype=np.int64)
+        self.face_dyad = np.ascontiguousarray(face_dyad, dtype=np.float64)
+        self.edge_vertex = np.ascontiguousarray(edge_vertex, dtype=np.int64)
+        self.edge_dyad = np.ascontiguousarray(edge_dyad, dtype=np.float64)
+        self.edge_length = np.linalg.norm(self.V[self.edge_vertex[:, 1], :]
+                                          - self.V[self.edge_vertex[:, 0], :], axis=1)
+        self.G = G
+        self.sigma = sigma
+
+    @classmethod
+    def from_asteroid_grav(cls, asteroid_grav, G, sigma):
+        """Build from the dictionary of dynamics.asteroid.Asteroid.polyhedron_shape_input
+        """
+        face_vertex = np.stack((asteroid_grav['Fa'], asteroid_grav['Fb'],
+                                asteroid_grav['Fc']), axis=1)
+        face_dyad = np.moveaxis(asteroid_grav['F_face'], 2, 0)
+
+        E_all = np.concatenate((asteroid_grav['E1_edge'], asteroid_grav['E2_edge'],
+                                asteroid_grav['E3_edge']), axis=2)
+        edge_dyad = np.moveaxis(E_all[:, :, asteroid_grav['unique_index']], 2, 0)
+
+        return cls(asteroid_grav['V'], face_vertex, face_dyad,
+                   asteroid_grav['e_vertex_map'], edge_dyad, G, sigma)
+
+    @classmethod
+    def from_mesh(cls, V, F, G, sigma):
+        """Build from the vertices and outward facing faces of a closed mesh
+
+        Used for the C++ asteroid, or any mesh, without the dictionary of
+        dynamics.asteroid.Asteroid.polyhedron_shape_input
+        """
+        V = np.asarray(V, dtype=np.float64)
+        F = np.asarray(F, dtype=np.int64)
+
+        a, b, c = V[F[:, 0], :], V[F[:, 1], :], V[F[:, 2], :]
+        normals = np.cross(b - a, c - a)
+        normals = normals / np.linalg.norm(normals, axis=1)[:, np.newaxis]
+        face_dyad = np.einsum('fi,fj->fij', normals, normals)
+
+        # directed edge (i, i+1) of each face and its outward in plane normal
+        start = F.reshape(-1)
+        end = np.roll(F, -1, axis=1).reshape(-1)
+        face_normals = np.repeat(normals, 3, axis=0)
+        edge_normals = np.cross(V[end, :] - V[start, :], face_normals)
+        edge_normals = edge_normals / np.linalg.norm(edge_normals, axis=1)[:, np.newaxis]
+
+        # each unique edge sums the dyads of the two faces that share it
+        edge_vertex, inverse = np.unique(np.sort(np.stack((start, end), axis=1), axis=1),
+                                         axis=0, return_inverse=True)
+        edge_dyad = np.zeros((edge_vertex.shape[0], 3, 3))
+        np.add.at(edge_dyad, inverse.reshape(-1),
+                  np.einsum('ei,ej->eij', face_normals, edge_normals))
+
+        return cls(V, F, face_dyad, edge_vertex, edge_dyad, G, sigma)
+
+    def potential(self, states, max_elements=2**22):
+        """Polyhedron potential at many field points
+
+        Points are processed in chunks so the (points, faces) work arrays have
+        at most about max_elements entries.
+
+        Parameters
+        ----------
+        states : (n, 3) array of positions in the asteroid fixed frame in km
+        max_elements : int size of the work arrays
+
+        Returns
+        -------
+        U : (n,) potential
+        U_grad : (n, 3) acceleration
+        U_grad_mat : (n, 3, 3) gradient matrix
+        Ulaplace : (n,) laplacian
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        num_p = states.shape[0]
+
+        U = np.zeros(num_p)
+        U_grad = np.zeros((num_p, 3))
+        U_grad_mat = np.zeros((num_p, 3, 3))
+        Ulaplace = np.zeros(num_p)
+
+        size = max(self.V.shape[0], self.face_vertex.shape[0], self.edge_vertex.shape[0])
+        chunk = max(1, max_elements // (9 * size))
+        for ii in range(0, num_p, chunk):
+            index = slice(ii, ii + chunk)
+            (U[index], U_grad[index, :],
+             U_grad_mat[index, :, :], Ulaplace[index]) = self._potential_chunk(states[index, :])
+
+        return U, U_grad, U_grad_mat, Ulaplace
+
+    def _potential_chunk(self, states):
+        r_v = self.V[np.newaxis, :, :] - states[:, np.newaxis, :]
+        r_norm = np.sqrt(np.einsum('pvi,pvi->pv', r_v, r_v))
+
+        # laplacian factor of each face
+        ri, rj, rk = [r_v[:, self.face_vertex[:, ii], :] for ii in range(3)]
+        ri_norm, rj_norm, rk_norm = [r_norm[:, self.face_vertex[:, ii]] for ii in range(3)]
+
+        num = np.einsum('pfi,pfi->pf', ri, np.cross(rj, rk))
+        den = (ri_norm * rj_norm * rk_norm
+               + ri_norm * np.einsum('pfi,pfi->pf', rj, rk)
+               + rj_norm * np.einsum('pfi,pfi->pf', rk, ri)
+               + rk_norm * np.einsum('pfi,pfi->pf', ri, rj))
+        w_face = 2.0 * np.arctan2(num, den)
+
+        # edge factor of each unique edge
+        re = r_v[:, self.edge_vertex[:, 0], :]
+        norm_sum = r_norm[:, self.edge_vertex[:, 0]] + r_norm[:, self.edge_vertex[:, 1]]
+        L_edge = np.log((norm_sum + self.edge_length) / (norm_sum - self.edge_length))
+
+        Fr = np.einsum('fjk,pfk->pfj', self.face_dyad, ri)
+        Er = np.einsum('ejk,pek->pej', self.edge_dyad, re)
+
+        U_face = np.einsum('pfj,pfj,pf->p', Fr, ri, w_face)
+        U_edge = np.einsum('pej,pej,pe->p', Er, re, L_edge)
+        U_grad_face = np.einsum('pfj,pf->pj', Fr, w_face)
+        U_grad_edge = np.einsum('pej,pe->pj', Er, L_edge)
+        U_grad_mat_face = np.einsum('fjk,pf->pjk', self.face_dyad, w_face)
+        U_grad_mat_edge = np.einsum('ejk,pe->pjk', self.edge_dyad, L_edge)
+
+        Gsigma = self.G * self.sigma
+        U = 1 / 2 * Gsigma * (U_edge - U_face)
+        U_grad = Gsigma * (U_grad_face - U_grad_edge)
+        U_grad_mat = Gsigma * (U_grad_mat_edge - U_grad_mat_face)
+        Ulaplace = -Gsigma * np.sum(w_face, axis=1)
+
+        # zero when outside body and -G*sigma*4 pi on the inside
+        inside = ~np.isclose(np.sum(w_face, axis=1), 0)
+        U[inside] = 0
+        U_grad[inside, :] = 0
+        U_grad_mat[inside, :, :] = 0
+        Ulaplace[inside] = 0
+
+        return U, U_grad, U_grad_mat, Ulaplace
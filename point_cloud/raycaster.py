@@ -161,37 +161,95 @@ class RayCaster(object):
         else:
             return intersection
     
-    def castarray(self, ps, targets):
+    def castarray(self, ps, targets, return_mask=False):
         r"""Cast many rays from ps to targets
 
         intersections = Lidar.castarray(source, targets)
+        intersections, hit = Lidar.castarray(source, targets, return_mask=True)
 
         Parameters
         ----------
-        ps : (3,) array
+        ps : (3,) or (n, 3) array
             Location of source. Position
         targets : (n, 3) array
             Targets that vectors should end at (from source to target)
+        return_mask : bool
+            Return all n rays and a mask of the hits instead of only the hits
 
         Returns
         -------
-        intersection: array_like
-            The intersections of each ray with the mesh
+        intersection: (m, 3) array
+            The first intersection of each ray which hit the mesh
+        hit : (n,) boolean array
+            Only if return_mask. Then intersection is (n, 3) and rays which
+            missed are nan
 
         See Also
         --------
-        castray : does ray casting for a single ray
+        castbatch : batched ray casting
 
         Author
         ------
         Shankar Kulumani		GWU		skulumani@gwu.edu
         """ 
-        all_intersections = []
-        for ii, pt in enumerate(targets):
-            intersection = self.castray(ps, pt)
-            all_intersections.append(intersection)
+        intersections, hit = self.castbatch(ps, targets)
 
-        return np.asarray(all_intersections)
+        if return_mask:
+            return intersections, hit
+        else:
+            return intersections[hit, :]
+
+    def castbatch(self, sources, targets):
+        r"""First intersection of many rays with the mesh
+
+        intersections, hit = caster.castbatch(sources, targets)
+
+        Casts every ray into preallocated output arrays, reusing a single
+        vtkPoints and only reading the first intersection. The rays are cast
+        one after another since the VTK locator is not thread safe.
+
+        Parameters
+        ----------
+        sources : (3,) or (n, 3) array
+            Start of each ray (or a single source for all rays)
+        targets : (n, 3) array
+            End of each ray
+
+        Returns
+        -------
+        intersections : (n, 3) array
+            First intersection of each ray. Rays which missed are nan
+        hit : (n,) boolean array
+            True if the ray hit the mesh
+
+        Author
+        ------
+        Shankar Kulumani		GWU		skulumani@gwu.edu
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+        sources = np.broadcast_to(np.asarray(sources, dtype=np.float64), targets.shape)
+        num_rays = targets.shape[0]
+
+        intersections = np.full((num_rays, 3), np.nan)
+        hit = np.zeros(num_rays, dtype=bool)
+
+        points = vtk.vtkPoints()
+        for ii in range(num_rays):
+            points.Reset()
+            if self.flag == 'bsp':
+                code = self.caster.IntersectWithLine(sources[ii], targets[ii],
+                                                     1e-9, points, None)
+            else:
+                code = self.caster.IntersectWithLine(sources[ii], targets[ii],
+                                                     points, None)
+
+            if code != 0 and points.GetNumberOfPoints() > 0:
+                intersections[ii, :] = points.GetPoint(0)
+                hit[ii] = True
+
+        logger.debug('{} of {} rays intersected the mesh'.format(np.sum(hit), num_rays))
+
+        return intersections, hit
 
     def ispointinside(self, point):
         """Check if a point lies inside the mesh using vtk
@@ -4,6 +4,8 @@
 
 #include <cmath>
 
+#include <omp.h>
+
 // Raycaster class
 RayCaster::RayCaster( void ) {
 
@@ -15,6 +17,7 @@ RayCaster::RayCaster(std::shared_ptr<const MeshData> mesh_in) {
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
     tree.accelerate_distance_queries();
 }
 
@@ -26,6 +29,7 @@ RayCaster::RayCaster(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
     tree.accelerate_distance_queries();
 }
 
@@ -34,6 +38,7 @@ void RayCaster::init_mesh(std::shared_ptr<const MeshData> mesh_in) {
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
 }
 
 void RayCaster::init_mesh(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& V_in,
@@ -43,19 +48,36 @@ void RayCaster::init_mesh(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dy
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
 }
 
 void RayCaster::accelerate( void ) {
     tree.accelerate_distance_queries();
 }
 
+void RayCaster::refit( void ) {
+    tree.build();
+    tree.accelerate_distance_queries();
+}
+
+void RayCaster::set_rotation(const Eigen::Ref<const Eigen::Matrix3d>& Ra_in) {
+    Ra = Ra_in;
+}
+
 void RayCaster::update_mesh(std::shared_ptr<const MeshData> mesh_in) {
+    // same mesh modified in place so the primitives are still valid
+    if (mesh_in == mesh) {
+        refit();
+        return;
+    }
+
     this->mesh.reset();
     mesh = mesh_in;
     this->tree.clear();
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
     tree.accelerate_distance_queries();
 }
 
@@ -70,24 +92,32 @@ void RayCaster::update_mesh(const Eigen::Ref<const Eigen::Matrix<double, Eigen::
     this->tree.insert(faces(this->mesh->surface_mesh).first,
             faces(this->mesh->surface_mesh).second,
             this->mesh->surface_mesh);
+    tree.build();
     tree.accelerate_distance_queries();
 }
 
 bool RayCaster::intersection(const Eigen::Ref<const Eigen::Vector3d>& psource,
-                             const Eigen::Ref<const Eigen::Vector3d>& ptarget) {
-    
-    Point a(psource(0), psource(1), psource(2));
-    Point b(ptarget(0), ptarget(1), ptarget(2));
+                             const Eigen::Ref<const Eigen::Vector3d>& ptarget) const {
+    // rotate the ray into the body frame
+    Eigen::Vector3d psource_b = Ra.transpose() * psource;
+    Eigen::Vector3d ptarget_b = Ra.transpose() * ptarget;
+
+    Point a(psource_b(0), psource_b(1), psource_b(2));
+    Point b(ptarget_b(0), ptarget_b(1), ptarget_b(2));
     Ray ray_query(a, b);
 
     return tree.do_intersect(ray_query);
 }
 
-Eigen::Matrix<double, 1, 3> RayCaster::castray(const Eigen::Ref<const Eigen::Vector3d>& psource, const Eigen::Ref<const Eigen::Vector3d>& ptarget) {
+Eigen::Matrix<double, 1, 3> RayCaster::castray(const Eigen::Ref<const Eigen::Vector3d>& psource, const Eigen::Ref<const Eigen::Vector3d>& ptarget) const {
     // TODO Also look at closest_point_and_primitive
+    // rotate the ray into the body frame
+    Eigen::Vector3d psource_b = Ra.transpose() * psource;
+    Eigen::Vector3d ptarget_b = Ra.transpose() * ptarget;
+
     // create a Point object
-    Point a(psource(0),psource(1),psource(2));
-    Point b(ptarget(0), ptarget(1), ptarget(2));
+    Point a(psource_b(0), psource_b(1), psource_b(2));
+    Point b(ptarget_b(0), ptarget_b(1), ptarget_b(2));
     Ray ray_query(a, b);
     Eigen::Matrix<double, 1, 3> pint(3);
 
@@ -97,8 +127,9 @@ Eigen::Matrix<double, 1, 3> RayCaster::castray(const Eigen::Ref<const Eigen::Vec
         // get intersection object
         const Point* p = boost::get<Point>(&(intersection->first));
         if (p) {
-            // output from function
+            // output from function (rotated back to the inertial frame)
             pint << CGAL::to_double(p->x()), CGAL::to_double(p->y()), CGAL::to_double(p->z());
+            pint = pint * Ra.transpose();
         } else {
             return pint.setZero();
         }
@@ -111,13 +142,14 @@ Eigen::Matrix<double, 1, 3> RayCaster::castray(const Eigen::Ref<const Eigen::Vec
 }
 
 Eigen::Matrix<double, Eigen::Dynamic, 3> RayCaster::castarray(const Eigen::Ref<const Eigen::Vector3d> &psource,
-                                                              const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> > &targets) {
+                                                              const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> > &targets) const {
     
-
     int num_targets = targets.rows();
 
     Eigen::Matrix<double, Eigen::Dynamic, 3> all_intersections(num_targets, 3);
-
+    
+    // the tree is built in the constructor/update so the queries are read only
+    #pragma omp parallel for if(num_targets > 1)
     for (int ii = 0; ii < num_targets; ++ii) {
         all_intersections.row(ii) = this->castray(psource, targets.row(ii));
     }
@@ -126,10 +158,12 @@ Eigen::Matrix<double, Eigen::Dynamic, 3> RayCaster::castarray(const Eigen::Ref<c
 }
 
 // TODO Modify this to compute distance instead of doing raycasting
-double RayCaster::minimum_distance(const Eigen::Ref<const Eigen::Vector3d> &pt) {
+double RayCaster::minimum_distance(const Eigen::Ref<const Eigen::Vector3d> &pt) const {
+    // rotate the point into the body frame
+    Eigen::Vector3d pt_b = Ra.transpose() * pt;
 
     // create a Point object
-    Point a(pt(0), pt(1), pt(2));
+    Point a(pt_b(0), pt_b(1), pt_b(2));
     
     return sqrt(CGAL::to_double(tree.squared_distance(a)));
  }
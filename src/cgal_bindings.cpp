@@ -37,8 +37,13 @@ PYBIND11_MODULE(cgal, m) {
         .def("minimum_distance", &RayCaster::minimum_distance, "Minimum distance from point to mesh",
                 pybind11::arg("pt"))
         .def("castarray", &RayCaster::castarray, "Cast many rays to the targets",
-                pybind11::arg("psource"), pybind11::arg("targets"))
+                pybind11::arg("psource"), pybind11::arg("targets"),
+                pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("accelerate", &RayCaster::accelerate, "Call the distance acceleration setup")
+        .def("refit", &RayCaster::refit, "Rebuild the tree after the mesh vertices moved")
+        .def("set_rotation", &RayCaster::set_rotation, "Set the body to inertial rotation of the mesh",
+                pybind11::arg("Ra"))
+        .def("get_rotation", &RayCaster::get_rotation, "Get the body to inertial rotation of the mesh")
         .def("intersection", &RayCaster::intersection, "Check for intersection between source and target",
                 pybind11::arg("psource"), pybind11::arg("ptarget"));
 
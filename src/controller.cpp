@@ -16,6 +16,7 @@
 #include <memory>
 #include <iostream>
 #include <cassert>
+#include <algorithm>
 
 
 AttitudeController::AttitudeController( void ) {
@@ -142,6 +143,11 @@ TranslationController::TranslationController( void ) {
     mposd.setZero(3);
     mveld.setZero(3);
     macceld.setZero(3);
+    
+    controller_cost_radius = 0;
+    controller_cost_ast = nullptr;
+    cost_vertex_tol = 1e-2;
+    cost_radius_tol = 1e-2;
 
 }
 
@@ -151,6 +157,11 @@ TranslationController::TranslationController(std::shared_ptr<const MeshData> mes
     mposd.setZero(3);
     mveld.setZero(3);
     macceld.setZero(3);
+    
+    controller_cost_radius = 0;
+    controller_cost_ast = nullptr;
+    cost_vertex_tol = 1e-2;
+    cost_radius_tol = 1e-2;
 
     generate_controller_mesh();
     build_controller_mesh_mapping(meshdata_ptr, max_angle);
@@ -174,36 +185,128 @@ void TranslationController::build_controller_mesh_mapping(
         std::shared_ptr<const MeshData> meshdata_ptr, const double& max_angle) {
     
     mesh_mapping.clear();
-    mesh_mapping.resize(meshdata_ptr->number_of_vertices());
-    // define some references
-    const Eigen::MatrixXd highres_vertices = meshdata_ptr->get_verts();
-    const Eigen::MatrixXi highres_faces = meshdata_ptr->get_faces();
+    mesh_mapping.resize(controller_vertices.rows());
     
-    Eigen::VectorXd cos_angle(highres_vertices.rows()); 
-    Eigen::VectorXd max_angle_vec(highres_vertices.rows());
-    max_angle_vec.setConstant(cos(max_angle));
-
-    Eigen::MatrixXd highres_vertices_uvec(highres_vertices.rows(), 3), 
-                    controller_uvec(highres_vertices.rows(), 3);
-    highres_vertices_uvec = highres_vertices.rowwise().normalized();
+    const Eigen::MatrixXd highres_vertices_uvec = meshdata_ptr->get_verts().rowwise().normalized();
+    const double cos_max_angle = cos(max_angle);
     
-    Eigen::Array<bool, Eigen::Dynamic, 1> angle_condition(highres_vertices.rows());
-    Eigen::VectorXi angle_index;
+    // only the mesh vertices in neighboring bins can be within max_angle
+    SphereBins bins(highres_vertices_uvec, max_angle);
     
     // loop over the low resolution mesh
-    /* #pragma omp parallel for */
+    #pragma omp parallel for
     for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
         Eigen::Vector3d controller_uvec = controller_vertices.row(ii).normalized();
-        
-        for (Vertex_index vd : meshdata_ptr->vertices()) {
-            double cos_angle = controller_uvec.dot(meshdata_ptr->get_vertex(vd));
+        std::vector<std::size_t> candidates;
+        bins.query(controller_uvec, candidates);
+        std::sort(candidates.begin(), candidates.end());
 
-            if (cos_angle > max_angle) {
-                mesh_mapping[ii].push_back(vd);
+        for (std::size_t index : candidates) {
+            if (controller_uvec.dot(highres_vertices_uvec.row(index)) >= cos_max_angle) {
+                mesh_mapping[ii].push_back(Vertex_index(index));
             }
         }
     }
     
+    // inverse mapping, each mesh vertex takes the cost of the last controller vertex
+    vertex_controller.setConstant(highres_vertices_uvec.rows(), -1);
+    for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
+        for (Vertex_index vd : mesh_mapping[ii]) {
+            vertex_controller((int)vd) = ii;
+        }
+    }
+}
+
+void TranslationController::update_controller_cost(const double& t, const double& radius,
+        std::shared_ptr<const ReconstructMesh> rmesh,
+        std::shared_ptr<Asteroid> ast_est) {
+
+    const Eigen::MatrixXd verts = rmesh->get_verts();
+    Eigen::Array<bool, Eigen::Dynamic, 1> stale(controller_vertices.rows());
+    Eigen::Array<bool, Eigen::Dynamic, 1> moved(verts.rows());
+    
+    if (controller_cost.size() != controller_vertices.rows()
+            || controller_cost_verts.rows() != verts.rows()
+            || controller_cost_ast != ast_est.get()
+            || std::abs(radius - controller_cost_radius) > cost_radius_tol * controller_cost_radius) {
+        // new mesh, estimate or radius so every controller vertex is stale
+        stale.setConstant(true);
+        moved.setConstant(true);
+        controller_cost.setZero(controller_vertices.rows());
+        controller_cost_verts = verts;
+        controller_cost_radius = radius;
+        controller_cost_ast = ast_est.get();
+    } else {
+        // only the regions with a mesh vertex that moved since its last update
+        moved = (verts - controller_cost_verts).rowwise().norm().array()
+            > cost_vertex_tol * controller_cost_verts.rowwise().norm().array();
+        stale.setConstant(false);
+        for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
+            for (Vertex_index vd : mesh_mapping[ii]) {
+                if (moved((int)vd)) {
+                    stale(ii) = true;
+                    break;
+                }
+            }
+        }
+    }
+    
+    // control_cost rotates to the asteroid frame so give it the inertial position
+    Eigen::Matrix<double, 3, 3> Ra = ast_est->rot_ast2int(t);
+    for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
+        if (stale(ii)) {
+            controller_cost(ii) = control_cost(t,
+                    controller_cost_radius * controller_vertices.row(ii) * Ra.transpose(), ast_est);
+        }
+    }
+
+    // moved vertices are the new reference, the rest accumulate until they move enough
+    for (int jj = 0; jj < verts.rows(); ++jj) {
+        if (moved(jj)) {
+            controller_cost_verts.row(jj) = verts.row(jj);
+        }
+    }
+}
+
+Eigen::VectorXd TranslationController::mapped_controller_cost(const int& num_vertices) const {
+    // now use the mapping to fill for each of the estimated vertices
+    Eigen::VectorXd vertex_control_cost(num_vertices);
+    vertex_control_cost.setZero();
+    for (int jj = 0; jj < std::min((int)vertex_controller.size(), num_vertices); ++jj) {
+        if (vertex_controller(jj) >= 0) {
+            vertex_control_cost(jj) = controller_cost(vertex_controller(jj));
+        }
+    }
+    return vertex_control_cost;
+}
+
+void TranslationController::set_desired_position(
+        const Eigen::Ref<const Eigen::RowVector3d>& des_vector,
+        const Eigen::Ref<const Eigen::Vector3d>& pos,
+        std::shared_ptr<const ReconstructMesh> rmesh,
+        std::shared_ptr<Asteroid> ast_est) {
+    
+    if (rmesh->get_weights().sum() < 1e-2) {
+        caster.update_mesh(rmesh->get_mesh());
+        double desired_radius = ast_est->get_axes().maxCoeff() * 2.0;
+        mposd = (Eigen::Vector3d() << desired_radius, 0 ,0).finished();
+    } else {
+        double desired_radius = ast_est->get_axes().maxCoeff() * 2.0;
+        mposd = des_vector.normalized() * desired_radius;
+    }
+    // check for intersection only if angle is large to the des_vector
+    if (std::acos(mposd.dot(pos) / pos.norm() / mposd.norm()) > kPI/4.0) {
+        caster.update_mesh(rmesh->get_mesh());
+        if (caster.intersection(pos,  mposd)) {
+            Eigen::Matrix<double, Eigen::Dynamic, 3> wp(5, 3);
+            wp = sphere_waypoint(pos, mposd, 5);
+            mposd = wp.row(1);
+        }
+    }
+    // check if the total uncertainty is low enough and if so go the first
+    // waypoint towards a desired position
+    mveld.setZero(3);
+    macceld.setZero(3);
 }
 
 void TranslationController::inertial_fixed_state(std::shared_ptr<const State> des_state) {
@@ -234,9 +337,9 @@ double control_cost(const double& t,
     Eigen::Matrix<double, 1, 3> z = (Ra.transpose() * pos_des.transpose()).transpose();
     
 
-    ast_est->polyhedron_potential(z);
+    Eigen::Vector3d U_grad = std::get<1>(ast_est->compute_potential(z.transpose()));
 
-    Eigen::Matrix<double, 3, 1> control = -(Ra * ast_est->get_acceleration()) * (m1 + m2);
+    Eigen::Matrix<double, 3, 1> control = -(Ra * U_grad) * (m1 + m2);
     
     double cost = (1.0 / max_potential) * control.transpose() * control;
     
@@ -277,20 +380,19 @@ double integrate_control_cost(const double& t,
 void TranslationController::minimize_uncertainty(std::shared_ptr<const State> state,
                                                  std::shared_ptr<const ReconstructMesh> rmesh) {
     // the state postion should be in the asteroid frame!    
-    double max_weight = rmesh->get_weights().maxCoeff();
+    const InformationMap& info_map = rmesh->get_information_map();
+    double max_weight = info_map.max_gain();
     double max_sigma = kPI;
     
     double alpha(0.5);
     // Cost of each vertex as weighted sum of vertex weight and sigma of each vertex
-    Eigen::VectorXd sigma = central_angle(state->get_pos().normalized(), rmesh->get_verts().rowwise().normalized());
-    Eigen::VectorXd cost = - (1 - alpha) *rmesh->get_weights().array()/max_weight + alpha * sigma.array()/max_sigma ;
     // now find min index of cost
-    Eigen::MatrixXd::Index min_cost_index;
-    cost.minCoeff(&min_cost_index);
+    std::vector<std::size_t> min_cost_index = info_map.top_k(state->get_pos().normalized(), 1,
+            (1 - alpha) / max_weight, alpha / max_sigma);
 
     Eigen::RowVector3d des_vector;
 
-    des_vector = rmesh->get_verts().row(min_cost_index);
+    des_vector = rmesh->get_vertex(Vertex_index(min_cost_index[0])).transpose();
     // pick out the corresponding vertex of the asteroid that should be viewed
     // use current norm of position and output a position with same radius but just above the minium point
     double current_radius = state->get_pos().norm();
@@ -313,80 +415,35 @@ void TranslationController::minimize_uncertainty(const double& t,
         std::shared_ptr<const ReconstructMesh> rmesh,
         std::shared_ptr<Asteroid> ast_est) {
     
-    double max_weight = rmesh->get_weights().maxCoeff();
+    const InformationMap& info_map = rmesh->get_information_map();
+    double max_weight = info_map.max_gain();
     double max_sigma = kPI;
     double min_axis = ast_est->get_axes().minCoeff();
-    ast_est->polyhedron_potential((Eigen::Vector3d() << 0, 0, min_axis).finished());
-    double max_accel = ast_est->get_acceleration().norm();
+    double max_accel = std::get<1>(ast_est->compute_potential(
+                (Eigen::Vector3d() << 0, 0, min_axis).finished())).norm();
 
-    const int num_waypoints = 1;
-    
     // weighting for each of the cost components
     double weighting_factor(0.5); /**< Weighting factor between distance and ucnertainty */
     double sigma_factor(0.5);
     double control_factor(0.1);
     
     // Rotate the position to the asteroid fixed frame
-    Eigen::Vector3d pos = state->get_pos();
-
     Eigen::Matrix<double, 3, 3> Ra = ast_est->rot_ast2int(t);
-    pos = Ra.transpose() * state->get_pos();
+    Eigen::Vector3d pos = Ra.transpose() * state->get_pos();
      
-    // compute the potential for each of the states in the controller mesh (controller vertices)
-    Eigen::VectorXd vertex_control_cost(rmesh->number_of_vertices());
-    vertex_control_cost.setZero();
-    Eigen::Matrix<double, Eigen::Dynamic, 3> waypoints(num_waypoints, 3);
-    double vcc_low_res = 0;
-
-    for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
-        if (num_waypoints != 1) {
-            waypoints = sphere_waypoint(pos, pos.norm() * controller_vertices.row(ii), num_waypoints);
-            vcc_low_res = integrate_control_cost(t, waypoints, ast_est);        
-        } else {
-            vcc_low_res = control_cost(t, pos.norm() * controller_vertices.row(ii), ast_est);
-        }
+    // potential for each of the states in the controller mesh (controller vertices)
+    update_controller_cost(t, pos.norm(), rmesh, ast_est);
 
-        // now use the mapping to fill for each of the estimated vertices
-        for (int jj = 0; jj < mesh_mapping[ii].size(); ++jj) {
-            int index = (int)mesh_mapping[ii][jj];
-            vertex_control_cost(index) = vcc_low_res;
-        }
-    }
+    Eigen::VectorXd vertex_control_cost = mapped_controller_cost(rmesh->number_of_vertices());
 
     // Cost of each vertex as weighted sum of vertex weight and sigma of each vertex
-    Eigen::VectorXd sigma = central_angle(pos.normalized(),rmesh->get_verts().rowwise().normalized() );
-    Eigen::VectorXd cost = - weighting_factor * rmesh->get_weights().array()/max_weight 
-        + sigma_factor * sigma.array()/max_sigma
-        + control_factor * vertex_control_cost.array() / max_accel;
-    
     // now find min index of cost
-    Eigen::MatrixXd::Index min_cost_index;
-    cost.minCoeff(&min_cost_index);
+    std::vector<std::size_t> min_cost_index = info_map.top_k(pos.normalized(), 1,
+            weighting_factor / max_weight, sigma_factor / max_sigma,
+            control_factor * vertex_control_cost / max_accel);
     // get the desired vector
-    Eigen::RowVector3d des_vector;
-    des_vector = rmesh->get_verts().row(min_cost_index);
-    
-    if (rmesh->get_weights().sum() < 1e-2) {
-        caster.update_mesh(rmesh->get_mesh());
-        double desired_radius = ast_est->get_axes().maxCoeff() * 2.0;
-        mposd = (Eigen::Vector3d() << desired_radius, 0 ,0).finished();
-    } else {
-        double desired_radius = ast_est->get_axes().maxCoeff() * 2.0;
-        mposd = des_vector.normalized() * desired_radius;
-    }
-    // check for intersection only if angle is large to the des_vector
-    if (std::acos(mposd.dot(pos) / pos.norm() / mposd.norm()) > kPI/4.0) {
-        caster.update_mesh(rmesh->get_mesh());
-        if (caster.intersection(pos,  mposd)) {
-            Eigen::Matrix<double, Eigen::Dynamic, 3> wp(5, 3);
-            wp = sphere_waypoint(pos, mposd, 5);
-            mposd = wp.row(1);
-        }
-    }
-    // check if the total uncertainty is low enough and if so go the first
-    // waypoint towards a desired position
-    mveld.setZero(3);
-    macceld.setZero(3);
+    set_desired_position(rmesh->get_vertex(Vertex_index(min_cost_index[0])).transpose(),
+                         pos, rmesh, ast_est);
 }
 
 void TranslationController::minimize_uncertainty(const double& t,
@@ -401,6 +458,114 @@ void TranslationController::minimize_uncertainty(const double& t,
     minimize_uncertainty(t, state_ptr, rmesh, ast_est);
 }
 
+// Apply a simulated measurement at pt to the weights and return the decrease of
+// the total weight
+static double predict_measurement(const Eigen::Ref<const Eigen::RowVector3d>& pt,
+                           const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& verts_uvec,
+                           const SphereBins& bins, const double& max_angle,
+                           Eigen::Ref<Eigen::VectorXd> weights) {
+    Eigen::Vector3d pt_uvec = pt.normalized();
+    double pt_radius = pt.norm();
+    double reduction = 0;
+
+    std::vector<std::size_t> candidates;
+    bins.query(pt_uvec, candidates);
+    for (std::size_t vd : candidates) {
+        double delta_sigma = single_central_angle(pt_uvec, verts_uvec.row(vd).transpose());
+        if (delta_sigma < max_angle) {
+            // same weight update as ReconstructMesh::update
+            double meas_weight = pow(delta_sigma * pt_radius, 2);
+            double weight = weights(vd);
+            double weight_new = 0;
+            if (weight + meas_weight > 0) {
+                weight_new = (weight * meas_weight) / (weight + meas_weight);
+            }
+            reduction += weight - weight_new;
+            weights(vd) = weight_new;
+        }
+    }
+    return reduction;
+}
+
+void TranslationController::plan_horizon(const double& t,
+        std::shared_ptr<const State> state,
+        std::shared_ptr<const ReconstructMesh> rmesh,
+        std::shared_ptr<Asteroid> ast_est,
+        const int& horizon, const int& num_candidates, const double& max_angle) {
+    
+    const Eigen::VectorXd weights = rmesh->get_weights();
+    const Eigen::MatrixXd verts = rmesh->get_verts();
+    const Eigen::MatrixXd verts_uvec = verts.rowwise().normalized();
+    const InformationMap& info_map = rmesh->get_information_map();
+
+    double max_weight = info_map.max_gain();
+    double max_sigma = kPI;
+    double min_axis = ast_est->get_axes().minCoeff();
+    double max_accel = std::get<1>(ast_est->compute_potential(
+                (Eigen::Vector3d() << 0, 0, min_axis).finished())).norm();
+    
+    // same weighting as minimize_uncertainty
+    double weighting_factor(0.5);
+    double sigma_factor(0.5);
+    double control_factor(0.1);
+
+    // Rotate the position to the asteroid fixed frame
+    Eigen::Matrix<double, 3, 3> Ra = ast_est->rot_ast2int(t);
+    Eigen::Vector3d pos = Ra.transpose() * state->get_pos();
+
+    update_controller_cost(t, pos.norm(), rmesh, ast_est);
+    const Eigen::VectorXd view_cost = control_factor 
+        * mapped_controller_cost(rmesh->number_of_vertices()).array() / max_accel;
+    
+    // the candidates start at the best vertices of the greedy cost
+    const std::vector<std::size_t> first = info_map.top_k(pos.normalized(),
+            std::max(num_candidates, 1), weighting_factor / max_weight, sigma_factor / max_sigma,
+            view_cost);
+    const int num_first = first.size();
+    
+    // each candidate sequence continues greedily on its own predicted weights
+    SphereBins bins(verts_uvec, max_angle);
+    Eigen::VectorXd score(num_first);
+    #pragma omp parallel for schedule(dynamic)
+    for (int kk = 0; kk < num_first; ++kk) {
+        Eigen::VectorXd predicted_weights = weights;
+        Eigen::Vector3d view_uvec = pos.normalized();
+        Eigen::MatrixXd::Index view = first[kk];
+        double total_cost = 0;
+
+        for (int hh = 0; hh < horizon; ++hh) {
+            if (hh > 0) {
+                (- weighting_factor * predicted_weights.array() / max_weight 
+                 + sigma_factor * central_angle(view_uvec.transpose(), verts_uvec).array() / max_sigma
+                 + view_cost.array()).minCoeff(&view);
+            }
+            
+            Eigen::Vector3d next_uvec = verts_uvec.row(view).transpose();
+            double reduction = predict_measurement(verts.row(view), verts_uvec, bins, max_angle,
+                                                   predicted_weights);
+            total_cost += - weighting_factor * reduction / max_weight
+                + sigma_factor * single_central_angle(view_uvec, next_uvec) / max_sigma
+                + view_cost(view);
+            view_uvec = next_uvec;
+        }
+        score(kk) = total_cost;
+    }
+
+    Eigen::MatrixXd::Index best;
+    score.minCoeff(&best);
+    set_desired_position(verts.row(first[best]), pos, rmesh, ast_est);
+}
+
+void TranslationController::plan_horizon(const double& t,
+        const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >& state,
+        std::shared_ptr<const ReconstructMesh> rmesh,
+        std::shared_ptr<Asteroid> ast_est,
+        const int& horizon, const int& num_candidates, const double& max_angle) {
+
+    std::shared_ptr<State> state_ptr = std::make_shared<State>(t, state);
+    plan_horizon(t, state_ptr, rmesh, ast_est, horizon, num_candidates, max_angle);
+}
+
 Eigen::Matrix<double, 3, 1> TranslationController::get_posd( void ) const {
     return mposd;
 }
@@ -475,6 +640,19 @@ void Controller::explore_asteroid(const double& t,
     body_fixed_pointing_attitude(new_state);
 }
 
+void Controller::explore_asteroid_horizon(const double& t,
+        const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >& state,
+        std::shared_ptr<const ReconstructMesh> rmesh_ptr,
+        std::shared_ptr<Asteroid> ast_est_ptr,
+        const int& horizon, const int& num_candidates, const double& max_angle) {
+    // plan over the horizon but only go to the first view
+    plan_horizon(t, state, rmesh_ptr, ast_est_ptr, horizon, num_candidates, max_angle);
+
+    std::shared_ptr<State> new_state = get_desired_state();
+    // find new attitude in asteroid frame
+    body_fixed_pointing_attitude(new_state);
+}
+
 void Controller::set_vertices_in_view( std::shared_ptr<const ReconstructMesh> rmesh,
         const Eigen::Ref<const Eigen::Vector3d>& pos,
         const double& max_angle) {
@@ -483,6 +661,22 @@ void Controller::set_vertices_in_view( std::shared_ptr<const ReconstructMesh> rm
     num_vertices_in_view = vertices_in_view.size();
 }
 
+void Controller::set_vertices_in_view(const Eigen::Ref<const Eigen::VectorXi>& index) {
+    vertices_in_view.clear();
+    for (int ii = 0; ii < index.size(); ++ii) {
+        vertices_in_view.push_back(Vertex_index(index(ii)));
+    }
+    num_vertices_in_view = vertices_in_view.size();
+}
+
+Eigen::VectorXi Controller::get_vertices_in_view( void ) const {
+    Eigen::VectorXi index(vertices_in_view.size());
+    for (std::size_t ii = 0; ii < vertices_in_view.size(); ++ii) {
+        index(ii) = (int)vertices_in_view[ii];
+    }
+    return index;
+}
+
 void Controller::refinement(const double& t,
         std::shared_ptr<const State> state,
         std::shared_ptr<const ReconstructMesh> rmesh,
@@ -55,6 +55,10 @@ PYBIND11_MODULE(controller, m) {
                                                        std::shared_ptr<Asteroid>)) &Controller::explore_asteroid,
                 "Explore asteroid with a control cost component",
                 pybind11::arg("time"), pybind11::arg("state"), pybind11::arg("reconstruct_mesh"), pybind11::arg("asteroid"))
+        .def("explore_asteroid_horizon", &Controller::explore_asteroid_horizon,
+                "Explore asteroid with the receding horizon planner",
+                pybind11::arg("time"), pybind11::arg("state"), pybind11::arg("reconstruct_mesh"), pybind11::arg("asteroid"),
+                pybind11::arg("horizon") = 3, pybind11::arg("num_candidates") = 8, pybind11::arg("max_angle") = 0.1)
         .def("refinement", (void (Controller::*)(
                         const double&,
                         const Eigen::Ref<const Eigen::Matrix<double, 1, 18> >&,
@@ -64,8 +68,15 @@ PYBIND11_MODULE(controller, m) {
                 "Refine specific area by rotating camera and pointing",
                 pybind11::arg("time"), pybind11::arg("state"), pybind11::arg("reconstruct mesh"), 
                 pybind11::arg("asteroid estimate"), pybind11::arg("desired landing site in asteroid frame"))
-        .def("set_vertices_in_view", &Controller::set_vertices_in_view, "Set the vertices that are in view of a specific point",
-                pybind11::arg("ReconstructMesh shared ptr"), pybind11::arg("pos in asteroid frame"), pybind11::arg("max angle in radians"));
+        .def("set_vertices_in_view", (void (Controller::*)(std::shared_ptr<const ReconstructMesh>,
+                        const Eigen::Ref<const Eigen::Vector3d>&,
+                        const double&)) &Controller::set_vertices_in_view,
+                "Set the vertices that are in view of a specific point",
+                pybind11::arg("ReconstructMesh shared ptr"), pybind11::arg("pos in asteroid frame"), pybind11::arg("max angle in radians"))
+        .def("set_vertices_in_view", (void (Controller::*)(const Eigen::Ref<const Eigen::VectorXi>&)) &Controller::set_vertices_in_view,
+                "Set the vertices in view from their indices",
+                pybind11::arg("vertex indices"))
+        .def("get_vertices_in_view", &Controller::get_vertices_in_view, "Get the indices of the vertices in view");
 
     
     // TODO Add overload for explore asteroid function then add here as well
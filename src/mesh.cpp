@@ -80,9 +80,20 @@ void MeshData::build_surface_mesh(const Eigen::Ref<const Eigen::MatrixXd> & V,
             {edge_built = build_edge_properties();}
         }
     }
+    build_vertex_table();
+}
+
+bool MeshData::build_vertex_table( void ) {
+    vertex_table.resize(surface_mesh.number_of_vertices(), 3);
+    for (Vertex_index vd: surface_mesh.vertices()) {
+        vertex_table.row((int)vd) = get_vertex(vd);
+    }
+    return true;
 }
 
 bool MeshData::build_face_properties( void ) {
+    face_vertex_table.resize(surface_mesh.number_of_faces(), 3);
+    face_dyad_table.resize(surface_mesh.number_of_faces(), 9);
     // loop over all faces need to dereference the iterators but not the index
     for (Face_index fd: surface_mesh.faces() ){
         bool face_updated = compute_face_properties(fd);
@@ -99,6 +110,9 @@ bool MeshData::build_halfedge_properties( void ) {
 }
 
 bool MeshData::build_edge_properties( void ){
+    edge_vertex_table.resize(surface_mesh.number_of_edges(), 2);
+    edge_dyad_table.resize(surface_mesh.number_of_edges(), 9);
+    edge_length_table.resize(surface_mesh.number_of_edges());
     for (Edge_index ed: surface_mesh.edges()) {
         compute_edge_properties(ed);
     }
@@ -399,6 +413,7 @@ bool MeshData::set_vertex(const Vertex_index& vd,
     
     Point p = Kernel::Point_3(vec(0), vec(1), vec(2));
     surface_mesh.point(vd) = p;
+    vertex_table.row((int)vd) = vec.transpose();
 
     // update the mesh properties associated with this vertex index
     std::vector<Face_index> face_vec = get_faces_with_vertex(vd);
@@ -408,6 +423,7 @@ bool MeshData::set_vertex(const Vertex_index& vd,
     update_face_properties(face_vec);
     update_halfedge_properties(halfedge_vec);
     update_edge_properties(edge_vec);
+    return true;
 }
 
 bool MeshData::refine_faces(const std::vector<Face_index>& face_vec,
@@ -427,6 +443,7 @@ bool MeshData::refine_faces(const std::vector<Face_index>& face_vec,
     build_halfedge_properties();
     build_edge_properties();
     surface_mesh.collect_garbage();
+    build_vertex_table();
     return true;
 }
 
@@ -446,6 +463,7 @@ bool MeshData::remesh_faces(const std::vector<Face_index>& face_vec,
     build_halfedge_properties();
     build_edge_properties();
     surface_mesh.collect_garbage();
+    build_vertex_table();
     return true;
 }
 
@@ -610,6 +628,11 @@ bool MeshData::compute_face_properties(const Face_index& fd) {
     face_dyad[fd] = face_unit_normal[fd] * face_unit_normal[fd].transpose();
 
     assert(face_dyad[fd].isApprox(face_dyad[fd].transpose(), 1e-3));
+    
+    // keep the flat tables in sync
+    const Eigen::Matrix<double, 3, 3, Eigen::RowMajor> dyad = face_dyad[fd];
+    face_vertex_table.row((int)fd) << (int)v1, (int)v2, (int)v3;
+    face_dyad_table.row((int)fd) = Eigen::Map<const Eigen::Matrix<double, 1, 9> >(dyad.data());
     return true;
 }
 
@@ -695,6 +718,15 @@ bool MeshData::compute_edge_properties(const Edge_index& ed) {
 
     edge_dyad[ed] = face_unit_normal[f1] * halfedge_unit_normal[h1].transpose() 
         + face_unit_normal[f2] * halfedge_unit_normal[h2].transpose();
+    
+    // keep the flat tables in sync
+    Vertex_index v1, v2;
+    v1 = surface_mesh.vertex(ed, 0);
+    v2 = surface_mesh.vertex(ed, 1);
+    const Eigen::Matrix<double, 3, 3, Eigen::RowMajor> dyad = edge_dyad[ed];
+    edge_vertex_table.row((int)ed) << (int)v1, (int)v2;
+    edge_dyad_table.row((int)ed) = Eigen::Map<const Eigen::Matrix<double, 1, 9> >(dyad.data());
+    edge_length_table((int)ed) = (get_vertex(v1) - get_vertex(v2)).norm();
     // doesn't work for matrices close to zero
     /* assert((edge_dyad[ed] - edge_dyad[ed].transpose()).isApprox(Eigen::Matrix3d::Zero(), 1e-3)); */
     return true;
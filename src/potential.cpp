@@ -408,67 +408,176 @@ void Asteroid::init_asteroid( void ) {
 }
 
 void Asteroid::polyhedron_potential(const Eigen::Ref<const Eigen::Vector3d>& state) {
-    // build L and w
-    bool edge_built, face_built;
-    #pragma omp parallel if(true)
-    {
-        #pragma omp single
-        {
-            #pragma omp task
-            edge_built = mesh_data->build_edge_factor(state);
+    std::tie(mU, mU_grad, mU_grad_mat, mUlaplace) = compute_potential(state);
+    // TODO int return type for inside/outside
+}
 
-            #pragma omp task
-            face_built = mesh_data->build_face_factor(state);
-        }
-    }
+std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d, double> Asteroid::compute_potential(
+        const Eigen::Ref<const Eigen::Vector3d>& state) const {
+    // scratch space is local to this call so multiple threads can share the asteroid
+    Eigen::Matrix<double, Eigen::Dynamic, 3> states = state.transpose();
+    Eigen::VectorXd U(1), Ulaplace(1);
+    Eigen::Matrix<double, Eigen::Dynamic, 3> U_grad(1, 3);
+    Eigen::Matrix<double, Eigen::Dynamic, 9> U_grad_mat(1, 9);
+
+    potential_block(states, U, U_grad, U_grad_mat, Ulaplace);
     
-    double w_sum = mesh_data->get_sum_face_factor();
+    Eigen::Matrix<double, 1, 9> U_grad_mat_row = U_grad_mat.row(0);
+    Eigen::Matrix3d U_mat = Eigen::Map<Eigen::Matrix<double, 3, 3, Eigen::RowMajor> >(U_grad_mat_row.data());
+    Eigen::Vector3d U_grad_vec = U_grad.row(0).transpose();
 
-    if (w_sum < 1e-10) {
+    return std::make_tuple(U(0), U_grad_vec, U_mat, Ulaplace(0));
+}
 
-        std::tuple<double, Eigen::Matrix<double, 3, 1>, Eigen::Matrix<double, 3, 3> > face_grav, edge_grav;
-        // loop over the faces
-        #pragma omp parallel if(true)
-        {
-            #pragma omp single
-            {
-            #pragma omp task
-            face_grav = face_contribution(state);
+std::tuple<Eigen::VectorXd,
+           Eigen::Matrix<double, Eigen::Dynamic, 3>,
+           Eigen::Matrix<double, Eigen::Dynamic, 9>,
+           Eigen::VectorXd> Asteroid::polyhedron_potential_batch(
+                   const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states,
+                   const std::size_t& block_size) const {
+    const std::size_t num_points = states.rows();
+    const std::size_t bsize = std::max<std::size_t>(block_size, 1);
+    const std::size_t num_blocks = (num_points + bsize - 1) / bsize;
+
+    Eigen::VectorXd U(num_points), Ulaplace(num_points);
+    Eigen::Matrix<double, Eigen::Dynamic, 3> U_grad(num_points, 3);
+    Eigen::Matrix<double, Eigen::Dynamic, 9> U_grad_mat(num_points, 9);
+    
+    // each block is independent and only reads the mesh
+    #pragma omp parallel for schedule(dynamic) if(num_blocks > 1)
+    for (std::size_t ii = 0; ii < num_blocks; ++ii) {
+        const std::size_t start = ii * bsize;
+        const std::size_t rows = std::min(bsize, num_points - start);
+        potential_block(states.middleRows(start, rows),
+                U.segment(start, rows),
+                U_grad.middleRows(start, rows),
+                U_grad_mat.middleRows(start, rows),
+                Ulaplace.segment(start, rows));
+    }
 
-            #pragma omp task
-            edge_grav = edge_contribution(state);
-            }
+    return std::make_tuple(U, U_grad, U_grad_mat, Ulaplace);
+}
+
+void Asteroid::potential_block(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& states,
+        Eigen::Ref<Eigen::VectorXd> U,
+        Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 3> > U_grad,
+        Eigen::Ref<Eigen::Matrix<double, Eigen::Dynamic, 9> > U_grad_mat,
+        Eigen::Ref<Eigen::VectorXd> Ulaplace) const {
+    
+    const std::size_t num_points = states.rows();
+    
+    // flat tables of the mesh (no halfedge walking or property map lookups)
+    const Eigen::Matrix<double, Eigen::Dynamic, 3>& V = mesh_data->get_vertex_table();
+    const Eigen::Matrix<int, Eigen::Dynamic, 3>& F = mesh_data->get_face_vertex_table();
+    const Eigen::Matrix<double, Eigen::Dynamic, 9>& F_dyad = mesh_data->get_face_dyad_table();
+    const Eigen::Matrix<int, Eigen::Dynamic, 2>& E = mesh_data->get_edge_vertex_table();
+    const Eigen::Matrix<double, Eigen::Dynamic, 9>& E_dyad = mesh_data->get_edge_dyad_table();
+    const Eigen::VectorXd& E_length = mesh_data->get_edge_length_table();
+
+    // the block of points as structure of arrays so each face/edge is
+    // applied to all points with vectorized array operations
+    const Eigen::ArrayXd X = states.col(0).array();
+    const Eigen::ArrayXd Y = states.col(1).array();
+    const Eigen::ArrayXd Z = states.col(2).array();
+    
+    // scratch and accumulators for each point in the block
+    Eigen::ArrayXd r1x(num_points), r1y(num_points), r1z(num_points),
+                   r2x(num_points), r2y(num_points), r2z(num_points),
+                   r3x(num_points), r3y(num_points), r3z(num_points),
+                   r1n(num_points), r2n(num_points), r3n(num_points),
+                   num(num_points), den(num_points), factor(num_points),
+                   Drx(num_points), Dry(num_points), Drz(num_points);
+
+    Eigen::ArrayXd w_sum = Eigen::ArrayXd::Zero(num_points);
+    Eigen::ArrayXd U_face = Eigen::ArrayXd::Zero(num_points),
+                   U_edge = Eigen::ArrayXd::Zero(num_points);
+    Eigen::Array<double, Eigen::Dynamic, 3> U_grad_face = Eigen::Array<double, Eigen::Dynamic, 3>::Zero(num_points, 3),
+                                            U_grad_edge = Eigen::Array<double, Eigen::Dynamic, 3>::Zero(num_points, 3);
+    Eigen::Array<double, Eigen::Dynamic, 9> U_mat_face = Eigen::Array<double, Eigen::Dynamic, 9>::Zero(num_points, 9),
+                                            U_mat_edge = Eigen::Array<double, Eigen::Dynamic, 9>::Zero(num_points, 9);
+    
+    // loop over the faces once and apply to all points
+    const std::size_t num_f = F.rows();
+    for (std::size_t ff = 0; ff < num_f; ++ff) {
+        const int a = F(ff, 0), b = F(ff, 1), c = F(ff, 2);
+        
+        r1x = V(a, 0) - X; r1y = V(a, 1) - Y; r1z = V(a, 2) - Z;
+        r2x = V(b, 0) - X; r2y = V(b, 1) - Y; r2z = V(b, 2) - Z;
+        r3x = V(c, 0) - X; r3y = V(c, 1) - Y; r3z = V(c, 2) - Z;
+
+        r1n = (r1x.square() + r1y.square() + r1z.square()).sqrt();
+        r2n = (r2x.square() + r2y.square() + r2z.square()).sqrt();
+        r3n = (r3x.square() + r3y.square() + r3z.square()).sqrt();
+        
+        // r1 . (r2 x r3)
+        num = r1x * (r2y * r3z - r2z * r3y) 
+            + r1y * (r2z * r3x - r2x * r3z) 
+            + r1z * (r2x * r3y - r2y * r3x);
+        den = r1n * r2n * r3n
+            + r1n * (r2x * r3x + r2y * r3y + r2z * r3z)
+            + r2n * (r3x * r1x + r3y * r1y + r3z * r1z)
+            + r3n * (r1x * r2x + r1y * r2y + r1z * r2z);
+        for (std::size_t jj = 0; jj < num_points; ++jj) {
+            factor(jj) = 2.0 * std::atan2(num(jj), den(jj));
+        }
+        
+        // F_dyad * r1
+        Drx = F_dyad(ff, 0) * r1x + F_dyad(ff, 1) * r1y + F_dyad(ff, 2) * r1z;
+        Dry = F_dyad(ff, 3) * r1x + F_dyad(ff, 4) * r1y + F_dyad(ff, 5) * r1z;
+        Drz = F_dyad(ff, 6) * r1x + F_dyad(ff, 7) * r1y + F_dyad(ff, 8) * r1z;
+
+        w_sum += factor;
+        U_face += (r1x * Drx + r1y * Dry + r1z * Drz) * factor;
+        U_grad_face.col(0) += Drx * factor;
+        U_grad_face.col(1) += Dry * factor;
+        U_grad_face.col(2) += Drz * factor;
+        for (int kk = 0; kk < 9; ++kk) {
+            U_mat_face.col(kk) += F_dyad(ff, kk) * factor;
         }
+    }
 
-        /* #pragma omp parallel shared(r_v) */
-        /* { */
-        /*     #pragma omp task */
-        /*     { */
-        /*         // face contribution */
-        /*         face_grav = face_contribution(r_v, w_face); */
-        /*     } */
-        /*     #pragma omp task */
-        /*     { */
-        /*     // edge contribution */
-        /*     edge_grav = edge_contribution(r_v, L_all); */
-        /*     } */
-        /* } */
+    // loop over the edges once and apply to all points
+    const std::size_t num_e = E.rows();
+    for (std::size_t ee = 0; ee < num_e; ++ee) {
+        const int a = E(ee, 0), b = E(ee, 1);
+        const double e = E_length(ee);
         
-        /* // combine them both */
-        mU = 1.0 / 2.0 * G * sigma * (std::get<0>(edge_grav) - std::get<0>(face_grav));
-        mU_grad = G * sigma * (-std::get<1>(edge_grav) + std::get<1>(face_grav));
-        mU_grad_mat = G * sigma * (std::get<2>(edge_grav) - std::get<2>(face_grav));
-        mUlaplace = -G * sigma * w_sum ;
-    } else {
-        mU = 0;
-        mU_grad.setZero();
-        mU_grad_mat.setZero();
-        mUlaplace = 0;
+        r1x = V(a, 0) - X; r1y = V(a, 1) - Y; r1z = V(a, 2) - Z;
+        r1n = (r1x.square() + r1y.square() + r1z.square()).sqrt();
+        r2n = ((V(b, 0) - X).square() + (V(b, 1) - Y).square() + (V(b, 2) - Z).square()).sqrt();
+        factor = ((r1n + r2n + e) / (r1n + r2n - e)).log();
+        
+        // E_dyad * r1
+        Drx = E_dyad(ee, 0) * r1x + E_dyad(ee, 1) * r1y + E_dyad(ee, 2) * r1z;
+        Dry = E_dyad(ee, 3) * r1x + E_dyad(ee, 4) * r1y + E_dyad(ee, 5) * r1z;
+        Drz = E_dyad(ee, 6) * r1x + E_dyad(ee, 7) * r1y + E_dyad(ee, 8) * r1z;
+
+        U_edge += (r1x * Drx + r1y * Dry + r1z * Drz) * factor;
+        U_grad_edge.col(0) += Drx * factor;
+        U_grad_edge.col(1) += Dry * factor;
+        U_grad_edge.col(2) += Drz * factor;
+        for (int kk = 0; kk < 9; ++kk) {
+            U_mat_edge.col(kk) += E_dyad(ee, kk) * factor;
+        }
+    }
+
+    // combine them both
+    for (std::size_t jj = 0; jj < num_points; ++jj) {
+        if (w_sum(jj) < 1e-10) {
+            U(jj) = 1.0 / 2.0 * G * sigma * (U_edge(jj) - U_face(jj));
+            U_grad.row(jj) = G * sigma * (-U_grad_edge.row(jj) + U_grad_face.row(jj)).matrix();
+            U_grad_mat.row(jj) = G * sigma * (U_mat_edge.row(jj) - U_mat_face.row(jj)).matrix();
+            Ulaplace(jj) = -G * sigma * w_sum(jj);
+        } else {
+            U(jj) = 0;
+            U_grad.row(jj).setZero();
+            U_grad_mat.row(jj).setZero();
+            Ulaplace(jj) = 0;
+        }
     }
-    // TODO int return type for inside/outside
 }
 
-Eigen::VectorXd Asteroid::surface_slope( void ) {
+Eigen::VectorXd Asteroid::surface_slope( void ) const {
     // compute the surface slope at the centroid of each face
     Eigen::VectorXd face_slope(mesh_data->number_of_faces());
     // loop over each face
@@ -482,14 +591,14 @@ Eigen::VectorXd Asteroid::surface_slope( void ) {
 }
 
 // TODO Think about storing this as a property of the mesh
-double Asteroid::compute_face_slope(const Face_index& fd) {
+double Asteroid::compute_face_slope(const Face_index& fd) const {
     Eigen::Vector3d face_normal = mesh_data->get_face_normal(fd);
     Eigen::Vector3d face_center = mesh_data->get_face_center(fd) + 
         0.001 * mesh_data->get_face_center(fd).normalized();
     
     // compute potential plus the rotational component
-    polyhedron_potential(face_center );
-    Eigen::Vector3d modified_potential = mU_grad +  omega * omega 
+    Eigen::Vector3d U_grad = std::get<1>(compute_potential(face_center));
+    Eigen::Vector3d modified_potential = U_grad +  omega * omega 
         * (Eigen::Vector3d()<< face_center(0), face_center(1), 0).finished();
     // take dot product and arccose
     double slope = kPI - std::acos(face_normal.dot(modified_potential.normalized()));
@@ -498,7 +607,7 @@ double Asteroid::compute_face_slope(const Face_index& fd) {
 }
 
 Eigen::Vector3d  Asteroid::land_in_view(const Eigen::Ref<const Eigen::Vector3d>& cur_ast_pos,
-        const double& max_fov) {
+        const double& max_fov) const {
     
     // find faces in view
     std::vector<Face_index> faces_in_view = mesh_data->faces_in_fov(cur_ast_pos, max_fov);
@@ -515,58 +624,6 @@ Eigen::Vector3d  Asteroid::land_in_view(const Eigen::Ref<const Eigen::Vector3d>&
     return mesh_data->get_face_center(min_fd);
 }
 
-std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d> Asteroid::face_contribution(
-        const Eigen::Ref<const Eigen::Vector3d>& state) const {
-
-    double U = 0;
-    Eigen::Vector3d U_grad = Eigen::Vector3d::Zero();
-    Eigen::Matrix3d U_mat = Eigen::Matrix3d::Zero();
-
-    // loop over the faces and compute gravity
-    for (Face_index fd: mesh_data->faces()) {
-        // get a vector from the face
-        Halfedge_index h1 = mesh_data->surface_mesh.halfedge(fd);
-        Vertex_index v1 = mesh_data->surface_mesh.source(h1);
-        Eigen::Vector3d vec1 = mesh_data->get_vertex(v1);
-        // subtract from current state
-        Eigen::Vector3d r = vec1 - state;
-
-        // get a Face dyad and face factor
-        Eigen::Matrix3d F_dyad = mesh_data->get_face_dyad(fd);
-        
-        double w_factor = mesh_data->get_face_factor(fd);
-        // multiply
-        U += (r.transpose() * F_dyad * r * w_factor).value();
-        U_grad += F_dyad * r * w_factor;
-        U_mat += F_dyad * w_factor;
-    }
-    return std::make_tuple(U, U_grad, U_mat);
-}
-
-std::tuple<double, Eigen::Vector3d, Eigen::Matrix3d> Asteroid::edge_contribution(
-        const Eigen::Ref<const Eigen::Vector3d>& state) const {
-    double U = 0;
-    Eigen::Vector3d U_grad = Eigen::Vector3d::Zero();
-    Eigen::Matrix3d U_mat = Eigen::Matrix3d::Zero();
-    
-    // loop over the edges
-    for (Edge_index ed: mesh_data->edges()) {
-        // get a vector from the edge
-        Vertex_index v1 = mesh_data->surface_mesh.vertex(ed, 0);
-        Eigen::Vector3d vec1 = mesh_data->get_vertex(v1);
-        // compute difference with state
-        Eigen::Vector3d r = vec1 - state;
-        
-        Eigen::Matrix3d E_dyad = mesh_data->get_edge_dyad(ed);
-        double L_factor = mesh_data->get_edge_factor(ed);
-
-        U += (r.transpose() * E_dyad * r * L_factor).value();
-        U_grad += E_dyad * r * L_factor;
-        U_mat += E_dyad * L_factor;
-    }
-    return std::make_tuple(U, U_grad, U_mat);
-}
-
 Eigen::Matrix<double, Eigen::Dynamic, 3> Asteroid::rotate_vertices(const double& time) const {
     
     // define the rotation matrix Ra
@@ -22,6 +22,8 @@ PYBIND11_MODULE(asteroid, m) {
         .def("get_gradient_mat", &Asteroid::get_gradient_mat, "Get the gradient matrix")
         .def("get_laplace", &Asteroid::get_laplace, "Get the laplacian")
         .def("get_omega", &Asteroid::get_omega, "Get the omega rotation rate")
+        .def("get_grav_constant", &Asteroid::get_grav_constant, "Get the gravitational constant (km^3/kg/sec^2)")
+        .def("get_sigma", &Asteroid::get_sigma, "Get the density (kg/km^3)")
         .def("get_verts", &Asteroid::get_verts, "Get the vertices of the mesh")
         .def("get_faces", &Asteroid::get_faces, "Get the faces of the mesh")
         .def("set_grav_constant", &Asteroid::set_grav_constant, "Set the gravitational constant",
@@ -30,6 +32,14 @@ PYBIND11_MODULE(asteroid, m) {
                 pybind11::arg("Sigma (density  kg/km^3)"))
         .def("polyhedron_potential", &Asteroid::polyhedron_potential, "Compute polyhedron potential",
                 pybind11::arg("state"))
+        .def("compute_potential", &Asteroid::compute_potential,
+                "Compute polyhedron potential without modifying the asteroid. Returns (U, U_grad, U_grad_mat, Ulaplace)",
+                pybind11::arg("state"),
+                pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("polyhedron_potential_batch", &Asteroid::polyhedron_potential_batch,
+                "Compute polyhedron potential for a (n, 3) array of states. Returns (U, U_grad, U_grad_mat, Ulaplace)",
+                pybind11::arg("states"), pybind11::arg("block_size") = 64,
+                pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("get_axes", &Asteroid::get_axes, "Return axes of asteroid")
         .def("rotate_vertices", &Asteroid::rotate_vertices, "Rotate teh asteroid vertices by ROT3",
                 pybind11::arg("time"))
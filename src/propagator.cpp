@@ -0,0 +1,289 @@
+#include "propagator.hpp"
+#include "potential.hpp"
+#include "reconstruct.hpp"
+#include "controller.hpp"
+#include "utilities.hpp"
+#include "geodesic.hpp"
+
+#include <Eigen/Dense>
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <stdexcept>
+#include <vector>
+
+Dumbbell::Dumbbell(const double& m1_in, const double& m2_in, const double& l_in) {
+    m1 = m1_in;
+    m2 = m2_in;
+    l = l_in;
+    r1 = 0.001;
+    r2 = 0.001;
+
+    double mratio = m2 / (m1 + m2);
+    double lcg1 = mratio * l; // distance from m1 to the CG along the b1hat direction
+    double lcg2 = l - lcg1;
+
+    zeta1 << -lcg1, 0, 0;
+    zeta2 << lcg2, 0, 0;
+
+    Eigen::Matrix<double, 3, 3> eye3 = Eigen::Matrix<double, 3, 3>::Identity();
+    J = 2.0 / 5 * m1 * r1 * r1 * eye3 + 2.0 / 5 * m2 * r2 * r2 * eye3
+        + m1 * (zeta1.dot(zeta1) * eye3 - zeta1 * zeta1.transpose())
+        + m2 * (zeta2.dot(zeta2) * eye3 - zeta2 * zeta2.transpose());
+
+    // controller parameters
+    double OS_translation = 5.0 / 100, Ts_translation = 200;
+    double OS_rotation = 5.0 / 100, Ts_rotation = 2;
+
+    double zeta_translation = - std::log(OS_translation)
+        / std::sqrt(kPI * kPI + std::pow(std::log(OS_translation), 2));
+    double wn_translation = 4.0 / zeta_translation / Ts_translation;
+    double zeta_rotation = - std::log(OS_rotation)
+        / std::sqrt(kPI * kPI + std::pow(std::log(OS_rotation), 2));
+    double wn_rotation = 4.0 / zeta_rotation / Ts_rotation;
+
+    kR = wn_rotation * wn_rotation;
+    kW = 2 * zeta_rotation * wn_rotation;
+    kx = (m1 + m2) * wn_translation * wn_translation;
+    kv = (m1 + m2) * 2 * zeta_translation * wn_translation;
+}
+
+// DORMAND PRINCE ***********************************************************
+// Butcher tableau of the 5th order solution
+static const double c2 = 1.0 / 5, c3 = 3.0 / 10, c4 = 4.0 / 5, c5 = 8.0 / 9;
+static const double a21 = 1.0 / 5;
+static const double a31 = 3.0 / 40, a32 = 9.0 / 40;
+static const double a41 = 44.0 / 45, a42 = -56.0 / 15, a43 = 32.0 / 9;
+static const double a51 = 19372.0 / 6561, a52 = -25360.0 / 2187, a53 = 64448.0 / 6561,
+                    a54 = -212.0 / 729;
+static const double a61 = 9017.0 / 3168, a62 = -355.0 / 33, a63 = 46732.0 / 5247,
+                    a64 = 49.0 / 176, a65 = -5103.0 / 18656;
+static const double a71 = 35.0 / 384, a73 = 500.0 / 1113, a74 = 125.0 / 192,
+                    a75 = -2187.0 / 6784, a76 = 11.0 / 84;
+// difference between the 5th and 4th order solutions
+static const double e1 = 71.0 / 57600, e3 = -71.0 / 16695, e4 = 71.0 / 1920,
+                    e5 = -17253.0 / 339200, e6 = 22.0 / 525, e7 = -1.0 / 40;
+// 4th order continuous extension (Hairer, Norsett and Wanner)
+static const double d1 = -12715105075.0 / 11282082432, d3 = 87487479700.0 / 32700410799,
+                    d4 = -10690763975.0 / 1880347072, d5 = 701980252875.0 / 199316789632,
+                    d6 = -1453857185.0 / 822651844, d7 = 69997945.0 / 29380423;
+
+static double rms_norm(const StateArray& vec, const StateArray& scale) {
+    return std::sqrt((vec.array() / scale.array()).square().mean());
+}
+
+std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > dormand_prince(
+        const std::function<StateArray(const double&, const StateArray&)>& fun,
+        const Eigen::Ref<const StateArray>& initial_state,
+        const double& t0, const double& tf, const double& output_every,
+        const double& rtol, const double& atol,
+        const std::function<void(const double&, const StateArray&)>& callback) {
+
+    if (output_every <= 0) {
+        throw std::invalid_argument("Output period must be positive");
+    }
+
+    std::vector<double> time_out;
+    std::vector<StateArray, Eigen::aligned_allocator<StateArray> > state_out;
+
+    double t = t0;
+    StateArray y = initial_state;
+    time_out.push_back(t);
+    state_out.push_back(y);
+
+    // index of the next output, the last one is at tf
+    int count = 1;
+    auto output_time = [&]() {
+        double t_out = t0 + count * output_every;
+        return (t_out > tf - 1e-12 * std::max(1.0, std::abs(tf))) ? tf : t_out;
+    };
+
+    // initial step size from Hairer, Norsett and Wanner
+    StateArray k1 = fun(t, y);
+    StateArray scale = atol + rtol * y.array().abs();
+    double d0 = rms_norm(y, scale), dy0 = rms_norm(k1, scale);
+    double h0 = (d0 < 1e-5 || dy0 < 1e-5) ? 1e-6 : 0.01 * d0 / dy0;
+    h0 = std::min(h0, tf - t0);
+    double dy1 = rms_norm(fun(t + h0, y + h0 * k1) - k1, scale) / h0;
+    double h1 = (std::max(dy0, dy1) <= 1e-15) ? std::max(1e-6, h0 * 1e-3)
+        : std::pow(0.01 / std::max(dy0, dy1), 1.0 / 5);
+    double h = std::min(100 * h0, h1);
+
+    StateArray k2, k3, k4, k5, k6, k7, y_new, error;
+    while (t < tf) {
+        // with a callback every output is the end of a step
+        double t_stop = callback ? output_time() : tf;
+        double h_free = h;
+        bool last = false;
+        if (t + 1.01 * h >= t_stop) {
+            h = t_stop - t;
+            last = true;
+        }
+        if (h < 16 * std::numeric_limits<double>::epsilon() * std::abs(t)) {
+            throw std::runtime_error("Step size too small at t = " + std::to_string(t));
+        }
+
+        k2 = fun(t + c2 * h, y + h * a21 * k1);
+        k3 = fun(t + c3 * h, y + h * (a31 * k1 + a32 * k2));
+        k4 = fun(t + c4 * h, y + h * (a41 * k1 + a42 * k2 + a43 * k3));
+        k5 = fun(t + c5 * h, y + h * (a51 * k1 + a52 * k2 + a53 * k3 + a54 * k4));
+        k6 = fun(t + h, y + h * (a61 * k1 + a62 * k2 + a63 * k3 + a64 * k4 + a65 * k5));
+        y_new = y + h * (a71 * k1 + a73 * k3 + a74 * k4 + a75 * k5 + a76 * k6);
+        k7 = fun(t + h, y_new);
+
+        error = h * (e1 * k1 + e3 * k3 + e4 * k4 + e5 * k5 + e6 * k6 + e7 * k7);
+        scale = atol + rtol * y.array().abs().max(y_new.array().abs());
+        double err = rms_norm(error, scale);
+
+        if (err > 1) {
+            // reject and try again with a smaller step
+            h = h * std::max(0.2, 0.9 * std::pow(err, -1.0 / 5));
+            continue;
+        }
+
+        double t_new = last ? t_stop : t + h;
+        // outputs inside of the step from the dense output
+        StateArray ydiff = y_new - y;
+        StateArray bspl = h * k1 - ydiff;
+        StateArray rcont4 = ydiff - h * k7 - bspl;
+        StateArray rcont5 = h * (d1 * k1 + d3 * k3 + d4 * k4 + d5 * k5 + d6 * k6 + d7 * k7);
+        while (count > 0 && output_time() <= t_new) {
+            double t_out = output_time();
+            if (t_out == t_new) {
+                state_out.push_back(y_new);
+            } else {
+                double theta = (t_out - t) / h;
+                double theta1 = 1 - theta;
+                state_out.push_back(y + theta * (ydiff + theta1 * (bspl
+                                + theta * (rcont4 + theta1 * rcont5))));
+            }
+            time_out.push_back(t_out);
+            // tf is the last output
+            count = (t_out == tf) ? -1 : count + 1;
+        }
+
+        double fac = (err == 0) ? 10 : std::min(10.0, std::max(0.2, 0.9 * std::pow(err, -1.0 / 5)));
+        t = t_new;
+        y = y_new;
+        if (callback && last) {
+            // the callback may change the dynamics so restart the integrator
+            callback(t, y);
+            k1 = fun(t, y);
+            h = std::max(h * fac, h_free);
+        } else {
+            k1 = k7;
+            h = h * fac;
+        }
+    }
+
+    Eigen::VectorXd time(time_out.size());
+    Eigen::Matrix<double, Eigen::Dynamic, 18> state(state_out.size(), 18);
+    for (std::size_t ii = 0; ii < time_out.size(); ++ii) {
+        time(ii) = time_out[ii];
+        state.row(ii) = state_out[ii];
+    }
+    return std::make_tuple(time, state);
+}
+
+// PROPAGATOR ****************************************************************
+Propagator::Propagator(std::shared_ptr<Asteroid> true_ast_in,
+                       std::shared_ptr<Asteroid> est_ast_in,
+                       std::shared_ptr<const ReconstructMesh> rmesh_in,
+                       std::shared_ptr<Controller> controller_in,
+                       const Dumbbell& dum_in)
+    : true_ast(true_ast_in), est_ast(est_ast_in), rmesh(rmesh_in),
+      controller(controller_in), dum(dum_in) {
+
+}
+
+void Propagator::plan(const double& t, const StateArray& state) {
+    if (!mhold_decision || !planned) {
+        controller->explore_asteroid(t, state, rmesh, est_ast);
+        planned = true;
+    }
+}
+
+StateArray Propagator::eoms(const double& t, const StateArray& state) {
+    ++num_evaluations;
+
+    // unpack the state
+    Eigen::Vector3d pos = state.segment<3>(0); // location of the center of mass in the inertial frame
+    Eigen::Vector3d vel = state.segment<3>(3); // vel of com in inertial frame
+    Eigen::Matrix<double, 3, 3> R; // sc body frame to inertial frame
+    R << state(6), state(7), state(8),
+         state(9), state(10), state(11),
+         state(12), state(13), state(14);
+    Eigen::Vector3d ang_vel = state.segment<3>(15); // ang vel of sc wrt inertial frame in body frame
+
+    Eigen::Matrix<double, 3, 3> Ra = true_ast->rot_ast2int(t); // asteroid body frame to inertial frame
+
+    // position of each mass in the asteroid frame
+    Eigen::Matrix<double, 2, 3> z;
+    z.row(0) = (Ra.transpose() * (pos + R * dum.zeta1)).transpose();
+    z.row(1) = (Ra.transpose() * (pos + R * dum.zeta2)).transpose();
+
+    // true gravity on the masses and the estimate used by the controller
+    Eigen::Matrix<double, Eigen::Dynamic, 3> U_grad = std::get<1>(true_ast->polyhedron_potential_batch(z));
+    Eigen::Matrix<double, Eigen::Dynamic, 3> U_grad_est = std::get<1>(est_ast->polyhedron_potential_batch(z));
+
+    Eigen::Vector3d F = dum.m1 * Ra * U_grad.row(0).transpose()
+        + dum.m2 * Ra * U_grad.row(1).transpose();
+    Eigen::Vector3d M = dum.m1 * hat_map(dum.zeta1) * R.transpose() * Ra * U_grad.row(0).transpose()
+        + dum.m2 * hat_map(dum.zeta2) * R.transpose() * Ra * U_grad.row(1).transpose();
+    Eigen::Vector3d F_est = dum.m1 * Ra * U_grad_est.row(0).transpose()
+        + dum.m2 * Ra * U_grad_est.row(1).transpose();
+    Eigen::Vector3d M_est = dum.m1 * hat_map(dum.zeta1) * R.transpose() * Ra * U_grad_est.row(0).transpose()
+        + dum.m2 * hat_map(dum.zeta2) * R.transpose() * Ra * U_grad_est.row(1).transpose();
+
+    // desired states for exploration converted to the inertial frame
+    plan(t, state);
+    Eigen::Matrix<double, 3, 3> Rd = Ra * controller->get_Rd();
+    Eigen::Vector3d ang_vel_d = Ra * controller->get_ang_vel_d();
+    Eigen::Vector3d ang_vel_d_dot = Ra * controller->get_ang_vel_d_dot();
+    Eigen::Vector3d x_des = Ra * controller->get_posd();
+    Eigen::Vector3d xd_des = Ra * controller->get_veld();
+    Eigen::Vector3d xdd_des = Ra * controller->get_acceld();
+
+    // geometric attitude controller, same as dynamics.controller.attitude_controller
+    Eigen::Vector3d eR = 0.5 * vee_map(Rd.transpose() * R - R.transpose() * Rd);
+    Eigen::Vector3d eW = ang_vel - R.transpose() * Rd * ang_vel_d;
+    Eigen::Vector3d u_m = - dum.kR * eR - dum.kW * eW + ang_vel.cross(dum.J * ang_vel)
+        - dum.J * (hat_map(ang_vel) * R.transpose() * Rd * ang_vel_d
+                - R.transpose() * Rd * ang_vel_d_dot) - M_est;
+
+    // translation controller, same as dynamics.controller.translation_controller
+    double m = dum.m1 + dum.m2;
+    Eigen::Vector3d u_f = - dum.kx * (pos - x_des) - dum.kv * (vel - xd_des) - F_est + m * xdd_des;
+
+    Eigen::Matrix<double, 3, 3> R_dot = R * hat_map(ang_vel);
+    Eigen::Vector3d ang_vel_dot = dum.J.ldlt().solve(- ang_vel.cross(dum.J * ang_vel) + M + u_m);
+
+    StateArray state_dot;
+    state_dot.segment<3>(0) = vel;
+    state_dot.segment<3>(3) = (F + u_f) / m;
+    for (int ii = 0; ii < 3; ++ii) {
+        state_dot.segment<3>(6 + 3 * ii) = R_dot.row(ii);
+    }
+    state_dot.segment<3>(15) = ang_vel_dot;
+    return state_dot;
+}
+
+std::tuple<Eigen::VectorXd, Eigen::Matrix<double, Eigen::Dynamic, 18> > Propagator::propagate(
+        const Eigen::Ref<const StateArray>& initial_state,
+        const double& t0, const double& tf, const double& callback_every,
+        const std::function<void(const double&, const StateArray&)>& callback) {
+
+    planned = false;
+    auto fun = [this](const double& t, const StateArray& state) { return eoms(t, state); };
+    if (!callback) {
+        return dormand_prince(fun, initial_state, t0, tf, callback_every, mrtol, matol);
+    }
+
+    // plan again after every callback since it may change the mesh
+    auto replan = [this, &callback](const double& t, const StateArray& state) {
+        callback(t, state);
+        planned = false;
+    };
+    return dormand_prince(fun, initial_state, t0, tf, callback_every, mrtol, matol, replan);
+}
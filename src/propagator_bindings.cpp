@@ -0,0 +1,62 @@
+/**
+    Bindings for the native propagator
+
+    @author Shankar Kulumani
+    @version 18 October 2026
+*/
+#include "propagator.hpp"
+#include "potential.hpp"
+#include "reconstruct.hpp"
+#include "controller.hpp"
+
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <pybind11/functional.h>
+#include <pybind11/stl.h>
+
+PYBIND11_MODULE(propagator, m) {
+    m.doc() = "Controlled dumbbell propagation in C++";
+
+    pybind11::class_<Dumbbell>(m, "Dumbbell")
+        .def(pybind11::init<const double&, const double&, const double&>(), "Dumbbell constructor",
+                pybind11::arg("m1") = 100.0, pybind11::arg("m2") = 100.0, pybind11::arg("l") = 0.003)
+        .def_readwrite("m1", &Dumbbell::m1)
+        .def_readwrite("m2", &Dumbbell::m2)
+        .def_readwrite("l", &Dumbbell::l)
+        .def_readwrite("zeta1", &Dumbbell::zeta1)
+        .def_readwrite("zeta2", &Dumbbell::zeta2)
+        .def_readwrite("J", &Dumbbell::J)
+        .def_readwrite("kR", &Dumbbell::kR)
+        .def_readwrite("kW", &Dumbbell::kW)
+        .def_readwrite("kx", &Dumbbell::kx)
+        .def_readwrite("kv", &Dumbbell::kv);
+
+    pybind11::class_<Propagator, std::shared_ptr<Propagator>>(m, "Propagator")
+        .def(pybind11::init<std::shared_ptr<Asteroid>, std::shared_ptr<Asteroid>,
+                            std::shared_ptr<const ReconstructMesh>, std::shared_ptr<Controller>,
+                            const Dumbbell&>(),
+                "Propagator constructor",
+                pybind11::arg("true_asteroid"), pybind11::arg("estimated_asteroid"),
+                pybind11::arg("reconstruct_mesh"), pybind11::arg("controller"),
+                pybind11::arg("dumbbell") = Dumbbell())
+        .def("rtol", &Propagator::rtol, "Set the relative tolerance",
+                pybind11::arg("rtol"))
+        .def("atol", &Propagator::atol, "Set the absolute tolerance",
+                pybind11::arg("atol"))
+        .def("hold_decision", &Propagator::hold_decision,
+                "Plan once per callback instead of every evaluation",
+                pybind11::arg("hold"))
+        .def("eoms", &Propagator::eoms, "Controlled equations of motion",
+                pybind11::arg("time"), pybind11::arg("state"))
+        .def("propagate", &Propagator::propagate, "Integrate from t0 to tf",
+                pybind11::arg("initial_state"), pybind11::arg("t0"), pybind11::arg("tf"),
+                pybind11::arg("callback_every") = 1.0, pybind11::arg("callback") = nullptr)
+        .def("get_num_evaluations", &Propagator::get_num_evaluations,
+                "Number of evaluations of the equations of motion");
+
+    m.def("dormand_prince", &dormand_prince, "Dormand-Prince 5(4) integration with dense output",
+            pybind11::arg("fun"), pybind11::arg("initial_state"), pybind11::arg("t0"),
+            pybind11::arg("tf"), pybind11::arg("output_every"),
+            pybind11::arg("rtol") = 1e-9, pybind11::arg("atol") = 1e-9,
+            pybind11::arg("callback") = nullptr);
+}
@@ -5,6 +5,9 @@
 #include <Eigen/Dense>
 #include <iostream>
 #include <cmath>
+#include <algorithm>
+#include <cassert>
+#include <omp.h>
 
 // Forward declaration
 Eigen::Matrix<double, Eigen::Dynamic, 1> initial_weight(const Eigen::Ref<const Eigen::MatrixXd> &v_in);
@@ -110,19 +113,212 @@ void ReconstructMesh::single_update(const Eigen::Ref<const Eigen::RowVector3d> &
 }
 
 void ReconstructMesh::update(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& pts,
-        const double& max_angle, const double& meas_weight,
-        const double& vert_weight) {
-    std::size_t num_pts(pts.rows());
+        const double& max_angle, const double& mw,
+        const double& vw) {
+    const std::size_t num_pts(pts.rows());
+    const std::size_t num_verts(mesh->number_of_vertices());
+    if (num_pts == 0 || num_verts == 0) {
+        return;
+    }
+
+    // state of every vertex at the start of the scan
+    Eigen::Matrix<double, Eigen::Dynamic, 3> verts(num_verts, 3);
+    Eigen::Matrix<double, Eigen::Dynamic, 3> vert_uvec(num_verts, 3);
+    Eigen::VectorXd vert_weight(num_verts);
+    for (Vertex_index vd : mesh->vertices()) {
+        verts.row((int)vd) = mesh->get_vertex(vd);
+        vert_uvec.row((int)vd) = verts.row((int)vd).normalized();
+        vert_weight((int)vd) = get_weight(vd);
+    }
     
+    // find the vertices close to each measurement and store the measurement
+    // index with the vertex. Measurements are visited in order so each list
+    // is sorted the same way as the sequential update
+    std::vector<std::vector<std::size_t> > vert_meas(num_verts);
+    SphereBins bins(vert_uvec, max_angle);
+    std::vector<std::size_t> candidates;
     for (std::size_t ii = 0; ii < num_pts; ++ii) {
-        single_update(pts.row(ii), max_angle, meas_weight, vert_weight);
+        Eigen::RowVector3d pt = pts.row(ii);
+        // missed measurements are NaN and never update a vertex
+        if (!pt.allFinite()) {
+            continue;
+        }
+        Eigen::Vector3d pt_uvec = pt.normalized();
+        bins.query(pt_uvec, candidates);
+        for (std::size_t vd : candidates) {
+            // a small margin since the unit vector is recomputed from the
+            // moving vertex in the exact test below
+            if (single_central_angle(pt_uvec, vert_uvec.row(vd).transpose()) 
+                    < max_angle + 1e-9) {
+                vert_meas[vd].push_back(ii);
+            }
+        }
+    }
+    
+    // each vertex only depends on its own radius and weight so the vertices
+    // are independent and applying the measurements in order matches
+    // single_update exactly
+    #pragma omp parallel for schedule(dynamic, 64)
+    for (std::size_t vd = 0; vd < num_verts; ++vd) {
+        Eigen::Vector3d vert = verts.row(vd).transpose();
+        double weight = vert_weight(vd);
+        for (std::size_t ii : vert_meas[vd]) {
+            // copy the row to match the arithmetic of single_update
+            Eigen::RowVector3d pt = pts.row(ii);
+            Eigen::Vector3d pt_uvec = pt.normalized();
+            double pt_radius = pt.norm();
+            Eigen::Vector3d uvec = vert.normalized();
+            double delta_sigma = single_central_angle(pt_uvec, uvec);
+            if ( delta_sigma < max_angle) {
+                double meas_weight = mw * pow(delta_sigma * pt_radius, 2);
+                double vertex_weight = vw * weight;
+                double radius_new = (vert.norm() * meas_weight 
+                        + pt_radius * vertex_weight) / ( vertex_weight + meas_weight ) ;
+                weight = (vertex_weight * meas_weight) / ( vertex_weight + meas_weight);
+                vert = radius_new * uvec;
+            }
+        }
+        verts.row(vd) = vert.transpose();
+        vert_weight(vd) = weight;
+    }
+    
+    // write back only the modified vertices, since moving a vertex updates
+    // the face properties of the mesh
+    for (Vertex_index vd : mesh->vertices()) {
+        if (!vert_meas[(int)vd].empty()) {
+            mesh->set_vertex(vd, verts.row((int)vd).transpose());
+            set_weight(vd, vert_weight((int)vd));
+        }
+    }
+}
+
+// Spatial bins of unit vectors
+SphereBins::SphereBins(const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3> >& uvec,
+        const double& max_angle) {
+    // chord length between unit vectors seperated by max_angle
+    double chord = 2.0 * std::sin(std::min(max_angle + 1e-6, kPI) / 2.0);
+    num_cells = std::max(1, std::min(256, (int)std::floor(2.0 / chord)));
+    
+    for (int ii = 0; ii < uvec.rows(); ++ii) {
+        bins[key(uvec.row(ii).transpose())].push_back(ii);
+    }
+}
+
+void SphereBins::query(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+        std::vector<std::size_t>& indices) const {
+    indices.clear();
+    Eigen::Vector3i cell = index(uvec);
+    for (int ix = std::max(0, cell(0) - 1); ix <= std::min(num_cells - 1, cell(0) + 1); ++ix) {
+        for (int iy = std::max(0, cell(1) - 1); iy <= std::min(num_cells - 1, cell(1) + 1); ++iy) {
+            for (int iz = std::max(0, cell(2) - 1); iz <= std::min(num_cells - 1, cell(2) + 1); ++iz) {
+                auto it = bins.find(((long)ix * num_cells + iy) * num_cells + iz);
+                if (it != bins.end()) {
+                    indices.insert(indices.end(), it->second.begin(), it->second.end());
+                }
+            }
+        }
+    }
+}
+
+Eigen::Vector3i SphereBins::index(const Eigen::Ref<const Eigen::Vector3d>& uvec) const {
+    Eigen::Vector3i cell;
+    for (int ii = 0; ii < 3; ++ii) {
+        int ci = (int)std::floor((uvec(ii) + 1.0) / 2.0 * num_cells);
+        cell(ii) = std::max(0, std::min(num_cells - 1, ci));
+    }
+    return cell;
+}
+
+long SphereBins::key(const Eigen::Ref<const Eigen::Vector3d>& uvec) const {
+    Eigen::Vector3i cell = index(uvec);
+    return ((long)cell(0) * num_cells + cell(1)) * num_cells + cell(2);
+}
+
+void InformationMap::set(const std::size_t& index,
+        const Eigen::Ref<const Eigen::Vector3d>& uvec,
+        const double& gain) {
+    if (index >= present.size()) {
+        present.resize(index + 1, false);
+        gains.resize(index + 1, 0);
+        uvecs.resize(index + 1, Eigen::Vector3d::Zero());
     }
+
+    if (present[index]) {
+        ordered.erase(std::make_pair(gains[index], index));
+    }
+    ordered.insert(std::make_pair(gain, index));
+    present[index] = true;
+    gains[index] = gain;
+    uvecs[index] = uvec;
+}
+
+void InformationMap::clear( void ) {
+    ordered.clear();
+    gains.clear();
+    uvecs.clear();
+    present.clear();
+}
+
+double InformationMap::max_gain( void ) const {
+    assert(!ordered.empty());
+    return ordered.begin()->first;
+}
+
+std::vector<std::size_t> InformationMap::top_k(const Eigen::Ref<const Eigen::Vector3d>& uvec,
+        const std::size_t& k,
+        const double& gain_factor,
+        const double& angle_factor,
+        const Eigen::Ref<const Eigen::VectorXd>& extra_cost) const {
+    
+    // the k best so far as (cost, index), the worst one on top
+    std::vector<std::pair<double, std::size_t> > best;
+    if (k == 0) {
+        return std::vector<std::size_t>();
+    }
+
+    for (auto it = ordered.begin(); it != ordered.end(); ++it) {
+        // angle and extra cost are non-negative so no vertex left can do better
+        if (best.size() == k && - gain_factor * it->first > best.front().first) {
+            break;
+        }
+
+        const std::size_t index = it->second;
+        double cost = - gain_factor * it->first
+            + angle_factor * single_central_angle(uvec, uvecs[index]);
+        if (extra_cost.size() > 0) {
+            cost += extra_cost(index);
+        }
+        
+        std::pair<double, std::size_t> candidate(cost, index);
+        if (best.size() < k) {
+            best.push_back(candidate);
+            std::push_heap(best.begin(), best.end());
+        } else if (candidate < best.front()) {
+            std::pop_heap(best.begin(), best.end());
+            best.back() = candidate;
+            std::push_heap(best.begin(), best.end());
+        }
+    }
+
+    std::sort_heap(best.begin(), best.end());
+    std::vector<std::size_t> indices;
+    for (auto& candidate : best) {
+        indices.push_back(candidate.second);
+    }
+    return indices;
 }
 
 void ReconstructMesh::update_meshdata( void ) {
     // update the data inside the mesh_ptr
     /* this->mesh->update_mesh(this->vertices, this->faces); */
 }
+void ReconstructMesh::set_mesh(const Eigen::Ref<const Eigen::MatrixXd>& v_in,
+                               const Eigen::Ref<const Eigen::MatrixXi>& f_in,
+                               const Eigen::Ref<const Eigen::VectorXd>& w_in) {
+    mesh->update_mesh(v_in, f_in);
+    set_all_weights(w_in);
+}
+
 double ReconstructMesh::maximum_weight(const Eigen::Ref<const Eigen::Vector3d>& v_in) {
     return pow(kPI * v_in.norm(), 2);
     /* return 6.0; */
@@ -130,6 +326,7 @@ double ReconstructMesh::maximum_weight(const Eigen::Ref<const Eigen::Vector3d>&
 
 bool ReconstructMesh::initialize_weight( void ) {
     // created is true if new and false if exisiting
+    info_map.clear();
 
     for (Vertex_index vd : mesh->surface_mesh.vertices() ) {
         set_weight(vd, maximum_weight(mesh->get_vertex(vd)));
@@ -140,6 +337,7 @@ bool ReconstructMesh::initialize_weight( void ) {
 
 bool ReconstructMesh::set_all_weights(const Eigen::Ref<const Eigen::VectorXd>& w_in) {
     assert(w_in.rows() == mesh->number_of_vertices());
+    info_map.clear();
     for (Vertex_index vd : mesh->surface_mesh.vertices() ) {
         set_weight(vd, w_in((int)vd));
     }
@@ -156,6 +354,7 @@ bool ReconstructMesh::set_weight(const Vertex_index& vd, const double& w) {
     /* assert(found); */
     // created is true if new and false if exisiting
     weight_property[vd] = w;
+    info_map.set((std::size_t)vd, mesh->get_vertex(vd).normalized(), w);
     
     return true;
 }
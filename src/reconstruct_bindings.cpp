@@ -32,5 +32,7 @@ PYBIND11_MODULE(reconstruct, m) {
                 pybind11::arg("meas_weight") = 1.0, pybind11::arg("vert_weight") = 1.0)
         .def("get_verts", &ReconstructMesh::get_verts, "Get the vertices")
         .def("get_faces", &ReconstructMesh::get_faces, "Get the faces")
-        .def("get_weights", &ReconstructMesh::get_weights, "Get the weights of the vertices");
+        .def("get_weights", &ReconstructMesh::get_weights, "Get the weights of the vertices")
+        .def("set_mesh", &ReconstructMesh::set_mesh, "Replace the vertices, faces and weights",
+                pybind11::arg("vertices"), pybind11::arg("faces"), pybind11::arg("weights"));
 }
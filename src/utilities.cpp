@@ -27,3 +27,18 @@ bool assert_SO3(const Eigen::Ref<const Eigen::Matrix<double, 3, 3> > &R) {
 	return isSO3;
 
 }
+
+Eigen::Matrix<double, 3, 3> hat_map(const Eigen::Ref<const Eigen::Vector3d>& vec) {
+    Eigen::Matrix<double, 3, 3> mat;
+    mat << 0, -vec(2), vec(1),
+           vec(2), 0, -vec(0),
+           -vec(1), vec(0), 0;
+    return mat;
+}
+
+Eigen::Vector3d vee_map(const Eigen::Ref<const Eigen::Matrix<double, 3, 3> >& mat) {
+    // same as kinematics.attitude.vee_map, the skew part of mat
+    return 0.5 * (Eigen::Vector3d() << mat(2, 1) - mat(1, 2),
+                                       mat(0, 2) - mat(2, 0),
+                                       mat(1, 0) - mat(0, 1)).finished();
+}
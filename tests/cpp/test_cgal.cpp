@@ -5,6 +5,7 @@
 #include <gtest/gtest.h>
 
 #include <iostream>
+#include <cmath>
 
 // The fixture for testing class Foo.
 class TestRayCaster: public ::testing::Test {
@@ -119,3 +120,79 @@ TEST_F(TestRayCaster, InitMeshNoIntersection) {
 
     ASSERT_FALSE(caster.intersection(psource, ptarget));  
 }
+
+TEST_F(TestRayCaster, RotationMatchesRotatedMesh) {
+    std::shared_ptr<MeshData> mesh = Loader::load(itokawa_file);
+    Eigen::Matrix3d Ra;
+    Ra = Eigen::AngleAxisd(0.7, Eigen::Vector3d(0, 0, 1));
+
+    RayCaster caster(mesh);
+    caster.set_rotation(Ra);
+
+    Eigen::MatrixXd V_rot = (Ra * mesh->get_verts().transpose()).transpose();
+    RayCaster caster_rot(V_rot, mesh->get_faces());
+    
+    Eigen::Vector3d psource(5, 1, 0.1);
+    Eigen::Matrix<double, 3, 3> targets;
+    targets << 0, 0, 0,
+               -5, 0, 0,
+               0, 0.05, 0.02;
+
+    Eigen::Matrix<double, Eigen::Dynamic, 3> intersections = caster.castarray(psource, targets);
+    Eigen::Matrix<double, Eigen::Dynamic, 3> intersections_rot = caster_rot.castarray(psource, targets);
+    ASSERT_TRUE(intersections.isApprox(intersections_rot, 1e-9));
+    ASSERT_EQ(caster.intersection(psource, targets.row(0)),
+              caster_rot.intersection(psource, targets.row(0)));
+}
+
+TEST_F(TestRayCaster, MinimumDistanceRotation) {
+    std::shared_ptr<MeshData> mesh = std::make_shared<MeshData>(Ve_true, Fe_true);
+    Eigen::Matrix3d Ra;
+    Ra = Eigen::AngleAxisd(M_PI / 4, Eigen::Vector3d(0, 0, 1));
+
+    RayCaster caster(mesh);
+    caster.set_rotation(Ra);
+
+    Eigen::MatrixXd V_rot = (Ra * mesh->get_verts().transpose()).transpose();
+    RayCaster caster_rot(V_rot, mesh->get_faces());
+
+    // the corner of the rotated cube is closer than the face
+    Eigen::Vector3d pt(2, 0, 0);
+    ASSERT_NEAR(caster.minimum_distance(pt), 2 - sqrt(2) / 2, 1e-9);
+    ASSERT_NEAR(caster.minimum_distance(pt), caster_rot.minimum_distance(pt), 1e-9);
+}
+
+TEST_F(TestRayCaster, CastArrayMatchesCastRay) {
+    std::shared_ptr<MeshData> mesh = Loader::load(itokawa_file);
+    RayCaster caster(mesh);
+
+    Eigen::Vector3d psource(2, 0.5, 0.3);
+    Eigen::Matrix<double, Eigen::Dynamic, 3> targets = Eigen::MatrixXd::Random(100, 3) * 0.2;
+    targets.row(0) << 10, 10, 10; // no intersection
+
+    Eigen::Matrix<double, Eigen::Dynamic, 3> intersections = caster.castarray(psource, targets);
+    for (int ii = 0; ii < targets.rows(); ++ii) {
+        ASSERT_TRUE(intersections.row(ii).isApprox(caster.castray(psource, targets.row(ii)))
+                    || intersections.row(ii).norm() == 0);
+    }
+    ASSERT_EQ(intersections.row(0).norm(), 0);
+}
+
+TEST_F(TestRayCaster, RefitAfterMovingVertex) {
+    std::shared_ptr<MeshData> mesh = std::make_shared<MeshData>(Ve_true, Fe_true);
+    RayCaster caster(mesh);
+
+    // push out every vertex with x = 0.5
+    for (Vertex_index vd : mesh->vertices()) {
+        Eigen::RowVector3d vertex = mesh->get_vertex(vd);
+        if (vertex(0) > 0) {
+            vertex(0) = 1.0;
+            mesh->set_vertex(vd, vertex.transpose());
+        }
+    }
+    caster.update_mesh(mesh);
+
+    Eigen::Vector3d psource(5, 0, 0), ptarget(0, 0, 0);
+    Eigen::RowVector3d intersection = caster.castray(psource, ptarget);
+    ASSERT_NEAR(intersection(0), 1.0, 1e-9);
+}
@@ -183,6 +183,53 @@ TEST(TestTranslationController, ControllerMeshMapping) {
     ASSERT_GT(tran_controller.get_mesh_mapping()[0].size(), 10);
 }
 
+TEST(TestTranslationController, ControllerCostCache) {
+    std::shared_ptr<MeshData> mesh_ptr;
+    mesh_ptr = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    std::shared_ptr<ReconstructMesh> rmesh_ptr = std::make_shared<ReconstructMesh>(mesh_ptr);
+    std::shared_ptr<Asteroid> ast = std::make_shared<Asteroid>("castalia", rmesh_ptr);
+    
+    std::shared_ptr<State> state_ptr = std::make_shared<State>();
+    state_ptr->pos((Eigen::Vector3d() << 1, 1, 1).finished());
+    
+    TranslationController tran_controller(rmesh_ptr->get_mesh());
+    tran_controller.minimize_uncertainty(0, state_ptr, rmesh_ptr, ast);
+    
+    Eigen::VectorXd cost = tran_controller.get_controller_cost();
+    Eigen::MatrixXd controller_vertices = tran_controller.get_controller_vertices();
+    ASSERT_EQ(cost.size(), controller_vertices.rows());
+    for (int ii = 0; ii < controller_vertices.rows(); ++ii) {
+        ASSERT_DOUBLE_EQ(cost(ii), control_cost(0, std::sqrt(3) * controller_vertices.row(ii), ast));
+    }
+    
+    // the cost is in the asteroid frame so it is the same after the asteroid rotates
+    state_ptr->pos(ast->rot_ast2int(100) * (Eigen::Vector3d() << 1, 1, 1).finished());
+    TranslationController rotated_controller(rmesh_ptr->get_mesh());
+    rotated_controller.minimize_uncertainty(100, state_ptr, rmesh_ptr, ast);
+    ASSERT_TRUE(rotated_controller.get_controller_cost().isApprox(cost, 1e-9));
+}
+
+TEST(TestTranslationController, PlanHorizonGreedy) {
+    std::shared_ptr<MeshData> mesh_ptr;
+    mesh_ptr = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    std::shared_ptr<ReconstructMesh> rmesh_ptr = std::make_shared<ReconstructMesh>(mesh_ptr);
+    std::shared_ptr<Asteroid> ast = std::make_shared<Asteroid>("castalia", rmesh_ptr);
+    
+    std::shared_ptr<State> state_ptr = std::make_shared<State>();
+    state_ptr->pos((Eigen::Vector3d() << 1, 1, 1).finished());
+    
+    // a single view with a single candidate is the greedy choice
+    TranslationController greedy_controller(rmesh_ptr->get_mesh());
+    greedy_controller.minimize_uncertainty(0, state_ptr, rmesh_ptr, ast);
+    TranslationController tran_controller(rmesh_ptr->get_mesh());
+    tran_controller.plan_horizon(0, state_ptr, rmesh_ptr, ast, 1, 1);
+    ASSERT_TRUE(tran_controller.get_posd().isApprox(greedy_controller.get_posd()));
+
+    tran_controller.plan_horizon(0, state_ptr, rmesh_ptr, ast, 3, 8);
+    ASSERT_TRUE(tran_controller.get_veld().isZero());
+    ASSERT_FALSE(tran_controller.get_posd().isZero());
+}
+
 TEST(TestController, ControlCost) {
     std::shared_ptr<MeshData> mesh_ptr;
     mesh_ptr = Loader::load("./integration/cube.obj");
@@ -268,3 +315,15 @@ TEST(TestController, ExploreCubeReturnState) {
     ASSERT_TRUE(new_state_ptr->get_att_dot().isApprox((Eigen::MatrixXd::Zero(3,3))));
 
 }
+
+TEST(TestController, VerticesInViewIndex) {
+    std::shared_ptr<MeshData> mesh_ptr = Loader::load("./integration/cube.obj");
+    std::shared_ptr<ReconstructMesh> rmesh_ptr = std::make_shared<ReconstructMesh>(mesh_ptr);
+    Controller controller, restored;
+
+    controller.set_vertices_in_view(rmesh_ptr, (Eigen::Vector3d() << 1, 1, 1).finished(), 0.5);
+    restored.set_vertices_in_view(controller.get_vertices_in_view());
+
+    ASSERT_GT(controller.get_vertices_in_view().size(), 0);
+    ASSERT_EQ(restored.get_vertices_in_view(), controller.get_vertices_in_view());
+}
@@ -197,6 +197,34 @@ TEST_F(TestMeshData, FaceFactorCube) {
     }
 }
 
+TEST_F(TestMeshData, FlatTablesMatchPropertyMaps) {
+    MeshData mesh(Ve_true, Fe_true);
+    
+    // move a vertex and ensure the affected rows are updated
+    Vertex_index vd(0);
+    mesh.set_vertex(vd, (Eigen::Vector3d() << -0.6, -0.6, -0.6).finished());
+    
+    ASSERT_TRUE(mesh.get_vertex_table().isApprox(mesh.get_verts()));
+    ASSERT_EQ(mesh.get_face_vertex_table().rows(), mesh.number_of_faces());
+    ASSERT_EQ(mesh.get_edge_vertex_table().rows(), mesh.number_of_edges());
+    
+    for (Face_index fd : mesh.faces()) {
+        Eigen::Matrix<double, 3, 3, Eigen::RowMajor> dyad = mesh.get_face_dyad(fd);
+        EXPECT_LT((mesh.get_face_dyad_table().row((int)fd) 
+                    - Eigen::Map<Eigen::Matrix<double, 1, 9> >(dyad.data())).norm(), 1e-12);
+    }
+
+    for (Edge_index ed : mesh.edges()) {
+        Eigen::Matrix<double, 3, 3, Eigen::RowMajor> dyad = mesh.get_edge_dyad(ed);
+        Eigen::RowVector3d v1 = mesh.get_vertex(mesh.surface_mesh.vertex(ed, 0));
+        Eigen::RowVector3d v2 = mesh.get_vertex(mesh.surface_mesh.vertex(ed, 1));
+        
+        EXPECT_LT((mesh.get_edge_dyad_table().row((int)ed) 
+                    - Eigen::Map<Eigen::Matrix<double, 1, 9> >(dyad.data())).norm(), 1e-12);
+        EXPECT_NEAR(mesh.get_edge_length_table()((int)ed), (v1 - v2).norm(), 1e-12);
+    }
+}
+
 TEST_F(TestMeshData, FacesInViewCube) {
     MeshData mesh(Ve_true, Fe_true);
     Eigen::Vector3d pos;
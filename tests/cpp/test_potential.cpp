@@ -5,6 +5,8 @@
 #include "gtest/gtest.h"
 
 #include <iostream>
+#include <thread>
+#include <vector>
 
 TEST(TestAsteroid, CubeGravity) {
     std::shared_ptr<MeshData> mesh_data = Loader::load("./integration/cube.obj");
@@ -105,3 +107,102 @@ TEST(TestAsteroid, CastaliaSurfaceSlope) {
     EXPECT_NEAR(face_slope.maxCoeff(), 0.669671, 1e-3);
     EXPECT_NEAR(face_slope.minCoeff(), 0.00451144, 1e-3);
 }
+
+TEST(TestAsteroid, BatchMatchesReference) {
+    std::shared_ptr<MeshData> mesh_data = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    Asteroid ast("castalia", mesh_data);
+    
+    Eigen::Matrix<double, Eigen::Dynamic, 3> states(6, 3);
+    states << 1, 2, 3,
+              -1, 0.5, 0.2,
+              2, -2, 1,
+              0, 0, 0,
+              0.1, 5, -3,
+              -3, -1, 0.5;
+
+    // from point_cloud.polyhedron.PolyhedronGravity, zero inside of the body
+    Eigen::VectorXd U_true(6);
+    Eigen::Matrix<double, 6, 3, Eigen::RowMajor> U_grad_true;
+    Eigen::Matrix<double, 6, 9, Eigen::RowMajor> U_grad_mat_true;
+    U_true << 2.4923324063940725e-08,
+              8.8938205541555294e-08,
+              3.1273457229422839e-08,
+              0,
+              1.6021267939949554e-08,
+              2.9520422942806858e-08;
+    U_grad_true << -1.7215261040963141e-09, -3.5357462723289411e-09, -5.3192945941294652e-09,
+                   7.4524740781203238e-08, -5.1261983195961420e-08, -2.1194224157913454e-08,
+                   -6.8418746988099095e-09, 7.0948830317656396e-09, -3.5561336108257256e-09,
+                   0, 0, 0,
+                   -4.6262532744929467e-11, -2.3471692044015803e-09, 1.4096841282284403e-09,
+                   8.7751657895403532e-09, 3.0307088879226331e-09, -1.5164125429608453e-09;
+    U_grad_mat_true << -1.3827768579049655e-09, 7.1925345086835532e-10, 1.0854559156692683e-09,
+                       7.1925345086835687e-10, -2.6337087019061492e-10, 2.2687257808106173e-09,
+                       1.0854559156692662e-09, 2.2687257808106218e-09, 1.6461477280953624e-09,
+                       8.7165400730122160e-08, -1.4502228954965638e-07, -6.1997326341120484e-08,
+                       -1.4502228954965628e-07, 6.8381818062324368e-09, 4.8225125503298679e-08,
+                       -6.1997326341120550e-08, 4.8225125503298626e-08, -9.4003582536354145e-08,
+                       9.4415235087630461e-10, -4.6418769303232244e-09, 2.3337547096938417e-09,
+                       -4.6418769303232128e-09, 1.3789501357290846e-09, -2.4697362365485562e-09,
+                       2.3337547096938363e-09, -2.4697362365485823e-09, -2.3231024866054556e-09,
+                       0, 0, 0,
+                       0, 0, 0,
+                       0, 0, 0,
+                       -4.6439694818939209e-10, 2.0106886246481622e-11, -1.2138065292590495e-11,
+                       2.0106886246480285e-11, 5.6182641882224017e-10, -6.1974214783916936e-10,
+                       -1.2138065292592530e-11, -6.1974214783916729e-10, -9.7429470632868349e-11,
+                       4.8545308034246820e-09, 2.7497095746762513e-09, -1.3779217452027136e-09,
+                       2.7497095746762492e-09, -2.0526402084414196e-09, -4.8638544460481993e-10,
+                       -1.3779217452026884e-09, -4.8638544460481704e-10, -2.8018905949833695e-09;
+
+    // use a small block so multiple blocks are exercised
+    Eigen::VectorXd U, Ulaplace;
+    Eigen::Matrix<double, Eigen::Dynamic, 3> U_grad;
+    Eigen::Matrix<double, Eigen::Dynamic, 9> U_grad_mat;
+    std::tie(U, U_grad, U_grad_mat, Ulaplace) = ast.polyhedron_potential_batch(states, 2);
+    
+    ASSERT_EQ(U.size(), states.rows());
+    for (int ii = 0; ii < states.rows(); ++ii) {
+        EXPECT_NEAR(U(ii), U_true(ii), 1e-9 * U_true(ii));
+        EXPECT_LE((U_grad.row(ii) - U_grad_true.row(ii)).norm(), 1e-9 * U_grad_true.row(ii).norm());
+        EXPECT_LE((U_grad_mat.row(ii) - U_grad_mat_true.row(ii)).norm(),
+                  1e-9 * U_grad_mat_true.row(ii).norm());
+        EXPECT_NEAR(Ulaplace(ii), 0, 1e-12);
+    }
+}
+
+TEST(TestAsteroid, ComputePotentialConcurrent) {
+    std::shared_ptr<MeshData> mesh_data = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    const Asteroid ast("castalia", mesh_data);
+    
+    const int num_threads = 4;
+    Eigen::Matrix<double, Eigen::Dynamic, 3> states(num_threads, 3);
+    states << 1, 2, 3,
+              -1, 0.5, 0.2,
+              2, -2, 1,
+              0.1, 5, -3;
+    
+    // serial result using the stateful interface
+    Asteroid ast_serial("castalia", mesh_data);
+    std::vector<double> U_true(num_threads);
+    for (int ii = 0; ii < num_threads; ++ii) {
+        ast_serial.polyhedron_potential(states.row(ii).transpose());
+        U_true[ii] = ast_serial.get_potential();
+    }
+    
+    // share one const asteroid across threads
+    std::vector<double> U(num_threads);
+    std::vector<std::thread> threads;
+    for (int ii = 0; ii < num_threads; ++ii) {
+        threads.push_back(std::thread([&, ii]() {
+            U[ii] = std::get<0>(ast.compute_potential(states.row(ii).transpose()));
+        }));
+    }
+    for (std::thread& t : threads) {
+        t.join();
+    }
+
+    for (int ii = 0; ii < num_threads; ++ii) {
+        EXPECT_NEAR(U[ii], U_true[ii], 1e-12);
+    }
+}
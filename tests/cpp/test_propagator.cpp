@@ -0,0 +1,78 @@
+#include "propagator.hpp"
+
+#include <gtest/gtest.h>
+
+#include <cmath>
+#include <vector>
+
+// nine independent harmonic oscillators
+static StateArray oscillators(const double& t, const StateArray& state) {
+    StateArray state_dot;
+    for (int ii = 0; ii < 9; ++ii) {
+        double omega = 0.5 + 0.3 * ii;
+        state_dot(2 * ii) = state(2 * ii + 1);
+        state_dot(2 * ii + 1) = - omega * omega * state(2 * ii);
+    }
+    return state_dot;
+}
+
+static StateArray oscillators_initial( void ) {
+    StateArray state = StateArray::Zero();
+    for (int ii = 0; ii < 9; ++ii) {
+        state(2 * ii) = 1;
+    }
+    return state;
+}
+
+static double oscillators_error(const Eigen::VectorXd& time,
+                                const Eigen::Matrix<double, Eigen::Dynamic, 18>& state) {
+    double error = 0;
+    for (int jj = 0; jj < time.size(); ++jj) {
+        for (int ii = 0; ii < 9; ++ii) {
+            error = std::max(error, std::abs(state(jj, 2 * ii) - std::cos((0.5 + 0.3 * ii) * time(jj))));
+        }
+    }
+    return error;
+}
+
+TEST(TestDormandPrince, DenseOutput) {
+    Eigen::VectorXd time;
+    Eigen::Matrix<double, Eigen::Dynamic, 18> state;
+    std::tie(time, state) = dormand_prince(oscillators, oscillators_initial(), 0, 10.25, 0.5, 1e-10, 1e-12);
+
+    ASSERT_EQ(time.size(), 22);
+    ASSERT_EQ(state.rows(), 22);
+    ASSERT_DOUBLE_EQ(time(1), 0.5);
+    ASSERT_DOUBLE_EQ(time(time.size() - 1), 10.25);
+    ASSERT_TRUE(state.row(0).isApprox(oscillators_initial()));
+    ASSERT_LT(oscillators_error(time, state), 1e-8);
+}
+
+TEST(TestDormandPrince, CallbackAtOutputs) {
+    std::vector<double> callback_time;
+    auto callback = [&callback_time](const double& t, const StateArray& state) {
+        callback_time.push_back(t);
+    };
+
+    Eigen::VectorXd time;
+    Eigen::Matrix<double, Eigen::Dynamic, 18> state;
+    std::tie(time, state) = dormand_prince(oscillators, oscillators_initial(), 0, 10.25, 0.5,
+                                           1e-10, 1e-12, callback);
+
+    ASSERT_EQ(callback_time.size(), time.size() - 1);
+    for (std::size_t ii = 0; ii < callback_time.size(); ++ii) {
+        ASSERT_EQ(callback_time[ii], time(ii + 1));
+    }
+    ASSERT_LT(oscillators_error(time, state), 1e-8);
+}
+
+TEST(TestDumbbell, InertiaAndGains) {
+    Dumbbell dum;
+    ASSERT_DOUBLE_EQ(dum.zeta2(0) - dum.zeta1(0), dum.l);
+    ASSERT_NEAR(dum.m1 * dum.zeta1(0) + dum.m2 * dum.zeta2(0), 0, 1e-12);
+    ASSERT_TRUE(dum.J.isApprox(dum.J.transpose()));
+    ASSERT_GT(dum.J(1, 1), dum.J(0, 0));
+    ASSERT_DOUBLE_EQ(dum.J(1, 1), dum.J(2, 2));
+    ASSERT_GT(dum.kR, 0);
+    ASSERT_GT(dum.kx, 0);
+}
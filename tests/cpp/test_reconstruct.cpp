@@ -1,9 +1,13 @@
 #include "reconstruct.hpp"
 #include "mesh.hpp"
 #include "loader.hpp"
+#include "geodesic.hpp"
 
 #include <gtest/gtest.h>
 
+#include <algorithm>
+#include <cmath>
+
 // The fixture for testing class Foo.
 class TestReconstruct: public ::testing::Test {
  protected:
@@ -134,3 +138,122 @@ TEST_F(TestReconstruct, UpdateManyVertices) {
     EXPECT_TRUE(reconstruct_mesh.get_verts().row(0).isApprox(pts.row(1)));
     
 }
+
+TEST_F(TestReconstruct, UpdateMatchesSingleUpdate) {
+    std::shared_ptr<MeshData> mesh_seq = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    std::shared_ptr<MeshData> mesh_batch = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    ReconstructMesh rmesh_seq(mesh_seq), rmesh_batch(mesh_batch);
+
+    Eigen::Matrix<double, Eigen::Dynamic, 3> pts = Eigen::MatrixXd::Random(200, 3);
+    double max_angle(0.2);
+    
+    for (int ii = 0; ii < pts.rows(); ++ii) {
+        rmesh_seq.single_update(pts.row(ii), max_angle);
+    }
+    rmesh_batch.update(pts, max_angle);
+
+    ASSERT_TRUE(rmesh_seq.get_verts() == rmesh_batch.get_verts());
+    ASSERT_TRUE(rmesh_seq.get_weights() == rmesh_batch.get_weights());
+}
+
+TEST_F(TestReconstruct, UpdateSkipsMissedMeasurements) {
+    std::shared_ptr<MeshData> mesh_all = Loader::load("./integration/cube.obj");
+    std::shared_ptr<MeshData> mesh_hit = Loader::load("./integration/cube.obj");
+    ReconstructMesh rmesh_all(mesh_all), rmesh_hit(mesh_hit);
+
+    Eigen::Matrix<double, Eigen::Dynamic, 3> pts(3, 3);
+    pts << 1, 1, 1,
+        NAN, NAN, NAN,
+        -1, -1, -1;
+    Eigen::Matrix<double, Eigen::Dynamic, 3> hits(2, 3);
+    hits << pts.row(0), pts.row(2);
+    double max_angle(1);
+
+    rmesh_all.update(pts, max_angle);
+    rmesh_hit.update(hits, max_angle);
+
+    ASSERT_TRUE(rmesh_all.get_verts().allFinite());
+    ASSERT_TRUE(rmesh_all.get_verts() == rmesh_hit.get_verts());
+    ASSERT_TRUE(rmesh_all.get_weights() == rmesh_hit.get_weights());
+}
+
+TEST_F(TestReconstruct, SetMeshSharedWithMeshData) {
+    std::shared_ptr<MeshData> mesh = Loader::load("./integration/cube.obj");
+    ReconstructMesh reconstruct_mesh(mesh);
+    
+    reconstruct_mesh.set_mesh(Ve_true, Fe_true, W_true);
+
+    ASSERT_EQ(reconstruct_mesh.get_verts(), Ve_true);
+    ASSERT_EQ(mesh->get_faces(), Fe_true);
+    ASSERT_EQ(reconstruct_mesh.get_weights(), W_true);
+}
+
+TEST(SphereBins, QueryContainsNeighbors) {
+    Eigen::Matrix<double, Eigen::Dynamic, 3> uvec = Eigen::MatrixXd::Random(500, 3);
+    uvec.rowwise().normalize();
+    double max_angle(0.3);
+    SphereBins bins(uvec, max_angle);
+    
+    std::vector<std::size_t> indices;
+    Eigen::Vector3d query(1, 0, 0);
+    bins.query(query, indices);
+    for (int ii = 0; ii < uvec.rows(); ++ii) {
+        if (std::acos(uvec.row(ii).dot(query)) < max_angle) {
+            ASSERT_TRUE(std::find(indices.begin(), indices.end(), (std::size_t)ii) != indices.end());
+        }
+    }
+}
+
+TEST(InformationMap, TopKMatchesFullCost) {
+    Eigen::Matrix<double, Eigen::Dynamic, 3> uvec = Eigen::MatrixXd::Random(500, 3);
+    uvec.rowwise().normalize();
+    Eigen::VectorXd gain = Eigen::VectorXd::Random(500).array() + 2.0;
+    Eigen::VectorXd extra = (Eigen::VectorXd::Random(500).array() + 1.0) * 0.01;
+
+    InformationMap info_map;
+    for (int ii = 0; ii < uvec.rows(); ++ii) {
+        info_map.set(ii, uvec.row(ii).transpose(), gain(ii));
+    }
+    // change some of the vertices after they were added
+    for (int ii = 0; ii < 50; ++ii) {
+        gain(ii) = 0.5 * gain(ii);
+        info_map.set(ii, uvec.row(ii).transpose(), gain(ii));
+    }
+    ASSERT_EQ(info_map.size(), 500);
+    ASSERT_EQ(info_map.max_gain(), gain.maxCoeff());
+    
+    Eigen::Vector3d pos_uvec(0, 0, 1);
+    Eigen::VectorXd cost = - 0.5 * gain.array() / gain.maxCoeff() 
+        + 0.5 * central_angle(pos_uvec.transpose(), uvec).array() / kPI + extra.array();
+    std::vector<std::size_t> sorted(cost.size());
+    for (std::size_t ii = 0; ii < sorted.size(); ++ii) {
+        sorted[ii] = ii;
+    }
+    std::sort(sorted.begin(), sorted.end(), [&cost](std::size_t a, std::size_t b) {
+            return cost(a) < cost(b);
+            });
+
+    std::vector<std::size_t> indices = info_map.top_k(pos_uvec, 5, 0.5 / gain.maxCoeff(), 0.5 / kPI, extra);
+    ASSERT_EQ(indices.size(), 5);
+    for (int ii = 0; ii < 5; ++ii) {
+        ASSERT_EQ(indices[ii], sorted[ii]);
+    }
+}
+
+TEST(InformationMap, FollowsReconstructUpdate) {
+    std::shared_ptr<MeshData> mesh_ptr = Loader::load("./data/shape_model/CASTALIA/castalia.obj");
+    ReconstructMesh rmesh(mesh_ptr);
+    Eigen::Matrix<double, 1, 3> pt(1, 0, 0);
+    rmesh.update(pt, 0.2);
+
+    const InformationMap& info_map = rmesh.get_information_map();
+    Eigen::VectorXd weights = rmesh.get_weights();
+    ASSERT_EQ(info_map.size(), rmesh.number_of_vertices());
+    ASSERT_EQ(info_map.max_gain(), weights.maxCoeff());
+    
+    // without the angle the best vertex has the largest weight
+    std::vector<std::size_t> indices = info_map.top_k((Eigen::Vector3d() << 1, 0, 0).finished(), 1, 1.0, 0.0);
+    Eigen::MatrixXd::Index max_index;
+    weights.maxCoeff(&max_index);
+    ASSERT_EQ(indices[0], max_index);
+}
@@ -24,3 +24,9 @@ TEST(TestUtilities, RandomNumberRange) {
         ASSERT_LE(rd(), 10);
     }
 }
+
+TEST(TestUtilities, HatMapCrossProduct) {
+    Eigen::Vector3d a(1, 2, 3), b(-4, 5, 0.5);
+    ASSERT_TRUE((hat_map(a) * b).isApprox(a.cross(b)));
+    ASSERT_TRUE(vee_map(hat_map(a)).isApprox(a));
+}
@@ -18,6 +18,7 @@ import pdb
 
 from point_cloud import wavefront
 from kinematics import attitude
+from dynamics import dumbbell, eoms, scheduler
 
 cgal = pytest.importorskip('lib.cgal')
 mesh_data = pytest.importorskip('lib.mesh_data')
@@ -27,6 +28,7 @@ reconstruct = pytest.importorskip('lib.reconstruct')
 geodesic = pytest.importorskip('lib.geodesic')
 controller = pytest.importorskip('lib.controller')
 stats = pytest.importorskip('lib.stats')
+propagator = pytest.importorskip('lib.propagator')
 
 class TestMeshData:
     v, f = wavefront.read_obj('./integration/cube.obj')
@@ -72,6 +74,21 @@ class TestMeshDist:
     def test_intersection_raycasting(self):
         intersections = self.caster.castray(self.pt, np.array([0, 0, 0],
                                                               dtype=np.float64))
+
+    def test_castarray_rotation(self):
+        caster = cgal.RayCaster(self.mesh)
+        Ra = attitude.rot3(np.pi / 4)
+        caster.set_rotation(Ra)
+        caster_rot = cgal.RayCaster(Ra.dot(self.v.T).T, self.f)
+        targets = np.array([[0, 0, 0], [0, 0.1, 0.1], [0, 5, 0]], dtype=np.float64)
+        np.testing.assert_allclose(caster.castarray(self.pt, targets),
+                                   caster_rot.castarray(self.pt, targets), atol=1e-12)
+        np.testing.assert_allclose(caster.get_rotation(), Ra)
+
+    def test_minimum_distance_rotation(self):
+        caster = cgal.RayCaster(self.mesh)
+        caster.set_rotation(attitude.rot3(np.pi / 4))
+        np.testing.assert_allclose(caster.minimum_distance(self.pt), 2 - np.sqrt(2) / 2)
     
     # also test out the ray caster
  
@@ -171,6 +188,33 @@ class TestAsteroid:
 
             np.testing.assert_allclose(ast_cpp.get_potential(), Up, 1e-6)
 
+    def test_asteroid_potential_batch(self):
+        mesh = mesh_data.MeshData(self.v, self.f)
+        ast = asteroid.Asteroid('castalia', mesh)
+        states = np.array([[1, 2, 3], [-1, 0.5, 0.2], [2, -2, 1]])
+
+        U, U_grad, U_grad_mat, Ulaplace = ast.polyhedron_potential_batch(states, 2)
+        for ii, state in enumerate(states):
+            ast.polyhedron_potential(state)
+            np.testing.assert_allclose(U[ii], ast.get_potential())
+            np.testing.assert_allclose(U_grad[ii, :], ast.get_acceleration())
+            np.testing.assert_allclose(U_grad_mat[ii, :].reshape((3, 3)),
+                                       ast.get_gradient_mat())
+
+    def test_compute_potential_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        mesh = mesh_data.MeshData(self.v, self.f)
+        ast = asteroid.Asteroid('castalia', mesh)
+        states = np.array([[1, 2, 3], [-1, 0.5, 0.2], [2, -2, 1], [0.1, 5, -3]])
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(ast.compute_potential, states))
+
+        for state, (U, U_grad, U_grad_mat, Ulaplace) in zip(states, results):
+            ast.polyhedron_potential(state)
+            np.testing.assert_allclose(U, ast.get_potential())
+            np.testing.assert_allclose(U_grad, ast.get_acceleration())
+
 class TestController:
     
     angle = ( 2 * np.pi - 0) * np.random.rand(1) + 0
@@ -231,3 +275,55 @@ class TestStats:
 
     def test_volume_mesh(self):
         np.testing.assert_allclose(stats.volume(self.mesh), 1)
+
+class TestPropagator:
+    """Native controlled dynamics against the Python equations of motion"""
+    v, f = wavefront.read_obj('./data/shape_model/CASTALIA/castalia.obj')
+    true_ast = asteroid.Asteroid('castalia', mesh_data.MeshData(v, f))
+
+    axes = true_ast.get_axes()
+    ellipsoid = surface_mesh.SurfMesh(axes[0], axes[1], axes[2], 10, 0.03, 0.5)
+    est_ast_rmesh = reconstruct.ReconstructMesh(mesh_data.MeshData(ellipsoid.get_verts(),
+                                                                   ellipsoid.get_faces()))
+    est_ast = asteroid.Asteroid('castalia', est_ast_rmesh)
+
+    dum = dumbbell.Dumbbell(m1=500, m2=500, l=0.003)
+    dum_cpp = propagator.Dumbbell(m1=500, m2=500, l=0.003)
+
+    initial_state = np.hstack(([1.5, 0, 0], [0, 1e-4, 0], attitude.rot3(np.pi / 2).reshape(-1),
+                               [1e-3, -2e-3, 1e-3]))
+
+    def native(self):
+        return propagator.Propagator(self.true_ast, self.est_ast, self.est_ast_rmesh,
+                                     controller.Controller(), self.dum_cpp)
+
+    def test_dumbbell_matches_python(self):
+        np.testing.assert_allclose(self.dum_cpp.J, self.dum.J)
+        np.testing.assert_allclose(self.dum_cpp.zeta1, self.dum.zeta1)
+        np.testing.assert_allclose(self.dum_cpp.zeta2, self.dum.zeta2)
+        np.testing.assert_allclose([self.dum_cpp.kR, self.dum_cpp.kW, self.dum_cpp.kx, self.dum_cpp.kv],
+                                   [self.dum.kR, self.dum.kW, self.dum.kx, self.dum.kv])
+
+    def test_eoms_match_python(self):
+        for t in (0, 12.5, 300):
+            expected = eoms.eoms_controlled_inertial_control_cost_pybind(
+                t, self.initial_state, self.true_ast, self.dum, controller.Controller(),
+                self.est_ast_rmesh, self.est_ast)
+            actual = self.native().eoms(t, self.initial_state)
+            np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-15)
+
+    def test_propagate_matches_scheduler(self):
+        t0, tf = 0, 10
+        expected = []
+        events = scheduler.Scheduler(eoms.eoms_controlled_inertial_control_cost_pybind, t0, tf,
+                                     args=(self.true_ast, self.dum, controller.Controller(),
+                                           self.est_ast_rmesh, self.est_ast),
+                                     method='RK45', rtol=1e-11, atol=1e-11)
+        events.every(1, lambda t, state: expected.append(state), restart=False)
+        events.run(self.initial_state)
+
+        time, state = self.native().rtol(1e-11).atol(1e-11).propagate(
+            self.initial_state, t0, tf, callback_every=1)
+        np.testing.assert_allclose(time, np.arange(t0, tf + 1))
+        np.testing.assert_allclose(state[0], self.initial_state)
+        np.testing.assert_allclose(state[1:], expected, rtol=1e-7, atol=1e-9)
@@ -170,3 +170,54 @@ class TestDumbbellAsteroidTranslationalLissajous():
         xdd_des = self.des_tran_tuple[2]
         np.testing.assert_equal(xdd_des.shape, (3,))
 
+
+class CountingController(object):
+    """Desired position is the state at the last decision"""
+    def __init__(self):
+        self.calls = 0
+
+    def explore_asteroid(self, t, state, *args):
+        self.calls += 1
+        self.posd = np.array(state[0:3])
+
+    def explore_asteroid_horizon(self, t, state, rmesh, ast_est, horizon, num_candidates,
+                                 max_angle):
+        self.planned = (horizon, num_candidates, max_angle)
+        self.explore_asteroid(t, state)
+
+    def get_Rd(self):
+        return np.eye(3)
+
+    get_Rd_dot = get_Rd
+
+    def get_ang_vel_d(self):
+        return np.zeros(3)
+
+    get_ang_vel_d_dot = get_veld = get_acceld = get_ang_vel_d
+
+    def get_posd(self):
+        return self.posd
+
+class TestDecisionHold():
+
+    def test_decision_held_until_expired(self):
+        hold = controller.DecisionHold(CountingController())
+        hold.explore_asteroid(0, state)
+        hold.explore_asteroid(0.5, state + 1)
+        np.testing.assert_equal(hold.controller.calls, 1)
+        np.testing.assert_allclose(hold.get_posd(), state[0:3])
+
+        hold.expire(1, state)
+        hold.explore_asteroid(1, state + 1)
+        np.testing.assert_equal(hold.replans, 2)
+        np.testing.assert_allclose(hold.get_posd(), state[0:3] + 1)
+        np.testing.assert_allclose(hold.get_veld(), np.zeros(3))
+
+    def test_horizon_planner(self):
+        hold = controller.DecisionHold(CountingController(), horizon=3, num_candidates=4,
+                                       max_angle=0.2)
+        hold.explore_asteroid(0, state, None, None)
+        hold.explore_asteroid(0.5, state + 1, None, None)
+        np.testing.assert_equal(hold.controller.calls, 1)
+        np.testing.assert_equal(hold.controller.planned, (3, 4, 0.2))
+        np.testing.assert_allclose(hold.get_posd(), state[0:3])
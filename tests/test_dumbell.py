@@ -38,6 +38,53 @@ class TestDumbbellInertial():
     def test_moment_of_inertia(self):
         np.testing.assert_allclose(self.dum.J, np.trace(self.dum.Jd)*np.eye(3,3) - self.dum.Jd)
 
+class TestDumbbellInertialBatch():
+
+    dum = dumbbell.Dumbbell()
+    states = np.vstack((state, np.hstack((pos + 1, vel, attitude.rot2(angle).reshape(9), ang_vel))))
+    time = np.array([t, 2 * t])
+    statedot = dum.eoms_inertial_batch(time, states, ast)
+
+    def test_eoms_inertial_batch_size(self):
+        np.testing.assert_allclose(self.statedot.shape, (2, 18))
+
+    def test_matches_eoms_inertial(self):
+        for ii in range(2):
+            np.testing.assert_allclose(self.statedot[ii, :],
+                                       self.dum.eoms_inertial(self.states[ii, :], self.time[ii], ast),
+                                       rtol=1e-12, atol=1e-20)
+
+class TestDumbbellInvariants():
+
+    dum = dumbbell.Dumbbell()
+    states = TestDumbbellInertialBatch.states
+    time = TestDumbbellInertialBatch.time
+    KE, PE, jacobi, ang_mom = dum.inertial_invariants(time, states, ast)
+
+    def test_energy_matches_single_state(self):
+        for ii in range(2):
+            pos, vel = self.states[ii, 0:3], self.states[ii, 3:6]
+            R, ang_vel = self.states[ii, 6:15].reshape((3, 3)), self.states[ii, 15:18]
+            Ra = attitude.rot3(ast.omega * self.time[ii], 'c')
+            U1 = ast.polyhedron_potential(Ra.T.dot(pos + R.dot(self.dum.zeta1)))[0]
+            U2 = ast.polyhedron_potential(Ra.T.dot(pos + R.dot(self.dum.zeta2)))[0]
+            KE = (1/2 * (self.dum.m1 + self.dum.m2) * vel.dot(vel)
+                  + 1/2 * ang_vel.dot(self.dum.J).dot(ang_vel))
+            np.testing.assert_allclose(self.KE[ii], KE)
+            np.testing.assert_allclose(self.PE[ii], -self.dum.m1 * U1 - self.dum.m2 * U2)
+
+    def test_relative_matches_inertial(self):
+        Ra = np.array([attitude.rot3(ast.omega * t, 'c') for t in self.time])
+        R = self.states[:, 6:15].reshape((2, 3, 3))
+        rel = np.hstack((np.einsum('nji,nj->ni', Ra, self.states[:, 0:3]),
+                         np.einsum('nji,nj->ni', Ra, self.states[:, 3:6]),
+                         np.einsum('nji,njk->nik', Ra, R).reshape((2, 9)),
+                         np.einsum('nji,njk,nk->ni', Ra, R, self.states[:, 15:18])))
+        for inertial, relative in zip((self.KE, self.PE, self.jacobi, self.ang_mom),
+                                      self.dum.relative_invariants(self.time, rel, ast)):
+            np.testing.assert_allclose(relative, inertial, rtol=1e-12,
+                                       atol=1e-12 * np.max(np.absolute(inertial)))
+
 class TestDumbbellRelative():
     dum = dumbbell.Dumbbell()
     angle = (2*np.pi- 0) * np.random.rand(1) + 0
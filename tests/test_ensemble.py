@@ -0,0 +1,281 @@
+"""Test the ensemble propagation over a process pool
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+
+import h5py
+import numpy as np
+import pytest
+
+from dynamics import dumbbell, ensemble
+
+# unit cube with outward facing normals
+V = np.array([[-0.5, -0.5, -0.5], [-0.5, -0.5, 0.5], [-0.5, 0.5, -0.5], [-0.5, 0.5, 0.5],
+              [0.5, -0.5, -0.5], [0.5, -0.5, 0.5], [0.5, 0.5, -0.5], [0.5, 0.5, 0.5]])
+F = np.array([[0, 6, 4], [0, 2, 6], [0, 3, 2], [0, 1, 3], [2, 7, 6], [2, 3, 7],
+              [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1], [1, 5, 7], [1, 7, 3]])
+
+class CubeAsteroid(object):
+    def __init__(self):
+        self.name = 'cube'
+        self.V, self.F = V, F
+        self.G = 6.673e-20
+        self.sigma = 2.67e12
+        self.omega = 2 * np.pi / 3600
+
+def initial_states(num_members):
+    radius = np.linspace(2, 3, num_members)
+    speed = np.sqrt(6.673e-20 * 2.67e12 / radius)
+    states = np.zeros((num_members, 18))
+    states[:, 0] = radius
+    states[:, 4] = speed
+    states[:, 6:15] = np.eye(3).reshape(-1)
+    return states
+
+class CppAsteroid(ensemble.SharedAsteroid):
+    """Shared cube with the rotation rate interface of the C++ asteroid"""
+    def __getattr__(self, name):
+        if name == 'omega':
+            raise AttributeError(name)
+        return ensemble.SharedAsteroid.__getattr__(self, name)
+
+    def get_omega(self):
+        return self.ast.omega
+
+class TestEnsemble():
+    time = np.linspace(0, 2000, 21)
+    states = initial_states(4)
+
+    def test_pool_matches_serial(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        l = [0.003, 0.003, 0.005, 0.005]
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                             l=l, processes=2, group='pool')
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                    l=l, processes=1, group='serial')
+
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_array_equal(hf['pool/time'][()], self.time)
+            np.testing.assert_array_equal(hf['pool/l'][()], l)
+            np.testing.assert_allclose(hf['pool/state'][()], hf['serial/state'][()],
+                                       rtol=1e-12, atol=1e-15)
+            np.testing.assert_array_equal(hf['pool/state'][:, 0, :], self.states)
+            assert np.all(hf['pool/elapsed'][()] > 0)
+
+    def test_failed_member(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        states = self.states.copy()
+        states[1, 0] = np.nan
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), states, self.time,
+                                             processes=2)
+        np.testing.assert_array_equal(status, [ensemble.SUCCESS, ensemble.FAILED,
+                                               ensemble.SUCCESS, ensemble.SUCCESS])
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_array_equal(hf['ensemble/status'][()], status)
+            assert hf['ensemble/message'][0].decode() == 'Integration successful.'
+
+    def test_resume(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                    processes=1)
+        with h5py.File(filename, 'a') as hf:
+            expected = hf['ensemble/state'][()]
+            elapsed = hf['ensemble/elapsed'][()]
+            hf['ensemble/state'][2, :, :] = 0
+            hf['ensemble/status'][2] = ensemble.FAILED
+
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                             processes=1, resume=True)
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_array_equal(hf['ensemble/state'][()], expected)
+            # only the failed member was propagated again
+            np.testing.assert_array_equal(hf['ensemble/elapsed'][[0, 1, 3]], elapsed[[0, 1, 3]])
+
+    def test_resume_parameters(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                    processes=1)
+        for option in ({'l': 0.005}, {'rtol': 1e-6}):
+            with pytest.raises(ValueError):
+                ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                            processes=1, resume=True, **option)
+
+    def test_memory_mapped_fallback(self, tmpdir, monkeypatch):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                             processes=2, group='shared')
+        monkeypatch.setattr(ensemble, 'shared_memory', None)
+        shared = ensemble.SharedAsteroid(CubeAsteroid())
+        directory = shared.directory
+        shared.close()
+        assert not os.path.exists(directory)
+
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                             processes=2, group='mapped')
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_array_equal(hf['mapped/state'][()], hf['shared/state'][()])
+
+def oscillators(t, states):
+    """Harmonic oscillators that carry their frequency in the state"""
+    return np.stack((states[:, 1], -states[:, 2]**2 * states[:, 0],
+                     np.zeros(states.shape[0])), axis=1)
+
+class TestLockstep():
+    omega = np.array([0.5, 1.0, 2.0, 4.0])
+    initial = np.stack((np.ones(4), np.zeros(4), omega), axis=1)
+    time = np.append(np.arange(0, 10.25, 0.5), 10.25)
+
+    def test_dense_output(self):
+        states, status, t_final, _ = ensemble.lockstep_dopri5(oscillators, self.initial, self.time,
+                                                              rtol=1e-10, atol=1e-12)
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        np.testing.assert_array_equal(t_final, 10.25)
+        np.testing.assert_allclose(states[:, :, 0], np.cos(self.omega[:, np.newaxis] * self.time),
+                                   atol=1e-8)
+
+    def test_terminal(self):
+        terminal = lambda t, states: states[:, 0] < -0.9
+        states, status, t_final, _ = ensemble.lockstep_dopri5(oscillators, self.initial, self.time,
+                                                              rtol=1e-10, atol=1e-12,
+                                                              terminal=terminal)
+        np.testing.assert_array_equal(status, ensemble.TERMINATED)
+        # stopped at the end of the step where it first went below -0.9
+        np.testing.assert_array_less(np.cos(self.omega * t_final), -0.9)
+        np.testing.assert_array_less(t_final, np.arccos(-0.9) / self.omega + 0.5)
+        for ii in range(4):
+            valid = self.time <= t_final[ii]
+            assert np.all(np.isfinite(states[ii, valid, 0]))
+            assert np.all(np.isnan(states[ii, ~valid, 0]))
+
+    def test_stopped_members_masked(self):
+        calls = []
+        def fun(t, states):
+            calls.append(states.shape[0])
+            return oscillators(t, states)
+
+        # the slow oscillators take longer steps so they stop first
+        states, status, t_final, _ = ensemble.lockstep_dopri5(fun, self.initial, self.time,
+                                                              rtol=1e-10, atol=1e-12,
+                                                              terminal=lambda t, states: t > 2)
+        np.testing.assert_array_equal(status, ensemble.TERMINATED)
+        np.testing.assert_array_less(2, t_final)
+        assert calls[0] == 4 and min(calls) == 1
+        assert sorted(calls, reverse=True) == calls
+
+def test_eoms_inertial_batch_cpp_asteroid():
+    ast, cpp_ast = ensemble.SharedAsteroid(CubeAsteroid()), CppAsteroid(CubeAsteroid())
+    dum = dumbbell.Dumbbell()
+    time = np.array([0, 1000, 2000])
+    np.testing.assert_array_equal(dum.eoms_inertial_batch(time, initial_states(3), cpp_ast),
+                                  dum.eoms_inertial_batch(time, initial_states(3), ast))
+    ast.close()
+    cpp_ast.close()
+
+def test_invariants_cpp_asteroid():
+    ast, cpp_ast = ensemble.SharedAsteroid(CubeAsteroid()), CppAsteroid(CubeAsteroid())
+    dum = dumbbell.Dumbbell()
+    time = np.array([0, 1000, 2000])
+    for invariants in (dum.inertial_invariants, dum.relative_invariants):
+        for actual, expected in zip(invariants(time, initial_states(3), cpp_ast),
+                                    invariants(time, initial_states(3), ast)):
+            np.testing.assert_array_equal(actual, expected)
+    ast.close()
+    cpp_ast.close()
+
+class TestEnsembleLockstep():
+    time = np.linspace(0, 2000, 21)
+    states = initial_states(5)
+
+    def test_matches_odeint(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        options = {'l': [0.003, 0.003, 0.005, 0.003, 0.003], 'rtol': 1e-11, 'atol': 1e-14}
+        status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                             processes=2, batch_size=2, group='lockstep',
+                                             **options)
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                    processes=1, group='odeint', **options)
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_allclose(hf['lockstep/state'][()], hf['odeint/state'][()],
+                                       rtol=1e-7, atol=1e-12)
+
+    def test_impact(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        states = self.states.copy()
+        states[0, 3:6] = 0
+        terminal = ensemble.RadiusBounds(min_radius=1.95)
+        for batch_size in (None, 5):
+            status = ensemble.propagate_ensemble(filename, CubeAsteroid(), states, self.time,
+                                                 processes=1, batch_size=batch_size,
+                                                 terminal=terminal)
+            np.testing.assert_array_equal(status, [ensemble.TERMINATED] + [ensemble.SUCCESS] * 4)
+            with h5py.File(filename, 'r') as hf:
+                assert hf['ensemble/message'][0].decode().startswith('Terminated')
+                assert np.isnan(hf['ensemble/state'][0, -1, 0])
+
+class TestInvariantMonitor():
+    time = np.linspace(0, 20000, 41)
+    states = initial_states(4)
+    states[:, 2] = 0.4
+
+    def test_tight_tolerance(self):
+        ast, dum = ensemble.SharedAsteroid(CubeAsteroid()), dumbbell.Dumbbell()
+        fun = lambda t, states: dum.eoms_inertial_batch(t, states, ast)
+        monitor = ensemble.InvariantMonitor(dum, ast, threshold=1e-8, every=100)
+        states, status, _, _ = ensemble.lockstep_dopri5(fun, self.states, self.time,
+                                                        rtol=1e-12, atol=1e-14, terminal=monitor)
+        np.testing.assert_array_equal(status, ensemble.SUCCESS)
+        np.testing.assert_array_less(monitor.drift, 1e-11)
+
+        # the energy is not conserved in the inertial frame but the Jacobi integral is
+        KE, PE, jacobi, _ = dum.inertial_invariants(self.time, states[0], ast)
+        assert np.ptp(KE + PE) / np.absolute(KE[0] + PE[0]) > 1e-4
+        np.testing.assert_allclose(jacobi, jacobi[0], rtol=1e-11)
+        ast.close()
+
+    def test_loose_tolerance(self):
+        ast, dum = ensemble.SharedAsteroid(CubeAsteroid()), dumbbell.Dumbbell()
+        fun = lambda t, states: dum.eoms_inertial_batch(t, states, ast)
+        monitor = ensemble.InvariantMonitor(dum, ast, threshold=1e-8, every=100)
+        _, status, t_final, _ = ensemble.lockstep_dopri5(fun, self.states, self.time,
+                                                         rtol=1e-6, atol=1e-8, terminal=monitor)
+        np.testing.assert_array_equal(status, ensemble.TERMINATED)
+        np.testing.assert_array_less(t_final, self.time[-1] / 4)
+        np.testing.assert_array_less(1e-8, monitor.drift)
+        ast.close()
+
+    def test_check_trajectory(self):
+        ast, dum = ensemble.SharedAsteroid(CubeAsteroid()), dumbbell.Dumbbell()
+        fun = lambda t, states: dum.eoms_inertial_batch(t, states, ast)
+        states, _, _, _ = ensemble.lockstep_dopri5(fun, self.states[:1], self.time,
+                                                   rtol=1e-6, atol=1e-8)
+
+        checked = []
+        monitor = ensemble.InvariantMonitor(dum, ast, threshold=1e-8, every=2000)
+        jacobi = monitor.jacobi
+        monitor.jacobi = lambda t, states: checked.append(t) or jacobi(t, states)
+        stop = monitor.check_trajectory(self.time, states[0])
+        # only every fourth output is checked after the reference
+        np.testing.assert_allclose(checked[-1], self.time[4::4])
+        np.testing.assert_array_equal(np.flatnonzero(stop) % 4, 0)
+        assert np.any(stop)
+        ast.close()
+
+    def test_ensemble(self, tmpdir):
+        filename = str(tmpdir.join('ensemble.hdf5'))
+        monitor = ensemble.InvariantMonitor(dumbbell.Dumbbell(), threshold=1e-8)
+        for batch_size in (None, 4):
+            status = ensemble.propagate_ensemble(filename, CubeAsteroid(), self.states, self.time,
+                                                 rtol=[1e-12, 1e-6, 1e-12, 1e-6], atol=1e-14,
+                                                 processes=1, batch_size=batch_size,
+                                                 terminal=monitor)
+            np.testing.assert_array_equal(status, [ensemble.SUCCESS, ensemble.TERMINATED] * 2)
+        assert monitor.ast is None
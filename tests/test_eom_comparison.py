@@ -1,6 +1,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 import numpy as np
 from scipy import integrate
+import h5py
 
 from eom_comparison import transform
 from kinematics import attitude as att
@@ -129,3 +130,57 @@ class TestInertialandRelativeEOMS():
 
     def test_asteroid_frame_comparison_ang_vel(self):
         np.testing.assert_array_almost_equal(self.astate_ham[:, 15:18], self.astate_int[:, 15:18])
+
+class TestBatchTransform():
+    ast = asteroid.Asteroid(name='castalia', num_faces=64)
+    dum = dumbbell.Dumbbell()
+
+    num = 100
+    time = np.linspace(0, 1e4, num)
+    state = np.hstack((np.random.rand(num, 6),
+                       np.array([att.rot1(angle).reshape(9) for angle in np.random.rand(num)]),
+                       np.random.rand(num, 3)))
+
+    def test_rotation_matrices(self):
+        Rast2int = transform.rot_ast2int(self.time, self.ast.omega)
+        for ii, t in enumerate(self.time):
+            np.testing.assert_allclose(Rast2int[ii], att.rot3(self.ast.omega * t, 'c'))
+
+    def test_hat_map(self):
+        vec = np.random.rand(self.num, 3)
+        vec_hat = transform.hat_map(vec)
+        for ii in range(self.num):
+            np.testing.assert_allclose(vec_hat[ii], att.hat_map(vec[ii]))
+
+    def test_eoms_inertial_to_asteroid_each_sample(self):
+        ast_state = transform.eoms_inertial_to_asteroid(self.time, self.state, self.ast, self.dum)
+        for ii, t in enumerate(self.time):
+            np.testing.assert_allclose(ast_state[ii, :],
+                                       transform.eoms_inertial_to_asteroid(t, self.state[ii, :],
+                                                                           self.ast, self.dum))
+            Ra = att.rot3(self.ast.omega * t, 'c')
+            R_sc2ast = Ra.T.dot(self.state[ii, 6:15].reshape((3, 3)))
+            np.testing.assert_allclose(ast_state[ii, 0:3], Ra.T.dot(self.state[ii, 0:3]))
+            np.testing.assert_allclose(ast_state[ii, 6:15], R_sc2ast.reshape(9))
+            np.testing.assert_allclose(ast_state[ii, 15:18], R_sc2ast.dot(self.state[ii, 15:18]))
+
+    def test_round_trip(self):
+        ast_state, _, _ = transform.inertial2ast(self.time, self.state, self.ast, self.dum)
+        ast_state[:, 15:18] = self.state[:, 15:18]
+        inertial_state, Rast2int, Rint2ast = transform.ast2inertial(self.time, ast_state,
+                                                                    self.ast, self.dum)
+        np.testing.assert_allclose(inertial_state[:, 0:15], self.state[:, 0:15], atol=1e-12)
+        np.testing.assert_allclose(Rast2int.shape, (3, 3, self.num))
+        np.testing.assert_allclose(np.einsum('ijn,jkn->ikn', Rast2int, Rint2ast)[:, :, -1], np.eye(3),
+                                   atol=1e-12)
+
+    def test_chunked_dataset(self, tmpdir):
+        expected = transform.eoms_inertial_to_asteroid(self.time, self.state, self.ast, self.dum)
+        with h5py.File(str(tmpdir.join('transform.hdf5')), 'w') as hf:
+            hf.create_dataset('time', data=self.time)
+            hf.create_dataset('state', data=self.state)
+            dataset = transform.transform_dataset(transform.eoms_inertial_to_asteroid, hf['time'],
+                                                  hf['state'], self.ast, self.dum, hf,
+                                                  'asteroid_state', chunk_size=32)
+            np.testing.assert_allclose(dataset[()], expected)
+            np.testing.assert_allclose(dataset.chunks, (32, 18))
@@ -0,0 +1,206 @@
+"""Test the spherical harmonic gravity model against the polyhedron
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import pytest
+
+from dynamics import gravity
+
+# unit cube with outward facing normals
+V = np.array([[-0.5, -0.5, -0.5], [-0.5, -0.5, 0.5], [-0.5, 0.5, -0.5], [-0.5, 0.5, 0.5],
+              [0.5, -0.5, -0.5], [0.5, -0.5, 0.5], [0.5, 0.5, -0.5], [0.5, 0.5, 0.5]])
+F = np.array([[0, 6, 4], [0, 2, 6], [0, 3, 2], [0, 1, 3], [2, 7, 6], [2, 3, 7],
+              [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1], [1, 5, 7], [1, 7, 3]])
+G = 6.673e-20
+sigma = 2.67e12
+
+class CubeAsteroid(object):
+    V, F, G, sigma = V, F, G, sigma
+
+def point_mass_sum(state):
+    """Potential and acceleration from a high order volume quadrature"""
+    pts, weights = gravity.tetrahedron_quadrature(V, F, 12)
+    d = state - pts
+    r = np.linalg.norm(d, axis=1)
+    U = G * sigma * np.sum(weights / r)
+    U_grad = -G * sigma * np.sum((weights / r**3)[:, np.newaxis] * d, axis=0)
+    return U, U_grad
+
+class TestSphericalHarmonicsCube():
+    sh = gravity.SphericalHarmonics.from_polyhedron(V, F, G, sigma, degree=8)
+    state = np.array([[1.5, 0.7, -0.4]])
+
+    def test_mass(self):
+        np.testing.assert_allclose(self.sh.mu, G * sigma)
+
+    def test_cube_symmetry(self):
+        # only even degrees and orders divisible by 4 are nonzero
+        np.testing.assert_allclose(self.sh.C[1:4, :], 0, atol=1e-14)
+        np.testing.assert_allclose(self.sh.S, 0, atol=1e-14)
+
+    def test_potential_within_bound(self):
+        U, U_grad, _, _ = self.sh.potential(self.state)
+        U_true, U_grad_true = point_mass_sum(self.state[0])
+        U_err, U_grad_err = self.sh.error_bound(np.linalg.norm(self.state))
+        np.testing.assert_array_less(np.absolute(U[0] - U_true), U_err)
+        np.testing.assert_array_less(np.linalg.norm(U_grad[0] - U_grad_true), U_grad_err)
+
+    def test_gradient_finite_difference(self):
+        U, U_grad, U_grad_mat, _ = self.sh.potential(self.state)
+        h = 1e-6
+        for ii in range(3):
+            dx = np.zeros(3)
+            dx[ii] = h
+            Up, Ugp, _, _ = self.sh.potential(self.state + dx)
+            Um, Ugm, _, _ = self.sh.potential(self.state - dx)
+            np.testing.assert_allclose((Up - Um) / 2 / h, U_grad[:, ii], rtol=1e-6)
+            np.testing.assert_allclose((Ugp - Ugm)[0] / 2 / h,
+                                       U_grad_mat[0].reshape((3, 3))[:, ii],
+                                       rtol=1e-5, atol=1e-12 * G * sigma)
+
+    def test_laplacian(self):
+        _, _, U_grad_mat, _ = self.sh.potential(self.state)
+        np.testing.assert_allclose(np.trace(U_grad_mat[0].reshape((3, 3))), 0,
+                                   atol=1e-12 * G * sigma)
+
+    def test_batch(self):
+        states = np.array([[1.5, 0.7, -0.4], [0, 0, 3], [-2, 1, 1]])
+        U, U_grad, U_grad_mat, _ = self.sh.potential(states)
+        for ii, state in enumerate(states):
+            Ui, Ugi, Ugmi, _ = self.sh.potential(state)
+            np.testing.assert_allclose(U[ii], Ui[0])
+            np.testing.assert_allclose(U_grad[ii], Ugi[0])
+            np.testing.assert_allclose(U_grad_mat[ii], Ugmi[0])
+
+def test_cache_roundtrip(tmpdir):
+    filename = str(tmpdir.join('cube_sh.hdf5'))
+    sh = gravity.SphericalHarmonics.from_asteroid(CubeAsteroid(), 6, filename)
+    sh_load = gravity.SphericalHarmonics.from_asteroid(CubeAsteroid(), 6, filename)
+    np.testing.assert_allclose(sh_load.C, sh.C)
+    np.testing.assert_allclose(sh_load.mu, sh.mu)
+    # different degree does not match the checksum
+    sh_other = gravity.SphericalHarmonics.from_asteroid(CubeAsteroid(), 4, filename)
+    np.testing.assert_equal(sh_other.degree, 4)
+
+def test_far_field_asteroid_itokawa():
+    from dynamics import asteroid
+    ast = asteroid.Asteroid('itokawa', 0, 'obj')
+    far = gravity.FarFieldAsteroid(ast, degree=8, rel_tol=1e-6)
+
+    near_state = np.array([0.5, 0.1, 0.0])
+    far_state = np.array([2 * far.switch_radius, 0.1, 0.2])
+
+    for state in (near_state, far_state):
+        U, U_grad, _, _ = far.polyhedron_potential(state)
+        U_true, U_grad_true, _, _ = ast.polyhedron_potential(state)
+        U_err, U_grad_err = far.error_bound(state)
+        np.testing.assert_array_less(np.absolute(U - U_true), U_err + 1e-16)
+        np.testing.assert_array_less(np.linalg.norm(U_grad - U_grad_true), U_grad_err + 1e-16)
+
+class TestClusterAsteroidCube():
+    cluster = gravity.ClusterAsteroid(CubeAsteroid(), theta=0.3, order=6, leaf_size=2)
+    states = np.array([[1.5, 0.7, -0.4], [0.9, 0.1, 0.2], [0, 0, 3]])
+    exact = cluster.polyhedron_potential_batch(states, theta=0)
+
+    def test_tree(self):
+        np.testing.assert_equal(len(self.cluster.cell_faces[0]), F.shape[0])
+        np.testing.assert_array_less(1, len(self.cluster.cell_faces))
+
+    def test_exact_matches_volume_integral(self):
+        for ii, state in enumerate(self.states):
+            U_true, U_grad_true = point_mass_sum(state)
+            np.testing.assert_allclose(self.exact[0][ii], U_true, rtol=1e-6)
+            np.testing.assert_allclose(self.exact[1][ii], U_grad_true, rtol=1e-5,
+                                       atol=1e-10 * G * sigma)
+
+    def test_exact_laplacian(self):
+        np.testing.assert_allclose(self.exact[3], 0, atol=1e-12 * G * sigma)
+
+    def test_validate(self):
+        error = self.cluster.validate(self.states, exact=self.exact)
+        np.testing.assert_array_less(error['U'], 1e-5)
+        np.testing.assert_array_less(error['U_grad'], 1e-4)
+
+    def test_single_point(self):
+        U, U_grad, U_grad_mat, _ = self.cluster.polyhedron_potential(self.states[0])
+        np.testing.assert_allclose(U_grad_mat, U_grad_mat.T, rtol=1e-12, atol=1e-25)
+        np.testing.assert_allclose(self.cluster.get_acceleration(), U_grad)
+
+def test_asteroid_gravity_abstract():
+    class MissingBatch(gravity.AsteroidGravity):
+        pass
+
+    with pytest.raises(TypeError):
+        MissingBatch(CubeAsteroid())
+
+def test_rotation_rate():
+    class CppAsteroid(object):
+        def get_omega(self):
+            return 2e-4
+
+    python_asteroid = CubeAsteroid()
+    python_asteroid.omega = 1e-4
+    assert gravity.rotation_rate(python_asteroid) == 1e-4
+    assert gravity.rotation_rate(CppAsteroid()) == 2e-4
+
+class PointMassAsteroid(CubeAsteroid):
+    """Point mass with the potential zeroed inside of a sphere like the polyhedron"""
+    mu = G * sigma
+
+    def polyhedron_potential_batch(self, states, block_size=64):
+        r = np.linalg.norm(states, axis=1)
+        inside = r < 0.9
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r3 = r**3
+            U = self.mu / r
+            U_grad = -self.mu * states / r3[:, np.newaxis]
+            U_grad_mat = self.mu * (3 * np.einsum('pi,pj->pij', states, states) / (r3 * r**2)[:, np.newaxis, np.newaxis]
+                                    - np.eye(3) / r3[:, np.newaxis, np.newaxis])
+        U[inside] = 0
+        U_grad[inside] = 0
+        U_grad_mat[inside] = 0
+        return U, U_grad, U_grad_mat.reshape((-1, 9)), np.zeros_like(U)
+
+class TestGridAsteroidPointMass():
+    ast = PointMassAsteroid()
+    grid_ast = gravity.GridAsteroid(ast, extent=4, num_nodes=41)
+    states = np.array([[1.5, 0.7, -0.4], [0.1, 2.2, 1.3], [-3.1, -1.2, 0.4]])
+
+    def test_contains(self):
+        contains = self.grid_ast.grid.contains(np.array([[2, 0, 0], [0.5, 0, 0], [5, 0, 0]]))
+        np.testing.assert_array_equal(contains, [True, False, False])
+
+    def test_interpolation(self):
+        U, U_grad, U_grad_mat, _ = self.grid_ast.polyhedron_potential_batch(self.states)
+        U_true, U_grad_true, U_grad_mat_true, _ = self.ast.polyhedron_potential_batch(self.states)
+        np.testing.assert_allclose(U, U_true, rtol=1e-5)
+        np.testing.assert_allclose(U_grad, U_grad_true, rtol=1e-3)
+        np.testing.assert_allclose(U_grad_mat, U_grad_mat_true, rtol=1e-1, atol=1e-2 * self.ast.mu)
+
+    def test_gradient_consistent(self):
+        _, U_grad, _, _ = self.grid_ast.grid.potential(self.states)
+        h = 1e-6
+        for ii in range(3):
+            dx = np.zeros(3)
+            dx[ii] = h
+            Up, _, _, _ = self.grid_ast.grid.potential(self.states + dx)
+            Um, _, _, _ = self.grid_ast.grid.potential(self.states - dx)
+            np.testing.assert_allclose((Up - Um) / 2 / h, U_grad[:, ii], rtol=1e-6, atol=1e-10 * self.ast.mu)
+
+    def test_exact_outside_grid(self):
+        state = np.array([6.0, 0.0, 0.0])
+        U, U_grad, _, _ = self.grid_ast.polyhedron_potential(state)
+        np.testing.assert_allclose(U, self.ast.mu / 6)
+        np.testing.assert_allclose(self.grid_ast.get_acceleration(), U_grad)
+
+    def test_cache(self, tmpdir):
+        filename = str(tmpdir.join('grid.hdf5'))
+        grid = gravity.GravityGrid.from_asteroid(self.ast, 4, 11, filename)
+        grid_load = gravity.GravityGrid.from_asteroid(self.ast, 4, 11, filename)
+        np.testing.assert_allclose(grid_load.nodes, grid.nodes)
+        np.testing.assert_array_equal(grid_load.cell_valid, grid.cell_valid)
@@ -288,3 +288,45 @@ class TestCubeOBJ():
 
     def test_grad_edge(self):
         np.testing.assert_allclose(self.U_grad_edge, self.U_grad_edge_loop)
+
+class TestPolyhedronGravityCastalia():
+    ast = asteroid.Asteroid('castalia', 4092, 'obj')
+    states = np.array([[1.0, 0.2, 0.3], [0.0, 2.0, -0.5], [-3.0, 1.0, 1.0], [0.0, 0.0, 0.0]])
+    model = ast.polyhedron_model
+    U, U_grad, U_grad_mat, Ulaplace = model.potential(states)
+
+    def test_face_contribution(self):
+        Gsigma = self.ast.G * self.ast.sigma
+        g = self.ast.asteroid_grav
+        state = self.states[0]
+        r_v = self.ast.V - state
+        w_face = polyhedron.laplacian_factor(r_v, g['Fa'], g['Fb'], g['Fc'])
+        L1, L2, L3 = polyhedron.edge_factor(r_v, g['e1'], g['e2'], g['e3'], g['e1_vertex_map'],
+                                            g['e2_vertex_map'], g['e3_vertex_map'])
+        U_face, U_grad_face, U_grad_mat_face = polyhedron.face_contribution(r_v, g['Fa'], g['F_face'], w_face)
+        U_edge, U_grad_edge, U_grad_mat_edge = polyhedron.edge_contribution(state, g['e_vertex_map'], g['unique_index'],
+                                                                            self.ast.V, g['E1_edge'], g['E2_edge'], g['E3_edge'],
+                                                                            L1, L2, L3)
+        np.testing.assert_allclose(self.U[0], Gsigma / 2 * (U_edge - U_face))
+        np.testing.assert_allclose(self.U_grad[0], Gsigma * (U_grad_face - U_grad_edge))
+        np.testing.assert_allclose(self.U_grad_mat[0], Gsigma * (U_grad_mat_edge - U_grad_mat_face))
+
+    def test_single_point(self):
+        for ii, state in enumerate(self.states):
+            U, U_grad, U_grad_mat, Ulaplace = self.ast.polyhedron_potential(state)
+            np.testing.assert_allclose(U, self.U[ii])
+            np.testing.assert_allclose(U_grad, self.U_grad[ii])
+            np.testing.assert_allclose(U_grad_mat, self.U_grad_mat[ii])
+
+    def test_chunks(self):
+        U, U_grad, U_grad_mat, _ = self.model.potential(self.states, max_elements=1)
+        np.testing.assert_allclose(U, self.U)
+        np.testing.assert_allclose(U_grad, self.U_grad)
+
+    def test_inside(self):
+        np.testing.assert_allclose(self.U[3], 0)
+        np.testing.assert_allclose(self.U_grad[3], np.zeros(3))
+
+    def test_batch_interface(self):
+        U, U_grad, U_grad_mat, _ = self.ast.polyhedron_potential_batch(self.states)
+        np.testing.assert_allclose(U_grad_mat, self.U_grad_mat.reshape((-1, 9)))
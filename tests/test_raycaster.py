@@ -62,6 +62,25 @@ class TestRayCaster():
         point = np.array([5,5,5])
         np.testing.assert_allclose(self.caster.ispointinside(point),False)
 
+    def test_castarray_mask(self):
+        targets = np.array([[-5, 0, 0], [6, 0, 0], [-5, 0, 0]])
+        intersections, hit = self.caster.castarray([5, 0, 0], targets, return_mask=True)
+        np.testing.assert_array_equal(hit, [True, False, True])
+        np.testing.assert_allclose(intersections[0, :], np.array([0.29648888, 0, 0]))
+        np.testing.assert_array_equal(np.isnan(intersections[1, :]), True)
+
+    def test_castarray_hits_only(self):
+        targets = np.array([[-5, 0, 0], [6, 0, 0]])
+        intersections = self.caster.castarray([5, 0, 0], targets)
+        np.testing.assert_allclose(intersections.shape, (1, 3))
+
+    def test_castbatch_matches_castray(self):
+        sources = np.array([[5, 0, 0], [0, 5, 0], [0, 0, 5], [5, 5, 5]])
+        intersections, hit = self.caster.castbatch(sources, -sources)
+        np.testing.assert_array_equal(hit, True)
+        for source, intersection in zip(sources, intersections):
+            np.testing.assert_allclose(intersection, self.caster.castray(source, -source))
+
     def test_distance(self):
         pa = np.array([5, 0, 0])
         pb = np.array([0, 0, 0])
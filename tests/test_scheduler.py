@@ -0,0 +1,67 @@
+"""Test the event driven integration scheduler
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from scipy import integrate
+
+from dynamics import scheduler
+
+def oscillator(t, state, omega):
+    return np.array([state[1], -omega[0]**2 * state[0]])
+
+class TestScheduler():
+    options = {'rtol': 1e-10, 'atol': 1e-12}
+
+    def test_output_does_not_restart(self):
+        events = scheduler.Scheduler(oscillator, 0, 10, args=([2.0],), **self.options)
+        output = []
+        events.every(0.5, lambda t, state: output.append((t, state[0])), restart=False)
+        t, state = events.run([1, 0])
+
+        np.testing.assert_equal(events.segments, 1)
+        np.testing.assert_allclose([time for time, _ in output], np.arange(0.5, 10.5, 0.5))
+        np.testing.assert_allclose([x for _, x in output], np.cos(2 * np.arange(0.5, 10.5, 0.5)),
+                                   atol=1e-8)
+        np.testing.assert_equal(t, 10)
+
+    def test_event_changes_dynamics(self):
+        omega = [1.0]
+        def double_frequency(t, state):
+            omega[0] = 2 * omega[0]
+
+        events = scheduler.Scheduler(oscillator, 0, 3, args=(omega,), **self.options)
+        events.every(2, double_frequency)
+        t, state = events.run([1, 0])
+        np.testing.assert_equal(events.segments, 2)
+
+        first = integrate.solve_ivp(oscillator, (0, 2), [1, 0], args=([1.0],), **self.options)
+        second = integrate.solve_ivp(oscillator, (2, 3), first.y[:, -1], args=([2.0],),
+                                     **self.options)
+        np.testing.assert_allclose(state, second.y[:, -1], atol=1e-8)
+
+    def test_event_order(self):
+        log = []
+        events = scheduler.Scheduler(oscillator, 0, 2, args=([1.0],), **self.options)
+        events.every(1, lambda t, state: log.append(('scan', t)))
+        events.every(0.5, lambda t, state: log.append(('save', t)), restart=False)
+        events.run([1, 0])
+        np.testing.assert_equal(log, [('save', 0.5), ('scan', 1), ('save', 1), ('save', 1.5),
+                                      ('scan', 2), ('save', 2)])
+
+    def test_resume_from_event(self):
+        def run(state, t=None):
+            output = []
+            events = scheduler.Scheduler(oscillator, 0, 10, args=([2.0],), **self.options)
+            events.every(1, lambda t, state: None)
+            events.every(0.25, lambda t, state: output.append(state), restart=False)
+            events.run(state, t)
+            return np.array(output)
+
+        expected = run([1, 0])
+        resumed = run(expected[15], 4)
+        np.testing.assert_array_equal(resumed, expected[16:])
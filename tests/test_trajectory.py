@@ -0,0 +1,235 @@
+"""Test the chunked trajectory storage against the per step layout
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import h5py
+import numpy as np
+
+from dynamics import trajectory
+
+num_steps = 50
+states = np.random.rand(num_steps, 18)
+Ras = np.random.rand(num_steps, 3, 3)
+faces = np.array([[0, 1, 2], [0, 2, 3], [0, 3, 1], [1, 3, 2]])
+refined_faces = np.array([[0, 1, 2], [0, 2, 3], [0, 3, 4], [1, 3, 4], [1, 4, 2]])
+
+def mesh(ii):
+    """Mesh with a topology change half way through"""
+    if ii < num_steps // 2:
+        return np.full((4, 3), ii, dtype=float), faces, np.full(4, ii, dtype=float)
+    else:
+        return np.full((5, 3), ii, dtype=float), refined_faces, np.full(5, ii, dtype=float)
+
+def write_chunked(group, block_size=16):
+    writer = trajectory.TrajectoryWriter(group, num_steps=10, block_size=block_size)
+    for ii in range(num_steps):
+        writer.append(ii + 1, mesh=mesh(ii), state=states[ii], Ra=Ras[ii])
+    writer.close()
+
+def write_legacy(group):
+    for name in trajectory.MESH_FIELDS + ('state', 'Ra'):
+        group.create_group(name)
+    for ii in range(num_steps):
+        v, f, w = mesh(ii)
+        group['reconstructed_vertex'].create_dataset(str(ii + 1), data=v)
+        group['reconstructed_face'].create_dataset(str(ii + 1), data=f)
+        group['reconstructed_weight'].create_dataset(str(ii + 1), data=w)
+        group['state'].create_dataset(str(ii + 1), data=states[ii])
+        group['Ra'].create_dataset(str(ii + 1), data=Ras[ii])
+
+class TestTrajectory():
+
+    def test_layouts_match(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            write_chunked(hf.create_group('chunked'))
+            write_legacy(hf.create_group('legacy'))
+
+            for group in ('chunked', 'legacy'):
+                reader = trajectory.TrajectoryReader(hf[group])
+                np.testing.assert_equal(len(reader), num_steps)
+                np.testing.assert_allclose(reader.steps, np.arange(1, num_steps + 1))
+                np.testing.assert_allclose(reader.read('state'), states)
+                np.testing.assert_allclose(reader.read('Ra', -1), Ras[-1])
+                np.testing.assert_allclose(reader.read('state', reader.rows(10, 20)), states[9:19])
+                for ii, (v, f, w) in enumerate(reader.meshes()):
+                    v_true, f_true, w_true = mesh(ii)
+                    np.testing.assert_allclose(v, v_true)
+                    np.testing.assert_array_equal(f, f_true)
+                    np.testing.assert_allclose(w, w_true)
+
+    def test_faces_stored_on_topology_change(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            write_chunked(hf)
+            np.testing.assert_equal(hf['reconstructed_face'].shape[0],
+                                    faces.shape[0] + refined_faces.shape[0])
+            np.testing.assert_equal(hf['state'].shape, (num_steps, 18))
+            np.testing.assert_equal(hf['Ra'].chunks, (16, 3, 3))
+
+    def test_index(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            write_chunked(hf)
+            reader = trajectory.TrajectoryReader(hf)
+            np.testing.assert_equal(reader.index(5), 4)
+            np.testing.assert_raises(KeyError, reader.index, 0.5)
+
+    def test_close_empty(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            trajectory.TrajectoryWriter(hf.create_group('empty')).close()
+            np.testing.assert_equal(len(hf['empty'].keys()), 0)
+
+    def test_fields_must_match(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            writer = trajectory.TrajectoryWriter(hf)
+            writer.append(0, state=states[0])
+            np.testing.assert_raises(ValueError, writer.append, 1, Ra=Ras[0])
+
+def radial_history(num_steps=40, num_verts=200):
+    """Sparse radial vertex updates like ReconstructMesh"""
+    np.random.seed(0)
+    v = np.random.randn(num_verts, 3)
+    w = np.full(num_verts, 10.0)
+    history = []
+    for ii in range(num_steps):
+        index = np.random.choice(num_verts, 5, replace=False)
+        radius = np.linalg.norm(v[index], axis=1) * np.random.uniform(0.9, 1.1, 5)
+        uvec = v[index] / np.linalg.norm(v[index], axis=1)[:, np.newaxis]
+        v = v.copy()
+        w = w.copy()
+        v[index] = radius[:, np.newaxis] * uvec
+        w[index] = w[index] / 2
+        history.append((v, w))
+    return history
+
+class TestTrajectoryKeyframes():
+    history = radial_history()
+
+    def write(self, group, keyframe_interval=16):
+        writer = trajectory.TrajectoryWriter(group, block_size=7,
+                                             keyframe_interval=keyframe_interval)
+        for ii, (v, w) in enumerate(self.history):
+            writer.append(ii, mesh=(v, faces, w))
+        writer.close()
+
+    def test_reconstruct_any_step(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            self.write(hf)
+            reader = trajectory.TrajectoryReader(hf)
+            for ii in (0, 1, 15, 16, 17, 39, -1):
+                v, f, w = reader.mesh(ii)
+                np.testing.assert_allclose(v, self.history[ii][0], rtol=1e-12)
+                np.testing.assert_array_equal(w, self.history[ii][1])
+            for (v, f, w), (v_true, w_true) in zip(reader.meshes(), self.history):
+                np.testing.assert_allclose(v, v_true, rtol=1e-12)
+                np.testing.assert_array_equal(w, w_true)
+
+    def test_deltas_are_sparse(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            self.write(hf)
+            num_keyframes = hf['keyframe_row'].shape[0]
+            np.testing.assert_equal(num_keyframes, 3)
+            np.testing.assert_equal(hf['reconstructed_vertex'].shape[0], 3 * 200)
+            np.testing.assert_equal(hf['delta_index'].shape[0], 5 * (40 - num_keyframes))
+
+    def test_non_radial_change_is_keyframe(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            writer = trajectory.TrajectoryWriter(hf)
+            v, w = self.history[0]
+            v_moved = v.copy()
+            v_moved[0] += 0.1
+            writer.append(0, mesh=(v, faces, w))
+            writer.append(1, mesh=(v_moved, faces, w))
+            writer.close()
+            np.testing.assert_array_equal(hf['keyframe_row'][()], [0, 1])
+            np.testing.assert_allclose(trajectory.TrajectoryReader(hf).mesh(1)[0], v_moved)
+
+class TestAsyncTrajectoryWriter():
+
+    def test_matches_synchronous(self, tmpdir):
+        filename = str(tmpdir.join('async.hdf5'))
+        with trajectory.AsyncTrajectoryWriter(filename, 'async', maxsize=4, num_steps=10,
+                                              block_size=16) as writer:
+            for ii in range(num_steps):
+                writer.append(ii + 1, mesh=mesh(ii), state=states[ii], Ra=Ras[ii])
+
+        with h5py.File(filename, 'a') as hf:
+            write_chunked(hf.create_group('sync'))
+            np.testing.assert_equal(sorted(hf['async'].keys()), sorted(hf['sync'].keys()))
+            for name in hf['sync']:
+                np.testing.assert_array_equal(hf['async'][name][()], hf['sync'][name][()])
+            np.testing.assert_equal(dict(hf['async'].attrs), dict(hf['sync'].attrs))
+
+    def test_flush_on_exception(self, tmpdir):
+        filename = str(tmpdir.join('async.hdf5'))
+        try:
+            with trajectory.AsyncTrajectoryWriter(filename, '/') as writer:
+                for ii in range(5):
+                    writer.append(ii, state=states[ii])
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_allclose(trajectory.TrajectoryReader(hf).read('state'), states[:5])
+
+    def test_close_without_steps(self, tmpdir):
+        filename = str(tmpdir.join('async.hdf5'))
+        try:
+            with trajectory.AsyncTrajectoryWriter(filename, '/'):
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+
+        with h5py.File(filename, 'r') as hf:
+            np.testing.assert_equal(len(hf.keys()), 0)
+
+    def test_writer_error_is_raised(self, tmpdir):
+        filename = str(tmpdir.join('async.hdf5'))
+        writer = trajectory.AsyncTrajectoryWriter(filename, '/')
+        writer.append(0, state=states[0])
+        writer.append(1, Ra=Ras[0])
+        np.testing.assert_raises(RuntimeError, writer.close)
+
+class TestTrajectoryResume():
+    history = radial_history(num_steps=50)
+
+    def write(self, group, start, stop, length=None):
+        if length is None:
+            writer = trajectory.TrajectoryWriter(group, block_size=8, keyframe_interval=16)
+        else:
+            writer = trajectory.TrajectoryWriter.resume(group, length, block_size=8,
+                                                        keyframe_interval=16)
+        for ii in range(start, stop):
+            v, w = self.history[ii]
+            writer.append(ii, mesh=(v, faces if ii < 35 else refined_faces, w), state=states[ii])
+            if ii == 24:
+                writer.checkpoint(step=ii + 1, state=states[ii])
+        writer.close()
+
+    def test_resume_matches_uninterrupted(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            self.write(hf.create_group('uninterrupted'), 0, 50)
+            # killed some time after the checkpoint
+            self.write(hf.create_group('resumed'), 0, 30)
+            length, values = trajectory.read_checkpoint(hf['resumed'])
+            np.testing.assert_equal(length, 25)
+            np.testing.assert_allclose(values['state'], states[24])
+            self.write(hf['resumed'], int(values['step']), 50, length=length)
+
+            expected = trajectory.TrajectoryReader(hf['uninterrupted'])
+            reader = trajectory.TrajectoryReader(hf['resumed'])
+            np.testing.assert_equal(len(reader), 50)
+            np.testing.assert_array_equal(reader.steps, expected.steps)
+            np.testing.assert_array_equal(reader.read('state'), expected.read('state'))
+            for (v, f, w), (v_true, f_true, w_true) in zip(reader.meshes(), expected.meshes()):
+                np.testing.assert_allclose(v, v_true, rtol=1e-12)
+                np.testing.assert_array_equal(f, f_true)
+                np.testing.assert_array_equal(w, w_true)
+            np.testing.assert_equal(hf['resumed/state'].shape[0], 50)
+
+    def test_no_checkpoint(self, tmpdir):
+        with h5py.File(str(tmpdir.join('traj.hdf5')), 'w') as hf:
+            np.testing.assert_raises(KeyError, trajectory.read_checkpoint, hf)
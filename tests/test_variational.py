@@ -0,0 +1,116 @@
+"""Test the Lie group variational integrator of the dumbbell
+
+Author
+------
+Shankar Kulumani		GWU		skulumani@gwu.edu
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import pytest
+
+from dynamics import dumbbell, ensemble, variational
+from eom_comparison import transform
+from tests.test_ensemble import CubeAsteroid, initial_states
+
+dum = dumbbell.Dumbbell()
+
+states = initial_states(2)
+states[:, 2] = 0.4
+states[:, 15:18] = [1e-3, 2e-3, -1e-3]
+
+class CountedAsteroid(ensemble.SharedAsteroid):
+    calls = 0
+
+    def polyhedron_potential_batch(self, states, block_size=64):
+        self.calls += 1
+        return ensemble.SharedAsteroid.polyhedron_potential_batch(self, states, block_size)
+
+def hat(vec):
+    return np.array([[0, -vec[2], vec[1]], [vec[2], 0, -vec[0]], [-vec[1], vec[0], 0]])
+
+class TestSolveRotation():
+    g = np.array([[1e-6, -2e-6, 3e-6], [0, 0, 0], [4e-5, 1e-5, -2e-5]])
+    F = variational.solve_rotation(g, dum.J)
+
+    def test_orthogonal(self):
+        for F in self.F:
+            np.testing.assert_allclose(F.T.dot(F), np.eye(3), atol=1e-14)
+            np.testing.assert_allclose(np.linalg.det(F), 1)
+
+    def test_implicit_equation(self):
+        for g, F in zip(self.g, self.F):
+            np.testing.assert_allclose(F.dot(dum.Jd) - dum.Jd.dot(F.T), hat(g),
+                                       atol=1e-14 * np.max(np.absolute(self.g)))
+
+    def test_no_solution(self):
+        # a rotation of more than pi about the intermediate axis
+        g = np.array([[3 * dum.Jd[1, 1], 0, 0], [1e-6, 0, 0]])
+        F = variational.solve_rotation(g, dum.J)
+        assert np.all(np.isnan(F[0]))
+        assert np.all(np.isfinite(F[1]))
+
+class TestLGVI():
+    time = np.linspace(0, 2000, 21)
+
+    def test_matches_dopri5(self):
+        ast = ensemble.SharedAsteroid(CubeAsteroid())
+        fun = lambda t, states: dum.eoms_inertial_batch(t, states, ast)
+        expected, _, _, _ = ensemble.lockstep_dopri5(fun, states, self.time, rtol=1e-12, atol=1e-14)
+        actual = variational.lgvi(dum, ast, states, self.time, step=1)
+        np.testing.assert_allclose(actual[:, :, 0:3], expected[:, :, 0:3], rtol=1e-8)
+        np.testing.assert_allclose(actual[:, :, 6:15], expected[:, :, 6:15], atol=1e-5)
+        np.testing.assert_allclose(variational.lgvi(dum, ast, states[0], self.time, step=1),
+                                   actual[0])
+        ast.close()
+
+    def test_large_steps(self):
+        ast = CountedAsteroid(CubeAsteroid())
+        time = np.linspace(0, 100000, 101)
+        state = variational.lgvi(dum, ast, states, time, step=100)
+        # a single potential evaluation for every step
+        assert ast.calls == 1001
+
+        R = state[:, :, 6:15].reshape((-1, 3, 3))
+        np.testing.assert_allclose(R @ np.swapaxes(R, 1, 2), np.broadcast_to(np.eye(3), R.shape),
+                                   atol=1e-13)
+        for member in state:
+            _, _, jacobi, _ = dum.inertial_invariants(time, member, ast)
+            np.testing.assert_allclose(jacobi, jacobi[0], rtol=1e-5)
+        ast.close()
+
+    def test_relative_frames(self):
+        ast = ensemble.SharedAsteroid(CubeAsteroid())
+        inertial = variational.lgvi(dum, ast, states, self.time, step=10)
+        relative = variational.lgvi(
+            dum, ast, transform.eoms_inertial_to_asteroid(np.zeros(2), states, ast, dum),
+            self.time, step=10, eoms='relative')
+        for ii in range(2):
+            np.testing.assert_allclose(
+                relative[ii], transform.eoms_inertial_to_asteroid(self.time, inertial[ii], ast, dum),
+                rtol=1e-10, atol=1e-15)
+
+        hamilton = relative.copy()
+        hamilton[:, :, 3:6] *= dum.m1 + dum.m2
+        R = relative[:, :, 6:15].reshape((2, -1, 3, 3))
+        hamilton[:, :, 15:18] = np.einsum('tnij,jk,tnlk,tnl->tni', R, dum.J, R, relative[:, :, 15:18])
+        np.testing.assert_allclose(variational.lgvi(dum, ast, hamilton[:, 0, :], self.time, step=10,
+                                                    eoms='hamilton'),
+                                   hamilton, rtol=1e-10, atol=1e-15)
+        ast.close()
+
+    def test_failed_member(self):
+        ast = ensemble.SharedAsteroid(CubeAsteroid())
+        spinning = states.copy()
+        spinning[1, 15:18] = 0
+        time = np.linspace(0, 5000, 6)
+        actual = variational.lgvi(dum, ast, spinning, time)
+        assert np.all(np.isnan(actual[0, 1:, :]))
+        np.testing.assert_allclose(actual[0, 0, :], spinning[0])
+        assert np.all(np.isfinite(actual[1]))
+        np.testing.assert_allclose(actual[1], variational.lgvi(dum, ast, spinning[1], time))
+        ast.close()
+
+    def test_eoms(self):
+        with pytest.raises(ValueError):
+            variational.lgvi(dum, None, states, self.time, eoms='body')
@@ -8,10 +8,10 @@ import pdb
 import os
 
 import dynamics.asteroid as asteroid
+from dynamics import trajectory
 from kinematics import attitude
 from visualization import graphics
 from point_cloud import wavefront
-import utilities
 
 
 def test_asteroid():
@@ -178,26 +178,18 @@ def inertial_asteroid_trajectory_cpp(time, state, inertial_intersections,
         est_initial_vertices = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         num_vert = est_initial_vertices.shape[0]
 
-        rv_group = hf['reconstructed_vertex']
-        rf_group = hf['reconstructed_face']
-        rw_group = hf['reconstructed_weight']
-        Ra_group = hf['Ra']
-
-        rv_keys = np.array(utilities.sorted_nicely(list(rv_group.keys())))
+        explore = trajectory.TrajectoryReader(hf)
         
-        for (t, pos, Rb2i, ints, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                            inertial_intersections,
-                                            rv_keys):
+        for (t, pos, Rb2i, ints, Ra, (vertices, new_faces, new_weight)) in zip(
+                time, state[:, 0:3], state[:, 6:15], inertial_intersections,
+                explore.read('Ra'), explore.meshes()):
             # rotate teh asteroid
             # Ra = ast.rot_ast2int(t)
             mesh.scene.disable_render = True
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3,3))
             # parse out the vertices x, y, z
             # rotate the asteroid
-            new_vertices = Ra.dot(rv_group[key][()].T).T
-            new_faces = rf_group[key][()]
-            new_weight = np.squeeze(rw_group[key][()])
+            new_vertices = Ra.dot(vertices.T).T
             
             # store value for number of vertices
             # add current time 
@@ -275,13 +267,11 @@ def inertial_asteroid_landing_cpp(time, state, filename, mayavi_objects,
         v = hf['landing/vertices'][()]
         f = hf['landing/faces'][()]
 
-        Ra_group = hf['landing/Ra']
-        keys = np.array(utilities.sorted_nicely(list(Ra_group.keys())))
+        Ra_array = trajectory.TrajectoryReader(hf['landing']).read('Ra')
         
-        for (t, pos, Rb2i, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                       keys):
+        for (t, pos, Rb2i, Ra) in zip(time, state[:, 0:3], state[:, 6:15],
+                                      Ra_array):
             mesh.scene.disable_render = True
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3, 3))
             new_vertices = Ra.dot(v.T).T
             new_faces = f
@@ -337,26 +327,18 @@ def inertial_asteroid_refinement_cpp(time, state, inertial_intersections,
         est_initial_vertices = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         num_vert = est_initial_vertices.shape[0]
 
-        rv_group = hf['refinement/reconstructed_vertex']
-        rf_group = hf['refinement/reconstructed_face']
-        rw_group = hf['refinement/reconstructed_weight']
-        Ra_group = hf['refinement/Ra']
-
-        rv_keys = np.array(utilities.sorted_nicely(list(rv_group.keys())))
+        explore = trajectory.TrajectoryReader(hf['refinement'])
         
-        for (t, pos, Rb2i, ints, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                            inertial_intersections,
-                                            rv_keys):
+        for (t, pos, Rb2i, ints, Ra, (vertices, new_faces, new_weight)) in zip(
+                time, state[:, 0:3], state[:, 6:15], inertial_intersections,
+                explore.read('Ra'), explore.meshes()):
             # rotate teh asteroid
             # Ra = ast.rot_ast2int(t)
             mesh.scene.disable_render = True
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3,3))
             # parse out the vertices x, y, z
             # rotate the asteroid
-            new_vertices = Ra.dot(rv_group[key][()].T).T
-            new_faces = rf_group[key][()]
-            new_weight = np.squeeze(rw_group[key][()])
+            new_vertices = Ra.dot(vertices.T).T
             
             # store value for number of vertices
             # add current time 
@@ -416,14 +398,12 @@ def inertial_asteroid_landing_cpp_save(time, state, filename, mayavi_objects,
         v = hf['landing/vertices'][()]
         f = hf['landing/faces'][()]
 
-        Ra_group = hf['landing/Ra']
-        keys = np.array(utilities.sorted_nicely(list(Ra_group.keys())))
+        Ra_array = trajectory.TrajectoryReader(hf['landing']).read('Ra')
         
         ii = 0
-        for (t, pos, Rb2i, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                       keys):
+        for (t, pos, Rb2i, Ra) in zip(time, state[:, 0:3], state[:, 6:15],
+                                      Ra_array):
             mesh.scene.disable_render = True
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3, 3))
             new_vertices = Ra.dot(v.T).T
             new_faces = f
@@ -468,28 +448,20 @@ def inertial_asteroid_trajectory_cpp_save(time, state, inertial_intersections,
     pc_sources = pc_points.mlab_source
 
     with h5py.File(hdf5_file, 'r') as hf:
-        rv_group = hf['reconstructed_vertex']
-        rf_group = hf['reconstructed_face']
-        rw_group = hf['reconstructed_weight']
-        Ra_group = hf['Ra']
+        explore = trajectory.TrajectoryReader(hf)
         est_initial_vertices = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         num_vert = est_initial_vertices.shape[0]
 
-        rv_keys = np.array(utilities.sorted_nicely(list(rv_group.keys())))
-        
-        for (t, pos, Rb2i, ints, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                            inertial_intersections,
-                                            rv_keys):
+        for (t, pos, Rb2i, ints, Ra, (vertices, new_faces, new_weight)) in zip(
+                time, state[:, 0:3], state[:, 6:15], inertial_intersections,
+                explore.read('Ra'), explore.meshes()):
             # rotate teh asteroid
             mesh.scene.disable_render = True
             # Ra = ast.rot_ast2int(t)
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3,3))
             # parse out the vertices x, y, z
             # rotate the asteroid
-            new_vertices = Ra.dot(rv_group[key][()].T).T
-            new_faces = rf_group[key][()]
-            new_weight = np.squeeze(rw_group[key][()])
+            new_vertices = Ra.dot(vertices.T).T
 
             # add current time 
             time_text.trait_set(text="t: {:8.1f}".format(t))
@@ -561,26 +533,19 @@ def inertial_asteroid_refinement_cpp_save(time, state, inertial_intersections,
         est_initial_vertices = hf['simulation_parameters/estimate_asteroid/initial_vertices'][()]
         num_vert = est_initial_vertices.shape[0]
 
-        rv_group = hf['refinement/reconstructed_vertex']
-        rf_group = hf['refinement/reconstructed_face']
-        rw_group = hf['refinement/reconstructed_weight']
-        Ra_group = hf['refinement/Ra']
+        explore = trajectory.TrajectoryReader(hf['refinement'])
 
-        rv_keys = np.array(utilities.sorted_nicely(list(rv_group.keys())))
         ii = 0        
-        for (t, pos, Rb2i, ints, key) in zip(time, state[:, 0:3], state[:, 6:15],
-                                            inertial_intersections,
-                                            rv_keys):
+        for (t, pos, Rb2i, ints, Ra, (vertices, new_faces, new_weight)) in zip(
+                time, state[:, 0:3], state[:, 6:15], inertial_intersections,
+                explore.read('Ra'), explore.meshes()):
             # rotate teh asteroid
             # Ra = ast.rot_ast2int(t)
             mesh.scene.disable_render = True
-            Ra = Ra_group[key][()]
             Rb2i = Rb2i.reshape((3,3))
             # parse out the vertices x, y, z
             # rotate the asteroid
-            new_vertices = Ra.dot(rv_group[key][()].T).T
-            new_faces = rf_group[key][()]
-            new_weight = np.squeeze(rw_group[key][()])
+            new_vertices = Ra.dot(vertices.T).T
             
             # store value for number of vertices
             # add current time 